@@ -55,6 +55,9 @@ setup(
             "isort>=5.0.0",
             "pip-audit>=2.0.0",
         ],
+        "pikepdf": [
+            "pikepdf>=8.0.0",
+        ],
     },
     entry_points={
         "console_scripts": [
@@ -14,7 +14,14 @@ from .exceptions import (
     PDFToolError,
     PDFValidationError,
 )
-from .interfaces import BasePDFOperation
+from .interfaces import (
+    BasePDFOperation,
+    PDFDocument,
+    PDFEngine,
+    available_engines,
+    get_engine,
+    register_engine,
+)
 from .models import (
     MergeOptions,
     OperationResult,
@@ -27,6 +34,11 @@ from .models import (
 __all__ = [
     # 核心接口
     "BasePDFOperation",
+    "PDFDocument",
+    "PDFEngine",
+    "available_engines",
+    "get_engine",
+    "register_engine",
     # 模型
     "PDFInfo",
     "SplitOptions",
@@ -3,15 +3,138 @@ Core interfaces for PDF operations
 """
 
 import logging
+from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Optional
-
-import PyPDF2
+from typing import BinaryIO, Dict, Iterable, List, Optional, Sequence, Union
 
+from ..config.settings import settings
 from .exceptions import PDFFileNotFoundError, PDFValidationError
+from .models import EncryptionAlgorithm
+from .utils.reader_cache import borrow_reader
 
 logger = logging.getLogger(__name__)
 
+# 未配置引擎时使用的默认引擎
+DEFAULT_ENGINE = "pypdf2"
+
+
+class PDFDocument(ABC):
+    """A document opened or created by a ``PDFEngine``
+
+    Pages are numbered from 0. Changes stay in memory until ``write``.
+    """
+
+    @property
+    @abstractmethod
+    def page_count(self) -> int:
+        """Number of pages"""
+
+    @property
+    @abstractmethod
+    def is_encrypted(self) -> bool:
+        """Whether the source file is encrypted"""
+
+    @abstractmethod
+    def copy_pages(
+        self,
+        source: "PDFDocument",
+        indices: Optional[Sequence[int]] = None,
+        import_outline: bool = False,
+    ) -> None:
+        """Append pages of ``source`` (all by default), optionally with its bookmarks
+
+        ``source`` must be a document of the same engine and stay open until
+        this document is written.
+        """
+
+    @abstractmethod
+    def stamp(self, stamp: "PDFDocument", indices: Iterable[int]) -> None:
+        """Draw the first page of ``stamp`` unscaled over the pages at ``indices``"""
+
+    @abstractmethod
+    def encrypt(
+        self,
+        algorithm: EncryptionAlgorithm,
+        user_password: str,
+        owner_password: str,
+        permissions: int,
+    ) -> None:
+        """Encrypt the document when it is written; ``permissions`` are the ``/P`` bits"""
+
+    @abstractmethod
+    def write(
+        self, output_file: Path, linearize: bool = False, max_workers: Optional[int] = None
+    ) -> None:
+        """Write the pages, bookmarks of copied pages and metadata to ``output_file``
+
+        Raises:
+            PDFValidationError: if the source document is encrypted
+        """
+
+    def close(self) -> None:
+        """Release the source file"""
+
+    def __enter__(self) -> "PDFDocument":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class PDFEngine(ABC):
+    """A PDF library the operations can run on, registered with ``register_engine``"""
+
+    name: str = ""
+
+    @abstractmethod
+    def open(self, source: Union[Path, BinaryIO], check_limits: bool = True) -> PDFDocument:
+        """Open a document
+
+        Args:
+            source: PDF file or binary stream, which must stay open with the document
+            check_limits: Check the document against the structure limits; files
+                written by the operations themselves can skip it
+
+        Raises:
+            PDFValidationError: if the document cannot be parsed or exceeds a limit
+        """
+
+    @abstractmethod
+    def new(self) -> PDFDocument:
+        """An empty document to copy pages into"""
+
+
+_engines: Dict[str, PDFEngine] = {}
+_unavailable_engines_logged = set()
+
+
+def register_engine(engine: PDFEngine) -> None:
+    """Make an engine available under its name"""
+    _engines[engine.name] = engine
+
+
+def available_engines() -> List[str]:
+    """Names of the registered engines"""
+    return sorted(_engines)
+
+
+def get_engine(name: Optional[str] = None, operation: Optional[str] = None) -> PDFEngine:
+    """Engine by name, or the one configured for ``operation``
+
+    Without a name, ``settings.pdf_engines[operation]`` is used, falling back to
+    ``settings.pdf_engine``. An engine whose library is not installed is
+    replaced by the default engine, with a warning.
+    """
+    if name is None:
+        name = (settings.pdf_engines or {}).get(operation or "", settings.pdf_engine)
+    name = (name or DEFAULT_ENGINE).lower()
+    if name not in _engines:
+        if name not in _unavailable_engines_logged:
+            _unavailable_engines_logged.add(name)
+            logger.warning(f"PDF 引擎 {name} 不可用（未安装或名称错误），使用 {DEFAULT_ENGINE}")
+        name = DEFAULT_ENGINE
+    return _engines[name]
+
 
 class BasePDFOperation:
     """Base class for PDF operations with common functionality"""
@@ -20,19 +143,32 @@ class BasePDFOperation:
         self.temp_dir = temp_dir or Path("temp")
         self.temp_dir.mkdir(exist_ok=True)
 
-    def validate_pdf_file(self, file_path: Path) -> None:
-        """Common PDF file validation"""
+    @property
+    def engine(self) -> PDFEngine:
+        """PDF engine configured for this operation"""
+        return get_engine(operation=getattr(self, "operation_name", None))
+
+    def validate_pdf_file(self, file_path: Path, parse: bool = True) -> None:
+        """Common PDF file validation
+
+        Args:
+            file_path: PDF file to validate
+            parse: Whether to parse the file with PyPDF2 and check it against
+                the structure limits; callers that parse the file themselves later
+                (e.g. in worker processes) can skip it
+        """
         if not file_path.exists():
             raise PDFFileNotFoundError(f"PDF file not found: {file_path}")
 
         if file_path.suffix.lower() != ".pdf":
             raise PDFValidationError(f"File is not a PDF: {file_path}")
 
-        try:
-            with open(file_path, "rb") as f:
-                PyPDF2.PdfReader(f)
-        except Exception as e:
-            raise PDFValidationError(f"Invalid PDF file: {file_path}. Error: {str(e)}")
+        if not parse:
+            return
+
+        # 解析结果进入已解析文档缓存，随后读取同一文档的操作无需再次解析
+        with borrow_reader(file_path):
+            pass
 
     def create_temp_file(self, suffix: str = "") -> Path:
         """Create a temporary file path"""
@@ -6,7 +6,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 
 class PageSelectionMode(Enum):
@@ -15,6 +15,9 @@ class PageSelectionMode(Enum):
     ALL_PAGES = "all"  # 全部页面（每页单独文件）
     SPECIFIC_PAGES = "pages"  # 指定页面列表（每页单独文件）
     SINGLE_FILE = "single"  # 将选中页面合并为单个文件
+    CHUNK = "chunk"  # 按固定页数拆分（每 N 页一个文件）
+    MAX_BYTES = "max_bytes"  # 按文件大小上限拆分
+    OUTLINE = "outline"  # 按顶层书签（章节）拆分
 
 
 class WatermarkType(Enum):
@@ -38,10 +41,77 @@ class WatermarkPosition(Enum):
     BOTTOM_RIGHT = 9
 
 
+class EncryptionAlgorithm(Enum):
+    """加密算法（标准安全处理程序）"""
+
+    RC4_128 = "rc4_128"  # RC4 128位（R3，兼容旧阅读器）
+    AES_128 = "aes_128"  # AES 128位（R4）
+    AES_256 = "aes_256"  # AES 256位（R6，推荐）
+
+
 # 保持向后兼容
 SplitMode = PageSelectionMode
 
 
+@dataclass
+class PageSizeSummary:
+    """一组尺寸和旋转角度相同的页面"""
+
+    width: float  # 单位: pt
+    height: float
+    rotation: int
+    count: int
+
+
+@dataclass
+class DocumentAnalysis:
+    """文档结构分析结果
+
+    加密且无法用空密码打开的文档只包含文件级信息，对象内容相关的字段为 None。
+    """
+
+    version: str
+    object_count: int
+    encrypted: bool
+    linearized: bool
+    encryption: Optional[str] = None  # 如 "Standard V5 R6 256-bit"
+    page_sizes: Optional[List[PageSizeSummary]] = None
+    fonts: Optional[List[str]] = None
+    image_count: Optional[int] = None
+    image_bytes: Optional[int] = None  # 图片流编码后的总字节数
+    text_pages: Optional[int] = None  # 使用字体的页面
+    scanned_pages: Optional[int] = None  # 不使用字体、只绘制图片的页面
+
+    @property
+    def content_type(self) -> Optional[str]:
+        """text / scanned / mixed / other"""
+        if self.text_pages is None or self.scanned_pages is None:
+            return None
+        if self.text_pages and self.scanned_pages:
+            return "mixed"
+        if self.scanned_pages:
+            return "scanned"
+        if self.text_pages:
+            return "text"
+        return "other"
+
+
+@dataclass
+class InfoOptions:
+    """信息提取选项"""
+
+    analyze: bool = False  # 遍历一次对象表，收集页面尺寸、字体、图片等分析数据
+
+
+class CompressionLevel(Enum):
+    """压缩级别"""
+
+    LOW = "low"  # 轻度压缩，保持高质量
+    MEDIUM = "medium"  # 平衡质量和大小
+    HIGH = "high"  # 最小文件大小
+    CUSTOM = "custom"  # 自定义图片质量和分辨率
+
+
 @dataclass
 class PDFInfo:
     """PDF metadata information"""
@@ -52,6 +122,7 @@ class PDFInfo:
     creation_date: Optional[datetime] = None
     file_size: Optional[int] = None
     file_path: Optional[Path] = None
+    analysis: Optional[DocumentAnalysis] = None
 
 
 @dataclass
@@ -61,10 +132,18 @@ class PageSelectionOptions:
     mode: PageSelectionMode
     # 页面选择参数
     pages: Optional[List[int]] = None  # 指定页面列表（SPECIFIC_PAGES/SINGLE_FILE模式）
+    chunk_size: Optional[int] = None  # 每个文件的页数（CHUNK模式）
+    max_bytes: Optional[int] = None  # 每个文件的大小上限，字节（MAX_BYTES模式）
     # 输出参数
     output_dir: Optional[Path] = None
     filename_prefix: Optional[str] = None
     output_format: str = "pdf"
+    # 只保留页面内容实际使用的资源（字体、图片等）
+    prune_resources: bool = True
+    # 写出后进行结构优化（对象流、重复对象合并、移除不可达对象）
+    optimize: bool = False
+    # 线性化输出（快速 Web 查看），在结构优化之后进行
+    linearize: bool = False
 
 
 # 保持向后兼容的别名
@@ -96,6 +175,23 @@ class MergeOptions:
     output_file: Optional[Path] = None
     preserve_bookmarks: bool = True
     preserve_metadata: bool = True
+    # 分层并行合并：文件分组在子进程中合并为中间文件，再逐层合并直到只剩一个输出
+    tree_merge: bool = False
+    group_size: Optional[int] = None  # 每组文件数，默认使用 settings.merge_group_size
+    max_workers: Optional[int] = None  # 工作进程数，默认使用 settings.max_workers
+    optimize: bool = False  # 写出后进行结构优化
+    linearize: bool = False  # 线性化输出（快速 Web 查看）
+
+
+@dataclass
+class AppendOptions:
+    """Options for appending pages to an existing PDF"""
+
+    output_file: Optional[Path] = None
+    # 增量更新：新页面写在原文件 %%EOF 之后，原始内容不重新解析和写出
+    incremental: bool = True
+    # 直接追加到基础文件本身（不复制），仅支持增量更新
+    in_place: bool = False
 
 
 @dataclass
@@ -119,10 +215,35 @@ class WatermarkOptions:
     page_selection: PageSelectionMode = PageSelectionMode.ALL_PAGES
     specific_pages: Optional[List[int]] = None
 
+    # 以增量更新方式追加水印（原始版本仍保留在文件中）
+    incremental: bool = False
+
+    # 写出后进行结构优化（增量更新时原始版本被移除）
+    optimize: bool = False
+
+    # 线性化输出（快速 Web 查看），同样会移除增量更新前的原始版本
+    linearize: bool = False
+
     # 输出参数
     output_file: Optional[Path] = None
 
 
+@dataclass
+class BulkWatermarkOptions:
+    """按接收者批量生成个性化文本水印的选项
+
+    ``watermark.text`` 是模板，以 ``{字段名}`` 引用接收者字段，如
+    "{name} - {email}"；``{{`` 和 ``}}`` 表示花括号本身。
+    """
+
+    watermark: WatermarkOptions
+    recipients: List[Dict[str, str]]
+    name_field: str = "name"  # 用于输出文件名的接收者字段
+    output_dir: Optional[Path] = None
+    filename_prefix: Optional[str] = None
+    max_workers: Optional[int] = None  # 并行写出的线程数，默认使用 settings.max_workers
+
+
 @dataclass
 class PasswordProtectionOptions:
     """密码保护选项"""
@@ -137,6 +258,80 @@ class PasswordProtectionOptions:
     allow_screen_readers: bool = True  # 允许屏幕阅读器访问
     allow_assembly: bool = True  # 允许组装（页面插入、删除等）
     allow_degraded_printing: bool = True  # 允许低质量打印
+    algorithm: EncryptionAlgorithm = EncryptionAlgorithm.AES_256  # 加密算法
+    max_workers: Optional[int] = None  # 并行加密线程数，默认使用 settings.max_workers
+    linearize: bool = False  # 线性化输出（快速 Web 查看）
+    output_file: Optional[Path] = None
+
+
+@dataclass
+class RecipientProtection:
+    """分发接收者：名称（用于输出文件名）及其密码与权限"""
+
+    name: str
+    protection: PasswordProtectionOptions
+
+
+@dataclass
+class PasswordDistributionOptions:
+    """按接收者分发加密副本的选项"""
+
+    recipients: List[RecipientProtection]
+    output_dir: Optional[Path] = None
+    filename_prefix: Optional[str] = None
+    max_workers: Optional[int] = None  # 并行写出的线程数，默认使用 settings.max_workers
+
+
+@dataclass
+class CompressOptions:
+    """压缩选项
+
+    image_quality / max_image_dpi 为 None 时使用压缩级别的预设值
+    """
+
+    level: CompressionLevel = CompressionLevel.MEDIUM
+    image_quality: Optional[int] = None  # JPEG 质量 10-100
+    max_image_dpi: Optional[int] = None  # 显示分辨率超过该值的图片降采样
+    remove_metadata: bool = False
+    remove_bookmarks: bool = False
+    max_workers: Optional[int] = None  # 图片处理进程数，默认使用 settings.max_workers
+    output_file: Optional[Path] = None
+
+
+@dataclass
+class OptimizeOptions:
+    """结构优化选项"""
+
+    object_streams: bool = True  # 非流对象打包进压缩对象流
+    deduplicate: bool = True  # 合并内容相同的对象
+    output_file: Optional[Path] = None
+
+
+@dataclass
+class RepairOptions:
+    """修复选项"""
+
+    # 重建交叉引用后重写为只包含可达对象的干净文件；
+    # 否则只在原文件之后追加重建的交叉引用流（原始字节不变）
+    rewrite: bool = True
+    output_file: Optional[Path] = None
+
+
+@dataclass
+class MetadataOptions:
+    """元数据编辑选项
+
+    None 表示保持不变，空字符串表示删除该条目
+    """
+
+    title: Optional[str] = None
+    author: Optional[str] = None
+    subject: Optional[str] = None
+    keywords: Optional[str] = None
+    creator: Optional[str] = None
+    producer: Optional[str] = None
+    # 增量更新：只追加新的信息字典和交叉引用，原始内容原样保留
+    incremental: bool = True
     output_file: Optional[Path] = None
 
 
@@ -5,9 +5,26 @@
 - 日志配置
 - 数据验证
 - 文件操作
+- 不可信文档的资源上限
+- 按内容哈希缓存已解析的文档
 """
 
+from .files import file_sha256
+from .limits import (
+    LimitedPdfReader,
+    PageTreeLimits,
+    check_structure,
+    inflate,
+    iter_page_tree,
+    open_reader,
+)
 from .logging import get_logger, setup_logging
+from .reader_cache import (
+    ReaderCache,
+    borrow_reader,
+    borrow_reader_with_key,
+    reader_cache,
+)
 from .validators import (
     sanitize_filename,
     validate_file_extension,
@@ -24,4 +41,15 @@ __all__ = [
     "validate_mime_type",
     "validate_pdf_files",
     "sanitize_filename",
+    "file_sha256",
+    "check_structure",
+    "LimitedPdfReader",
+    "PageTreeLimits",
+    "iter_page_tree",
+    "inflate",
+    "open_reader",
+    "ReaderCache",
+    "borrow_reader",
+    "borrow_reader_with_key",
+    "reader_cache",
 ]
@@ -0,0 +1,18 @@
+"""
+File utilities
+"""
+
+import hashlib
+from pathlib import Path
+
+# 计算哈希时每次读取的字节数
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(file_path: Path) -> str:
+    """Hex SHA-256 digest of a file's content, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
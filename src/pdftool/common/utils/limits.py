@@ -0,0 +1,248 @@
+"""
+Resource limits for untrusted documents
+
+A small upload can describe an enormous amount of work: a FlateDecode
+stream inflating to gigabytes, millions of objects, or a page tree with
+millions of nodes. The guards here reject such documents with a
+PDFValidationError before memory or CPU is exhausted:
+
+- every Flate stream PyPDF2 decodes (content streams, object streams,
+  cross-reference streams, images...) is inflated incrementally and stopped
+  at ``settings.max_decoded_stream_size``
+- ``open_reader`` checks the object count and the page count declared by
+  the page tree root right after parsing the cross-reference data; both are
+  read without resolving any page
+- the page tree itself (depth, cycles, number of pages and intermediate
+  nodes) is checked as it is walked: ``iter_page_tree`` and the readers
+  returned by ``open_reader``, whose ``pages`` walk the tree through it, and
+  the traversals of the structure module. Operations reading a few pages
+  pay only for the nodes on the way to them
+"""
+
+import zlib
+from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Sized,
+    Tuple,
+    Union,
+)
+
+import PyPDF2
+import PyPDF2.filters
+from PyPDF2 import PageObject
+from PyPDF2.generic import DictionaryObject, IndirectObject, NameObject, PdfObject
+
+from ...config.settings import settings
+from ..exceptions import PDFToolError, PDFValidationError
+
+# 每次解压的最大输出量：超过上限时最多多分配一块
+INFLATE_CHUNK_SIZE = 1024 * 1024
+
+# 可从父节点继承的页面属性（与 structure.page_tree.INHERITABLE_ATTRIBUTES 相同）
+_INHERITABLE_ATTRIBUTES = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+
+
+def inflate(data: bytes, limit: Optional[int] = None) -> bytes:
+    """Decompress zlib data, refusing output larger than ``limit`` bytes
+
+    Corrupt data is decompressed as far as possible, as PyPDF2 does.
+
+    Raises:
+        PDFValidationError: if the output exceeds the limit
+    """
+    limit = settings.max_decoded_stream_size if limit is None else limit
+    output = bytearray()
+    try:
+        _inflate(zlib.decompressobj(), data, limit, output)
+        return bytes(output)
+    except zlib.error:
+        pass
+
+    # 损坏的流：与 PyPDF2 相同，逐字节解压并跳过出错的部分
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 32)
+    output = bytearray()
+    for start in range(len(data)):
+        try:
+            _inflate(decompressor, data[start : start + 1], limit, output)
+        except zlib.error:
+            pass
+    return bytes(output)
+
+
+def _inflate(decompressor: Any, data: bytes, limit: int, output: bytearray) -> None:
+    while data:
+        output += decompressor.decompress(data, INFLATE_CHUNK_SIZE)
+        if len(output) > limit:
+            raise PDFValidationError(f"流解压后超过 {limit} 字节的上限（可能是解压炸弹）")
+        if decompressor.eof:
+            break
+        data = decompressor.unconsumed_tail
+
+
+def install_decode_guard() -> None:
+    """Make PyPDF2 inflate every Flate stream through ``inflate``"""
+    PyPDF2.filters.decompress = inflate
+
+
+def open_reader(
+    stream: Union[str, Path, BinaryIO], strict: bool = False, check_limits: bool = True
+) -> PyPDF2.PdfReader:
+    """Parse a document and check it against the structure limits
+
+    The returned reader checks the page tree limits when ``pages`` walks the
+    tree. ``check_limits`` can be turned off for files written by pdftool
+    itself.
+
+    Raises:
+        PDFValidationError: if the document cannot be parsed or exceeds a limit
+    """
+    reader_class = LimitedPdfReader if check_limits else PyPDF2.PdfReader
+    try:
+        reader = reader_class(stream, strict=strict)
+    except PDFToolError:
+        raise
+    except Exception as e:
+        name = getattr(stream, "name", stream)
+        raise PDFValidationError(f"Invalid PDF file: {name}. Error: {str(e)}")
+    if check_limits:
+        check_structure(reader)
+    return reader
+
+
+def check_structure(reader: PyPDF2.PdfReader) -> None:
+    """Check the object count and the declared page count of a parsed document
+
+    Only the page tree root is read, so the check costs the same for any
+    document size; the rest of the tree is checked when it is walked.
+
+    Raises:
+        PDFValidationError: if the document exceeds a limit
+    """
+    objects = sum(len(entries) for entries in reader.xref.values()) + len(reader.xref_objStm)
+    if objects > settings.max_object_count:
+        raise PDFValidationError(
+            f"文档包含 {objects} 个对象，超过 {settings.max_object_count} 个的上限"
+        )
+
+    if reader.is_encrypted:
+        # 页面树在解密之后才能读取，由各操作自行处理
+        return
+    try:
+        root = reader.trailer["/Root"].get_object()["/Pages"].get_object()
+    except Exception:
+        # 缺少页面树的文档由各操作报告
+        return
+    count = root.get("/Count") if isinstance(root, DictionaryObject) else None
+    if isinstance(count, int) and count > settings.max_page_count:
+        raise PDFValidationError(f"文档包含 {count} 页，超过 {settings.max_page_count} 页的上限")
+
+
+class PageTreeLimits:
+    """Page tree limits, checked on the nodes one traversal reaches
+
+    Cycles are detected by object number; ``/Count`` is not trusted, pages
+    and intermediate nodes are counted as they are reached.
+    """
+
+    def __init__(self) -> None:
+        self.visited: Set[int] = set()
+        self.pages = 0
+        self.nodes = 0
+
+    def visit(self, node_ref: object, depth: int) -> None:
+        """Check a node reached at ``depth`` (the root is at depth 1)"""
+        if isinstance(node_ref, IndirectObject):
+            if node_ref.idnum in self.visited:
+                raise PDFValidationError("页面树中存在循环引用")
+            self.visited.add(node_ref.idnum)
+        if depth > settings.max_nesting_depth:
+            raise PDFValidationError(f"页面树深度超过 {settings.max_nesting_depth} 层的上限")
+
+    def page(self) -> None:
+        """Count a page"""
+        self.pages += 1
+        if self.pages > settings.max_page_count:
+            raise PDFValidationError(f"文档页数超过 {settings.max_page_count} 页的上限")
+
+    def node(self, kids: Sized) -> None:
+        """Count an intermediate node with its kids"""
+        self.nodes += 1
+        if self.nodes > settings.max_page_count or len(kids) > settings.max_page_count:
+            raise PDFValidationError(f"页面树节点数超过 {settings.max_page_count} 个的上限")
+
+
+def iter_page_tree(
+    reader: PyPDF2.PdfReader,
+) -> Iterator[Tuple[Optional[IndirectObject], DictionaryObject, Dict[str, PdfObject]]]:
+    """Walk the whole page tree without recursion, checking the limits
+
+    Yields:
+        For each page in order: its reference, its dictionary and the
+        inheritable attributes set by its ancestors
+
+    Raises:
+        PDFValidationError: if the page tree exceeds a limit
+    """
+    root_ref = reader.trailer["/Root"].get_object().raw_get("/Pages")
+    limits = PageTreeLimits()
+    # 栈元素: (节点引用, 深度, 继承属性)
+    stack: List[Tuple[Any, int, Dict[str, PdfObject]]] = [(root_ref, 1, {})]
+    while stack:
+        node_ref, depth, inherited = stack.pop()
+        limits.visit(node_ref, depth)
+        node = node_ref.get_object()
+        if not isinstance(node, DictionaryObject):
+            continue
+        kids = node["/Kids"] if "/Kids" in node else None
+        if not isinstance(kids, list):
+            limits.page()
+            page_ref = node_ref if isinstance(node_ref, IndirectObject) else None
+            yield page_ref, node, inherited
+            continue
+
+        limits.node(kids)
+        attributes = dict(inherited)
+        for key in _INHERITABLE_ATTRIBUTES:
+            if key in node:
+                attributes[key] = node[key]
+        stack.extend((kid, depth + 1, attributes) for kid in reversed(kids))
+
+
+class LimitedPdfReader(PyPDF2.PdfReader):
+    """PdfReader whose ``pages`` walk the page tree with ``iter_page_tree``
+
+    PyPDF2 flattens the page tree recursively, trusting its structure. Here
+    the tree is checked against the limits as it is flattened, only when an
+    operation first accesses ``pages``.
+    """
+
+    def _flatten(
+        self,
+        pages: Union[None, DictionaryObject, PageObject] = None,
+        inherit: Optional[Dict[str, Any]] = None,
+        indirect_reference: Optional[IndirectObject] = None,
+    ) -> None:
+        if pages is not None:
+            super()._flatten(pages, inherit, indirect_reference)
+            return
+
+        flattened = []
+        for page_ref, page, inherited in iter_page_tree(self):
+            # 与 PyPDF2 相同：继承属性写入页面字典
+            for key, value in inherited.items():
+                if key not in page:
+                    page[NameObject(key)] = value  # type: ignore[assignment]
+            page_obj = PageObject(self, page_ref)
+            page_obj.update(page)
+            flattened.append(page_obj)
+        self.flattened_pages = flattened
+
+
+install_decode_guard()
@@ -0,0 +1,194 @@
+"""
+Parsed document cache
+
+Every operation parses its input again with ``PdfReader``, even when the
+same file (a popular template) is uploaded request after request. The
+cache here keeps parsed readers, with their cross-reference data, trailer,
+resolved objects and page list, keyed by the SHA-256 of the file content,
+so a document seen before is not parsed again.
+
+The readers are shared. ``borrow_reader`` lends one for the duration of a
+``with`` block, to one borrower at a time (``PdfReader`` is not
+thread-safe), and the borrower must only read from it: operations that
+modify pages (watermark, compress...) parse their own copy with
+``open_reader``. Encrypted documents are not cached, since decrypting
+changes the reader. ``borrow_reader_with_key`` also yields the content hash,
+for callers that key their own caches by content.
+
+Memory is accounted per reader as the file content it holds plus an
+estimate for its parsed objects, re-estimated each time it is returned.
+The least recently used readers are evicted once the total exceeds
+``settings.reader_cache_size`` bytes.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from io import BytesIO
+from pathlib import Path
+from typing import ContextManager, Iterator, Optional, Tuple
+
+import PyPDF2
+from PyPDF2.generic import EncodedStreamObject
+
+from ...config.settings import settings
+from .files import file_sha256
+from .limits import open_reader
+
+logger = logging.getLogger(__name__)
+
+# 解析后每个交叉引用条目、每个已读取对象占用内存的估计值（字节）
+XREF_ENTRY_SIZE = 200
+RESOLVED_OBJECT_SIZE = 4096
+
+
+@dataclass
+class _Entry:
+    reader: PyPDF2.PdfReader
+    file_size: int
+    size: int
+    lock: threading.RLock = field(default_factory=threading.RLock)
+
+
+class ReaderCache:
+    """LRU cache of parsed readers keyed by content hash, bounded in bytes"""
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        # None：使用 settings.reader_cache_size（运行时修改立即生效）
+        self._max_bytes = max_bytes
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def max_bytes(self) -> int:
+        return settings.reader_cache_size if self._max_bytes is None else self._max_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @contextmanager
+    def borrow(self, file_path: Path) -> Iterator[PyPDF2.PdfReader]:
+        """Lend the parsed reader of a file, parsing it (with limits) on a miss
+
+        Files larger than the cache are parsed from disk and not cached.
+
+        Raises:
+            PDFValidationError: if the document cannot be parsed or exceeds a limit
+        """
+        if file_path.stat().st_size > self.max_bytes:
+            # 不缓存时不需要内容哈希
+            with open(file_path, "rb") as f:
+                yield open_reader(f)
+            return
+
+        with self.borrow_with_key(file_path) as (reader, _):
+            yield reader
+
+    @contextmanager
+    def borrow_with_key(self, file_path: Path) -> Iterator[Tuple[PyPDF2.PdfReader, str]]:
+        """``borrow``, also yielding the file's content hash (hex SHA-256)
+
+        The hash is the cache key, so callers keying their own caches by
+        content do not hash the file a second time. Files larger than the
+        cache are hashed from disk in chunks.
+        """
+        file_size = file_path.stat().st_size
+        if file_size > self.max_bytes:
+            key = file_sha256(file_path)
+            with open(file_path, "rb") as f:
+                yield open_reader(f), key
+            return
+
+        data = file_path.read_bytes()
+        key = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if entry is None:
+            stream = BytesIO(data)
+            stream.name = str(file_path)  # 错误信息中显示文件名
+            reader = open_reader(stream)
+        # 命中时不再需要文件内容；未命中时内容由读取器的流持有
+        del data
+
+        if entry is None:
+            if reader.is_encrypted:
+                yield reader, key
+                return
+            entry = self._add(key, _Entry(reader, file_size, _reader_size(reader, file_size)))
+
+        with entry.lock:
+            try:
+                yield entry.reader, key
+            finally:
+                self._account(key, entry)
+
+    def clear(self) -> None:
+        """Drop all cached readers"""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def _add(self, key: str, entry: _Entry) -> _Entry:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                # 另一个线程同时解析了同一文档
+                return cached
+            self._entries[key] = entry
+            self.total_bytes += entry.size
+            self._evict()
+        return entry
+
+    def _account(self, key: str, entry: _Entry) -> None:
+        """Re-estimate a returned reader (it may have resolved more objects)"""
+        size = _reader_size(entry.reader, entry.file_size)
+        with self._lock:
+            if self._entries.get(key) is entry:
+                self.total_bytes += size - entry.size
+                entry.size = size
+                self._evict()
+
+    def _evict(self) -> None:
+        while self._entries and self.total_bytes > self.max_bytes:
+            key, evicted = self._entries.popitem(last=False)
+            self.total_bytes -= evicted.size
+            self.evictions += 1
+            logger.debug(f"淘汰已解析文档 {key[:12]}（{evicted.size} 字节）")
+
+
+def _reader_size(reader: PyPDF2.PdfReader, file_size: int) -> int:
+    """Estimated memory held by a parsed reader of a file of ``file_size`` bytes"""
+    entries = sum(len(table) for table in reader.xref.values()) + len(reader.xref_objStm)
+    size = file_size + entries * XREF_ENTRY_SIZE
+    size += len(reader.resolved_objects) * RESOLVED_OBJECT_SIZE
+    for obj in reader.resolved_objects.values():
+        if isinstance(obj, EncodedStreamObject) and obj.decoded_self is not None:
+            size += len(obj.decoded_self._data)
+    return size
+
+
+# 进程内共享的缓存
+reader_cache = ReaderCache()
+
+
+def borrow_reader(file_path: Path) -> ContextManager[PyPDF2.PdfReader]:
+    """``reader_cache.borrow``: lend the parsed, read-only reader of a file"""
+    return reader_cache.borrow(file_path)
+
+
+def borrow_reader_with_key(file_path: Path) -> ContextManager[Tuple[PyPDF2.PdfReader, str]]:
+    """``reader_cache.borrow_with_key``: the shared reader and the file's content hash"""
+    return reader_cache.borrow_with_key(file_path)
@@ -3,7 +3,7 @@ Configuration settings for PDFTool
 """
 
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 try:
     from dotenv import load_dotenv
@@ -46,9 +46,19 @@ class Settings(BaseSettings):
 
     # File handling
     temp_dir: Path = Field(default=Path("temp"))
+    document_store_dir: Path = Field(default=Path("documents"))  # 按内容哈希存放的文档及其索引
     max_file_size: int = Field(default=100 * 1024 * 1024)  # 100MB
     allowed_extensions: List[str] = Field(default=[".pdf"])
 
+    # Processing
+    max_workers: int = Field(default=4)  # 并行处理的工作进程/线程数
+    merge_group_size: int = Field(default=32)  # 分层合并时每组的文件数
+    # 已解析文档缓存的内存上限（字节），0 表示不缓存
+    reader_cache_size: int = Field(default=256 * 1024 * 1024)
+    # PDF 引擎：默认引擎，以及按操作名覆盖，如 {"watermark": "pikepdf"}
+    pdf_engine: str = Field(default="pypdf2")
+    pdf_engines: Dict[str, str] = Field(default={})
+
     # API settings
     api_host: str = Field(default="0.0.0.0")
     api_port: int = Field(default=8001)
@@ -56,6 +66,11 @@ class Settings(BaseSettings):
 
     # Security
     upload_rate_limit: int = Field(default=10)  # uploads per minute
+    # 不可信文档的资源上限（解压炸弹、异常结构）
+    max_decoded_stream_size: int = Field(default=256 * 1024 * 1024)  # 单个流解压后的大小
+    max_object_count: int = Field(default=1_000_000)
+    max_page_count: int = Field(default=100_000)  # 页数及页面树节点数
+    max_nesting_depth: int = Field(default=64)  # 页面树深度
 
     # Logging
     log_level: str = Field(default="INFO")
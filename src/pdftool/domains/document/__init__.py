@@ -5,8 +5,12 @@
 - PDF合并、拆分、水印、信息提取
 - 文档验证
 - 操作模型
+- 可替换的PDF引擎（PyPDF2、pikepdf）
+- 按内容哈希存储并建立索引的文档存储，按页提取单页PDF
 """
 
+# 导入时注册PDF引擎
+from . import engines  # noqa: F401
 from .models import (
     DocumentInfoOperation,
     DocumentMergeOperation,
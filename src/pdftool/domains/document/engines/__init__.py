@@ -0,0 +1,31 @@
+"""
+PDF引擎模块
+
+合并、密码保护和水印（完整重写）通过 ``BasePDFOperation.engine`` 使用可替换的
+PDF 库，按操作名在配置中选择：
+
+- pypdf2: 默认引擎，加密和线性化使用底层结构模块
+- pikepdf: 基于 qpdf，安装 pikepdf 后可用
+
+其余操作直接基于 PyPDF2 的对象结构实现（structure 模块），不经过引擎。
+各引擎的一致性检查见 tests/test_engines.py；
+``python -m pdftool.domains.document.engines.benchmark`` 比较各引擎的性能。
+"""
+
+from ....common.interfaces import register_engine
+from .pypdf2_engine import PyPDF2Engine, document_writer
+
+register_engine(PyPDF2Engine())
+
+try:
+    from .pikepdf_engine import PikepdfEngine
+except ImportError:
+    PikepdfEngine = None  # type: ignore[assignment,misc]
+else:
+    register_engine(PikepdfEngine())
+
+__all__ = [
+    "PikepdfEngine",
+    "PyPDF2Engine",
+    "document_writer",
+]
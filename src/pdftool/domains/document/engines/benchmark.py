@@ -0,0 +1,137 @@
+"""
+PDF引擎性能基准
+
+    python -m pdftool.domains.document.engines.benchmark [--engine NAME] [--pages N]
+
+在 N 页的样本文档上比较各已注册引擎的耗时（打开、合并、水印、加密、线性化）。
+各引擎的一致性检查是 tests/test_engines.py 中的 pytest 测试。
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from statistics import median
+from typing import Callable, Dict, List, Optional
+
+from reportlab.pdfgen import canvas
+
+from ....common.interfaces import PDFEngine, available_engines, get_engine
+from ....common.models import EncryptionAlgorithm
+
+_PERMISSIONS = -3904 | 4  # 仅允许打印
+
+
+class Samples:
+    """Sample documents written into ``directory``"""
+
+    def __init__(self, directory: Path, pages: int):
+        self.directory = directory
+        self.pages = pages
+        self.large = self._document("large.pdf", pages)
+        self.stamp = self._stamp("stamp.pdf")
+
+    def output(self, name: str) -> Path:
+        return self.directory / name
+
+    def _document(self, name: str, pages: int) -> Path:
+        """Pages with the text "Page n" (from 1)"""
+        path = self.directory / name
+        c = canvas.Canvas(str(path), pagesize=(300, 300))
+        c.setTitle("benchmark")
+        for number in range(1, pages + 1):
+            c.drawString(50, 150, f"Page {number}")
+            c.showPage()
+        c.save()
+        return path
+
+    def _stamp(self, name: str) -> Path:
+        path = self.directory / name
+        c = canvas.Canvas(str(path), pagesize=(300, 300))
+        c.drawString(50, 250, "STAMP")
+        c.showPage()
+        c.save()
+        return path
+
+
+def _bench_open(engine: PDFEngine, samples: Samples) -> None:
+    with engine.open(samples.large) as document:
+        document.page_count
+
+
+def _bench_merge(engine: PDFEngine, samples: Samples) -> None:
+    with engine.open(samples.large) as first, engine.open(samples.large) as second:
+        with engine.new() as document:
+            document.copy_pages(first)
+            document.copy_pages(second)
+            document.write(samples.output(f"{engine.name}_bench_merge.pdf"))
+
+
+def _bench_stamp(engine: PDFEngine, samples: Samples) -> None:
+    with engine.open(samples.large) as document, engine.open(samples.stamp) as stamp:
+        document.stamp(stamp, range(document.page_count))
+        document.write(samples.output(f"{engine.name}_bench_stamp.pdf"))
+
+
+def _bench_encrypt(engine: PDFEngine, samples: Samples) -> None:
+    with engine.open(samples.large) as document:
+        document.encrypt(EncryptionAlgorithm.AES_256, "user", "owner", _PERMISSIONS)
+        document.write(samples.output(f"{engine.name}_bench_encrypt.pdf"))
+
+
+def _bench_linearize(engine: PDFEngine, samples: Samples) -> None:
+    with engine.open(samples.large) as document:
+        document.write(samples.output(f"{engine.name}_bench_linearize.pdf"), linearize=True)
+
+
+BENCHMARKS: Dict[str, Callable[[PDFEngine, Samples], None]] = {
+    "open": _bench_open,
+    "merge x2": _bench_merge,
+    "stamp all": _bench_stamp,
+    "aes-256": _bench_encrypt,
+    "linearize": _bench_linearize,
+}
+
+
+def run_benchmarks(engines: List[PDFEngine], samples: Samples, repeat: int) -> None:
+    """Print the median time of each benchmark per engine"""
+    print(f"\n{samples.pages} 页，{repeat} 次取中位数（秒）")
+    print(f"{'':<12}" + "".join(f"{engine.name:>12}" for engine in engines))
+    for name, benchmark in BENCHMARKS.items():
+        row = f"{name:<12}"
+        for engine in engines:
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                benchmark(engine, samples)
+                timings.append(time.perf_counter() - started)
+            row += f"{median(timings):>12.3f}"
+        print(row)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="PDF引擎性能基准")
+    parser.add_argument(
+        "--engine", action="append", help="只测试指定引擎（可重复），默认全部已注册的引擎"
+    )
+    parser.add_argument("--pages", type=int, default=500, help="样本文档的页数")
+    parser.add_argument("--repeat", type=int, default=3, help="每项基准的运行次数")
+    args = parser.parse_args(argv)
+
+    names = args.engine or available_engines()
+    unknown = sorted(set(names) - set(available_engines()))
+    if unknown:
+        parser.error(
+            f"引擎不可用: {', '.join(unknown)}（已注册: {', '.join(available_engines())}）"
+        )
+    engines = [get_engine(name) for name in names]
+
+    with tempfile.TemporaryDirectory(prefix="pdftool_engines_") as directory:
+        run_benchmarks(engines, Samples(Path(directory), args.pages), args.repeat)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""
+PyPDF2 engine
+
+The default engine. Encryption and linearization use the structure layer
+(parallel object encryption, ``write_linearized``); merging keeps bookmarks
+pointing at the merged pages, and stamping decodes the content of the next
+pages in a thread pool (``prefetch_pages``).
+"""
+
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, List, Optional, Sequence, Tuple, Union, cast
+
+import PyPDF2
+from PyPDF2.generic import IndirectObject, NameObject, NumberObject
+
+from ....common.exceptions import PDFProcessingError, PDFValidationError
+from ....common.interfaces import PDFDocument, PDFEngine
+from ....common.models import EncryptionAlgorithm
+from ....common.utils import open_reader
+from ....config.settings import settings
+from ..structure.encryption import StandardSecurityHandler, write_encrypted
+from ..structure.linearization import write_linearized
+from ..structure.prefetch import prefetch_pages
+from ..structure.serialization import header_version, new_file_id
+
+
+class _OutlinePreservingMerger(PyPDF2.PdfMerger):
+    """PdfMerger that points outline items at the merged page objects
+
+    PyPDF2 3.0 writes the page *index* into outline ``/GoTo`` actions, which
+    viewers (and a later merge of the output) cannot resolve; use the
+    indirect reference of the output page instead.
+
+    Overrides private ``PdfMerger`` methods; PyPDF2 is pinned to 3.0.x for this.
+    """
+
+    def _write_outline_item_on_page(self, outline_item: Any, page: Any) -> None:
+        super()._write_outline_item_on_page(outline_item, page)
+        action = outline_item[NameObject("/A")]
+        action[NameObject("/D")][0] = page.out_pagedata
+
+    def _trim_outline(self, pdf: Any, outline: Any, pages: Any) -> Any:
+        # PyPDF2 按字典内容比较页面，内容相同的页面（如空白页）会被混淆；改为按对象引用比较
+        selected = pages if isinstance(pages, list) else list(range(*pages))
+        references = {_reference(pdf.pages[index].indirect_reference) for index in selected}
+        trimmed = []
+        header_added = True
+        for position, outline_item in enumerate(outline):
+            if isinstance(outline_item, list):
+                children = self._trim_outline(pdf, outline_item, selected)
+                if children:
+                    if not header_added:
+                        trimmed.append(outline[position - 1])
+                    trimmed.append(children)
+            else:
+                header_added = _reference(outline_item.raw_get("/Page")) in references
+                if header_added:
+                    trimmed.append(outline_item)
+        return trimmed
+
+    def _associate_outline_items_to_pages(self, pages: Any, outline: Any = None) -> None:
+        page_ids = {_reference(page.pagedata.indirect_reference): page.id for page in pages}
+        for outline_item in self.outline if outline is None else outline:
+            if isinstance(outline_item, list):
+                self._associate_outline_items_to_pages(pages, outline_item)
+                continue
+            page_id = page_ids.get(_reference(outline_item.raw_get("/Page")))
+            if page_id is not None:
+                outline_item[NameObject("/Page")] = NumberObject(page_id)
+
+    def _create_stream(self, fileobj: Any) -> Any:
+        # 已解析的源文档：共享其文件流，不再把整个文件复制一份
+        if isinstance(fileobj, PyPDF2.PdfReader):
+            return fileobj.stream, fileobj._encryption
+        return super()._create_stream(fileobj)
+
+    def assemble(self) -> PyPDF2.PdfWriter:
+        """The merged pages, named destinations and outline in the output writer
+
+        Same as the first part of ``write``, which can then be left to the
+        structure layer (encryption, linearization).
+        """
+        for page in self.pages:
+            self.output.add_page(page.pagedata)
+            # 直接取 /Kids 中的引用：get_reference 按内容查找，会混淆相同的页面
+            page.out_pagedata = self.output._pages.get_object()["/Kids"][-1]
+        self._write_dests()
+        self._write_outline()
+        return self.output
+
+
+def document_writer(reader: PyPDF2.PdfReader) -> PyPDF2.PdfWriter:
+    """Unencrypted copy of the document's pages and metadata, ready for encryption"""
+    if reader.is_encrypted:
+        raise PDFValidationError("文档已加密，请先解密")
+    writer = PyPDF2.PdfWriter()
+
+    # 复制所有页面
+    for page_num in range(len(reader.pages)):
+        page = reader.pages[page_num]
+        writer.add_page(page)
+
+    # 复制元数据（如果存在）
+    if reader.metadata:
+        writer.add_metadata(reader.metadata)
+    return writer
+
+
+class PyPDF2Document(PDFDocument):
+    """A parsed document (``reader``), or pages copied from other documents"""
+
+    def __init__(self, reader: Optional[PyPDF2.PdfReader] = None, name: str = ""):
+        self.reader = reader
+        self.name = name
+        self.header = reader.pdf_header if reader is not None else "%PDF-1.4"
+        self._merger: Optional[_OutlinePreservingMerger] = None
+        self._handler: Optional[StandardSecurityHandler] = None
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pages())
+
+    @property
+    def is_encrypted(self) -> bool:
+        return self.reader is not None and self.reader.is_encrypted
+
+    def copy_pages(
+        self,
+        source: PDFDocument,
+        indices: Optional[Sequence[int]] = None,
+        import_outline: bool = False,
+    ) -> None:
+        reader = _reader(source)
+        if self._merger is None:
+            self._merger = _OutlinePreservingMerger()
+            if self.reader is not None:
+                self._append(self.reader, None, True)
+        self._append(reader, indices, import_outline)
+        version = header_version(reader.pdf_header, minimum=header_version(self.header, "1.0"))
+        self.header = f"%PDF-{version}"
+
+    def stamp(self, stamp: PDFDocument, indices: Iterable[int]) -> None:
+        stamp_page = _reader(stamp).pages[0]
+        pages = self._pages()
+        # 后续页面的内容流在线程池中预先解压，与当前页面的合并重叠
+        for page in prefetch_pages(pages[index] for index in indices):
+            page.merge_page(stamp_page)
+
+    def encrypt(
+        self,
+        algorithm: EncryptionAlgorithm,
+        user_password: str,
+        owner_password: str,
+        permissions: int,
+    ) -> None:
+        self._handler = StandardSecurityHandler(
+            algorithm,
+            user_password,
+            owner_password,
+            permissions,
+            new_file_id(self.name.encode("utf-8")),
+        )
+
+    def write(
+        self, output_file: Path, linearize: bool = False, max_workers: Optional[int] = None
+    ) -> None:
+        if self._merger is not None:
+            writer = self._merger.assemble()
+        elif self.reader is not None:
+            writer = document_writer(self.reader)
+        else:
+            writer = PyPDF2.PdfWriter()
+        max_workers = max_workers or settings.max_workers
+
+        with open(output_file, "wb") as output_f:
+            if linearize:
+                write_linearized(
+                    output_f,
+                    writer._root,
+                    writer._info,
+                    self.header,
+                    handler=self._handler,
+                    max_workers=max_workers,
+                )
+            elif self._handler is not None:
+                write_encrypted(
+                    writer, output_f, self._handler, header=self.header, max_workers=max_workers
+                )
+            else:
+                writer.write(output_f)
+
+    def close(self) -> None:
+        if self._merger is not None:
+            self._merger.close()
+            self._merger = None
+
+    def _append(
+        self, reader: PyPDF2.PdfReader, indices: Optional[Sequence[int]], import_outline: bool
+    ) -> None:
+        merger = cast(_OutlinePreservingMerger, self._merger)
+        selected = list(range(len(reader.pages))) if indices is None else list(indices)
+        start = len(merger.pages)
+        # PyPDF2 3.0 的 PdfMerger 不支持页码列表，按连续页码段逐段追加
+        for first, stop in _runs(selected):
+            merger.append(reader, pages=(first, stop), import_outline=import_outline)
+        # PdfMerger 会重新解析源文件；换回源文档的页面对象，保留其上尚未写出的修改
+        for merged, index in zip(merger.pages[start:], selected):
+            merged.pagedata = reader.pages[index]
+
+    def _pages(self) -> Sequence[PyPDF2.PageObject]:
+        if self._merger is not None:
+            return [page.pagedata for page in self._merger.pages]
+        if self.reader is not None:
+            return self.reader.pages
+        return []
+
+
+def _reference(obj: Any) -> Optional[Tuple[int, int]]:
+    """``(object number, generation)`` of an indirect reference"""
+    if isinstance(obj, IndirectObject):
+        return obj.idnum, obj.generation
+    return None
+
+
+def _runs(indices: List[int]) -> List[Tuple[int, int]]:
+    """``(start, stop)`` ranges of consecutive page indices, in order"""
+    runs: List[Tuple[int, int]] = []
+    for index in indices:
+        if runs and runs[-1][1] == index:
+            runs[-1] = (runs[-1][0], index + 1)
+        else:
+            runs.append((index, index + 1))
+    return runs
+
+
+def _reader(document: PDFDocument) -> PyPDF2.PdfReader:
+    """The reader of a parsed document of this engine"""
+    if not isinstance(document, PyPDF2Document) or document.reader is None:
+        raise PDFProcessingError("只能使用同一引擎打开的文档")
+    return document.reader
+
+
+class PyPDF2Engine(PDFEngine):
+    """PyPDF2 with the structure limits of ``open_reader``"""
+
+    name = "pypdf2"
+
+    def open(self, source: Union[Path, BinaryIO], check_limits: bool = True) -> PDFDocument:
+        reader = open_reader(source, check_limits=check_limits)
+        return PyPDF2Document(reader, str(getattr(source, "name", source)))
+
+    def new(self) -> PDFDocument:
+        return PyPDF2Document()
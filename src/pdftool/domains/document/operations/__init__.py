@@ -2,16 +2,30 @@
 PDF Operations package
 """
 
+from .append import AppendOperation
+from .bulk_watermark import BulkWatermarkOperation
+from .compress import CompressOperation
+from .distribution import PasswordDistributionOperation
 from .info import InfoOperation
 from .merge import MergeOperation
+from .metadata import MetadataOperation
+from .optimize import OptimizeOperation
 from .password import PasswordProtectionOperation
+from .repair import RepairOperation
 from .split import SplitOperation
 from .watermark import WatermarkOperation
 
 __all__ = [
+    "AppendOperation",
+    "BulkWatermarkOperation",
+    "CompressOperation",
     "InfoOperation",
     "MergeOperation",
+    "MetadataOperation",
+    "OptimizeOperation",
+    "PasswordDistributionOperation",
     "PasswordProtectionOperation",
+    "RepairOperation",
     "SplitOperation",
     "WatermarkOperation",
 ]
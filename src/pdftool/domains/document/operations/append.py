@@ -0,0 +1,156 @@
+"""
+PDF append operation
+"""
+
+import logging
+from pathlib import Path
+from typing import List
+from uuid import uuid4
+
+from PyPDF2.generic import (
+    ArrayObject,
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+    NumberObject,
+)
+
+from ....common.exceptions import PDFProcessingError, PDFToolError, PDFValidationError
+from ....common.interfaces import BasePDFOperation
+from ....common.models import AppendOptions, OperationResult
+from ....common.utils import open_reader
+from ..structure.incremental import IncrementalUpdate
+from ..structure.page_tree import get_page_count, standalone_page
+from .merge import _merge_documents
+
+logger = logging.getLogger(__name__)
+
+
+class AppendOperation(BasePDFOperation):
+    """PDF append operation implementation
+
+    Appends the pages of one or more documents to the end of a base document
+    as an incremental update: the new page objects (and what they reference),
+    one new ``/Pages`` node holding them and the updated page tree root are
+    written after the existing ``%%EOF``. Of the base document only the
+    cross-reference data, the catalog and the page tree root are read; its
+    pages and content are never parsed, so the cost depends on the appended
+    pages only. Each appended file is parsed once.
+    """
+
+    @property
+    def operation_name(self) -> str:
+        return "append"
+
+    def validate_input(self, input_files: List[Path], options: AppendOptions) -> None:
+        """Validate append operation input"""
+        if not isinstance(input_files, list) or len(input_files) < 2:
+            raise PDFValidationError("追加操作需要一个基础文件和至少一个待追加文件")
+
+        # 所有文件由 execute 解析一次：基础文件只读取交叉引用和页面树根节点
+        for file_path in input_files:
+            self.validate_pdf_file(file_path, parse=False)
+
+        if options.in_place and not options.incremental:
+            raise PDFValidationError("原地追加只支持增量更新方式")
+
+    def execute(self, input_files: List[Path], options: AppendOptions) -> OperationResult:
+        """Execute PDF append operation"""
+        self.validate_input(input_files, options)
+
+        base_file, appended_files = input_files[0], input_files[1:]
+        if options.in_place:
+            output_file = base_file
+        else:
+            output_file = options.output_file or self.temp_dir / f"appended_{uuid4().hex}.pdf"
+
+        try:
+            if options.incremental:
+                try:
+                    added = self._append_incremental(
+                        base_file, appended_files, output_file, options.in_place
+                    )
+                    mode = "增量更新"
+                except PDFValidationError as e:
+                    if options.in_place:
+                        raise
+                    logger.warning(f"无法增量追加，回退到完整合并: {e.message}")
+                    added = self._merge(base_file, appended_files, output_file)
+                    mode = "完整合并"
+            else:
+                added = self._merge(base_file, appended_files, output_file)
+                mode = "完整合并"
+
+            logger.info(f"成功追加 {added} 个页面到 {base_file} ({mode})")
+            return OperationResult(
+                success=True,
+                message=f"成功追加 {len(appended_files)} 个文件的 {added} 个页面",
+                output_files=[output_file],
+                details=f"方式: {mode}",
+            )
+
+        except PDFToolError:
+            raise
+        except Exception as e:
+            raise PDFProcessingError(f"追加页面失败: {str(e)}")
+
+    def _append_incremental(
+        self, base_file: Path, appended_files: List[Path], output_file: Path, in_place: bool
+    ) -> int:
+        """Append the pages as an incremental update and return the number of pages"""
+        with open(base_file, "rb") as base:
+            reader = open_reader(base)
+            update = IncrementalUpdate(reader, base_file)
+
+            catalog = reader.trailer["/Root"].get_object()
+            root_ref = catalog.raw_get("/Pages")
+            if not isinstance(root_ref, IndirectObject):
+                raise PDFValidationError("页面树根节点不是间接对象，无法增量追加")
+            root = root_ref.get_object()
+            count = get_page_count(reader)
+
+            # 新页面挂在一个新的 /Pages 节点下，根节点只增加一个子节点
+            node_ref = update.reserve()
+            kids: List[IndirectObject] = []
+            for file_path in appended_files:
+                with open(file_path, "rb") as f:
+                    source = open_reader(f)
+                    if source.is_encrypted:
+                        raise PDFValidationError(f"待追加文件已加密: {file_path.name}")
+                    # 新页面挂在基础文档的页面树下，继承属性须写在页面自身上，
+                    # 否则会继承基础文档根节点的 /Rotate、/CropBox 和 /Resources
+                    pages = [standalone_page(page) for page in source.pages]
+                    kids.extend(update.import_pages(pages, node_ref))
+
+            update.replace_object(
+                node_ref,
+                DictionaryObject(
+                    {
+                        NameObject("/Type"): NameObject("/Pages"),
+                        NameObject("/Parent"): root_ref,
+                        NameObject("/Kids"): ArrayObject(kids),
+                        NameObject("/Count"): NumberObject(len(kids)),
+                    }
+                ),
+            )
+
+            new_root = DictionaryObject(root)
+            new_root[NameObject("/Kids")] = ArrayObject([*root["/Kids"], node_ref])
+            new_root[NameObject("/Count")] = NumberObject(count + len(kids))
+            update.replace_object(root_ref, new_root)
+
+            if in_place:
+                update.write_in_place()
+            else:
+                update.write(output_file)
+            return len(kids)
+
+    def _merge(self, base_file: Path, appended_files: List[Path], output_file: Path) -> int:
+        """Rewrite base and appended documents as one file and return the appended page count"""
+        page_counts = _merge_documents(
+            [str(path) for path in [base_file, *appended_files]],
+            str(output_file),
+            True,
+            self.engine.name,
+        )
+        return sum(page_counts[1:])
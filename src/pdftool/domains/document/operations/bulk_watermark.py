@@ -0,0 +1,226 @@
+"""
+PDF按接收者批量生成个性化水印操作
+"""
+
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
+
+import PyPDF2
+from PyPDF2.generic import (
+    ArrayObject,
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+    PdfObject,
+    StreamObject,
+)
+
+from ....common.exceptions import PDFProcessingError, PDFToolError, PDFValidationError
+from ....common.interfaces import BasePDFOperation
+from ....common.models import (
+    BulkWatermarkOptions,
+    OperationResult,
+    WatermarkOptions,
+    WatermarkType,
+)
+from ....common.utils import open_reader
+from ....config.settings import settings
+from ..structure.document import SerializedDocument
+from ..structure.page_tree import get_page_count, get_pages
+from ..structure.serialization import serialize_object
+from .distribution import MAX_RECIPIENTS, recipient_output_files
+from .watermark import (
+    WatermarkOperation,
+    _content_stream,
+    _draw_stream,
+    _form_xobject,
+    _stamped_page,
+)
+
+logger = logging.getLogger(__name__)
+
+# 水印模板的记号：{{ 和 }} 转义花括号，{字段名} 引用接收者字段，其余花括号无效
+# （不支持 str.format 的格式说明、转换和属性/下标访问）
+_TEMPLATE_TOKEN = re.compile(r"\{\{|\}\}|\{(\w+)\}|[{}]")
+
+
+class BulkWatermarkOperation(BasePDFOperation):
+    """PDF按接收者批量生成个性化水印操作实现
+
+    源文件只解析、序列化一次（SerializedDocument）。水印以 Form XObject 的
+    形式绘制在目标页面上，且对象号对所有接收者相同，因此修改后的页面对象
+    也只生成一次；每个接收者只需生成自己的水印 XObject，其余对象直接复制
+    已序列化的内容。副本在线程池中并行写出，均为完整文件而非增量更新，
+    不会残留未加水印的版本。
+    """
+
+    def __init__(self, temp_dir: Optional[Path] = None):
+        super().__init__(temp_dir)
+        # 复用单文件水印的页面选择和水印绘制逻辑
+        self._watermark = WatermarkOperation(self.temp_dir)
+
+    @property
+    def operation_name(self) -> str:
+        return "bulk_watermark"
+
+    def validate_input(self, input_file: Path, options: BulkWatermarkOptions) -> None:
+        """验证批量水印操作输入"""
+        # 文档由 execute 解析一次
+        self.validate_pdf_file(input_file, parse=False)
+
+        watermark = options.watermark
+        if watermark.watermark_type != WatermarkType.TEXT:
+            raise PDFValidationError("批量水印只支持文本水印")
+        if not watermark.text:
+            raise PDFValidationError("文本水印需要提供文本模板")
+
+        if not options.recipients:
+            raise PDFValidationError("至少需要一个接收者")
+        if len(options.recipients) > MAX_RECIPIENTS:
+            raise PDFValidationError(f"接收者数量不能超过 {MAX_RECIPIENTS}")
+
+        for index, recipient in enumerate(options.recipients, 1):
+            text = render_template(watermark.text, recipient, index)
+            if not text.strip():
+                raise PDFValidationError(f"第 {index} 个接收者的水印文本为空")
+
+    def execute(self, input_file: Path, options: BulkWatermarkOptions) -> OperationResult:
+        """执行PDF批量水印操作"""
+        self.validate_input(input_file, options)
+
+        output_dir = options.output_dir or self.temp_dir / f"bulk_watermark_{uuid4().hex}"
+        output_dir.mkdir(exist_ok=True)
+        prefix = options.filename_prefix or input_file.stem
+        names = [
+            recipient.get(options.name_field, "").strip() or f"recipient_{index}"
+            for index, recipient in enumerate(options.recipients, 1)
+        ]
+        output_files = recipient_output_files(output_dir, prefix, names)
+
+        try:
+            with open(input_file, "rb") as f:
+                reader = open_reader(f)
+
+                document = SerializedDocument(reader)
+                target_pages = self._watermark._target_pages(
+                    options.watermark, get_page_count(reader)
+                )
+                stamp_number, page_overrides = self._stamped_pages(reader, document, target_pages)
+
+            def write_copy(index: int) -> Path:
+                text = render_template(options.watermark.text, options.recipients[index], index + 1)
+                stamp = self._stamp_body(replace(options.watermark, text=text))
+                with open(output_files[index], "wb") as output_f:
+                    document.write(output_f, {**page_overrides, stamp_number: stamp})
+                return output_files[index]
+
+            max_workers = options.max_workers or settings.max_workers
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(write_copy, range(len(options.recipients))))
+
+            logger.info(f"成功为 {len(output_files)} 个接收者生成水印副本: {input_file}")
+            return OperationResult(
+                success=True,
+                message=f"成功为 {len(output_files)} 个接收者生成水印副本",
+                output_files=output_files,
+                details=(
+                    f"每份副本水印 {len(target_pages)} 个页面，"
+                    f"源文件解析一次，共 {len(document)} 个对象"
+                ),
+            )
+
+        except PDFToolError:
+            raise
+        except Exception as e:
+            raise PDFProcessingError(f"批量添加水印失败: {str(e)}")
+
+    def _stamped_pages(
+        self, reader: PyPDF2.PdfReader, document: SerializedDocument, target_pages: List[int]
+    ) -> Tuple[int, Dict[int, bytes]]:
+        """Serialize the watermarked target pages once for all recipients
+
+        Returns:
+            The object number reserved for the per-recipient stamp XObject, and
+            object number -> serialized body for the updated pages and the new
+            content streams
+        """
+        number = document.next_object_number
+        stamp = IndirectObject(number, 0, reader)
+        save_state = IndirectObject(number + 1, 0, reader)
+        overrides: Dict[int, bytes] = {save_state.idnum: serialize_object(_content_stream(b"q\n"))}
+        draw_streams: Dict[str, IndirectObject] = {}
+
+        def draw_stream(name: str) -> IndirectObject:
+            if name not in draw_streams:
+                reference = IndirectObject(number + 2 + len(draw_streams), 0, reader)
+                overrides[reference.idnum] = serialize_object(_draw_stream(name))
+                draw_streams[name] = reference
+            return draw_streams[name]
+
+        pages = get_pages(reader, target_pages)
+        for index in target_pages:
+            page = pages[index]
+            if page.indirect_reference is None:
+                raise PDFValidationError("页面缺少间接引用，无法批量添加水印")
+            stamped = _stamped_page(page, stamp, save_state, draw_stream)
+            overrides[page.indirect_reference.idnum] = serialize_object(stamped)
+
+        return stamp.idnum, overrides
+
+    def _stamp_body(self, options: WatermarkOptions) -> bytes:
+        """Serialized Form XObject drawing one recipient's watermark"""
+        watermark_pdf = self._watermark._create_watermark_pdf(options)
+        try:
+            page = PyPDF2.PdfReader(watermark_pdf).pages[0]
+            stream = _form_xobject(page)
+            # 水印资源（字体、透明度）直接内联，XObject 不引用其他对象
+            stream[NameObject("/Resources")] = _inline(page["/Resources"])
+            return serialize_object(stream)
+        finally:
+            watermark_pdf.close()
+
+
+def render_template(template: str, recipient: Dict[str, str], index: int) -> str:
+    """Fill a template's ``{field}`` tokens with a recipient's fields
+
+    Only plain field names are substituted; ``{{`` and ``}}`` are literal
+    braces. Format specs, conversions and attribute or index access are
+    rejected, so recipient data cannot pad or reformat the text.
+
+    Raises:
+        PDFValidationError: if the template is malformed or refers to a field
+            the recipient does not have
+    """
+
+    def substitute(match: "re.Match[str]") -> str:
+        token = match.group(0)
+        if token in ("{{", "}}"):
+            return token[0]
+        field = match.group(1)
+        if field is None:
+            raise PDFValidationError(
+                f"水印模板格式无效: 第 {match.start() + 1} 个字符处的花括号"
+                "（字段只能写作 {字段名}，花括号本身写作 {{ 或 }}）"
+            )
+        if field not in recipient:
+            raise PDFValidationError(f"第 {index} 个接收者缺少水印模板字段: {field}")
+        return recipient[field]
+
+    return _TEMPLATE_TOKEN.sub(substitute, template)
+
+
+def _inline(obj: PdfObject) -> PdfObject:
+    """Copy of ``obj`` with every indirect reference replaced by the object itself"""
+    obj = obj.get_object()
+    if isinstance(obj, StreamObject):
+        raise PDFValidationError("水印资源中包含流对象，无法内联")
+    if isinstance(obj, DictionaryObject):
+        return DictionaryObject({key: _inline(value) for key, value in obj.items()})
+    if isinstance(obj, ArrayObject):
+        return ArrayObject(_inline(value) for value in obj)
+    return obj
@@ -0,0 +1,645 @@
+"""
+PDF压缩操作
+"""
+
+import io
+import logging
+import math
+import multiprocessing
+import re
+import shutil
+import struct
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+from uuid import uuid4
+
+import PyPDF2
+from PIL import Image
+from PyPDF2.errors import PdfReadError
+from PyPDF2.filters import FlateDecode
+from PyPDF2.generic import (
+    ArrayObject,
+    ContentStream,
+    DictionaryObject,
+    EncodedStreamObject,
+    IndirectObject,
+    NameObject,
+    NumberObject,
+    PdfObject,
+    StreamObject,
+)
+
+from ....common.exceptions import PDFProcessingError, PDFToolError, PDFValidationError
+from ....common.interfaces import BasePDFOperation
+from ....common.models import CompressionLevel, CompressOptions, OperationResult
+from ....common.utils import open_reader
+from ....config.settings import settings
+from ..structure.analysis import object_table
+from ..structure.document import SerializedDocument
+from ..structure.page_tree import get_page_count, get_pages
+from ..structure.prefetch import prefetch_pages
+from ..structure.serialization import serialize_object
+
+logger = logging.getLogger(__name__)
+
+# 压缩级别 -> (JPEG 质量, 图片最大显示分辨率 DPI)，CUSTOM 未指定的值按 MEDIUM 处理
+COMPRESSION_PRESETS = {
+    CompressionLevel.LOW: (85, 300),
+    CompressionLevel.MEDIUM: (75, 150),
+    CompressionLevel.HIGH: (50, 96),
+}
+
+# 分辨率超过目标值的倍数时才降采样（与 Ghostscript 的默认阈值相同），
+# 略高于目标分辨率的图片重采样收益很小，反而损失清晰度
+DOWNSAMPLE_THRESHOLD = 1.5
+
+# 小于该像素数的图片不处理
+MIN_IMAGE_PIXELS = 64 * 64
+
+# 小于该字节数的流不值得压缩
+MIN_STREAM_SIZE = 64
+
+# Form XObject 的最大嵌套深度
+MAX_FORM_DEPTH = 16
+
+# 可以解码后用 Flate 重新压缩的过滤器
+_TEXT_FILTERS = {"/ASCIIHexDecode", "/ASCII85Decode", "/LZWDecode"}
+
+# ASCII 编码层，去掉后数据体积减小 20%-50%
+_ASCII_FILTERS = {"/ASCIIHexDecode", "/ASCII85Decode"}
+
+_WHITESPACE = re.compile(rb"\s+")
+
+# ASCII85 字符 -> 数值
+_A85_DIGITS = bytes((value - 33) % 256 for value in range(256))
+
+_IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+Matrix = Tuple[float, float, float, float, float, float]
+
+
+class _ImageJob(NamedTuple):
+    """One image to re-encode, picklable for worker processes"""
+
+    idnum: int
+    data: bytes  # 原始流数据
+    ascii_filters: Tuple[str, ...]  # 图片压缩过滤器外层的 ASCII 编码
+    filter: str  # /DCTDecode 或 /FlateDecode
+    decode_parms: Optional[Dict[str, int]]
+    mode: str  # Pillow 模式: L / RGB
+    size: Tuple[int, int]
+    target_size: Tuple[int, int]
+    quality: int
+    lossless: bool  # 软遮罩等必须无损保存的图片
+
+
+def _reencode_image(job: _ImageJob) -> Optional[Tuple[bytes, str, int, int]]:
+    """Downsample and re-encode one image (runs in worker processes)
+
+    Returns:
+        (encoded data, filter name, width, height), or None if the result
+        would not be smaller than the original
+    """
+    try:
+        data = _decode_ascii(job.ascii_filters, job.data)
+        if job.filter == "/DCTDecode":
+            image = Image.open(io.BytesIO(data))
+            image.load()
+        else:
+            pixels = FlateDecode.decode(data, job.decode_parms)
+            width, height = job.size
+            if len(pixels) != width * height * len(job.mode):
+                # 数据长度与尺寸不符（参数错误或数据损坏）：不能按像素解释
+                return None
+            image = Image.frombytes(job.mode, job.size, pixels)
+    except (OSError, ValueError, zlib.error, struct.error, PdfReadError):
+        # 无法解码的图片保持原样
+        return None
+
+    if image.mode != job.mode or image.size != job.size:
+        return None
+    if job.target_size != job.size:
+        image = image.resize(job.target_size, Image.LANCZOS)
+
+    if job.lossless:
+        data = zlib.compress(image.tobytes(), 9)
+        filter_name = "/FlateDecode"
+    else:
+        output = io.BytesIO()
+        image.save(output, "JPEG", quality=job.quality, optimize=True)
+        data = output.getvalue()
+        filter_name = "/DCTDecode"
+
+    if len(data) >= len(job.data):
+        return None
+    return data, filter_name, image.width, image.height
+
+
+class CompressOperation(BasePDFOperation):
+    """PDF压缩操作实现
+
+    - 显示分辨率超过目标 DPI 的图片降采样，图片重新编码为 JPEG；编码结果
+      不小于原图时保留原图。图片的显示尺寸由页面内容流中绘制图片时的
+      变换矩阵得出，解码、缩放、编码在进程池中并行完成
+    - 未压缩（或只有 ASCII/LZW 编码）的流用 Flate 重新压缩
+    - 只写出从目录可达的对象，输出使用交叉引用流
+    """
+
+    @property
+    def operation_name(self) -> str:
+        return "compress"
+
+    def validate_input(self, input_file: Path, options: CompressOptions) -> None:
+        """验证压缩操作输入"""
+        # 文档由 execute 解析一次
+        self.validate_pdf_file(input_file, parse=False)
+
+        if options.image_quality is not None and not 10 <= options.image_quality <= 100:
+            raise PDFValidationError("图片质量必须在 10-100 之间")
+        if options.max_image_dpi is not None and options.max_image_dpi < 36:
+            raise PDFValidationError("图片分辨率不能低于 36 DPI")
+
+    def execute(self, input_file: Path, options: CompressOptions) -> OperationResult:
+        """执行PDF压缩操作"""
+        self.validate_input(input_file, options)
+
+        output_file = options.output_file or self.temp_dir / f"compressed_{uuid4().hex}.pdf"
+        quality, max_dpi = compression_settings(options)
+        start = time.perf_counter()
+
+        try:
+            with open(input_file, "rb") as f:
+                reader = open_reader(f)
+                if reader.is_encrypted:
+                    raise PDFValidationError("加密文档需要先解密才能压缩")
+
+                self._strip_document(reader, options)
+                document = SerializedDocument(reader)
+
+                jobs, skipped = self._image_jobs(
+                    reader, document, quality, max_dpi, options.max_workers
+                )
+                overrides, downsampled = self._reencode_images(reader, jobs, options)
+                compressed_streams = self._compress_streams(reader, document, overrides)
+
+                with open(output_file, "wb") as output_f:
+                    document.write(output_f, overrides)
+
+            original_size = input_file.stat().st_size
+            compressed_size = output_file.stat().st_size
+            kept_original = compressed_size >= original_size
+            if kept_original:
+                # 重写后反而变大（例如原文件使用了对象流），直接输出原文件
+                shutil.copyfile(input_file, output_file)
+                compressed_size = original_size
+            elapsed = time.perf_counter() - start
+            reencoded = sum(1 for job in jobs if job.idnum in overrides)
+
+            logger.info(
+                f"成功压缩PDF: {input_file}, {original_size} -> {compressed_size} 字节, "
+                f"耗时 {elapsed:.2f}s"
+            )
+            return OperationResult(
+                success=True,
+                message=f"成功压缩PDF，压缩率 {compression_ratio(original_size, compressed_size)}",
+                output_files=[output_file],
+                details=(
+                    f"原始大小 {original_size} 字节，压缩后 {compressed_size} 字节，"
+                    f"耗时 {elapsed:.2f}s；图片重新编码 {reencoded} 张（其中降采样 "
+                    f"{downsampled} 张），保持不变 {len(jobs) - reencoded + skipped} 张；"
+                    f"Flate 压缩流 {compressed_streams} 个"
+                    + ("；重写后文件未变小，保留原文件" if kept_original else "")
+                ),
+            )
+
+        except PDFToolError:
+            raise
+        except Exception as e:
+            raise PDFProcessingError(f"压缩PDF失败: {str(e)}")
+
+    def _strip_document(self, reader: PyPDF2.PdfReader, options: CompressOptions) -> None:
+        """Drop metadata and bookmarks before the document is serialized"""
+        catalog = reader.trailer["/Root"]
+        if options.remove_metadata:
+            if "/Info" in reader.trailer:
+                del reader.trailer["/Info"]
+            if "/Metadata" in catalog:
+                del catalog["/Metadata"]
+        if options.remove_bookmarks:
+            if "/Outlines" in catalog:
+                del catalog["/Outlines"]
+            if catalog.get("/PageMode") == "/UseOutlines":
+                del catalog["/PageMode"]
+
+    def _image_jobs(
+        self,
+        reader: PyPDF2.PdfReader,
+        document: SerializedDocument,
+        quality: int,
+        max_dpi: int,
+        max_workers: Optional[int] = None,
+    ) -> Tuple[List[_ImageJob], int]:
+        """Re-encodable images of the document and their target sizes
+
+        Returns:
+            The jobs, and the number of images left alone because their format
+            is not supported
+        """
+        images: Dict[int, Tuple[int, StreamObject]] = {}
+        soft_masks: Set[int] = set()
+        skipped = 0
+        for idnum, generation in object_table(reader):
+            if idnum not in document:
+                continue
+            obj = reader.get_object(IndirectObject(idnum, generation, reader))
+            if not isinstance(obj, StreamObject) or obj.get("/Subtype") != "/Image":
+                continue
+            if _image_mode(obj) is None:
+                skipped += 1
+                continue
+            images[idnum] = (generation, obj)
+            smask = obj.raw_get("/SMask") if "/SMask" in obj else None
+            if isinstance(smask, IndirectObject):
+                soft_masks.add(smask.idnum)
+
+        display_sizes = _display_sizes(reader, set(images), max_workers)
+        # 软遮罩与所属图片显示在同一区域
+        for idnum, (_, image) in images.items():
+            smask = image.raw_get("/SMask") if "/SMask" in image else None
+            if isinstance(smask, IndirectObject) and idnum in display_sizes:
+                display_sizes.setdefault(smask.idnum, display_sizes[idnum])
+
+        jobs = []
+        for idnum, (generation, image) in images.items():
+            mode = _image_mode(image)
+            lossless = idnum in soft_masks
+            if lossless and mode != "L":
+                skipped += 1
+                continue
+            size = (int(image["/Width"]), int(image["/Height"]))
+            filters = _filters(image)
+            decode_parms = _image_decode_parms(image)
+            jobs.append(
+                _ImageJob(
+                    idnum=idnum,
+                    data=image._data,
+                    ascii_filters=tuple(filters[:-1]),
+                    filter=filters[-1],
+                    decode_parms=(
+                        {str(key): int(value) for key, value in decode_parms.items()}
+                        if decode_parms is not None and filters[-1] == "/FlateDecode"
+                        else None
+                    ),
+                    mode=mode,
+                    size=size,
+                    target_size=_target_size(size, display_sizes.get(idnum), max_dpi),
+                    quality=quality,
+                    lossless=lossless,
+                )
+            )
+            # 任务持有原始数据，释放解析缓存
+            reader.resolved_objects.pop((generation, idnum), None)
+
+        return jobs, skipped
+
+    def _reencode_images(
+        self, reader: PyPDF2.PdfReader, jobs: List[_ImageJob], options: CompressOptions
+    ) -> Tuple[Dict[int, bytes], int]:
+        """Re-encode images in worker processes
+
+        Returns:
+            Object number -> serialized image stream for the images that got
+            smaller, and how many of them were downsampled
+        """
+        max_workers = min(options.max_workers or settings.max_workers, len(jobs))
+        if max_workers > 1:
+            # spawn：不继承父进程的线程和锁（服务进程中 fork 可能死锁）
+            with ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                results = list(executor.map(_reencode_image, jobs))
+        else:
+            results = [_reencode_image(job) for job in jobs]
+
+        overrides: Dict[int, bytes] = {}
+        downsampled = 0
+        for job, result in zip(jobs, results):
+            if result is None:
+                continue
+            data, filter_name, width, height = result
+            image = reader.get_object(job.idnum)
+            stream = _encoded_stream(image, data, filter_name)
+            stream[NameObject("/Width")] = NumberObject(width)
+            stream[NameObject("/Height")] = NumberObject(height)
+            overrides[job.idnum] = serialize_object(stream)
+            if (width, height) != job.size:
+                downsampled += 1
+        return overrides, downsampled
+
+    def _compress_streams(
+        self, reader: PyPDF2.PdfReader, document: SerializedDocument, overrides: Dict[int, bytes]
+    ) -> int:
+        """Flate-compress the streams stored without compression
+
+        Returns:
+            The number of streams compressed
+        """
+        count = 0
+        for idnum, generation in object_table(reader):
+            if idnum not in document or idnum in overrides:
+                continue
+            obj = reader.get_object(IndirectObject(idnum, generation, reader))
+            if not isinstance(obj, StreamObject) or obj.get("/Type") == "/Metadata":
+                continue
+
+            filters = _filters(obj)
+            try:
+                if set(filters) <= _TEXT_FILTERS and "/DecodeParms" not in obj:
+                    data = obj.get_data()
+                    if len(data) < MIN_STREAM_SIZE:
+                        continue
+                    compressed = zlib.compress(data, 9)
+                elif (
+                    len(filters) > 1
+                    and set(filters[:-1]) <= _ASCII_FILTERS
+                    and filters[-1] == "/FlateDecode"
+                    and not isinstance(obj.get("/DecodeParms"), ArrayObject)
+                ):
+                    # 已经 Flate 压缩、外层还有 ASCII 编码的流只去掉编码层
+                    compressed = _decode_ascii(filters[:-1], obj._data)
+                else:
+                    continue
+            except Exception:
+                continue
+
+            if len(compressed) < len(obj._data):
+                overrides[idnum] = serialize_object(
+                    _encoded_stream(obj, compressed, "/FlateDecode")
+                )
+                count += 1
+        return count
+
+
+def compression_settings(options: CompressOptions) -> Tuple[int, int]:
+    """JPEG quality and maximum image DPI for the options' compression level"""
+    preset_quality, preset_dpi = COMPRESSION_PRESETS.get(
+        options.level, COMPRESSION_PRESETS[CompressionLevel.MEDIUM]
+    )
+    return options.image_quality or preset_quality, options.max_image_dpi or preset_dpi
+
+
+def compression_ratio(original_size: int, compressed_size: int) -> str:
+    """Size reduction as a percentage, e.g. ``"70%"``"""
+    if original_size <= 0:
+        return "0%"
+    return f"{max(0, int((1 - compressed_size / original_size) * 100))}%"
+
+
+def _filters(stream: StreamObject) -> List[str]:
+    """Filter names of a stream"""
+    filters = stream.get("/Filter")
+    if filters is None:
+        return []
+    if isinstance(filters, ArrayObject):
+        return [str(name) for name in filters]
+    return [str(filters)]
+
+
+def _decode_ascii(filters: Sequence[str], data: bytes) -> bytes:
+    """Decode ASCIIHex / ASCII85 layers"""
+    for name in filters:
+        data = _WHITESPACE.sub(b"", data)
+        if name == "/ASCII85Decode":
+            data = _a85decode(data)
+        else:
+            data = data.split(b">", 1)[0]
+            data = bytes.fromhex((data + b"0" * (len(data) % 2)).decode("ascii"))
+    return data
+
+
+def _a85decode(data: bytes) -> bytes:
+    """ASCII85 decoding, about twice as fast as PyPDF2 and three times as fast
+    as ``base64.a85decode`` on multi-megabyte images
+
+    Raises:
+        struct.error: if a group does not fit in 32 bits
+    """
+    if data.startswith(b"<~"):
+        data = data[2:]
+    data = data.split(b"~>", 1)[0].replace(b"z", b"!!!!!")
+    padding = -len(data) % 5
+    digits = iter((data + b"u" * padding).translate(_A85_DIGITS))
+    words = [
+        (((a * 85 + b) * 85 + c) * 85 + d) * 85 + e
+        for a, b, c, d, e in zip(digits, digits, digits, digits, digits)
+    ]
+    decoded = struct.pack(">%dI" % len(words), *words)
+    return decoded[: len(decoded) - padding]
+
+
+def _image_filter(image: StreamObject) -> Optional[str]:
+    """The image compression filter below any ASCII encoding"""
+    filters = _filters(image)
+    if not filters or not set(filters[:-1]) <= _ASCII_FILTERS:
+        return None
+    return filters[-1]
+
+
+def _image_decode_parms(image: StreamObject) -> Any:
+    """Decode parameters of the image compression filter"""
+    parms = image.get("/DecodeParms")
+    if isinstance(parms, ArrayObject):
+        parms = parms[-1].get_object() if parms else None
+    return parms if isinstance(parms, DictionaryObject) else None
+
+
+def _image_mode(image: StreamObject) -> Optional[str]:
+    """Pillow mode of an image that can be re-encoded, None if unsupported"""
+    if image.get("/ImageMask") or image.get("/BitsPerComponent") != 8:
+        return None
+    # 颜色键遮罩要求像素值精确保留，不能有损编码
+    if isinstance(image.get("/Mask"), ArrayObject):
+        return None
+    try:
+        if int(image["/Width"]) * int(image["/Height"]) < MIN_IMAGE_PIXELS:
+            return None
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    filter_name = _image_filter(image)
+    if filter_name not in ("/DCTDecode", "/FlateDecode"):
+        return None
+
+    components = _color_components(image.get("/ColorSpace"))
+    if components is None:
+        return None
+    parms = _image_decode_parms(image)
+    if filter_name == "/DCTDecode" and parms is not None and "/ColorTransform" in parms:
+        # Pillow 按 JPEG 文件自身的标记决定颜色变换，不能保证与 PDF 参数一致
+        return None
+    if filter_name == "/FlateDecode" and parms is not None:
+        if not all(isinstance(value, int) for value in parms.values()):
+            return None
+        # PyPDF2 的 PNG 预测器解码只支持单分量
+        if parms.get("/Predictor", 1) != 1:
+            if components != 1 or parms.get("/Colors", 1) != 1:
+                return None
+    return "L" if components == 1 else "RGB"
+
+
+def _color_components(color_space: Any) -> Optional[int]:
+    """Number of components of a gray or RGB color space, None otherwise"""
+    color_space = color_space.get_object() if isinstance(color_space, PdfObject) else None
+    if color_space == "/DeviceGray":
+        return 1
+    if color_space == "/DeviceRGB":
+        return 3
+    if isinstance(color_space, ArrayObject) and len(color_space) == 2:
+        if color_space[0] == "/ICCBased":
+            profile = color_space[1].get_object()
+            components = profile.get("/N") if isinstance(profile, DictionaryObject) else None
+            if components in (1, 3):
+                return int(components)
+    return None
+
+
+def _target_size(
+    size: Tuple[int, int], display_size: Optional[Tuple[float, float]], max_dpi: int
+) -> Tuple[int, int]:
+    """Pixel size of an image after downsampling to ``max_dpi``
+
+    Images whose display size is unknown keep their resolution.
+    """
+    if display_size is None:
+        return size
+    width, height = size
+    display_width, display_height = display_size
+    if display_width <= 0 or display_height <= 0:
+        return size
+
+    dpi = min(width / (display_width / 72), height / (display_height / 72))
+    if dpi <= max_dpi * DOWNSAMPLE_THRESHOLD:
+        return size
+    scale = max_dpi / dpi
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _display_sizes(
+    reader: PyPDF2.PdfReader, images: Set[int], max_workers: Optional[int] = None
+) -> Dict[int, Tuple[float, float]]:
+    """Largest size in points each image is drawn at
+
+    Follows the transformation matrix through each page's content stream and
+    the Form XObjects it draws; images that are never found drawn are missing
+    from the result. The content of the next pages is decoded in a thread pool
+    while the current page is scanned.
+    """
+    sizes: Dict[int, Tuple[float, float]] = {}
+    if not images:
+        return sizes
+
+    pages = (
+        page
+        for page in get_pages(reader, range(get_page_count(reader))).values()
+        if "/Contents" in page and _draws_xobjects(page.get("/Resources"))
+    )
+    for page in prefetch_pages(pages, max_workers, forms=True):
+        _scan_content(
+            reader, page["/Contents"], page.get("/Resources"), _IDENTITY, images, sizes, ()
+        )
+    return sizes
+
+
+def _draws_xobjects(resources: Any) -> bool:
+    resources = resources.get_object() if resources is not None else None
+    return isinstance(resources, DictionaryObject) and bool(resources.get("/XObject"))
+
+
+def _scan_content(
+    reader: PyPDF2.PdfReader,
+    contents: PdfObject,
+    resources: Any,
+    ctm: Matrix,
+    images: Set[int],
+    sizes: Dict[int, Tuple[float, float]],
+    forms: Tuple[int, ...],
+) -> None:
+    """Record the drawn size of images in one content stream"""
+    xobjects = resources.get_object().get("/XObject")
+    xobjects = xobjects.get_object() if xobjects is not None else DictionaryObject()
+    try:
+        operations = ContentStream(contents.get_object(), reader).operations
+    except Exception:
+        logger.debug("无法解析内容流，跳过")
+        return
+
+    stack: List[Matrix] = []
+    for operands, operator in operations:
+        if operator == b"q":
+            stack.append(ctm)
+        elif operator == b"Q":
+            ctm = stack.pop() if stack else ctm
+        elif operator == b"cm" and len(operands) == 6:
+            ctm = _multiply(tuple(float(value) for value in operands), ctm)
+        elif operator == b"Do" and operands:
+            reference = xobjects.raw_get(operands[0]) if operands[0] in xobjects else None
+            if not isinstance(reference, IndirectObject):
+                continue
+            xobject = reference.get_object()
+            if reference.idnum in images:
+                width = math.hypot(ctm[0], ctm[1])
+                height = math.hypot(ctm[2], ctm[3])
+                previous = sizes.get(reference.idnum, (0.0, 0.0))
+                sizes[reference.idnum] = (max(previous[0], width), max(previous[1], height))
+            elif (
+                isinstance(xobject, StreamObject)
+                and xobject.get("/Subtype") == "/Form"
+                and reference.idnum not in forms
+                and len(forms) < MAX_FORM_DEPTH
+            ):
+                form_resources = xobject.get("/Resources", resources)
+                if not _draws_xobjects(form_resources):
+                    continue
+                matrix = xobject.get("/Matrix")
+                form_ctm = (
+                    _multiply(tuple(float(value) for value in matrix), ctm)
+                    if isinstance(matrix, ArrayObject) and len(matrix) == 6
+                    else ctm
+                )
+                _scan_content(
+                    reader,
+                    xobject,
+                    form_resources,
+                    form_ctm,
+                    images,
+                    sizes,
+                    forms + (reference.idnum,),
+                )
+
+
+def _multiply(m1: Tuple[float, ...], m2: Tuple[float, ...]) -> Matrix:
+    """Product of two PDF transformation matrices ``m1 × m2``"""
+    a1, b1, c1, d1, e1, f1 = m1
+    a2, b2, c2, d2, e2, f2 = m2
+    return (
+        a1 * a2 + b1 * c2,
+        a1 * b2 + b1 * d2,
+        c1 * a2 + d1 * c2,
+        c1 * b2 + d1 * d2,
+        e1 * a2 + f1 * c2 + e2,
+        e1 * b2 + f1 * d2 + f2,
+    )
+
+
+def _encoded_stream(source: StreamObject, data: bytes, filter_name: str) -> EncodedStreamObject:
+    """Copy of a stream's dictionary with new encoded data"""
+    stream = EncodedStreamObject()
+    for key, value in source.items():
+        if key not in ("/Length", "/Filter", "/DecodeParms"):
+            stream[NameObject(key)] = value
+    stream[NameObject("/Filter")] = NameObject(filter_name)
+    stream._data = data
+    return stream
@@ -0,0 +1,124 @@
+"""
+PDF按接收者分发加密副本操作
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+from uuid import uuid4
+
+from ....common.exceptions import PDFProcessingError, PDFToolError, PDFValidationError
+from ....common.interfaces import BasePDFOperation
+from ....common.models import (
+    OperationResult,
+    PasswordDistributionOptions,
+)
+from ....common.utils import open_reader, sanitize_filename
+from ....config.settings import settings
+from ..engines import document_writer
+from ..structure.encryption import EncryptionTemplate, StandardSecurityHandler
+from ..structure.linearization import write_linearized
+from ..structure.serialization import new_file_id
+from .password import permission_flags
+
+logger = logging.getLogger(__name__)
+
+# 单次分发的接收者数量上限
+MAX_RECIPIENTS = 1000
+
+
+class PasswordDistributionOperation(BasePDFOperation):
+    """PDF按接收者分发加密副本操作实现
+
+    源文件只解析一次：页面和元数据组装后，除字符串和流数据外的对象内容只
+    序列化一次（EncryptionTemplate），每个接收者的副本只需用各自的密钥加密
+    这些数据。副本在线程池中并行写出。
+    """
+
+    @property
+    def operation_name(self) -> str:
+        return "distribution"
+
+    def validate_input(self, input_file: Path, options: PasswordDistributionOptions) -> None:
+        """验证分发操作输入"""
+        # 文档由 execute 解析一次
+        self.validate_pdf_file(input_file, parse=False)
+
+        if not options.recipients:
+            raise PDFValidationError("至少需要一个接收者")
+        if len(options.recipients) > MAX_RECIPIENTS:
+            raise PDFValidationError(f"接收者数量不能超过 {MAX_RECIPIENTS}")
+
+        for recipient in options.recipients:
+            if not recipient.name.strip():
+                raise PDFValidationError("接收者名称不能为空")
+            if len(recipient.protection.user_password or "") < 4:
+                raise PDFValidationError(f"接收者 {recipient.name} 的密码长度至少为4位")
+
+    def execute(self, input_file: Path, options: PasswordDistributionOptions) -> OperationResult:
+        """执行PDF分发加密操作"""
+        self.validate_input(input_file, options)
+
+        output_dir = options.output_dir or self.temp_dir / f"distribution_{uuid4().hex}"
+        output_dir.mkdir(exist_ok=True)
+        prefix = options.filename_prefix or input_file.stem
+        names = [recipient.name for recipient in options.recipients]
+        output_files = recipient_output_files(output_dir, prefix, names)
+
+        try:
+            with open(input_file, "rb") as f:
+                reader = open_reader(f)
+                header = reader.pdf_header
+                writer = document_writer(reader)
+                template = EncryptionTemplate(writer, header)
+
+            def write_copy(index: int) -> Path:
+                protection = options.recipients[index].protection
+                handler = StandardSecurityHandler(
+                    protection.algorithm,
+                    protection.user_password,
+                    protection.owner_password or protection.user_password,
+                    permission_flags(protection),
+                    new_file_id(str(input_file).encode("utf-8"), str(index).encode("ascii")),
+                )
+                with open(output_files[index], "wb") as output_f:
+                    if protection.linearize:
+                        # 线性化副本需要按新的对象顺序重新编号，不能使用模板
+                        write_linearized(output_f, writer._root, writer._info, header, handler)
+                    else:
+                        template.write(output_f, handler)
+                return output_files[index]
+
+            max_workers = options.max_workers or settings.max_workers
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(write_copy, range(len(options.recipients))))
+
+            logger.info(f"成功为 {len(output_files)} 个接收者生成加密副本: {input_file}")
+            return OperationResult(
+                success=True,
+                message=f"成功为 {len(output_files)} 个接收者生成加密副本",
+                output_files=output_files,
+                details=f"源文件解析一次，共 {len(template.objects)} 个对象",
+            )
+
+        except PDFToolError:
+            raise
+        except Exception as e:
+            raise PDFProcessingError(f"分发加密失败: {str(e)}")
+
+
+def recipient_output_files(output_dir: Path, prefix: str, names: List[str]) -> List[Path]:
+    """One output path per recipient name; repeated names get a numeric suffix"""
+    paths: List[Path] = []
+    used = set()
+    for recipient in names:
+        stem = f"{prefix}_{sanitize_filename(recipient.strip())[:80]}"
+        name = stem
+        suffix = 2
+        while name.lower() in used:
+            name = f"{stem}_{suffix}"
+            suffix += 1
+        used.add(name.lower())
+        paths.append(output_dir / f"{name}.pdf")
+    return paths
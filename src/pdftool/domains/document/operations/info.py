@@ -3,38 +3,63 @@ PDF info operation
 """
 
 import logging
+import threading
+from collections import OrderedDict
 from pathlib import Path
+from typing import Optional
 
 import PyPDF2
 
-from ....common.exceptions import PDFProcessingError
+from ....common.exceptions import PDFProcessingError, PDFToolError, PDFValidationError
 from ....common.interfaces import BasePDFOperation
-from ....common.models import PDFInfo
+from ....common.models import DocumentAnalysis, InfoOptions, PDFInfo
+from ....common.utils import borrow_reader_with_key
+from ..structure.analysis import analyze_document
+from ..structure.page_tree import get_checked_page_count
 
 logger = logging.getLogger(__name__)
 
+# 分析结果缓存的条目数上限（按文件内容 SHA-256 缓存）
+ANALYSIS_CACHE_SIZE = 256
+
 
 class InfoOperation(BasePDFOperation):
-    """PDF info operation implementation"""
+    """PDF info operation implementation
+
+    Only the trailer, the page tree root and the document information
+    dictionary are read, so the time does not depend on the number of pages.
+    Documents whose root ``/Count`` is missing or inconsistent fall back to a
+    full page tree traversal.
+
+    With ``analyze`` set, every object of the document is read once, in file
+    order, to collect page sizes, fonts, images and file properties. The
+    analysis is cached by content hash, so uploading the same file again
+    skips it. The parsed document comes from the shared reader cache.
+    """
+
+    _analysis_cache: "OrderedDict[str, DocumentAnalysis]" = OrderedDict()
+    _analysis_lock = threading.Lock()
 
     @property
     def operation_name(self) -> str:
         return "info"
 
-    def validate_input(self, input_file: Path, options: None = None) -> None:
+    def validate_input(self, input_file: Path, options: Optional[InfoOptions] = None) -> None:
         """Validate info operation input"""
-        self.validate_pdf_file(input_file)
+        # 文档由 execute 解析
+        self.validate_pdf_file(input_file, parse=False)
 
-    def execute(self, input_file: Path, options: None = None) -> PDFInfo:
+    def execute(self, input_file: Path, options: Optional[InfoOptions] = None) -> PDFInfo:
         """Execute PDF info operation"""
         self.validate_input(input_file, options)
 
         try:
-            with open(input_file, "rb") as f:
-                reader = PyPDF2.PdfReader(f)
+            with borrow_reader_with_key(input_file) as (reader, content_hash):
+                if reader.is_encrypted and not reader.decrypt(""):
+                    raise PDFValidationError("文档已加密，需要密码才能读取信息")
 
                 info = PDFInfo(
-                    pages=len(reader.pages),
+                    pages=self._get_page_count(reader),
                     file_path=input_file,
                     file_size=input_file.stat().st_size,
                 )
@@ -44,7 +69,35 @@ class InfoOperation(BasePDFOperation):
                     info.author = reader.metadata.author
                     info.creation_date = reader.metadata.creation_date
 
+                if options is not None and options.analyze:
+                    info.analysis = self._analyze(content_hash, reader)
+
                 return info
 
+        except PDFToolError:
+            raise
         except Exception as e:
             raise PDFProcessingError(f"Failed to read PDF info: {str(e)}")
+
+    def _get_page_count(self, reader: PyPDF2.PdfReader) -> int:
+        """Page count from the page tree root, falling back to a full traversal"""
+        try:
+            return get_checked_page_count(reader)
+        except PDFValidationError as e:
+            logger.warning(f"无法从页面树读取页数，回退到完整遍历: {e.message}")
+            return len(reader.pages)
+
+    def _analyze(self, content_hash: str, reader: PyPDF2.PdfReader) -> DocumentAnalysis:
+        """Document analysis, from the cache when the same content was analyzed before"""
+        with self._analysis_lock:
+            cached = self._analysis_cache.get(content_hash)
+            if cached is not None:
+                self._analysis_cache.move_to_end(content_hash)
+                return cached
+
+        analysis = analyze_document(reader)
+        with self._analysis_lock:
+            self._analysis_cache[content_hash] = analysis
+            while len(self._analysis_cache) > ANALYSIS_CACHE_SIZE:
+                self._analysis_cache.popitem(last=False)
+        return analysis
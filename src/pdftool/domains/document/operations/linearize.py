@@ -0,0 +1,35 @@
+"""
+PDF线性化（快速 Web 查看）输出
+"""
+
+import os
+from pathlib import Path
+from typing import List
+from uuid import uuid4
+
+import PyPDF2
+
+from ....common.exceptions import PDFValidationError
+from ..structure.linearization import write_linearized
+
+
+def linearize_outputs(output_files: List[Path]) -> None:
+    """Linearize files in place, as the post-processing step of other operations"""
+    for file_path in output_files:
+        temp_file = file_path.with_name(f".{file_path.name}.{uuid4().hex}.linearizing")
+        try:
+            with open(file_path, "rb") as f:
+                reader = PyPDF2.PdfReader(f)
+                if reader.is_encrypted:
+                    raise PDFValidationError("加密文档需要先解密")
+                trailer = reader.trailer
+                with open(temp_file, "wb") as output_f:
+                    write_linearized(
+                        output_f,
+                        trailer.raw_get("/Root"),
+                        trailer.raw_get("/Info") if "/Info" in trailer else None,
+                        reader.pdf_header,
+                    )
+            os.replace(temp_file, file_path)
+        finally:
+            temp_file.unlink(missing_ok=True)
@@ -3,19 +3,72 @@ PDF merge operation
 """
 
 import logging
+import multiprocessing
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 from uuid import uuid4
 
-import PyPDF2
-
-from ....common.exceptions import PDFProcessingError, PDFValidationError
-from ....common.interfaces import BasePDFOperation
+from ....common.exceptions import PDFProcessingError, PDFToolError, PDFValidationError
+from ....common.interfaces import BasePDFOperation, PDFDocument, get_engine
 from ....common.models import MergeOptions, OperationResult
+from ....config.settings import settings
+from .linearize import linearize_outputs
+from .optimize import optimize_outputs
 
 logger = logging.getLogger(__name__)
 
 
+def _merge_group(
+    input_files: List[str],
+    output_file: str,
+    import_outline: bool,
+    engine_name: Optional[str] = None,
+    check_limits: bool = True,
+) -> str:
+    """Merge a group of PDFs into one file (runs in worker processes)
+
+    ``check_limits`` checks the inputs against the structure limits; the
+    intermediate files of a tree merge are not checked again.
+    """
+    _merge_documents(input_files, output_file, import_outline, engine_name, check_limits)
+    return output_file
+
+
+def _merge_documents(
+    input_files: List[str],
+    output_file: str,
+    import_outline: bool,
+    engine_name: Optional[str] = None,
+    check_limits: bool = True,
+) -> List[int]:
+    """Merge PDFs into one file and return the page count of each input"""
+    engine = get_engine(engine_name)
+    sources: List[PDFDocument] = []
+    page_counts: List[int] = []
+    try:
+        with engine.new() as merged:
+            for file_path in input_files:
+                try:
+                    source = engine.open(Path(file_path), check_limits=check_limits)
+                    sources.append(source)
+                    merged.copy_pages(source, import_outline=import_outline)
+                    page_counts.append(source.page_count)
+                except PDFToolError:
+                    raise
+                except Exception as e:
+                    raise PDFValidationError(f"Invalid PDF file: {file_path}. Error: {str(e)}")
+
+            merged.write(Path(output_file))
+    finally:
+        for source in sources:
+            source.close()
+
+    return page_counts
+
+
 class MergeOperation(BasePDFOperation):
     """PDF merge operation implementation"""
 
@@ -28,32 +81,108 @@ class MergeOperation(BasePDFOperation):
         if not isinstance(input_files, list) or len(input_files) < 2:
             raise PDFValidationError("At least 2 PDF files are required for merging")
 
+        # 文件由合并时的引擎解析（分层合并时在工作进程中）并检查结构上限
         for file_path in input_files:
-            self.validate_pdf_file(file_path)
+            self.validate_pdf_file(file_path, parse=False)
 
     def execute(self, input_files: List[Path], options: MergeOptions) -> OperationResult:
         """Execute PDF merge operation"""
         self.validate_input(input_files, options)
 
         output_file = options.output_file or self.temp_dir / f"merged_{uuid4().hex}.pdf"
+        group_size = max(options.group_size or settings.merge_group_size, 2)
 
         try:
-            merger = PyPDF2.PdfMerger()
-
-            for file_path in input_files:
-                merger.append(str(file_path))
-
-            with open(output_file, "wb") as f:
-                merger.write(f)
-
-            merger.close()
+            if options.tree_merge and len(input_files) > group_size:
+                levels = self._tree_merge(input_files, output_file, options, group_size)
+                details = f"分层并行合并: {levels} 层, 每组 {group_size} 个文件"
+            else:
+                _merge_group(
+                    [str(file_path) for file_path in input_files],
+                    str(output_file),
+                    options.preserve_bookmarks,
+                    self.engine.name,
+                )
+                details = None
+
+            if options.optimize:
+                saved = optimize_outputs([output_file])
+                details = f"{details}；" if details else ""
+                details += f"结构优化节省 {saved} 字节"
+            if options.linearize:
+                linearize_outputs([output_file])
+                details = f"{details}；" if details else ""
+                details += "已线性化（快速 Web 查看）"
 
             logger.info(f"Successfully merged {len(input_files)} PDFs into {output_file}")
             return OperationResult(
                 success=True,
                 message=f"Successfully merged {len(input_files)} PDF files",
                 output_files=[output_file],
+                details=details,
             )
 
+        except PDFToolError:
+            raise
         except Exception as e:
             raise PDFProcessingError(f"Failed to merge PDFs: {str(e)}")
+
+    def _tree_merge(
+        self, input_files: List[Path], output_file: Path, options: MergeOptions, group_size: int
+    ) -> int:
+        """Merge files by tree reduction in worker processes
+
+        Consecutive groups of inputs are merged into intermediate documents in the
+        operation's scratch directory, level by level, so page and bookmark order
+        match a sequential merge. Returns the number of merge levels.
+        """
+        scratch_dir = self.create_temp_dir()
+        engine_name = self.engine.name
+        level_files = [str(file_path) for file_path in input_files]
+        levels = 0
+
+        try:
+            # spawn：不继承父进程的线程和锁（服务进程中 fork 可能死锁）
+            with ProcessPoolExecutor(
+                max_workers=options.max_workers or settings.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as ex:
+                while len(level_files) > group_size:
+                    groups = [
+                        level_files[i : i + group_size]
+                        for i in range(0, len(level_files), group_size)
+                    ]
+                    outputs = [
+                        str(scratch_dir / f"level{levels}_{index:05d}.pdf")
+                        for index in range(len(groups))
+                    ]
+                    merged = list(
+                        ex.map(
+                            _merge_group,
+                            groups,
+                            outputs,
+                            repeat(options.preserve_bookmarks),
+                            repeat(engine_name),
+                            repeat(levels == 0),
+                        )
+                    )
+
+                    # 上一层的中间文件已合并完毕，及时释放磁盘空间
+                    if levels > 0:
+                        for file_path in level_files:
+                            Path(file_path).unlink(missing_ok=True)
+
+                    logger.debug(f"Merge level {levels}: {len(level_files)} -> {len(merged)} files")
+                    level_files = merged
+                    levels += 1
+
+            _merge_group(
+                level_files,
+                str(output_file),
+                options.preserve_bookmarks,
+                engine_name,
+                check_limits=levels == 0,
+            )
+            return levels + 1
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
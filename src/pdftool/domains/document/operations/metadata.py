@@ -0,0 +1,157 @@
+"""
+PDF元数据编辑操作
+"""
+
+import logging
+from datetime import datetime
+from pathlib import Path
+from uuid import uuid4
+
+import PyPDF2
+from PyPDF2.generic import (
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+    TextStringObject,
+)
+
+from ....common.exceptions import PDFProcessingError, PDFToolError, PDFValidationError
+from ....common.interfaces import BasePDFOperation
+from ....common.models import MetadataOptions, OperationResult
+from ....common.utils import open_reader
+from ..structure.incremental import IncrementalUpdate
+
+logger = logging.getLogger(__name__)
+
+# 选项字段与文档信息字典条目的对应关系
+METADATA_FIELDS = {
+    "title": "/Title",
+    "author": "/Author",
+    "subject": "/Subject",
+    "keywords": "/Keywords",
+    "creator": "/Creator",
+    "producer": "/Producer",
+}
+
+
+class MetadataOperation(BasePDFOperation):
+    """PDF元数据编辑操作实现
+
+    默认以增量更新方式写出：原始文件字节原样复制，只在末尾追加新的信息字典、
+    交叉引用和 trailer，耗时与修改量相关而与文件大小基本无关。
+    """
+
+    @property
+    def operation_name(self) -> str:
+        return "metadata"
+
+    def validate_input(self, input_file: Path, options: MetadataOptions) -> None:
+        """验证元数据编辑操作输入"""
+        # 只需要读取交叉引用和 trailer，由 execute 解析
+        self.validate_pdf_file(input_file, parse=False)
+
+        if all(getattr(options, field) is None for field in METADATA_FIELDS):
+            raise PDFValidationError("至少需要修改一项元数据")
+
+    def execute(self, input_file: Path, options: MetadataOptions) -> OperationResult:
+        """执行PDF元数据编辑操作"""
+        self.validate_input(input_file, options)
+
+        output_file = options.output_file or self.temp_dir / f"metadata_{uuid4().hex}.pdf"
+
+        try:
+            with open(input_file, "rb") as f:
+                reader = open_reader(f)
+
+                info = self._updated_info(reader, options)
+                has_xmp = "/Metadata" in reader.trailer["/Root"].get_object()
+                if options.incremental:
+                    try:
+                        self._write_incremental(reader, input_file, info, output_file)
+                        mode = "增量更新"
+                    except PDFValidationError as e:
+                        logger.warning(f"无法增量更新，回退到完整重写: {e.message}")
+                        self._rewrite(reader, info, output_file)
+                        mode = "完整重写"
+                else:
+                    self._rewrite(reader, info, output_file)
+                    mode = "完整重写"
+
+            changed = [
+                key[1:]
+                for field, key in METADATA_FIELDS.items()
+                if getattr(options, field) is not None
+            ]
+            appended = output_file.stat().st_size - input_file.stat().st_size
+            logger.info(f"成功更新PDF元数据 ({mode}): {input_file}")
+
+            details = f"方式: {mode}, 修改项: {', '.join(changed)}"
+            if mode == "增量更新":
+                details += f", 追加 {appended} 字节"
+            if has_xmp:
+                details += "；文档另含 XMP 元数据，部分阅读器可能优先显示 XMP 中的内容"
+
+            return OperationResult(
+                success=True,
+                message="PDF元数据更新成功",
+                output_files=[output_file],
+                details=details,
+            )
+
+        except PDFToolError:
+            raise
+        except Exception as e:
+            raise PDFProcessingError(f"元数据更新失败: {str(e)}")
+
+    def _updated_info(self, reader: PyPDF2.PdfReader, options: MetadataOptions) -> DictionaryObject:
+        """Copy of the document information dictionary with the requested edits"""
+        info = DictionaryObject()
+        original = reader.trailer.get("/Info")
+        if original is not None and isinstance(original.get_object(), DictionaryObject):
+            info.update(original.get_object())
+
+        for field, key in METADATA_FIELDS.items():
+            value = getattr(options, field)
+            if value is None:
+                continue
+            if value == "":
+                info.pop(NameObject(key), None)
+            else:
+                info[NameObject(key)] = TextStringObject(value)
+
+        info[NameObject("/ModDate")] = TextStringObject(_pdf_date(datetime.now().astimezone()))
+        return info
+
+    def _write_incremental(
+        self,
+        reader: PyPDF2.PdfReader,
+        input_file: Path,
+        info: DictionaryObject,
+        output_file: Path,
+    ) -> None:
+        """Append the new information dictionary as an incremental update"""
+        update = IncrementalUpdate(reader, input_file)
+        original = reader.trailer.raw_get("/Info") if "/Info" in reader.trailer else None
+        if isinstance(original, IndirectObject):
+            update.replace_object(original, info)
+        else:
+            update.trailer["/Info"] = update.add_object(info)
+        update.write(output_file)
+
+    def _rewrite(self, reader: PyPDF2.PdfReader, info: DictionaryObject, output_file: Path) -> None:
+        """Rewrite the whole document with the new information dictionary"""
+        if reader.is_encrypted:
+            raise PDFValidationError("加密文档需要先解密才能修改元数据")
+
+        writer = PyPDF2.PdfWriter()
+        writer.clone_document_from_reader(reader)
+        writer._info.get_object().clear()  # type: ignore[union-attr]
+        writer.add_metadata(info)
+        with open(output_file, "wb") as output_f:
+            writer.write(output_f)
+
+
+def _pdf_date(moment: datetime) -> str:
+    """Format a timezone-aware datetime as a PDF date (``D:YYYYMMDDHHmmSS+HH'mm'``)"""
+    offset = moment.strftime("%z") or "+0000"
+    return moment.strftime("D:%Y%m%d%H%M%S") + f"{offset[:3]}'{offset[3:]}'"
@@ -0,0 +1,122 @@
+"""
+PDF结构优化操作
+"""
+
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import List, Optional, Tuple
+from uuid import uuid4
+
+import PyPDF2
+
+from ....common.exceptions import PDFProcessingError, PDFToolError, PDFValidationError
+from ....common.interfaces import BasePDFOperation
+from ....common.models import OperationResult, OptimizeOptions
+from ....common.utils import open_reader
+from ..structure.optimize import OptimizationResult, write_optimized
+
+logger = logging.getLogger(__name__)
+
+
+class OptimizeOperation(BasePDFOperation):
+    """PDF结构优化操作实现
+
+    移除不可达对象、合并内容相同的对象，非流对象打包进压缩对象流并使用
+    交叉引用流。图片和流内容不变（有损压缩见 CompressOperation）。
+    """
+
+    @property
+    def operation_name(self) -> str:
+        return "optimize"
+
+    def validate_input(self, input_file: Path, options: OptimizeOptions) -> None:
+        """验证结构优化操作输入"""
+        # 文档由 execute 解析一次
+        self.validate_pdf_file(input_file, parse=False)
+
+    def execute(self, input_file: Path, options: OptimizeOptions) -> OperationResult:
+        """执行PDF结构优化操作"""
+        self.validate_input(input_file, options)
+
+        output_file = options.output_file or self.temp_dir / f"optimized_{uuid4().hex}.pdf"
+
+        try:
+            result, optimized = write_smaller(input_file, output_file, options, check_limits=True)
+            original_size = input_file.stat().st_size
+            optimized_size = output_file.stat().st_size
+
+            logger.info(f"成功优化PDF结构: {input_file}, {original_size} -> {optimized_size} 字节")
+            details = (
+                f"原始大小 {original_size} 字节，优化后 {optimized_size} 字节；"
+                f"对象 {result.source_objects} -> {result.written_objects} 个"
+                f"（合并重复对象 {result.duplicates} 个），对象流 {result.object_streams} 个"
+            )
+            if not optimized:
+                details += "；优化后文件未变小，保留原文件"
+            return OperationResult(
+                success=True,
+                message="成功优化PDF结构",
+                output_files=[output_file],
+                details=details,
+            )
+
+        except PDFToolError:
+            raise
+        except Exception as e:
+            raise PDFProcessingError(f"优化PDF结构失败: {str(e)}")
+
+
+def write_smaller(
+    input_file: Path,
+    output_file: Path,
+    options: Optional[OptimizeOptions] = None,
+    check_limits: bool = False,
+) -> Tuple[OptimizationResult, bool]:
+    """Write the optimized document, or a copy of the input if that is not smaller
+
+    ``output_file`` may be the input file itself. ``check_limits`` checks the
+    input against the structure limits (uploads, not outputs of other operations).
+
+    Returns:
+        The optimization counts, and whether the optimized version was kept
+    """
+    options = options or OptimizeOptions()
+    temp_file = output_file.with_name(f".{output_file.name}.{uuid4().hex}.optimizing")
+    try:
+        with open(input_file, "rb") as f:
+            if check_limits:
+                reader = open_reader(f)
+            else:
+                try:
+                    reader = PyPDF2.PdfReader(f)
+                except Exception as e:
+                    raise PDFValidationError(f"Invalid PDF file: {input_file}. Error: {str(e)}")
+            with open(temp_file, "wb") as output_f:
+                result = write_optimized(
+                    reader, output_f, options.object_streams, options.deduplicate
+                )
+
+        optimized = temp_file.stat().st_size < input_file.stat().st_size
+        if optimized:
+            os.replace(temp_file, output_file)
+        elif input_file != output_file:
+            shutil.copyfile(input_file, output_file)
+        return result, optimized
+    finally:
+        temp_file.unlink(missing_ok=True)
+
+
+def optimize_outputs(output_files: List[Path]) -> int:
+    """Optimize files in place, as the post-processing step of other operations
+
+    Returns:
+        The number of bytes saved
+    """
+    saved = 0
+    for file_path in output_files:
+        size = file_path.stat().st_size
+        write_smaller(file_path, file_path)
+        saved += size - file_path.stat().st_size
+    return saved
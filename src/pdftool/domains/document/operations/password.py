@@ -6,17 +6,31 @@ import logging
 from pathlib import Path
 from uuid import uuid4
 
-import PyPDF2
-
-from ....common.exceptions import PDFProcessingError, PDFValidationError
+from ....common.exceptions import PDFProcessingError, PDFToolError, PDFValidationError
 from ....common.interfaces import BasePDFOperation
-from ....common.models import OperationResult, PasswordProtectionOptions
+from ....common.models import (
+    EncryptionAlgorithm,
+    OperationResult,
+    PasswordProtectionOptions,
+)
+from ....config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+ENCRYPTION_ALGORITHM_NAMES = {
+    EncryptionAlgorithm.RC4_128: "RC4 128位",
+    EncryptionAlgorithm.AES_128: "AES 128位",
+    EncryptionAlgorithm.AES_256: "AES 256位",
+}
+
 
 class PasswordProtectionOperation(BasePDFOperation):
-    """PDF密码保护操作实现"""
+    """PDF密码保护操作实现
+
+    支持 RC4-128、AES-128 和 AES-256 (R6) 加密，由配置的PDF引擎完成。PyPDF2
+    引擎在 PdfWriter 组装文档后，将各对象的字符串和流在线程池中并行加密，再按
+    对象顺序写出。
+    """
 
     @property
     def operation_name(self) -> str:
@@ -24,7 +38,8 @@ class PasswordProtectionOperation(BasePDFOperation):
 
     def validate_input(self, input_file: Path, options: PasswordProtectionOptions) -> None:
         """验证密码保护操作输入"""
-        self.validate_pdf_file(input_file)
+        # 文档由 execute 中的引擎解析
+        self.validate_pdf_file(input_file, parse=False)
 
         if not options.user_password:
             raise PDFValidationError("用户密码不能为空")
@@ -39,52 +54,25 @@ class PasswordProtectionOperation(BasePDFOperation):
         output_file = options.output_file or self.temp_dir / f"protected_{uuid4().hex}.pdf"
 
         try:
-            with open(input_file, "rb") as f:
-                reader = PyPDF2.PdfReader(f)
-                writer = PyPDF2.PdfWriter()
-
-                # 复制所有页面
-                for page_num in range(len(reader.pages)):
-                    page = reader.pages[page_num]
-                    writer.add_page(page)
-
-                # 复制元数据（如果存在）
-                if reader.metadata:
-                    writer.add_metadata(reader.metadata)
+            with self.engine.open(input_file) as document:
+                if document.is_encrypted:
+                    raise PDFValidationError("文档已加密，请先解密")
 
                 # 设置密码和权限
                 # 使用所有者密码（如果提供）或用户密码作为所有者密码
-                owner_password = options.owner_password or options.user_password
-
-                # 构建权限标志
-                permissions = 0
-                if options.allow_printing:
-                    permissions |= 4  # 允许打印
-                if options.allow_modification:
-                    permissions |= 8  # 允许修改内容
-                if options.allow_copying:
-                    permissions |= 16  # 允许复制/提取文本
-                if options.allow_annotation:
-                    permissions |= 32  # 允许添加注释
-                if options.allow_filling_forms:
-                    permissions |= 256  # 允许填写表单
-                if options.allow_screen_readers:
-                    permissions |= 512  # 允许屏幕阅读器访问
-                if options.allow_assembly:
-                    permissions |= 1024  # 允许组装文档
-                if options.allow_degraded_printing:
-                    permissions |= 4  # 允许低质量打印
-
-                # 加密PDF
-                writer.encrypt(
-                    user_password=options.user_password,
-                    owner_password=owner_password,
-                    permissions_flag=permissions,
+                document.encrypt(
+                    options.algorithm,
+                    options.user_password,
+                    options.owner_password or options.user_password,
+                    permission_flags(options),
                 )
 
-                # 写入输出文件
-                with open(output_file, "wb") as output_f:
-                    writer.write(output_f)
+                # 加密并写入输出文件（PyPDF2 引擎在线程池中并行加密各对象）
+                document.write(
+                    output_file,
+                    linearize=options.linearize,
+                    max_workers=options.max_workers or settings.max_workers,
+                )
 
             logger.info(f"成功为PDF添加密码保护: {input_file}")
 
@@ -107,8 +95,36 @@ class PasswordProtectionOperation(BasePDFOperation):
                 success=True,
                 message="PDF密码保护设置成功",
                 output_files=[output_file],
-                details=f"已设置用户密码，允许的操作: {permissions_text}",
+                details=(
+                    f"已设置用户密码，加密算法: {ENCRYPTION_ALGORITHM_NAMES[options.algorithm]}，"
+                    f"允许的操作: {permissions_text}"
+                    + ("，已线性化（快速 Web 查看）" if options.linearize else "")
+                ),
             )
 
+        except PDFToolError:
+            raise
         except Exception as e:
             raise PDFProcessingError(f"密码保护失败: {str(e)}")
+
+
+def permission_flags(options: PasswordProtectionOptions) -> int:
+    """Permission bits (``/P``) for the selected permissions"""
+    permissions = 0
+    if options.allow_printing:
+        permissions |= 4 | 2048  # 允许打印（含高质量打印）
+    if options.allow_modification:
+        permissions |= 8  # 允许修改内容
+    if options.allow_copying:
+        permissions |= 16  # 允许复制/提取文本
+    if options.allow_annotation:
+        permissions |= 32  # 允许添加注释
+    if options.allow_filling_forms:
+        permissions |= 256  # 允许填写表单
+    if options.allow_screen_readers:
+        permissions |= 512  # 允许屏幕阅读器访问
+    if options.allow_assembly:
+        permissions |= 1024  # 允许组装文档
+    if options.allow_degraded_printing:
+        permissions |= 4  # 允许低质量打印
+    return permissions
@@ -3,14 +3,27 @@ PDF split operation
 """
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
 from uuid import uuid4
 
 import PyPDF2
 
-from ....common.exceptions import PDFProcessingError, PDFValidationError
+from ....common.exceptions import PDFProcessingError, PDFToolError, PDFValidationError
 from ....common.interfaces import BasePDFOperation
 from ....common.models import OperationResult, PageSelectionMode, PageSelectionOptions
+from ....common.utils import borrow_reader, sanitize_filename
+from ....config.settings import settings
+from ..structure import (
+    OutlineItem,
+    PageSubsetWriter,
+    get_page_count,
+    get_pages,
+    read_outline,
+)
+from .linearize import linearize_outputs
+from .optimize import optimize_outputs
 
 logger = logging.getLogger(__name__)
 
@@ -34,13 +47,27 @@ class SplitOperation(BasePDFOperation):
         output_dir.mkdir(exist_ok=True)
 
         try:
-            with open(input_file, "rb") as f:
-                reader = PyPDF2.PdfReader(f)
-                total_pages = len(reader.pages)
+            # 拆分只读取源文档，使用已解析文档缓存中的读取器
+            with borrow_reader(input_file) as reader:
                 output_files = []
+                oversized: List[int] = []
 
                 # Determine which pages to process
-                if options.mode == PageSelectionMode.ALL_PAGES:
+                if options.mode in [
+                    PageSelectionMode.ALL_PAGES,
+                    PageSelectionMode.CHUNK,
+                    PageSelectionMode.MAX_BYTES,
+                    PageSelectionMode.OUTLINE,
+                ]:
+                    if options.mode == PageSelectionMode.CHUNK and (
+                        not options.chunk_size or options.chunk_size < 1
+                    ):
+                        raise PDFValidationError("固定页数拆分需要提供有效的每份页数")
+                    if options.mode == PageSelectionMode.MAX_BYTES and (
+                        not options.max_bytes or options.max_bytes < 1
+                    ):
+                        raise PDFValidationError("按大小拆分需要提供有效的文件大小上限")
+                    total_pages = len(reader.pages)
                     target_pages = list(range(1, total_pages + 1))
                 elif options.mode in [
                     PageSelectionMode.SPECIFIC_PAGES,
@@ -48,6 +75,7 @@ class SplitOperation(BasePDFOperation):
                 ]:
                     if not options.pages:
                         raise PDFValidationError("指定页面模式需要提供页面列表")
+                    total_pages = self._get_page_count(reader)
                     # Validate page range
                     for page_num in options.pages:
                         if page_num < 1 or page_num > total_pages:
@@ -56,12 +84,14 @@ class SplitOperation(BasePDFOperation):
                 else:
                     raise PDFValidationError(f"不支持的页面选择模式: {options.mode}")
 
+                pages = self._load_pages(reader, target_pages, options.mode)
+
+                # 所有输出共享同一个已序列化对象缓存，共享的字体、图片只编码一次
+                writer = PageSubsetWriter(reader, prune_resources=options.prune_resources)
+
                 # Process pages based on mode
                 if options.mode == PageSelectionMode.SINGLE_FILE:
                     # Merge selected pages into single file
-                    writer = PyPDF2.PdfWriter()
-                    for page_num in target_pages:
-                        writer.add_page(reader.pages[page_num - 1])
 
                     if len(target_pages) == 1:
                         prefix = options.filename_prefix or input_file.stem
@@ -72,25 +102,74 @@ class SplitOperation(BasePDFOperation):
                         filename = f"{prefix}_pages_{page_range}.pdf"
 
                     output_file = output_dir / filename
-                    with open(output_file, "wb") as out_f:
-                        writer.write(out_f)
+                    writer.write([pages[page_num] for page_num in target_pages], output_file)
                     output_files.append(output_file)
 
+                elif options.mode == PageSelectionMode.CHUNK:
+                    # Write every chunk_size pages into one file, chunks in parallel
+                    chunk_size = options.chunk_size or total_pages
+                    chunks = [
+                        target_pages[i : i + chunk_size]
+                        for i in range(0, len(target_pages), chunk_size)
+                    ]
+                    prefix = options.filename_prefix or input_file.stem
+                    output_files = self._write_chunks(writer, pages, chunks, output_dir, prefix)
+
+                elif options.mode == PageSelectionMode.MAX_BYTES:
+                    # Pack consecutive pages into files below max_bytes, chunks in parallel
+                    max_bytes = options.max_bytes or 0
+                    groups = writer.pack_by_size(
+                        [pages[page_num] for page_num in target_pages], max_bytes
+                    )
+                    chunks = [[target_pages[index] for index in group] for group in groups]
+                    oversized = [
+                        chunk[0]
+                        for chunk in chunks
+                        if len(chunk) == 1 and writer.estimate_size([pages[chunk[0]]]) > max_bytes
+                    ]
+                    if oversized:
+                        logger.warning(f"{len(oversized)} 个页面单独超过大小上限，已单独输出")
+                    prefix = options.filename_prefix or input_file.stem
+                    output_files = self._write_chunks(writer, pages, chunks, output_dir, prefix)
+
+                elif options.mode == PageSelectionMode.OUTLINE:
+                    # One file per top-level bookmark, chapters in parallel
+                    outline = read_outline(reader, [pages[page_num] for page_num in target_pages])
+                    sections = self._outline_sections(outline, total_pages)
+                    if not sections:
+                        raise PDFValidationError("文档没有指向页面的顶层书签，无法按章节拆分")
+                    prefix = options.filename_prefix or input_file.stem
+                    width = max(len(str(len(sections))), 2)
+                    filenames = []
+                    for number, (title, chunk, _) in enumerate(sections):
+                        # 标题可能含换行等字符，规整空白并限制长度
+                        name = sanitize_filename(" ".join((title or "").split()))[:80]
+                        name = name or f"pages_{chunk[0]}-{chunk[-1]}"
+                        filenames.append(f"{prefix}_{number:0{width}d}_{name}.pdf")
+                    output_files = self._write_chunks(
+                        writer,
+                        pages,
+                        [chunk for _, chunk, _ in sections],
+                        output_dir,
+                        prefix,
+                        filenames=filenames,
+                        outlines=[items for _, _, items in sections],
+                    )
+
                 else:
                     # Create separate file for each page
                     for page_num in target_pages:
-                        writer = PyPDF2.PdfWriter()
-                        writer.add_page(reader.pages[page_num - 1])
-
                         filename = (
                             f"{options.filename_prefix or input_file.stem}_page_{page_num}.pdf"
                         )
                         output_file = output_dir / filename
-
-                        with open(output_file, "wb") as out_f:
-                            writer.write(out_f)
+                        writer.write([pages[page_num]], output_file)
                         output_files.append(output_file)
 
+                logger.debug(
+                    f"对象缓存命中 {writer.cache.hits} 次, 序列化 {writer.cache.misses} 个对象"
+                )
+
                 pages_desc = (
                     f"{min(target_pages)}-{max(target_pages)}"
                     if len(target_pages) > 1
@@ -98,12 +177,118 @@ class SplitOperation(BasePDFOperation):
                 )
                 logger.info(f"成功分割PDF页面: {pages_desc}")
 
+                details = f"页面: {', '.join(map(str, target_pages))}"
+                if options.mode == PageSelectionMode.OUTLINE:
+                    details = f"按书签拆分为 {len(output_files)} 个文件"
+                elif options.mode == PageSelectionMode.MAX_BYTES:
+                    details = f"按大小拆分为 {len(output_files)} 个文件"
+                    if oversized:
+                        shown = ", ".join(map(str, oversized[:10]))
+                        more = " 等" if len(oversized) > 10 else ""
+                        details += (
+                            f"，{len(oversized)} 个页面单独超过大小上限（页面 {shown}{more}）"
+                        )
+
+                if options.optimize:
+                    saved = optimize_outputs(output_files)
+                    details += f"；结构优化节省 {saved} 字节"
+                if options.linearize:
+                    linearize_outputs(output_files)
+                    details += "；已线性化（快速 Web 查看）"
+
                 return OperationResult(
                     success=True,
                     message=f"成功处理 {len(target_pages)} 个页面: {pages_desc}",
                     output_files=output_files,
-                    details=f"页面: {', '.join(map(str, target_pages))}",
+                    details=details,
                 )
 
+        except PDFToolError:
+            raise
         except Exception as e:
             raise PDFProcessingError(f"Failed to split PDF: {str(e)}")
+
+    def _get_page_count(self, reader: PyPDF2.PdfReader) -> int:
+        """Page count from the page tree root, falling back to a full traversal"""
+        try:
+            return get_page_count(reader)
+        except PDFValidationError as e:
+            logger.warning(f"无法从页面树读取页数，回退到完整遍历: {e.message}")
+            return len(reader.pages)
+
+    def _load_pages(
+        self, reader: PyPDF2.PdfReader, target_pages: List[int], mode: PageSelectionMode
+    ) -> Dict[int, PyPDF2.PageObject]:
+        """Load the target pages (1-based) keyed by page number
+
+        Explicit page selections walk only the page tree paths leading to the
+        selected pages, so extracting a few pages does not depend on the size of
+        the document. Inconsistent page trees fall back to ``reader.pages``.
+        """
+        if mode in [PageSelectionMode.SPECIFIC_PAGES, PageSelectionMode.SINGLE_FILE]:
+            try:
+                pages = get_pages(reader, [page_num - 1 for page_num in target_pages])
+                return {index + 1: page for index, page in pages.items()}
+            except PDFValidationError as e:
+                logger.warning(f"页面树按需遍历失败，回退到完整遍历: {e.message}")
+
+        return {page_num: reader.pages[page_num - 1] for page_num in target_pages}
+
+    def _write_chunks(
+        self,
+        writer: PageSubsetWriter,
+        pages: Dict[int, PyPDF2.PageObject],
+        chunks: List[List[int]],
+        output_dir: Path,
+        prefix: str,
+        filenames: Optional[List[str]] = None,
+        outlines: Optional[List[List[OutlineItem]]] = None,
+    ) -> List[Path]:
+        """Write page chunks concurrently from one parsed input
+
+        All chunks share the writer's serialized-object cache; encoding of an
+        object happens once under the cache lock and the file assembly and
+        writes of different chunks overlap.
+        """
+
+        def write_chunk(position: int) -> Path:
+            chunk = chunks[position]
+            if filenames:
+                output_file = output_dir / filenames[position]
+            else:
+                output_file = output_dir / f"{prefix}_pages_{chunk[0]}-{chunk[-1]}.pdf"
+            return writer.write(
+                [pages[page_num] for page_num in chunk],
+                output_file,
+                outlines[position] if outlines else None,
+            )
+
+        with ThreadPoolExecutor(max_workers=settings.max_workers) as executor:
+            return list(executor.map(write_chunk, range(len(chunks))))
+
+    def _outline_sections(
+        self, outline: Sequence[OutlineItem], total_pages: int
+    ) -> List[Tuple[Optional[str], List[int], List[OutlineItem]]]:
+        """Page ranges (1-based) delimited by the top-level bookmarks
+
+        Each section runs from a bookmark's page to the page before the next
+        one and carries the bookmark with its nested bookmarks. Bookmarks on
+        the same page share a section; pages before the first bookmark form an
+        untitled leading section.
+        """
+        starts: Dict[int, List[OutlineItem]] = {}
+        for item in outline:
+            if item.page_index is not None:
+                starts.setdefault(item.page_index, []).append(item)
+        if not starts:
+            return []
+
+        sections: List[Tuple[Optional[str], List[int], List[OutlineItem]]] = []
+        boundaries = sorted(starts)
+        if boundaries[0] > 0:
+            sections.append((None, list(range(1, boundaries[0] + 1)), []))
+        for position, start in enumerate(boundaries):
+            end = boundaries[position + 1] if position + 1 < len(boundaries) else total_pages
+            items = starts[start]
+            sections.append((items[0].title, list(range(start + 1, end + 1)), items))
+        return sections
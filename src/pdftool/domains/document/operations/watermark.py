@@ -4,16 +4,29 @@ PDF watermark operation
 
 import io
 import logging
+import zlib
 from pathlib import Path
+from typing import Callable, Dict, List, Optional
 from uuid import uuid4
 
 import PyPDF2
 from PIL import Image
+from PyPDF2.generic import (
+    ArrayObject,
+    DecodedStreamObject,
+    DictionaryObject,
+    EncodedStreamObject,
+    FloatObject,
+    IndirectObject,
+    NameObject,
+    PdfObject,
+    StreamObject,
+)
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 
-from ....common.exceptions import PDFProcessingError, PDFValidationError
+from ....common.exceptions import PDFProcessingError, PDFToolError, PDFValidationError
 from ....common.interfaces import BasePDFOperation
 from ....common.models import (
     OperationResult,
@@ -22,12 +35,27 @@ from ....common.models import (
     WatermarkPosition,
     WatermarkType,
 )
+from ....common.utils import open_reader
+from ..structure.incremental import IncrementalUpdate
+from ..structure.page_tree import get_page_count, get_pages
+from .linearize import linearize_outputs
+from .optimize import optimize_outputs
 
 logger = logging.getLogger(__name__)
 
+# 增量模式下水印 XObject 在页面资源中的名称
+WATERMARK_XOBJECT_NAME = "/PdfToolWatermark"
+
 
 class WatermarkOperation(BasePDFOperation):
-    """PDF watermark operation implementation"""
+    """PDF watermark operation implementation
+
+    The whole document is rewritten by the configured PDF engine. With
+    ``incremental`` set, the watermark and the updated target pages are
+    appended to an unchanged copy of the original file instead of rewriting
+    the whole document. Note that the previous revision stays in the file and
+    can be recovered by removing the update.
+    """
 
     @property
     def operation_name(self) -> str:
@@ -35,7 +63,8 @@ class WatermarkOperation(BasePDFOperation):
 
     def validate_input(self, input_file: Path, options: WatermarkOptions) -> None:
         """Validate watermark operation input"""
-        self.validate_pdf_file(input_file)
+        # 文档由 execute 解析
+        self.validate_pdf_file(input_file, parse=False)
 
         if options.watermark_type == WatermarkType.TEXT and not options.text:
             raise PDFValidationError("文本水印需要提供文本内容")
@@ -44,6 +73,12 @@ class WatermarkOperation(BasePDFOperation):
             if not options.image_path or not options.image_path.exists():
                 raise PDFValidationError("图片水印需要提供有效的图片文件")
 
+        if (
+            options.page_selection == PageSelectionMode.SPECIFIC_PAGES
+            and not options.specific_pages
+        ):
+            raise PDFValidationError("指定页面模式需要提供页面列表")
+
     def execute(self, input_file: Path, options: WatermarkOptions) -> OperationResult:
         """Execute PDF watermark operation"""
         self.validate_input(input_file, options)
@@ -54,48 +89,45 @@ class WatermarkOperation(BasePDFOperation):
             # Create watermark PDF
             watermark_pdf = self._create_watermark_pdf(options)
 
-            # Apply watermark to input PDF
-            with open(input_file, "rb") as input_pdf_file:
-                input_pdf = PyPDF2.PdfReader(input_pdf_file)
-                output_pdf = PyPDF2.PdfWriter()
-
-                # Get watermark reader
-                watermark_reader = PyPDF2.PdfReader(watermark_pdf)
-                watermark_page = watermark_reader.pages[0]
-
-                total_pages = len(input_pdf.pages)
-
-                # Determine which pages to watermark
-                if options.page_selection == PageSelectionMode.ALL_PAGES:
-                    target_pages = list(range(total_pages))
-                elif options.page_selection == PageSelectionMode.SPECIFIC_PAGES:
-                    if not options.specific_pages:
-                        raise PDFValidationError("指定页面模式需要提供页面列表")
-                    # Convert 1-based to 0-based indexing
-                    target_pages = [p - 1 for p in options.specific_pages if 0 < p <= total_pages]
-                else:
-                    # Default to all pages
-                    target_pages = list(range(total_pages))
-
-                # Process each page
-                for i, page in enumerate(input_pdf.pages):
-                    if i in target_pages:
-                        # Merge page with watermark
-                        page.merge_page(watermark_page)
-                    output_pdf.add_page(page)
-
-                # Write output file
-                with open(output_file, "wb") as output_file_obj:
-                    output_pdf.write(output_file_obj)
-
-            logger.info(f"Successfully added watermark to PDF: {input_file}")
+            target_pages: Optional[List[int]] = None
+            if options.incremental:
+                with open(input_file, "rb") as input_pdf_file:
+                    input_pdf = open_reader(input_pdf_file)
+                    watermark_page = PyPDF2.PdfReader(watermark_pdf).pages[0]
+                    try:
+                        target_pages = self._target_pages(options, get_page_count(input_pdf))
+                        self._watermark_incremental(
+                            input_pdf, input_file, watermark_page, target_pages, output_file
+                        )
+                        mode = "增量更新"
+                    except PDFValidationError as e:
+                        logger.warning(f"无法增量添加水印，回退到完整重写: {e.message}")
+                        target_pages = None
+
+            if target_pages is None:
+                target_pages = self._rewrite(input_file, watermark_pdf, options, output_file)
+                mode = "完整重写"
+
+            if options.optimize:
+                saved = optimize_outputs([output_file])
+                mode += f"，结构优化节省 {saved} 字节"
+            if options.linearize:
+                linearize_outputs([output_file])
+                mode += "，已线性化"
+
+            logger.info(f"Successfully added watermark to PDF: {input_file} ({mode})")
             return OperationResult(
                 success=True,
                 message=f"成功添加水印到 {len(target_pages)} 个页面",
                 output_files=[output_file],
-                details=f"水印类型: {options.watermark_type.value}, 位置: {options.position.value}",
+                details=(
+                    f"水印类型: {options.watermark_type.value}, "
+                    f"位置: {options.position.value}, 方式: {mode}"
+                ),
             )
 
+        except PDFToolError:
+            raise
         except Exception as e:
             raise PDFProcessingError(f"Failed to add watermark: {str(e)}")
         finally:
@@ -106,6 +138,72 @@ class WatermarkOperation(BasePDFOperation):
             except Exception:
                 pass
 
+    def _target_pages(self, options: WatermarkOptions, total_pages: int) -> List[int]:
+        """0-based indices of the pages to watermark"""
+        if options.page_selection == PageSelectionMode.SPECIFIC_PAGES:
+            # Convert 1-based to 0-based indexing
+            return sorted({p - 1 for p in options.specific_pages or [] if 0 < p <= total_pages})
+        # Default to all pages
+        return list(range(total_pages))
+
+    def _rewrite(
+        self,
+        input_file: Path,
+        watermark_pdf: io.BytesIO,
+        options: WatermarkOptions,
+        output_file: Path,
+    ) -> List[int]:
+        """Stamp the watermark on the target pages and rewrite the whole document"""
+        engine = self.engine
+        watermark_pdf.seek(0)
+        with engine.open(input_file) as document, engine.open(
+            watermark_pdf, check_limits=False
+        ) as watermark:
+            if document.is_encrypted:
+                raise PDFValidationError("加密文档需要先解密才能添加水印")
+
+            target_pages = self._target_pages(options, document.page_count)
+            document.stamp(watermark, target_pages)
+            document.write(output_file)
+        return target_pages
+
+    def _watermark_incremental(
+        self,
+        input_pdf: PyPDF2.PdfReader,
+        input_file: Path,
+        watermark_page: PyPDF2.PageObject,
+        target_pages: List[int],
+        output_file: Path,
+    ) -> None:
+        """Append the watermark as an incremental update
+
+        The watermark is written once as a Form XObject. Each target page gets
+        a new page dictionary whose ``/Contents`` array wraps the original
+        content streams in ``q``/``Q`` and ends with a stream drawing the
+        XObject; the original content streams are referenced, not copied.
+        """
+        update = IncrementalUpdate(input_pdf, input_file)
+        stamp = update.import_object(_form_xobject(watermark_page))
+        # 原内容可能遗留图形状态（坐标变换、颜色等），用 q/Q 隔离后再绘制水印
+        save_state = update.add_object(_content_stream(b"q\n"))
+        draw_streams: Dict[str, IndirectObject] = {}
+
+        def draw_stream(name: str) -> IndirectObject:
+            if name not in draw_streams:
+                draw_streams[name] = update.add_object(_draw_stream(name))
+            return draw_streams[name]
+
+        pages = get_pages(input_pdf, target_pages)
+        for index in target_pages:
+            page = pages[index]
+            if page.indirect_reference is None:
+                raise PDFValidationError("页面缺少间接引用，无法增量更新")
+            update.replace_object(
+                page.indirect_reference, _stamped_page(page, stamp, save_state, draw_stream)
+            )
+
+        update.write(output_file)
+
     def _create_watermark_pdf(self, options: WatermarkOptions) -> io.BytesIO:
         """Create a transparent watermark PDF"""
         watermark_buffer = io.BytesIO()
@@ -242,3 +340,78 @@ class WatermarkOperation(BasePDFOperation):
             y = margin
 
         return x, y
+
+
+def _form_xobject(page: PyPDF2.PageObject) -> StreamObject:
+    """A Form XObject drawing the content of ``page``"""
+    stream = EncodedStreamObject()
+    stream._data = zlib.compress(page.get_contents().get_data())  # type: ignore[union-attr]
+    stream[NameObject("/Type")] = NameObject("/XObject")
+    stream[NameObject("/Subtype")] = NameObject("/Form")
+    stream[NameObject("/BBox")] = ArrayObject(
+        FloatObject(value) for value in page.mediabox  # type: ignore[attr-defined]
+    )
+    stream[NameObject("/Resources")] = page.raw_get("/Resources")
+    stream[NameObject("/Filter")] = NameObject("/FlateDecode")
+    return stream
+
+
+def _content_stream(data: bytes) -> StreamObject:
+    """An uncompressed content stream"""
+    stream = DecodedStreamObject()
+    stream.set_data(data)
+    return stream
+
+
+def _draw_stream(name: str) -> StreamObject:
+    """Content stream restoring the graphics state and drawing the XObject ``name``"""
+    return _content_stream(b"Q\nq %s Do Q\n" % name.encode("latin-1"))
+
+
+def _stamped_page(
+    page: PyPDF2.PageObject,
+    stamp: IndirectObject,
+    save_state: IndirectObject,
+    draw_stream: Callable[[str], IndirectObject],
+) -> DictionaryObject:
+    """Copy of a page dictionary drawing the ``stamp`` XObject over its content
+
+    The ``/Contents`` array wraps the original content streams (referenced, not
+    copied) in ``save_state`` and the stream returned by ``draw_stream`` for the
+    name the stamp gets in the page's XObject resources.
+    """
+    resources = page.get("/Resources")
+    resources = DictionaryObject(resources.get_object() if resources is not None else {})
+    xobjects = resources.get("/XObject")
+    xobjects = DictionaryObject(xobjects.get_object() if xobjects is not None else {})
+    name = _unused_name(xobjects, WATERMARK_XOBJECT_NAME)
+    xobjects[NameObject(name)] = stamp
+    resources[NameObject("/XObject")] = xobjects
+
+    page_dict = DictionaryObject(page)
+    page_dict[NameObject("/Contents")] = ArrayObject(
+        [save_state, *_content_references(page), draw_stream(name)]
+    )
+    page_dict[NameObject("/Resources")] = resources
+    return page_dict
+
+
+def _content_references(page: PyPDF2.PageObject) -> List[PdfObject]:
+    """The page's content streams, as the (unresolved) entries of a ``/Contents`` array"""
+    if "/Contents" not in page:
+        return []
+    contents = page.raw_get("/Contents")
+    resolved = contents.get_object()
+    if isinstance(resolved, ArrayObject):
+        return list(resolved)
+    return [contents]
+
+
+def _unused_name(entries: DictionaryObject, base: str) -> str:
+    """``base``, or ``base`` with a numeric suffix if the name is already taken"""
+    name = base
+    suffix = 1
+    while name in entries:
+        name = f"{base}{suffix}"
+        suffix += 1
+    return name
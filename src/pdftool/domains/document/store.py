@@ -0,0 +1,232 @@
+"""
+文档存储
+
+上传的文档按内容 SHA-256 存放为 ``<id>.pdf``，旁边是它的侧车索引 ``<id>.idx``
+（交叉引用表、trailer、页面对象号和页面框，见 ``structure.index``）。索引在文档
+第一次存入时建立，之后打开文档只读取索引，不再解析交叉引用表和遍历页面树。
+
+单页提取（``page_pdf``）使用两级缓存：最近使用文档的已打开读取器（连同其
+已序列化对象缓存，同一文档的不同页面共享字体和图片的编码），以及最近生成的
+单页 PDF 字节。文档按内容寻址、不会改变，生成的页面可以一直缓存。
+"""
+
+import logging
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+from typing import List, Optional, Tuple
+from uuid import uuid4
+
+from ...common.exceptions import PDFFileNotFoundError, PDFToolError, PDFValidationError
+from ...common.utils import file_sha256, open_reader
+from ...config.settings import settings
+from .structure.index import DocumentIndex, IndexedPdfReader
+from .structure.writer import OUTPUT_FORMAT_VERSION, PageSubsetWriter
+
+logger = logging.getLogger(__name__)
+
+# 文档 ID：内容的 SHA-256（小写十六进制）
+DOCUMENT_ID_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+# 保持打开的文档数上限（按最近使用淘汰）
+OPEN_DOCUMENT_CACHE_SIZE = 16
+
+# 缓存的单页 PDF 总字节数上限
+PAGE_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class _OpenDocument:
+    """A stored document kept open for page extraction
+
+    ``PdfReader`` is not thread-safe; use the reader and writer under ``lock``.
+    """
+
+    def __init__(self, reader: IndexedPdfReader):
+        self.reader = reader
+        self.writer = PageSubsetWriter(reader)
+        self.lock = threading.Lock()
+
+    def close(self) -> None:
+        with self.lock:
+            self.reader.stream.close()
+
+
+class DocumentStore:
+    """Content-addressed store of documents and their sidecar indexes"""
+
+    # 进程内共享：文档按内容寻址，与存储目录无关
+    _open_documents: "OrderedDict[str, _OpenDocument]" = OrderedDict()
+    _page_cache: "OrderedDict[Tuple[str, int], bytes]" = OrderedDict()
+    _page_cache_bytes = 0
+    _cache_lock = threading.Lock()
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or settings.document_store_dir)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def add(self, source: Path) -> str:
+        """Store a document (once per content) and return its ID
+
+        The document is parsed and checked against the structure limits once,
+        when its index is built.
+
+        Raises:
+            PDFValidationError: if the document cannot be parsed or exceeds a limit
+        """
+        document_id = file_sha256(source)
+        path = self._document_path(document_id)
+        if path.exists():
+            # 已存入的文档：确保索引存在
+            self.index(document_id)
+            return document_id
+
+        index = _build_index(source)
+        temp_path = self.root / f".{document_id}.{uuid4().hex}.tmp"
+        try:
+            shutil.copyfile(source, temp_path)
+            os.replace(temp_path, path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+        index.save(self._index_path(document_id))
+        logger.info(f"存入文档 {document_id}: {index.page_count} 页")
+        return document_id
+
+    def path(self, document_id: str) -> Path:
+        """Path of a stored document
+
+        Raises:
+            PDFValidationError: if the ID is malformed
+            PDFFileNotFoundError: if no document is stored under the ID
+        """
+        path = self._document_path(document_id)
+        if not path.exists():
+            raise PDFFileNotFoundError(f"文档不存在: {document_id}")
+        return path
+
+    def index(self, document_id: str) -> DocumentIndex:
+        """The document's index, rebuilt if missing or from another format version"""
+        path = self.path(document_id)
+        file_size = path.stat().st_size
+        index = DocumentIndex.load(self._index_path(document_id), file_size)
+        if index is None:
+            logger.info(f"重建文档索引: {document_id}")
+            index = _build_index(path)
+            index.save(self._index_path(document_id))
+        return index
+
+    def open_reader(self, document_id: str) -> IndexedPdfReader:
+        """A reader of a stored document, set up from its index
+
+        The reader keeps the file open; close ``reader.stream`` when done.
+        """
+        index = self.index(document_id)
+        stream = open(self.path(document_id), "rb")
+        try:
+            return IndexedPdfReader(stream, index)
+        except PDFToolError:
+            stream.close()
+            raise
+        except Exception as e:
+            stream.close()
+            raise PDFValidationError(f"无法打开文档 {document_id}: {str(e)}")
+
+    def page_count(self, document_id: str) -> int:
+        """Number of pages of a stored document, from its index
+
+        Raises:
+            PDFValidationError: if the document is encrypted
+        """
+        index = self._open_document(document_id).reader.index
+        if not index.has_pages:
+            raise PDFValidationError("文档已加密，无法按页访问")
+        return index.page_count
+
+    def page_pdf(self, document_id: str, page_number: int) -> bytes:
+        """One page (1-based) of a stored document as a PDF file
+
+        Raises:
+            PDFValidationError: if the document is encrypted or the page is out of range
+        """
+        key = (document_id, page_number)
+        with self._cache_lock:
+            data = self._page_cache.get(key)
+            if data is not None:
+                self._page_cache.move_to_end(key)
+                return data
+
+        page_count = self.page_count(document_id)
+        if not 1 <= page_number <= page_count:
+            raise PDFValidationError(f"页面 {page_number} 超出范围 (1-{page_count})")
+
+        document = self._open_document(document_id)
+        output = BytesIO()
+        with document.lock:
+            page = document.reader.indexed_page(page_number - 1)
+            document.writer.write_to_stream([page], output)
+        data = output.getvalue()
+
+        with self._cache_lock:
+            if key not in self._page_cache and len(data) <= PAGE_CACHE_BYTES:
+                self._page_cache[key] = data
+                DocumentStore._page_cache_bytes += len(data)
+                while DocumentStore._page_cache_bytes > PAGE_CACHE_BYTES:
+                    _, evicted = self._page_cache.popitem(last=False)
+                    DocumentStore._page_cache_bytes -= len(evicted)
+        return data
+
+    def _open_document(self, document_id: str) -> _OpenDocument:
+        """The document's cached open reader, opened from its index when not cached"""
+        with self._cache_lock:
+            document = self._open_documents.get(document_id)
+            if document is not None:
+                self._open_documents.move_to_end(document_id)
+                return document
+
+        document = _OpenDocument(self.open_reader(document_id))
+        evicted: List[_OpenDocument] = []
+        with self._cache_lock:
+            cached = self._open_documents.get(document_id)
+            if cached is not None:
+                # 另一个线程同时打开了该文档
+                evicted.append(document)
+                document = cached
+            else:
+                self._open_documents[document_id] = document
+                while len(self._open_documents) > OPEN_DOCUMENT_CACHE_SIZE:
+                    evicted.append(self._open_documents.popitem(last=False)[1])
+        for unused in evicted:
+            unused.close()
+        return document
+
+    def _document_path(self, document_id: str) -> Path:
+        if not DOCUMENT_ID_PATTERN.match(document_id):
+            raise PDFValidationError(f"无效的文档ID: {document_id}")
+        return self.root / f"{document_id}.pdf"
+
+    def _index_path(self, document_id: str) -> Path:
+        return self.root / f"{document_id}.idx"
+
+
+def page_etag(document_id: str, page_number: int) -> str:
+    """Strong ETag of a page of a stored document
+
+    The document never changes; the writer's output format version is part of
+    the tag so that clients drop pages written by an older writer.
+    """
+    return f'"{document_id}-{page_number}-w{OUTPUT_FORMAT_VERSION}"'
+
+
+def _build_index(path: Path) -> DocumentIndex:
+    """Parse a document once, checking the structure limits, and index it"""
+    with open(path, "rb") as f:
+        reader = open_reader(f)
+        try:
+            return DocumentIndex.build(reader, path.stat().st_size)
+        except PDFToolError:
+            raise
+        except Exception as e:
+            raise PDFValidationError(f"无法为文档建立索引: {str(e)}")
@@ -0,0 +1,42 @@
+"""
+PDF底层结构模块
+
+直接基于PDF对象结构实现的高性能工具，包括：
+- 页面树按需遍历
+- 共享序列化对象缓存的页面子集写出
+- 书签读取与按输出页面重建
+- 标准安全处理程序加密（对象并行加密）
+- 整文档一次序列化、按对象替换写出多个版本
+- 单次遍历对象表的文档结构分析
+- 移除不可达对象、合并重复对象并打包对象流的结构优化
+- 线性化（快速 Web 查看）写出
+- 扫描文件重建交叉引用的损坏文件修复
+- 内容流在线程池中预先解压（zlib 解压时释放 GIL）
+- 交叉引用表和页面映射的侧车索引（再次打开文档无需解析）
+"""
+
+from .index import DocumentIndex, IndexedPdfReader
+from .outline import OutlineItem, read_outline
+from .page_tree import (
+    get_checked_page_count,
+    get_page_count,
+    get_pages,
+    standalone_page,
+)
+from .prefetch import prefetch, prefetch_pages
+from .writer import PageSubsetWriter, SerializedObjectCache
+
+__all__ = [
+    "DocumentIndex",
+    "IndexedPdfReader",
+    "OutlineItem",
+    "PageSubsetWriter",
+    "SerializedObjectCache",
+    "get_checked_page_count",
+    "get_page_count",
+    "get_pages",
+    "prefetch",
+    "prefetch_pages",
+    "read_outline",
+    "standalone_page",
+]
@@ -0,0 +1,373 @@
+"""
+One-pass document analysis
+
+``analyze_document`` reads every in-use object of the cross-reference table
+once, in file order, and keeps only what the analysis needs: the inheritable
+attributes of page tree nodes, font names and image sizes. Stream data is
+dropped from the reader's object cache right after it has been measured, so
+memory use does not grow with the size of the images. Content streams are
+decoded a few objects ahead in a thread pool (``prefetch``).
+"""
+
+import logging
+import re
+from collections import Counter
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from PyPDF2 import PdfReader
+from PyPDF2.generic import (
+    ArrayObject,
+    DictionaryObject,
+    IndirectObject,
+    PdfObject,
+    StreamObject,
+)
+
+from ....common.exceptions import PDFToolError
+from ....common.models import DocumentAnalysis, PageSizeSummary
+from ....config.settings import settings
+from .prefetch import prefetch
+from .serialization import header_version
+
+logger = logging.getLogger(__name__)
+
+# 判断线性化时读取的文件开头字节数（线性化参数字典必须是文件中的第一个对象）
+LINEARIZATION_PROBE_SIZE = 1024
+
+
+# 文本显示操作符（Tj/TJ/'/"），以前面的字符串或数组结尾为锚点
+TEXT_OPERATORS = re.compile(rb"[)>]\s*(?:Tj|'|\")|\]\s*TJ")
+
+# 这些键表明流不是内容流（嵌入字体、ICC 配置文件等），不检查其中的文本
+_NON_CONTENT_KEYS = ("/Type", "/Subtype", "/Length1", "/Length2", "/Length3", "/N")
+
+Box = Tuple[float, float, float, float]
+
+
+class _Node(NamedTuple):
+    """Attributes of a page tree node (``None`` when not set on the node)"""
+
+    parent: Optional[int]
+    is_page: bool
+    mediabox: Optional[Box]
+    rotate: Optional[int]
+    xobjects: Optional[Tuple[int, ...]]  # 资源中引用的 XObject 对象号
+    contents: Tuple[int, ...]  # 页面内容流对象号
+
+
+class _Page(NamedTuple):
+    """Attributes of a page with inheritance applied"""
+
+    mediabox: Optional[Box]
+    rotate: int
+    xobjects: Tuple[int, ...]
+    contents: Tuple[int, ...]
+
+
+def object_table(reader: PdfReader) -> List[Tuple[int, int]]:
+    """In-use ``(object number, generation)`` pairs in file order
+
+    Objects stored directly in the file come first, sorted by offset, followed
+    by the compressed objects grouped by object stream. Object numbers whose
+    newest entry is free are skipped.
+    """
+    newest: Dict[int, Tuple[int, int]] = {}
+    for generation, entries in reader.xref.items():
+        free = reader.xref_free_entry.get(generation, {})
+        for idnum, offset in entries.items():
+            if idnum == 0 or free.get(idnum):
+                continue
+            if idnum not in newest or newest[idnum][0] < generation:
+                newest[idnum] = (generation, offset)
+
+    direct = sorted(newest.items(), key=lambda item: item[1][1])
+    table = [(idnum, generation) for idnum, (generation, _) in direct]
+    compressed = sorted(reader.xref_objStm.items(), key=lambda item: item[1])
+    table.extend((idnum, 0) for idnum, _ in compressed if idnum not in newest)
+    return table
+
+
+def analyze_document(reader: PdfReader) -> DocumentAnalysis:
+    """Collect page, font, image and file level properties in one pass
+
+    A page counts as text if its content streams or the Form XObjects it
+    draws show text, and as scanned otherwise if it draws an image XObject.
+    Encrypted documents that cannot be opened with an empty password only get
+    the file level properties.
+    """
+    table = object_table(reader)
+    analysis = DocumentAnalysis(
+        version=_version(reader),
+        object_count=len(table),
+        encrypted=reader.is_encrypted,
+        linearized=_is_linearized(reader, table),
+        encryption=_encryption_description(reader),
+    )
+    if reader.is_encrypted and not reader.decrypt(""):
+        return analysis
+
+    nodes: Dict[int, _Node] = {}
+    fonts: Set[str] = set()
+    images: Set[int] = set()
+    image_bytes = 0
+    # 含文本显示操作的内容流和 Form XObject
+    text_streams: Set[int] = set()
+    # Form XObject 对象号 -> 其资源中引用的 XObject 对象号
+    forms: Dict[int, Tuple[int, ...]] = {}
+
+    # 后续内容流在线程池中预先解压，与当前对象的处理重叠
+    objects = prefetch(_read_objects(reader, table), _content_streams)
+    for idnum, generation, obj in objects:
+        if isinstance(obj, StreamObject):
+            if obj.get("/Subtype") == "/Image":
+                images.add(idnum)
+                image_bytes += len(obj._data)
+            elif _is_content(obj):
+                if _has_text(obj):
+                    text_streams.add(idnum)
+                if obj.get("/Subtype") == "/Form" and "/Resources" in obj:
+                    forms[idnum] = _xobjects(obj["/Resources"], fonts)
+            if obj.get("/Type") != "/ObjStm":
+                # 流数据已统计，不再保留在解析缓存中
+                reader.resolved_objects.pop((generation, idnum), None)
+        elif isinstance(obj, DictionaryObject):
+            node_type = obj.get("/Type")
+            if node_type == "/Font" or "/BaseFont" in obj:
+                _add_font(obj, fonts)
+            elif node_type in ("/Page", "/Pages"):
+                nodes[idnum] = _node(obj, fonts)
+
+    sizes: Counter = Counter()
+    text_pages = scanned_pages = 0
+    for page in _effective_pages(reader, nodes):
+        if page.mediabox is not None:
+            width = round(abs(page.mediabox[2] - page.mediabox[0]), 2)
+            height = round(abs(page.mediabox[3] - page.mediabox[1]), 2)
+            sizes[(width, height, page.rotate % 360)] += 1
+        drawn = _drawn_xobjects(page.xobjects, forms)
+        if text_streams.intersection(page.contents) or text_streams.intersection(drawn):
+            text_pages += 1
+        elif images.intersection(drawn):
+            scanned_pages += 1
+
+    analysis.page_sizes = [
+        PageSizeSummary(width=width, height=height, rotation=rotation, count=count)
+        for (width, height, rotation), count in sizes.most_common()
+    ]
+    analysis.fonts = sorted(fonts)
+    analysis.image_count = len(images)
+    analysis.image_bytes = image_bytes
+    analysis.text_pages = text_pages
+    analysis.scanned_pages = scanned_pages
+    return analysis
+
+
+def _version(reader: PdfReader) -> str:
+    """PDF version from the header, or the catalog's ``/Version`` if later"""
+    version = header_version(reader.pdf_header, minimum="1.0")
+    try:
+        catalog_version = reader.trailer["/Root"].get_object().get("/Version")
+    except Exception:
+        catalog_version = None
+    if catalog_version:
+        version = header_version(f"%PDF-{str(catalog_version).lstrip('/')}", minimum=version)
+    return version
+
+
+def _is_linearized(reader: PdfReader, table: List[Tuple[int, int]]) -> bool:
+    """Whether the first object in the file is a linearization parameter dictionary"""
+    offsets = [
+        reader.xref[generation][idnum]
+        for idnum, generation in table
+        if idnum not in reader.xref_objStm
+    ]
+    if not offsets:
+        return False
+    position = reader.stream.tell()
+    try:
+        reader.stream.seek(min(offsets))
+        head = reader.stream.read(LINEARIZATION_PROBE_SIZE)
+    finally:
+        reader.stream.seek(position)
+    return b"/Linearized" in head.split(b"endobj", 1)[0]
+
+
+def _encryption_description(reader: PdfReader) -> Optional[str]:
+    """Security handler and algorithm of an encrypted document, e.g. ``Standard R6 AES-256``"""
+    if not reader.is_encrypted:
+        return None
+    try:
+        encrypt = reader.trailer["/Encrypt"].get_object()
+        version = int(encrypt.get("/V", 0))
+        revision = int(encrypt.get("/R", 0))
+        if version >= 5:
+            algorithm = "AES-256"
+        elif version == 4:
+            crypt_filter = encrypt.get("/CF", {}).get(encrypt.get("/StmF", "/Identity"), {})
+            algorithm = "AES-128" if crypt_filter.get("/CFM") == "/AESV2" else "RC4 128-bit"
+        elif version in (2, 3):
+            algorithm = f"RC4 {int(encrypt.get('/Length', 40))}-bit"
+        else:
+            algorithm = "RC4 40-bit"
+        return f"{str(encrypt.get('/Filter', '/Standard')).lstrip('/')} R{revision} {algorithm}"
+    except Exception:
+        return "unknown"
+
+
+def _add_font(font: DictionaryObject, fonts: Set[str]) -> None:
+    """Record a font's name, without the subset tag (``ABCDEF+``)"""
+    name = font.get("/BaseFont")
+    if name is None:
+        return
+    name = str(name).lstrip("/")
+    if len(name) > 7 and name[6] == "+" and name[:6].isupper():
+        name = name[7:]
+    fonts.add(name)
+
+
+def _read_objects(
+    reader: PdfReader, table: List[Tuple[int, int]]
+) -> Iterator[Tuple[int, int, PdfObject]]:
+    """The objects of ``table``, skipping those that cannot be read"""
+    for idnum, generation in table:
+        try:
+            obj = reader.get_object(IndirectObject(idnum, generation, reader))
+        except PDFToolError:
+            raise
+        except Exception as e:
+            logger.debug(f"跳过无法读取的对象 {idnum} {generation}: {e}")
+            continue
+        yield idnum, generation, obj
+
+
+def _is_content(stream: StreamObject) -> bool:
+    """Whether a stream may be a content stream or Form XObject"""
+    return stream.get("/Subtype") == "/Form" or not any(key in stream for key in _NON_CONTENT_KEYS)
+
+
+def _content_streams(entry: Tuple[int, int, PdfObject]) -> List[PdfObject]:
+    """The stream ``_has_text`` will decode for an entry of ``_read_objects``"""
+    obj = entry[2]
+    if isinstance(obj, StreamObject) and obj.get("/Subtype") != "/Image" and _is_content(obj):
+        return [obj]
+    return []
+
+
+def _has_text(stream: StreamObject) -> bool:
+    """Whether a content stream shows text"""
+    try:
+        return TEXT_OPERATORS.search(stream.get_data()) is not None
+    except PDFToolError:
+        raise
+    except Exception:
+        return False
+
+
+def _drawn_xobjects(xobjects: Tuple[int, ...], forms: Dict[int, Tuple[int, ...]]) -> Set[int]:
+    """XObjects available to a page, including those nested in its Form XObjects"""
+    drawn: Set[int] = set()
+    pending = list(xobjects)
+    while pending:
+        idnum = pending.pop()
+        if idnum not in drawn:
+            drawn.add(idnum)
+            pending.extend(forms.get(idnum, ()))
+    return drawn
+
+
+def _node(obj: DictionaryObject, fonts: Set[str]) -> _Node:
+    """Attributes of a page tree node; fonts in its resources are recorded"""
+    parent = obj.raw_get("/Parent") if "/Parent" in obj else None
+    rotate = obj.get("/Rotate")
+    resources = obj.get("/Resources")
+    contents = obj.get("/Contents")
+    if isinstance(contents, ArrayObject):
+        content_refs = tuple(ref.idnum for ref in contents if isinstance(ref, IndirectObject))
+    elif "/Contents" in obj and isinstance(obj.raw_get("/Contents"), IndirectObject):
+        content_refs = (obj.raw_get("/Contents").idnum,)
+    else:
+        content_refs = ()
+
+    return _Node(
+        parent=parent.idnum if isinstance(parent, IndirectObject) else None,
+        is_page=obj.get("/Type") == "/Page",
+        mediabox=_box(obj.get("/MediaBox")),
+        rotate=int(rotate) if isinstance(rotate, (int, float)) else None,
+        xobjects=_xobjects(resources, fonts) if resources is not None else None,
+        contents=content_refs,
+    )
+
+
+def _box(value: Optional[PdfObject]) -> Optional[Box]:
+    try:
+        x1, y1, x2, y2 = (float(v.get_object()) for v in value.get_object())  # type: ignore
+        return x1, y1, x2, y2
+    except Exception:
+        return None
+
+
+def _xobjects(value: PdfObject, fonts: Set[str]) -> Tuple[int, ...]:
+    """Object numbers of the XObjects in a resource dictionary; its fonts are recorded"""
+    resources = value.get_object()
+    if not isinstance(resources, DictionaryObject):
+        return ()
+
+    font_dict = resources.get("/Font")
+    font_dict = font_dict.get_object() if font_dict is not None else None
+    if isinstance(font_dict, DictionaryObject):
+        for font in font_dict.values():
+            font = font.get_object()
+            if isinstance(font, DictionaryObject):
+                _add_font(font, fonts)
+
+    xobjects = resources.get("/XObject")
+    xobjects = xobjects.get_object() if xobjects is not None else None
+    if not isinstance(xobjects, DictionaryObject):
+        return ()
+    return tuple(ref.idnum for ref in xobjects.values() if isinstance(ref, IndirectObject))
+
+
+def _effective_pages(reader: PdfReader, nodes: Dict[int, _Node]) -> List[_Page]:
+    """Every page reachable from the page tree root, with inheritance applied"""
+    try:
+        root = reader.trailer["/Root"].get_object().raw_get("/Pages")
+        root_number = root.idnum if isinstance(root, IndirectObject) else None
+    except Exception:
+        root_number = None
+
+    # /Pages 节点对象号 -> 合并继承后的 (MediaBox, Rotate, XObject)，None 表示不在页面树中
+    resolved: Dict[int, Optional[Tuple]] = {}
+
+    # 父节点链超过页面树深度上限（或成环）的节点视为不在页面树中
+    def inherited(idnum: Optional[int], depth: int = 0) -> Optional[Tuple]:
+        if idnum is None or idnum not in nodes or depth > settings.max_nesting_depth:
+            return None
+        if idnum in resolved:
+            return resolved[idnum]
+        node = nodes[idnum]
+        own = (node.mediabox, node.rotate, node.xobjects)
+        if idnum == root_number:
+            attributes: Optional[Tuple] = own
+        else:
+            parent = inherited(node.parent, depth + 1)
+            attributes = None
+            if parent is not None:
+                attributes = tuple(
+                    value if value is not None else base for value, base in zip(own, parent)
+                )
+        resolved[idnum] = attributes
+        return attributes
+
+    pages = []
+    for node in nodes.values():
+        if not node.is_page:
+            continue
+        parent = inherited(node.parent)
+        if parent is None:
+            continue
+        mediabox, rotate, xobjects = (
+            value if value is not None else base
+            for value, base in zip((node.mediabox, node.rotate, node.xobjects), parent)
+        )
+        pages.append(_Page(mediabox, rotate or 0, xobjects or (), node.contents))
+    return pages
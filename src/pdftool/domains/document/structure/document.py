@@ -0,0 +1,94 @@
+"""
+Whole-document serialization for writing many variants
+
+Some operations write many versions of one document that differ in a few
+objects, e.g. a personalized stamp per recipient. ``SerializedDocument``
+serializes every object reachable from the trailer once, keeping the source
+object numbers; each variant replaces or adds a few objects and copies the
+cached bytes of all the others.
+"""
+
+from collections import deque
+from typing import BinaryIO, Deque, Dict, Tuple
+
+from PyPDF2 import PdfReader
+from PyPDF2.generic import IndirectObject
+
+from ....common.exceptions import PDFValidationError
+from .serialization import (
+    header_version,
+    new_file_id,
+    pdf_header,
+    serialize_object,
+    write_indirect_object,
+    write_xref_stream,
+)
+from .writer import next_object_number
+
+
+class SerializedDocument:
+    """Every object of a document, serialized once
+
+    Raises:
+        PDFValidationError: if the document is encrypted or has no catalog
+    """
+
+    def __init__(self, reader: PdfReader):
+        if reader.is_encrypted:
+            raise PDFValidationError("加密文档需要先解密")
+        if "/Root" not in reader.trailer:
+            raise PDFValidationError("文档缺少目录对象 (/Root)")
+
+        self.version = header_version(reader.pdf_header)
+        self.next_object_number = next_object_number(reader)
+        self.trailer: Dict[bytes, bytes] = {}
+        # 对象号 -> (代数, 已序列化的对象内容)
+        self._objects: Dict[int, Tuple[int, bytes]] = {}
+
+        pending: Deque[IndirectObject] = deque()
+        queued = set()
+
+        def on_reference(reference: IndirectObject, stream: BinaryIO) -> None:
+            stream.write(b"%d %d R" % (reference.idnum, reference.generation))
+            if reference.idnum not in queued:
+                queued.add(reference.idnum)
+                pending.append(reference)
+
+        for key in ("/Root", "/Info"):
+            if key in reader.trailer:
+                value = reader.trailer.raw_get(key)
+                self.trailer[key.encode("ascii")] = serialize_object(value, on_reference)
+
+        while pending:
+            reference = pending.popleft()
+            obj = reference.get_object()
+            body = b"null" if obj is None else serialize_object(obj, on_reference)
+            self._objects[reference.idnum] = (reference.generation, body)
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def __contains__(self, idnum: object) -> bool:
+        return idnum in self._objects
+
+    def write(self, output: BinaryIO, overrides: Dict[int, bytes]) -> None:
+        """Write the document with some object bodies replaced or added
+
+        Args:
+            output: Empty binary stream
+            overrides: Object number -> serialized body; numbers from
+                ``next_object_number`` on add new objects
+        """
+        offsets: Dict[int, Tuple[int, int]] = {}
+        output.write(pdf_header(self.version))
+        for idnum in sorted(self._objects.keys() | overrides.keys()):
+            generation, body = self._objects.get(idnum, (0, b""))
+            if idnum in overrides:
+                body = overrides[idnum]
+            offsets[idnum] = (output.tell(), generation)
+            write_indirect_object(output, idnum, generation, [body])
+
+        file_id = b"<" + new_file_id().hex().encode("ascii") + b">"
+        trailer = dict(self.trailer)
+        trailer[b"/ID"] = b"[ %s %s ]" % (file_id, file_id)
+        write_xref_stream(output, offsets, trailer)
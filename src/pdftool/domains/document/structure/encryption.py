@@ -0,0 +1,447 @@
+"""
+Standard security handler encryption
+
+Encrypts a document assembled by ``PdfWriter`` with the standard security
+handler (PDF 32000 §7.6): RC4 128-bit (R3), AES-128 (R4, ``/AESV2``) or
+AES-256 (R6, ``/AESV3``). Strings and streams are encrypted per object, and
+objects do not depend on each other, so ``write_encrypted`` encrypts them in
+a thread pool and writes the results in object order. ``EncryptionTemplate``
+serializes everything but the encrypted values once, so one document can be
+written for many passwords at the cost of the encryption alone.
+The ciphers come from ``cryptography``, which releases the GIL while
+encrypting, so large streams (scanned pages) are encrypted on all cores.
+"""
+
+import codecs
+import hashlib
+import os
+import struct
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+from typing import (
+    BinaryIO,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from PyPDF2 import PdfWriter
+from PyPDF2.generic import (
+    ArrayObject,
+    ByteStringObject,
+    DictionaryObject,
+    PdfObject,
+    StreamObject,
+    TextStringObject,
+    encode_pdfdocencoding,
+)
+
+from ....common.exceptions import PDFValidationError
+from ....common.models import EncryptionAlgorithm
+from .serialization import (
+    ReferenceWriter,
+    header_version,
+    pdf_header,
+    write_indirect_object,
+    write_object,
+    write_reference,
+    write_xref_stream,
+)
+
+try:
+    from cryptography.hazmat.decrepit.ciphers.algorithms import ARC4
+except ImportError:  # cryptography < 43
+    from cryptography.hazmat.primitives.ciphers.algorithms import ARC4  # type: ignore
+
+# 密码填充串（PDF 32000 §7.6.4.3 算法 2）
+_PASSWORD_PADDING = (
+    b"\x28\xbf\x4e\x5e\x4e\x75\x8a\x41\x64\x00\x4e\x56\xff\xfa\x01\x08"
+    b"\x2e\x2e\x00\xb6\xd0\x68\x3e\x80\x2f\x0c\xa9\xfe\x64\x53\x69\x7a"
+)
+
+# 权限标志中必须置 1 的保留位（第 7-8、13-32 位）
+_RESERVED_PERMISSION_BITS = 0xFFFFF0C0
+
+# 每个线程任务处理的对象数
+_BATCH_SIZE = 64
+
+# 每个线程预先加密的批次数（限制已加密、尚未写出的对象数）
+BATCHES_PER_WORKER = 2
+
+
+class _PlainValue(NamedTuple):
+    """A string or stream data to be encrypted with its object's key"""
+
+    data: bytes
+    is_stream: bool
+
+
+_Part = Union[bytes, _PlainValue]
+
+
+class StandardSecurityHandler:
+    """Keys and ``/Encrypt`` dictionary of the standard security handler
+
+    Args:
+        algorithm: Cipher, which determines the handler revision (R3, R4, R6)
+        user_password: Password required to open the document
+        owner_password: Password granting full access
+        permissions: Permission bits (``/P``); reserved bits are set here
+        file_id: First element of the trailer ``/ID``
+    """
+
+    def __init__(
+        self,
+        algorithm: EncryptionAlgorithm,
+        user_password: str,
+        owner_password: str,
+        permissions: int,
+        file_id: bytes,
+    ):
+        self.algorithm = algorithm
+        self.permissions = _signed32(permissions | _RESERVED_PERMISSION_BITS)
+        self.file_id = file_id
+        self._object_keys: Dict[Tuple[int, int], bytes] = {}
+
+        if algorithm == EncryptionAlgorithm.AES_256:
+            self.key = os.urandom(32)
+            self._entries = self._r6_entries(
+                _r6_password(user_password), _r6_password(owner_password)
+            )
+        else:
+            user = _r4_password(user_password)
+            owner_entry = self._r4_owner_entry(_r4_password(owner_password), user)
+            self.key = self._r4_file_key(user, owner_entry)
+            self._entries = {
+                "/O": owner_entry,
+                "/U": self._r4_user_entry(),
+            }
+
+    @property
+    def minimum_version(self) -> str:
+        """Lowest PDF version defining the cipher"""
+        return {
+            EncryptionAlgorithm.RC4_128: "1.5",
+            EncryptionAlgorithm.AES_128: "1.6",
+            EncryptionAlgorithm.AES_256: "1.7",
+        }[self.algorithm]
+
+    def encrypt_dictionary(self) -> bytes:
+        """Serialized ``/Encrypt`` dictionary (written unencrypted)"""
+        entries = [b"/Filter /Standard", b"/P %d" % self.permissions]
+        if self.algorithm == EncryptionAlgorithm.RC4_128:
+            entries += [b"/V 2", b"/R 3", b"/Length 128"]
+        else:
+            aes_256 = self.algorithm == EncryptionAlgorithm.AES_256
+            entries += [
+                b"/V 5 /R 6 /Length 256" if aes_256 else b"/V 4 /R 4 /Length 128",
+                b"/CF << /StdCF << /AuthEvent /DocOpen /CFM /%s /Length %d >> >>"
+                % (b"AESV3" if aes_256 else b"AESV2", 32 if aes_256 else 16),
+                b"/StmF /StdCF",
+                b"/StrF /StdCF",
+            ]
+        for key, value in self._entries.items():
+            entries.append(key.encode("ascii") + b" <" + value.hex().encode("ascii") + b">")
+        return b"<<\n" + b"\n".join(entries) + b"\n>>"
+
+    def object_key(self, idnum: int, generation: int) -> bytes:
+        """Key for the strings and streams of one object (algorithm 1)"""
+        if self.algorithm == EncryptionAlgorithm.AES_256:
+            return self.key
+        key = self._object_keys.get((idnum, generation))
+        if key is None:
+            data = self.key + struct.pack("<i", idnum)[:3] + struct.pack("<i", generation)[:2]
+            if self.algorithm == EncryptionAlgorithm.AES_128:
+                data += b"sAlT"
+            key = hashlib.md5(data).digest()[: min(len(self.key) + 5, 16)]
+            self._object_keys[(idnum, generation)] = key
+        return key
+
+    def encrypt_bytes(self, key: bytes, data: bytes) -> bytes:
+        """Encrypt one string or stream with an object key"""
+        if self.algorithm == EncryptionAlgorithm.RC4_128:
+            return _rc4(key, data)
+        iv = os.urandom(16)
+        padder = padding.PKCS7(128).padder()
+        padded = padder.update(data) + padder.finalize()
+        encryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).encryptor()
+        return iv + encryptor.update(padded) + encryptor.finalize()
+
+    # --- R3/R4: 算法 2、3、5 ---
+
+    def _r4_owner_entry(self, owner: bytes, user: bytes) -> bytes:
+        digest = hashlib.md5(owner).digest()
+        for _ in range(50):
+            digest = hashlib.md5(digest).digest()
+        encrypted = _rc4(digest, user)
+        for i in range(1, 20):
+            encrypted = _rc4(bytes(b ^ i for b in digest), encrypted)
+        return encrypted
+
+    def _r4_file_key(self, user: bytes, owner_entry: bytes) -> bytes:
+        digest = hashlib.md5(
+            user + owner_entry + struct.pack("<i", self.permissions) + self.file_id
+        ).digest()
+        for _ in range(50):
+            digest = hashlib.md5(digest).digest()
+        return digest
+
+    def _r4_user_entry(self) -> bytes:
+        encrypted = _rc4(self.key, hashlib.md5(_PASSWORD_PADDING + self.file_id).digest())
+        for i in range(1, 20):
+            encrypted = _rc4(bytes(b ^ i for b in self.key), encrypted)
+        return encrypted + bytes(16)
+
+    # --- R6: 算法 8、9、10 ---
+
+    def _r6_entries(self, user: bytes, owner: bytes) -> Dict[str, bytes]:
+        user_salts = os.urandom(16)
+        user_entry = _r6_hash(user, user_salts[:8], b"") + user_salts
+        owner_salts = os.urandom(16)
+        owner_entry = _r6_hash(owner, owner_salts[:8], user_entry) + owner_salts
+
+        perms = struct.pack("<i", self.permissions) + b"\xff\xff\xff\xffTadb" + os.urandom(4)
+        return {
+            "/U": user_entry,
+            "/UE": _aes_no_padding(_r6_hash(user, user_salts[8:], b""), self.key),
+            "/O": owner_entry,
+            "/OE": _aes_no_padding(_r6_hash(owner, owner_salts[8:], user_entry), self.key),
+            "/Perms": Cipher(algorithms.AES(self.key), modes.ECB()).encryptor().update(perms),
+        }
+
+
+class EncryptionTemplate:
+    """Objects of a ``PdfWriter`` serialized once around their strings and stream data
+
+    Encryption only changes the bytes of strings and stream data, so each
+    object is kept as literal segments interleaved with those plain values.
+    Writing the document for a handler (or for many handlers with different
+    passwords) encrypts the values and joins them with the cached segments,
+    without walking the PyPDF2 objects again.
+    """
+
+    def __init__(self, writer: PdfWriter, header: str = "%PDF-1.5"):
+        self.header = header
+        self.root_number = writer._root.idnum
+        self.info_number = writer._info.idnum if writer._info is not None else None
+        self.encrypt_number = len(writer._objects) + 1
+        self.objects: List[Tuple[int, List[_Part]]] = []
+        for index, obj in enumerate(writer._objects):
+            if obj is not None:
+                self.objects.append((index + 1, collect_parts(obj)))
+
+    def write(
+        self, output: BinaryIO, handler: StandardSecurityHandler, max_workers: int = 1
+    ) -> None:
+        """Write the document encrypted with ``handler``
+
+        With ``max_workers`` > 1 objects are encrypted in batches on a thread
+        pool and written in object order as the batches complete. The file ends
+        with the ``/Encrypt`` dictionary and a cross-reference stream, neither
+        of which is encrypted.
+        """
+        offsets: Dict[int, Tuple[int, int]] = {}
+        output.write(pdf_header(header_version(self.header, handler.minimum_version)))
+        for idnum, body in encrypt_objects(self.objects, handler, max_workers):
+            offsets[idnum] = (output.tell(), 0)
+            write_indirect_object(output, idnum, 0, [body])
+
+        offsets[self.encrypt_number] = (output.tell(), 0)
+        write_indirect_object(output, self.encrypt_number, 0, [handler.encrypt_dictionary()])
+
+        file_id = b"<" + handler.file_id.hex().encode("ascii") + b">"
+        trailer = {
+            b"/Root": b"%d 0 R" % self.root_number,
+            b"/Encrypt": b"%d 0 R" % self.encrypt_number,
+            b"/ID": b"[ %s %s ]" % (file_id, file_id),
+        }
+        if self.info_number is not None:
+            trailer[b"/Info"] = b"%d 0 R" % self.info_number
+        write_xref_stream(output, offsets, trailer)
+
+
+def write_encrypted(
+    writer: PdfWriter,
+    output: BinaryIO,
+    handler: StandardSecurityHandler,
+    header: str = "%PDF-1.5",
+    max_workers: int = 4,
+) -> None:
+    """Write the objects of ``writer`` encrypted with ``handler``"""
+    EncryptionTemplate(writer, header).write(output, handler, max_workers)
+
+
+def collect_parts(obj: PdfObject, on_reference: ReferenceWriter = write_reference) -> List[_Part]:
+    """Serialize an object body as literal segments around its strings and stream data"""
+    parts: List[_Part] = []
+    buffer = BytesIO()
+    _collect_parts(obj, buffer, parts, on_reference)
+    parts.append(buffer.getvalue())
+    return parts
+
+
+def encrypt_objects(
+    objects: Sequence[Tuple[int, List[_Part]]],
+    handler: StandardSecurityHandler,
+    max_workers: int = 1,
+) -> Iterator[Tuple[int, bytes]]:
+    """Encrypt collected object bodies with their object keys, in object order
+
+    With ``max_workers`` > 1 objects are encrypted in batches on a thread pool,
+    at most ``max_workers`` * BATCHES_PER_WORKER batches ahead of the one being
+    yielded, so only those encrypted bodies are held in memory at a time.
+
+    Args:
+        objects: (object number, parts from ``collect_parts``) pairs
+        handler: Security handler providing the keys
+        max_workers: With more than one, objects are encrypted in batches on
+            a thread pool
+    """
+
+    def encrypt_batch(start: int) -> List[Tuple[int, bytes]]:
+        return [
+            (idnum, _encrypt_parts(parts, handler, idnum))
+            for idnum, parts in objects[start : start + _BATCH_SIZE]
+        ]
+
+    starts = range(0, len(objects), _BATCH_SIZE)
+    if max_workers <= 1:
+        for start in starts:
+            yield from encrypt_batch(start)
+        return
+
+    window = max_workers * BATCHES_PER_WORKER
+    pending: Deque[Future] = deque()
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdftool-encrypt")
+    try:
+        for start in starts:
+            pending.append(executor.submit(encrypt_batch, start))
+            if len(pending) > window:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        # 调用方提前结束迭代（或出错）时，取消尚未开始的加密
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def _collect_parts(
+    obj: PdfObject, buffer: BytesIO, parts: List[_Part], on_reference: ReferenceWriter
+) -> None:
+    """Serialize ``obj`` into ``buffer``, cutting out strings and stream data as values"""
+    if isinstance(obj, (TextStringObject, ByteStringObject)):
+        parts.append(buffer.getvalue())
+        parts.append(_PlainValue(_string_bytes(obj), is_stream=False))
+        buffer.seek(0)
+        buffer.truncate()
+    elif isinstance(obj, StreamObject):
+        buffer.write(b"<<")
+        for key, value in obj.items():
+            if key == "/Length":
+                continue
+            buffer.write(b"\n")
+            key.write_to_stream(buffer, None)
+            buffer.write(b" ")
+            _collect_parts(value, buffer, parts, on_reference)
+        parts.append(buffer.getvalue())
+        parts.append(_PlainValue(obj._data, is_stream=True))
+        buffer.seek(0)
+        buffer.truncate()
+    elif isinstance(obj, DictionaryObject):
+        buffer.write(b"<<")
+        for key, value in obj.items():
+            buffer.write(b"\n")
+            key.write_to_stream(buffer, None)
+            buffer.write(b" ")
+            _collect_parts(value, buffer, parts, on_reference)
+        buffer.write(b"\n>>")
+    elif isinstance(obj, ArrayObject):
+        buffer.write(b"[")
+        for value in obj:
+            buffer.write(b" ")
+            _collect_parts(value, buffer, parts, on_reference)
+        buffer.write(b" ]")
+    else:
+        write_object(obj, buffer, on_reference)
+
+
+def _encrypt_parts(parts: Sequence["_Part"], handler: StandardSecurityHandler, idnum: int) -> bytes:
+    """Object body with its plain values encrypted with the object key"""
+    key = handler.object_key(idnum, 0)
+    chunks: List[bytes] = []
+    for part in parts:
+        if isinstance(part, bytes):
+            chunks.append(part)
+            continue
+        encrypted = handler.encrypt_bytes(key, part.data)
+        if part.is_stream:
+            chunks.append(b"\n/Length %d\n>>\nstream\n" % len(encrypted))
+            chunks.append(encrypted)
+            chunks.append(b"\nendstream")
+        else:
+            chunks.append(b"<" + encrypted.hex().encode("ascii") + b">")
+    return b"".join(chunks)
+
+
+def _signed32(value: int) -> int:
+    """Interpret the low 32 bits of ``value`` as a signed integer"""
+    value &= 0xFFFFFFFF
+    return value - (1 << 32) if value & 0x80000000 else value
+
+
+def _string_bytes(obj: PdfObject) -> bytes:
+    """Bytes of a string object as they would be written to the file"""
+    if isinstance(obj, ByteStringObject):
+        return bytes(obj)
+    try:
+        return encode_pdfdocencoding(obj)
+    except UnicodeEncodeError:
+        return codecs.BOM_UTF16_BE + str(obj).encode("utf-16be")
+
+
+def _rc4(key: bytes, data: bytes) -> bytes:
+    return Cipher(ARC4(key), mode=None).encryptor().update(data)
+
+
+def _aes_no_padding(key: bytes, data: bytes, iv: Optional[bytes] = None) -> bytes:
+    encryptor = Cipher(algorithms.AES(key), modes.CBC(iv or bytes(16))).encryptor()
+    return encryptor.update(data) + encryptor.finalize()
+
+
+def _r4_password(password: str) -> bytes:
+    """Password padded to 32 bytes (R2-R4 use PDFDocEncoding)"""
+    try:
+        encoded = encode_pdfdocencoding(password)
+    except UnicodeEncodeError:
+        raise PDFValidationError("RC4/AES-128 加密的密码只能包含拉丁字符，请改用 AES-256")
+    return (encoded + _PASSWORD_PADDING)[:32]
+
+
+def _r6_password(password: str) -> bytes:
+    """Password as UTF-8, truncated to 127 bytes (R6)"""
+    return password.encode("utf-8")[:127]
+
+
+def _r6_hash(password: bytes, salt: bytes, user_entry: bytes) -> bytes:
+    """Hardened password hash of revision 6 (algorithm 2.B)"""
+    digest = hashlib.sha256(password + salt + user_entry).digest()
+    round_number = 0
+    while True:
+        block = (password + digest + user_entry) * 64
+        encrypted = _aes_no_padding(digest[:16], block, digest[16:32])
+        function = (hashlib.sha256, hashlib.sha384, hashlib.sha512)[sum(encrypted[:16]) % 3]
+        digest = function(encrypted).digest()
+        round_number += 1
+        if round_number >= 64 and encrypted[-1] <= round_number - 32:
+            return digest[:32]
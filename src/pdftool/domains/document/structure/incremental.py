@@ -0,0 +1,242 @@
+"""
+Incremental updates
+
+An incremental update appends the changed and new objects, a cross-reference
+section listing only those objects and a trailer pointing back (``/Prev``) to
+the previous section. The original bytes are copied through unchanged, so the
+cost of an edit depends on the size of the change rather than of the file.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import time
+from collections import deque
+from pathlib import Path
+from typing import BinaryIO, Deque, Dict, List, Sequence, Tuple
+
+from PyPDF2 import PageObject, PdfReader
+from PyPDF2.generic import DictionaryObject, IndirectObject, NameObject, PdfObject
+
+from ....common.exceptions import PDFValidationError
+from .serialization import (
+    serialize_object,
+    write_indirect_object,
+    write_xref_stream,
+    write_xref_table,
+)
+from .writer import EXCLUDED_PAGE_KEYS, STRUCTURAL_TYPES, next_object_number
+
+# 在文件末尾多大范围内查找 startxref
+STARTXREF_SEARCH_SIZE = 2048
+
+_STARTXREF_PATTERN = re.compile(rb"startxref\s+(\d+)")
+_OBJECT_HEADER_PATTERN = re.compile(rb"\s*\d+\s+\d+\s+obj\b")
+
+
+class IncrementalUpdate:
+    """Objects to append to an existing file as one update section
+
+    Raises:
+        PDFValidationError: if the file is encrypted or its last
+            cross-reference section cannot be located exactly
+    """
+
+    def __init__(self, reader: PdfReader, source: Path):
+        if reader.is_encrypted:
+            raise PDFValidationError("加密文档不支持增量更新")
+
+        self.reader = reader
+        self.source = source
+        self.prev_offset, self.xref_stream = find_last_xref(source)
+        self.next_object_number = next_object_number(reader)
+        self.trailer: Dict[str, PdfObject] = {}
+        # 对象号 -> (代数, 已序列化的对象内容)
+        self._objects: Dict[int, Tuple[int, bytes]] = {}
+
+    def reserve(self) -> IndirectObject:
+        """Allocate a new object number, to be filled with ``replace_object``"""
+        number = self.next_object_number
+        self.next_object_number += 1
+        return IndirectObject(number, 0, self.reader)
+
+    def add_object(self, obj: PdfObject) -> IndirectObject:
+        """Add a new object and return its reference"""
+        reference = self.reserve()
+        self.replace_object(reference, obj)
+        return reference
+
+    def replace_object(self, reference: IndirectObject, obj: PdfObject) -> None:
+        """Replace an existing (or reserved) object, keeping its object number"""
+        self._objects[reference.idnum] = (reference.generation, serialize_object(obj))
+
+    def import_pages(
+        self, pages: Sequence[PageObject], parent: IndirectObject
+    ) -> List[IndirectObject]:
+        """Copy pages of another document, and every object they reach, as new objects
+
+        The pages are re-parented to ``parent``. References to page tree
+        objects of the source document other than the imported pages (its
+        ``/Pages`` nodes, catalog, pages not imported) are written as ``null``.
+        Returns the references of the imported pages, in order.
+        """
+        numbers: Dict[int, int] = {}
+        roots: List[Tuple[IndirectObject, PdfObject]] = []
+        for page in pages:
+            if page.indirect_reference is None:
+                raise PDFValidationError("页面缺少间接引用，无法追加")
+            reference = self.reserve()
+            numbers[page.indirect_reference.idnum] = reference.idnum
+            page_dict = DictionaryObject(
+                {key: value for key, value in page.items() if key not in EXCLUDED_PAGE_KEYS}
+            )
+            page_dict[NameObject("/Parent")] = parent
+            roots.append((reference, page_dict))
+
+        self._import(roots, numbers)
+        return [reference for reference, _ in roots]
+
+    def import_object(self, obj: PdfObject) -> IndirectObject:
+        """Add an object built from another document as a new object
+
+        Every object it references in the other document is copied as well,
+        with the same page tree rules as ``import_pages``.
+        """
+        reference = self.reserve()
+        self._import([(reference, obj)], {})
+        return reference
+
+    def _import(
+        self, roots: List[Tuple[IndirectObject, PdfObject]], numbers: Dict[int, int]
+    ) -> None:
+        """Write ``roots`` and the objects they reach, renumbered after this document's"""
+        pending: Deque[IndirectObject] = deque()
+
+        def on_reference(reference: IndirectObject, stream: BinaryIO) -> None:
+            if reference.pdf is self.reader:
+                # 本次更新中的对象（如 parent），原样写出
+                stream.write(b"%d %d R" % (reference.idnum, reference.generation))
+                return
+            number = numbers.get(reference.idnum)
+            if number is None:
+                target = reference.get_object()
+                if isinstance(target, DictionaryObject) and target.get("/Type") in STRUCTURAL_TYPES:
+                    stream.write(b"null")
+                    return
+                number = self.reserve().idnum
+                numbers[reference.idnum] = number
+                pending.append(reference)
+            stream.write(b"%d 0 R" % number)
+
+        for reference, obj in roots:
+            self._objects[reference.idnum] = (0, serialize_object(obj, on_reference))
+
+        while pending:
+            source = pending.popleft()
+            body = serialize_object(source.get_object(), on_reference)
+            self._objects[numbers[source.idnum]] = (0, body)
+
+    def write(self, output_file: Path) -> Path:
+        """Copy the original file to ``output_file`` and append the update"""
+        shutil.copyfile(self.source, output_file)
+        with open(output_file, "r+b") as output:
+            output.seek(0, os.SEEK_END)
+            self.append_to(output)
+        return output_file
+
+    def write_in_place(self) -> Path:
+        """Append the update to the original file itself
+
+        The file is truncated back to its original size if writing fails.
+        """
+        with open(self.source, "r+b") as output:
+            size = output.seek(0, os.SEEK_END)
+            try:
+                self.append_to(output)
+            except BaseException:
+                output.truncate(size)
+                raise
+        return self.source
+
+    def append_to(self, output: BinaryIO) -> None:
+        """Append the update to a readable stream positioned after the original bytes"""
+        end = output.tell()
+        if end > 0:
+            output.seek(end - 1)
+            if output.read(1) not in (b"\n", b"\r"):
+                output.write(b"\n")
+
+        offsets: Dict[int, Tuple[int, int]] = {}
+        for idnum in sorted(self._objects):
+            generation, body = self._objects[idnum]
+            offsets[idnum] = (output.tell(), generation)
+            write_indirect_object(output, idnum, generation, [body])
+
+        trailer = self._trailer()
+        if self.xref_stream:
+            write_xref_stream(
+                output,
+                offsets,
+                trailer,
+                prev=self.prev_offset,
+                xref_idnum=self.next_object_number,
+            )
+        else:
+            write_xref_table(
+                output, offsets, trailer, size=self.next_object_number, prev=self.prev_offset
+            )
+
+    def _trailer(self) -> Dict[bytes, bytes]:
+        """Trailer entries: the original /Root, /Info and /ID, then the overrides"""
+        entries: Dict[bytes, bytes] = {}
+        for key in ("/Root", "/Info"):
+            value = self.trailer.get(key)
+            if value is None and key in self.reader.trailer:
+                value = self.reader.trailer.raw_get(key)
+            if value is not None:
+                entries[key.encode("ascii")] = serialize_object(value)
+
+        original_id = self.reader.trailer.get("/ID")
+        if original_id is not None:
+            # 第一个标识保持不变，第二个标识随每次修改更新
+            first = original_id.get_object()[0]
+            digest = hashlib.md5(
+                b"%s%d%f" % (serialize_object(first), self.prev_offset, time.time())
+            ).hexdigest()
+            entries[b"/ID"] = b"[ %s <%s> ]" % (serialize_object(first), digest.encode("ascii"))
+
+        for key, value in self.trailer.items():
+            if key not in ("/Root", "/Info"):
+                entries[key.encode("ascii")] = serialize_object(value)
+        return entries
+
+
+def find_last_xref(source: Path) -> Tuple[int, bool]:
+    """Offset of the last cross-reference section and whether it is a stream
+
+    Raises:
+        PDFValidationError: if ``startxref`` is missing or does not point to an
+            ``xref`` table or cross-reference stream object
+    """
+    with open(source, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(size - STARTXREF_SEARCH_SIZE, 0))
+        tail = f.read()
+
+        matches = list(_STARTXREF_PATTERN.finditer(tail))
+        if not matches:
+            raise PDFValidationError("文件末尾缺少 startxref，无法增量更新")
+        offset = int(matches[-1].group(1))
+        if offset >= size:
+            raise PDFValidationError("startxref 指向文件范围之外，无法增量更新")
+
+        f.seek(offset)
+        head = f.read(32)
+
+    if head.lstrip().startswith(b"xref"):
+        return offset, False
+    if _OBJECT_HEADER_PATTERN.match(head):
+        return offset, True
+    raise PDFValidationError("startxref 未指向交叉引用表，无法增量更新")
@@ -0,0 +1,327 @@
+"""
+Sidecar document index
+
+Opening a document with ``PdfReader`` parses every cross-reference section,
+and ``PdfReader.pages`` walks the whole page tree, before the first page can
+be read. For documents that are opened again and again (stored documents),
+``DocumentIndex`` keeps the result: the cross-reference tables, the trailer,
+the page -> object number map and the page boxes, in flat ``array`` columns
+written to a small binary file next to the document.
+
+``IndexedPdfReader`` installs a loaded index instead of parsing: object
+lookups bisect the sorted columns and ``pages[n]`` resolves the page object
+directly (plus its ``/Parent`` chain for inherited attributes), so opening a
+document and reading a few pages costs the same for any document size.
+"""
+
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from io import BytesIO
+from itertools import islice
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, MutableMapping, Optional, Tuple
+
+from PyPDF2 import PageObject, PdfReader
+from PyPDF2.generic import DictionaryObject, IndirectObject, NameObject
+
+from ....common.exceptions import PDFValidationError
+
+# 文件头：标识与格式版本、字节序、源文件大小、页面数（-1 表示页面树未编入索引）
+INDEX_MAGIC = b"PDFTIDX1"
+_HEADER = struct.Struct("<8sBqq")
+_SECTION = struct.Struct("<cBq")  # 类型码、元素字节数、数据字节数
+
+# 可从父节点继承的页面属性（与 page_tree.INHERITABLE_ATTRIBUTES 相同）
+_INHERITABLE_ATTRIBUTES = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+
+# 沿 /Parent 链查找继承属性的最大层数
+_MAX_PARENT_DEPTH = 256
+
+# 列名及其 array 类型码，按写入顺序
+_COLUMNS = (
+    ("xref_generations", "H"),
+    ("xref_numbers", "I"),
+    ("xref_offsets", "Q"),
+    ("free_generations", "H"),
+    ("free_numbers", "I"),
+    ("compressed_numbers", "I"),
+    ("compressed_streams", "I"),
+    ("compressed_positions", "I"),
+    ("page_numbers", "I"),
+    ("page_generations", "H"),
+    ("media_boxes", "d"),  # 每页 4 个数
+    ("crop_boxes", "d"),
+    ("trailer", "B"),  # 序列化的 trailer 字典
+)
+
+Box = Tuple[float, float, float, float]
+
+
+class DocumentIndex:
+    """Cross-reference tables, trailer and page map of one document file"""
+
+    def __init__(self, file_size: int, page_count: int = -1, **columns: array):
+        self.file_size = file_size
+        # 加密文档在解密前无法读取页面树，页面数为 -1
+        self.page_count = page_count
+        for name, typecode in _COLUMNS:
+            setattr(self, name, columns.get(name, array(typecode)))
+
+    @property
+    def has_pages(self) -> bool:
+        """Whether the page map and boxes are in the index"""
+        return self.page_count >= 0
+
+    def media_box(self, page_index: int) -> Box:
+        """Effective ``/MediaBox`` of a page"""
+        start = page_index * 4
+        return tuple(self.media_boxes[start : start + 4])  # type: ignore[return-value]
+
+    def crop_box(self, page_index: int) -> Box:
+        """Effective ``/CropBox`` of a page (the media box when not set)"""
+        start = page_index * 4
+        return tuple(self.crop_boxes[start : start + 4])  # type: ignore[return-value]
+
+    @classmethod
+    def build(cls, reader: PdfReader, file_size: int) -> "DocumentIndex":
+        """Index a parsed document; the pages are included unless it is encrypted"""
+        columns: Dict[str, array] = {name: array(typecode) for name, typecode in _COLUMNS}
+
+        for generation in sorted(reader.xref):
+            entries = reader.xref[generation]
+            for number in sorted(entries):
+                columns["xref_generations"].append(generation)
+                columns["xref_numbers"].append(number)
+                columns["xref_offsets"].append(entries[number])
+        for generation in sorted(reader.xref_free_entry):
+            for number, free in sorted(reader.xref_free_entry[generation].items()):
+                if free:
+                    columns["free_generations"].append(generation)
+                    columns["free_numbers"].append(number)
+        for number, (stream, position) in sorted(reader.xref_objStm.items()):
+            columns["compressed_numbers"].append(number)
+            columns["compressed_streams"].append(stream)
+            columns["compressed_positions"].append(position)
+
+        trailer = BytesIO()
+        reader.trailer.write_to_stream(trailer, None)
+        columns["trailer"].frombytes(trailer.getvalue())
+
+        page_count = -1
+        if not reader.is_encrypted:
+            pages = reader.pages
+            page_count = len(pages)
+            for page in pages:
+                reference = page.indirect_reference
+                if reference is None:
+                    raise PDFValidationError("页面对象不是间接对象，无法建立索引")
+                columns["page_numbers"].append(reference.idnum)
+                columns["page_generations"].append(reference.generation)
+                columns["media_boxes"].extend(_box(page, "/MediaBox"))
+                columns["crop_boxes"].extend(_box(page, "/CropBox"))
+
+        return cls(file_size, page_count, **columns)
+
+    def save(self, path: Path) -> None:
+        """Write the index to ``path`` (atomically, through a temporary file)"""
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(temp_path, "wb") as f:
+            f.write(
+                _HEADER.pack(
+                    INDEX_MAGIC, sys.byteorder == "little", self.file_size, self.page_count
+                )
+            )
+            for name, typecode in _COLUMNS:
+                column: array = getattr(self, name)
+                data = column.tobytes()
+                f.write(_SECTION.pack(typecode.encode(), column.itemsize, len(data)))
+                f.write(data)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: Path, file_size: int) -> Optional["DocumentIndex"]:
+        """Read an index written by ``save``
+
+        Returns None if the file is missing, from another format version or
+        platform, or does not describe a file of ``file_size`` bytes; the
+        caller then builds a new one.
+        """
+        try:
+            with open(path, "rb") as f:
+                magic, little_endian, indexed_size, page_count = _HEADER.unpack(
+                    f.read(_HEADER.size)
+                )
+                if (
+                    magic != INDEX_MAGIC
+                    or bool(little_endian) != (sys.byteorder == "little")
+                    or indexed_size != file_size
+                ):
+                    return None
+                columns = {}
+                for name, typecode in _COLUMNS:
+                    stored_typecode, itemsize, length = _SECTION.unpack(f.read(_SECTION.size))
+                    column = array(typecode)
+                    if stored_typecode != typecode.encode() or itemsize != column.itemsize:
+                        return None
+                    data = f.read(length)
+                    if len(data) != length:
+                        return None
+                    column.frombytes(data)
+                    columns[name] = column
+        except (OSError, struct.error):
+            return None
+        return cls(indexed_size, page_count, **columns)
+
+
+class IndexedPdfReader(PdfReader):
+    """PdfReader that takes its cross-reference data and page map from an index
+
+    Behaves like a ``PdfReader`` of the same file. ``stream`` must be the
+    indexed file, opened in binary mode.
+    """
+
+    def __init__(self, stream: BinaryIO, index: DocumentIndex, strict: bool = False):
+        self.index = index
+        self._indexed_pages: Dict[int, PageObject] = {}
+        super().__init__(stream, strict=strict)
+
+    def read(self, stream: Any) -> None:
+        index = self.index
+        self.xref_index = 0
+        self.xref = _generation_tables(
+            index.xref_generations, index.xref_numbers, index.xref_offsets
+        )
+        self.xref_free_entry = {}
+        for generation, number in zip(index.free_generations, index.free_numbers):
+            self.xref_free_entry.setdefault(generation, {})[number] = True
+        self.xref_objStm = _SortedTable(
+            index.compressed_numbers, index.compressed_streams, index.compressed_positions
+        )
+        self.trailer = DictionaryObject.read_from_stream(BytesIO(index.trailer.tobytes()), self)
+
+    def indexed_page(self, page_index: int) -> PageObject:
+        """The page at ``page_index``, with inherited attributes applied"""
+        page = self._indexed_pages.get(page_index)
+        if page is not None:
+            return page
+        if not 0 <= page_index < self.index.page_count:
+            raise PDFValidationError(f"页面索引超出范围 (0-{self.index.page_count - 1})")
+
+        reference = IndirectObject(
+            self.index.page_numbers[page_index], self.index.page_generations[page_index], self
+        )
+        page_dict = reference.get_object()
+        if not isinstance(page_dict, DictionaryObject):
+            raise PDFValidationError(f"索引中的页面对象无效: {reference.idnum}")
+        page = PageObject(self, reference)
+        page.update(page_dict)
+
+        missing = [key for key in _INHERITABLE_ATTRIBUTES if key not in page]
+        parent = _resolve(page_dict.get("/Parent"))
+        depth = 0
+        while missing and isinstance(parent, DictionaryObject) and depth < _MAX_PARENT_DEPTH:
+            for key in list(missing):
+                if key in parent:
+                    page[NameObject(key)] = parent.raw_get(key)
+                    missing.remove(key)
+            parent = _resolve(parent.get("/Parent"))
+            depth += 1
+
+        self._indexed_pages[page_index] = page
+        return page
+
+    def _get_num_pages(self) -> int:
+        if self.index.has_pages:
+            return self.index.page_count
+        return super()._get_num_pages()
+
+    def _get_page(self, page_number: int) -> PageObject:
+        if self.index.has_pages:
+            return self.indexed_page(page_number)
+        return super()._get_page(page_number)
+
+    def _get_page_number_by_indirect(self, indirect_reference: Any) -> int:
+        if self._page_id2num is None and self.index.has_pages:
+            self._page_id2num = dict(zip(self.index.page_numbers, range(self.index.page_count)))
+        return super()._get_page_number_by_indirect(indirect_reference)
+
+
+class _SortedTable(MutableMapping[int, Any]):
+    """Mapping over a sorted key column and value columns, looked up by bisection
+
+    Only rows ``start`` to ``stop`` of the columns belong to the table. Values
+    are single values for one value column, tuples for several. Entries
+    added later (PyPDF2 records objects it recovers) go to a plain dict.
+    """
+
+    def __init__(self, keys: array, *values: array, start: int = 0, stop: Optional[int] = None):
+        self._keys = keys
+        self._values = values
+        self._start = start
+        self._stop = len(keys) if stop is None else stop
+        self._added: Dict[int, Any] = {}
+
+    def _position(self, key: int) -> int:
+        position = bisect_left(self._keys, key, self._start, self._stop)
+        if position < self._stop and self._keys[position] == key:
+            return position
+        return -1
+
+    def __getitem__(self, key: int) -> Any:
+        if key in self._added:
+            return self._added[key]
+        position = self._position(key) if isinstance(key, int) else -1
+        if position < 0:
+            raise KeyError(key)
+        if len(self._values) == 1:
+            return self._values[0][position]
+        return tuple(column[position] for column in self._values)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._added or (isinstance(key, int) and self._position(key) >= 0)
+
+    def __setitem__(self, key: int, value: Any) -> None:
+        self._added[key] = value
+
+    def __delitem__(self, key: int) -> None:
+        if key not in self._added:
+            raise TypeError("索引中的条目不能删除")
+        del self._added[key]
+
+    def __iter__(self) -> Iterator[int]:
+        yield from islice(self._keys, self._start, self._stop)
+        yield from (key for key in self._added if self._position(key) < 0)
+
+    def __len__(self) -> int:
+        added = sum(1 for key in self._added if self._position(key) < 0)
+        return self._stop - self._start + added
+
+
+def _generation_tables(
+    generations: array, numbers: array, offsets: array
+) -> Dict[int, MutableMapping[int, Any]]:
+    """``PdfReader.xref``: generation -> table over that generation's rows"""
+    tables: Dict[int, MutableMapping[int, Any]] = {}
+    start = 0
+    while start < len(generations):
+        generation = generations[start]
+        stop = bisect_right(generations, generation, start)
+        tables[generation] = _SortedTable(numbers, offsets, start=start, stop=stop)
+        start = stop
+    return tables
+
+
+def _resolve(obj: Any) -> Any:
+    return obj.get_object() if isinstance(obj, IndirectObject) else obj
+
+
+def _box(page: PageObject, key: str) -> List[float]:
+    """A page box as four numbers, zeros when missing or invalid"""
+    try:
+        box = page.cropbox if key == "/CropBox" else page.mediabox
+        return [float(value) for value in box]
+    except Exception:
+        return [0.0, 0.0, 0.0, 0.0]
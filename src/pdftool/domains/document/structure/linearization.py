@@ -0,0 +1,684 @@
+"""
+Linearized ("fast web view") output
+
+Writes a document in the layout of PDF 32000 Annex F, so that a viewer
+reading the file front to back can display the first page after a small
+prefix:
+
+1. header, linearization parameter dictionary, first-page cross-reference
+   table and trailer
+2. catalog and the objects needed to open the document, primary hint stream
+3. first page: the page object and every object it uses
+4. remaining pages, each followed by the objects only it uses
+5. objects shared by several pages, then everything else (page tree,
+   outlines, document information...)
+6. main cross-reference table for sections 4-5
+
+Objects are assigned to sections by their users (pages, catalog entries,
+trailer entries) with the same rules as qpdf, so ``qpdf --check-linearization``
+accepts the output. Hint table offsets are given as if the hint stream were
+absent (F.4), which lets the stream be built once the rest of the layout is
+known.
+"""
+
+import zlib
+from collections import deque
+from typing import BinaryIO, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from PyPDF2.generic import DictionaryObject, IndirectObject, NameObject, PdfObject
+
+from ....common.exceptions import PDFValidationError
+from ....common.utils.limits import PageTreeLimits
+from .encryption import StandardSecurityHandler, collect_parts, encrypt_objects
+from .page_tree import INHERITABLE_ATTRIBUTES
+from .serialization import (
+    ARRAY,
+    DICTIONARY,
+    REFERENCE,
+    STREAM,
+    header_version,
+    new_file_id,
+    object_kind,
+    pdf_header,
+    serialize_object,
+)
+
+# 打开文档所需的目录项，其引用的对象放在第一页之前
+OPEN_DOCUMENT_KEYS = ("/ViewerPreferences", "/PageMode", "/Threads", "/OpenAction", "/AcroForm")
+
+# 写出时才知道的偏移量按固定宽度输出（空格补齐），各部分的大小因此可以预先确定
+_NUMBER_WIDTH = 10
+
+# 对象的使用者: ("page", 页面序号)、("thumb", 页面序号)、("root_key", 目录键)、
+# ("trailer_key", trailer 键) 或 ("root", "")
+_User = Tuple[str, object]
+
+# 对象分类（与 qpdf 相同）
+(
+    _ROOT,
+    _OPEN_DOCUMENT,
+    _OUTLINES,
+    _FIRST_PAGE_PRIVATE,
+    _FIRST_PAGE_SHARED,
+    _OTHER_PAGE_PRIVATE,
+    _OTHER_PAGE_SHARED,
+    _THUMBNAIL_PRIVATE,
+    _THUMBNAIL_SHARED,
+    _OTHER,
+) = range(10)
+
+
+def write_linearized(
+    output: BinaryIO,
+    root: IndirectObject,
+    info: Optional[IndirectObject] = None,
+    version: str = "1.4",
+    handler: Optional[StandardSecurityHandler] = None,
+    max_workers: int = 1,
+) -> None:
+    """Write the document reachable from ``root`` and ``info`` linearized
+
+    Works for documents of a ``PdfReader`` (``trailer.raw_get("/Root")``) as
+    well as a ``PdfWriter`` (``_root``). Objects are renumbered and unreachable
+    ones dropped; inheritable page attributes are copied onto the pages.
+
+    Args:
+        output: Empty binary stream
+        root: Reference to the catalog
+        info: Reference to the document information dictionary
+        version: PDF version of the source document
+        handler: Encrypt the output with this security handler
+        max_workers: Threads used for encryption
+
+    Raises:
+        PDFValidationError: if the document has no catalog or no pages, or
+            its page tree is malformed
+    """
+    catalog = root.get_object() if isinstance(root, IndirectObject) else None
+    if not isinstance(catalog, DictionaryObject):
+        raise PDFValidationError("文档缺少目录对象 (/Root)")
+
+    graph = _ObjectGraph()
+    graph.add_reference(root)
+    pages = _read_page_tree(catalog, graph)
+    if not pages:
+        raise PDFValidationError("文档没有页面，无法线性化")
+    page_set = set(pages)
+
+    # 记录每个对象的使用者
+    users: Dict[int, List[_User]] = {}
+    page_objects: List[List[int]] = []
+    thumb_objects: List[List[int]] = []
+
+    def use(user: _User, idnums: Iterable[int]) -> List[int]:
+        used = list(idnums)
+        for idnum in used:
+            users.setdefault(idnum, []).append(user)
+        return used
+
+    for index, page in enumerate(pages):
+        page_objects.append(use(("page", index), graph.reachable([page], page_set)))
+        page_dict = graph.get(page)
+        thumb = page_dict.raw_get("/Thumb") if "/Thumb" in page_dict else None
+        thumb_objects.append(
+            use(("thumb", index), graph.reachable(graph.references(thumb), page_set))
+        )
+    for key, value in catalog.items():
+        use(("root_key", key), graph.reachable(graph.references(value), page_set))
+    if info is not None:
+        use(("trailer_key", "/Info"), graph.reachable(graph.references(info), page_set))
+    users.setdefault(root.idnum, []).append(("root", ""))
+
+    sections = {idnum: _classify(object_users) for idnum, object_users in users.items()}
+    if any(sections.get(page) not in (_FIRST_PAGE_PRIVATE, _OTHER_PAGE_PRIVATE) for page in pages):
+        raise PDFValidationError("页面对象被其他对象共用，无法线性化")
+
+    # 第一页之前：目录和打开文档所需对象
+    part4 = [root.idnum] + _in_section(sections, _OPEN_DOCUMENT, users)
+    outlines_first = catalog.get("/PageMode") == "/UseOutlines"
+    outline_group = _outline_group(catalog, sections)
+
+    # 第一页：页面对象在前，其后依次为只被第一页使用的对象和共用对象
+    part6 = [pages[0]]
+    part6 += [i for i in page_objects[0] if sections[i] == _FIRST_PAGE_PRIVATE and i != pages[0]]
+    part6 += _in_section(sections, _FIRST_PAGE_SHARED, users)
+    if outlines_first:
+        part6 += outline_group
+    first_page_count = len(part6)
+
+    # 其余页面：每页的页面对象在前，紧跟只被该页使用的对象
+    part7: List[List[int]] = []
+    for index in range(1, len(pages)):
+        page = pages[index]
+        private = [
+            i for i in page_objects[index] if sections[i] == _OTHER_PAGE_PRIVATE and i != page
+        ]
+        part7.append([page] + private)
+
+    part8 = _in_section(sections, _OTHER_PAGE_SHARED, users)
+
+    # 其他对象：页面树、缩略图、书签，然后是其余对象
+    part9 = [i for i in graph.page_tree_nodes if sections.get(i) == _OTHER]
+    for objects in thumb_objects:
+        part9 += [i for i in objects if sections[i] == _THUMBNAIL_PRIVATE]
+    part9 += _in_section(sections, _THUMBNAIL_SHARED, users)
+    if not outlines_first:
+        part9 += outline_group
+    placed = set(part9)
+    part9 += [i for i in _in_section(sections, _OTHER, users) if i not in placed]
+
+    # 编号：第二部分（其余页面、共用对象、其他对象）从 1 开始，
+    # 第一部分（参数字典、目录、加密字典、提示流、第一页）紧随其后
+    second_half = [i for group in part7 for i in group] + part8 + part9
+    numbers: Dict[int, int] = {idnum: n for n, idnum in enumerate(second_half, 1)}
+    linearization_number = len(second_half) + 1
+    next_number = linearization_number + 1
+    for idnum in part4:
+        numbers[idnum] = next_number
+        next_number += 1
+    encrypt_number = 0
+    if handler is not None:
+        encrypt_number = next_number
+        next_number += 1
+    hint_number = next_number
+    next_number += 1
+    for idnum in part6:
+        numbers[idnum] = next_number
+        next_number += 1
+    size = next_number
+
+    chunks = _serialize(graph, numbers, handler, max_workers)
+    if handler is not None:
+        chunks[encrypt_number] = _chunk(encrypt_number, handler.encrypt_dictionary())
+
+    # 不含提示流的布局；提示表中的偏移量均按此计算
+    file_id = handler.file_id if handler is not None else new_file_id()
+    trailer = _trailer_entries(numbers[root.idnum], info, numbers, encrypt_number, file_id)
+    header = pdf_header(
+        header_version(version, handler.minimum_version if handler is not None else "1.4")
+    )
+    first_numbers = list(range(linearization_number, size))
+    first_xref_size = len(b"xref\n%d %d\n" % (linearization_number, len(first_numbers)))
+    first_xref_size += 20 * len(first_numbers) + len(_first_trailer(trailer, size, 0))
+
+    offsets: Dict[int, int] = {}
+    position = len(header)
+    linearization_offset = position
+    placeholder = _parameters(0, (0, 0), numbers[pages[0]], 0, len(pages), 0)
+    position += len(_chunk(linearization_number, placeholder))
+    first_xref_offset = position
+    position += first_xref_size
+    for number in [numbers[i] for i in part4] + ([encrypt_number] if encrypt_number else []):
+        offsets[number] = position
+        position += len(chunks[number])
+    hint_offset = position
+    for number in [numbers[i] for i in part6] + [numbers[i] for i in second_half]:
+        offsets[number] = position
+        position += len(chunks[number])
+    main_xref_offset = position
+
+    # 提示流
+    page_numbers = [[numbers[i] for i in part6]] + [[numbers[i] for i in g] for g in part7]
+    shared_numbers = [numbers[i] for i in part6] + [numbers[i] for i in part8]
+    shared_index = {number: index for index, number in enumerate(shared_numbers)}
+    page_shared = [[]] + [
+        sorted(
+            {
+                shared_index[numbers[i]]
+                for i in page_objects[index]
+                if len(users[i]) > 1 and numbers[i] in shared_index
+            }
+        )
+        for index in range(1, len(pages))
+    ]
+    lengths = {number: len(chunk) for number, chunk in chunks.items()}
+    page_table = _page_offset_table(
+        page_numbers, page_shared, len(shared_numbers), offsets, lengths
+    )
+    shared_table = _shared_object_table(
+        shared_numbers, first_page_count, numbers[part8[0]] if part8 else 0, offsets, lengths
+    )
+    hint_entries = b"/S %d" % len(page_table)
+    hint_data = page_table + shared_table
+    if outline_group:
+        outline_numbers = [numbers[i] for i in outline_group]
+        hint_entries += b" /O %d" % len(hint_data)
+        hint_data += _outline_table(outline_numbers, offsets, lengths)
+    hint_data = zlib.compress(hint_data)
+    if handler is not None:
+        hint_data = handler.encrypt_bytes(handler.object_key(hint_number, 0), hint_data)
+    hint_chunk = _chunk(
+        hint_number,
+        b"<< /Filter /FlateDecode %s /Length %d >>\nstream\n%s\nendstream"
+        % (hint_entries, len(hint_data), hint_data),
+    )
+
+    # 插入提示流后的实际偏移量
+    hint_length = len(hint_chunk)
+    final_offsets = {
+        number: offset + hint_length if offset >= hint_offset else offset
+        for number, offset in offsets.items()
+    }
+    final_offsets[linearization_number] = linearization_offset
+    final_offsets[hint_number] = hint_offset
+    main_xref_offset += hint_length
+    end_of_first_page = final_offsets[numbers[part6[-1]]] + lengths[numbers[part6[-1]]]
+
+    main_xref = bytearray(b"xref\n0 %d\n" % linearization_number)
+    main_xref_first_entry = main_xref_offset + len(main_xref) - 1
+    main_xref += b"0000000000 65535 f\r\n"
+    for number in range(1, linearization_number):
+        main_xref += b"%010d 00000 n\r\n" % final_offsets[number]
+    main_xref += b"trailer\n<<\n/Size %d\n/ID %s\n>>\nstartxref\n%d\n%%%%EOF\n" % (
+        linearization_number,
+        trailer[b"/ID"],
+        first_xref_offset,
+    )
+    file_length = main_xref_offset + len(main_xref)
+
+    output.write(header)
+    output.write(
+        _chunk(
+            linearization_number,
+            _parameters(
+                file_length,
+                (hint_offset, hint_length),
+                numbers[pages[0]],
+                end_of_first_page,
+                len(pages),
+                main_xref_first_entry,
+            ),
+        )
+    )
+    output.write(b"xref\n%d %d\n" % (linearization_number, len(first_numbers)))
+    for number in first_numbers:
+        output.write(b"%010d 00000 n\r\n" % final_offsets[number])
+    output.write(_first_trailer(trailer, size, main_xref_offset))
+    for idnum in part4:
+        output.write(chunks[numbers[idnum]])
+    if encrypt_number:
+        output.write(chunks[encrypt_number])
+    output.write(hint_chunk)
+    for idnum in part6 + second_half:
+        output.write(chunks[numbers[idnum]])
+    output.write(main_xref)
+
+
+class _ObjectGraph:
+    """Objects of the document resolved on demand, with their direct references
+
+    Page tree nodes and pages can be given replacement dictionaries (with
+    inheritable attributes moved down to the pages); references from a page
+    to its ``/Parent`` and ``/Thumb`` are not followed.
+    """
+
+    def __init__(self) -> None:
+        self.replacements: Dict[int, DictionaryObject] = {}
+        self.page_tree_nodes: List[int] = []
+        self._references: Dict[int, IndirectObject] = {}
+        self._objects: Dict[int, Optional[PdfObject]] = {}
+        self._children: Dict[int, List[int]] = {}
+        self._pages: Set[int] = set()
+
+    def add_reference(self, reference: IndirectObject) -> int:
+        self._references.setdefault(reference.idnum, reference)
+        return reference.idnum
+
+    def add_page(self, idnum: int) -> None:
+        self._pages.add(idnum)
+
+    def get(self, idnum: int) -> Optional[PdfObject]:
+        """The object, or its replacement; None for dangling references"""
+        if idnum in self.replacements:
+            return self.replacements[idnum]
+        if idnum not in self._objects:
+            self._objects[idnum] = self._references[idnum].get_object()
+        return self._objects[idnum]
+
+    def references(self, value: Optional[PdfObject]) -> List[int]:
+        """Numbers of the objects referenced by a value, without resolving them"""
+        found: List[int] = []
+        stack = [value]
+        while stack:
+            value = stack.pop()
+            kind = object_kind(value)
+            if kind == REFERENCE:
+                found.append(self.add_reference(value))
+            elif kind == DICTIONARY or kind == STREAM:
+                stack.extend(reversed(list(value.values())))
+            elif kind == ARRAY:
+                stack.extend(reversed(value))
+        return found
+
+    def children(self, idnum: int) -> List[int]:
+        """Objects directly referenced by an object"""
+        children = self._children.get(idnum)
+        if children is None:
+            obj = self.get(idnum)
+            if idnum in self._pages and obj is not None:
+                children = []
+                for key, value in obj.items():
+                    if key not in ("/Parent", "/Thumb"):
+                        children += self.references(value)
+            else:
+                children = self.references(obj)
+            self._children[idnum] = children
+        return children
+
+    def reachable(self, start: List[int], stop: Set[int]) -> List[int]:
+        """Objects reachable from ``start`` in breadth-first order
+
+        Traversal does not enter objects in ``stop`` (other pages), except
+        those in ``start`` itself.
+        """
+        seen = set(start)
+        order = list(start)
+        pending: Deque[int] = deque(start)
+        while pending:
+            for child in self.children(pending.popleft()):
+                if child not in seen and child not in stop:
+                    seen.add(child)
+                    order.append(child)
+                    pending.append(child)
+        return order
+
+
+def _read_page_tree(catalog: DictionaryObject, graph: _ObjectGraph) -> List[int]:
+    """Page object numbers in order; inheritable attributes are pushed onto the pages
+
+    The nodes are checked for cycles and depth as they are reached; the
+    number of pages is not limited, the document may be pdftool's own output.
+    """
+    pages_ref = catalog.raw_get("/Pages") if "/Pages" in catalog else None
+    if not isinstance(pages_ref, IndirectObject):
+        raise PDFValidationError("页面树根节点无效")
+
+    pages: List[int] = []
+    limits = PageTreeLimits()
+    # 栈元素: (节点引用, 深度, 继承属性)
+    stack: List[Tuple[IndirectObject, int, Dict[str, PdfObject]]] = [(pages_ref, 1, {})]
+    while stack:
+        node_ref, depth, inherited = stack.pop()
+        if not isinstance(node_ref, IndirectObject):
+            raise PDFValidationError("页面树节点必须是间接对象")
+        limits.visit(node_ref, depth)
+        idnum = graph.add_reference(node_ref)
+        node = graph.get(idnum)
+        if not isinstance(node, DictionaryObject):
+            raise PDFValidationError("页面树节点无效")
+
+        if node.get("/Type") == "/Pages" or "/Kids" in node:
+            graph.page_tree_nodes.append(idnum)
+            attributes = dict(inherited)
+            for key in INHERITABLE_ATTRIBUTES:
+                if key in node:
+                    attributes[key] = node.raw_get(key)
+            if any(key in node for key in INHERITABLE_ATTRIBUTES):
+                graph.replacements[idnum] = DictionaryObject(
+                    {k: v for k, v in node.items() if k not in INHERITABLE_ATTRIBUTES}
+                )
+            kids = node.get("/Kids", [])
+            stack.extend((kid, depth + 1, attributes) for kid in reversed(kids))
+        else:
+            graph.add_page(idnum)
+            pages.append(idnum)
+            missing = {k: v for k, v in inherited.items() if k not in node}
+            if missing:
+                page = DictionaryObject(node)
+                for key, value in missing.items():
+                    page[NameObject(key)] = value
+                graph.replacements[idnum] = page
+    return pages
+
+
+def _classify(users: List[_User]) -> int:
+    """Section of an object from its users (qpdf's rules)"""
+    is_root = in_outlines = in_open_document = in_first_page = False
+    other_pages = thumbs = others = 0
+    for kind, key in users:
+        if kind == "root":
+            is_root = True
+        elif kind == "page":
+            if key == 0:
+                in_first_page = True
+            else:
+                other_pages += 1
+        elif kind == "thumb":
+            thumbs += 1
+        elif kind == "root_key" and key in OPEN_DOCUMENT_KEYS:
+            in_open_document = True
+        elif kind == "root_key" and key == "/Outlines":
+            in_outlines = True
+        else:
+            others += 1
+
+    if is_root:
+        return _ROOT
+    if in_outlines:
+        return _OUTLINES
+    if in_open_document:
+        return _OPEN_DOCUMENT
+    if in_first_page:
+        private = others == 0 and other_pages == 0 and thumbs == 0
+        return _FIRST_PAGE_PRIVATE if private else _FIRST_PAGE_SHARED
+    if other_pages == 1 and others == 0 and thumbs == 0:
+        return _OTHER_PAGE_PRIVATE
+    if other_pages > 1:
+        return _OTHER_PAGE_SHARED
+    if thumbs == 1 and others == 0:
+        return _THUMBNAIL_PRIVATE
+    if thumbs > 1:
+        return _THUMBNAIL_SHARED
+    return _OTHER
+
+
+def _in_section(sections: Dict[int, int], section: int, users: Dict[int, List[_User]]) -> List[int]:
+    """Objects of one section, in the order they were first used"""
+    return [idnum for idnum in users if sections[idnum] == section]
+
+
+def _outline_group(catalog: DictionaryObject, sections: Dict[int, int]) -> List[int]:
+    """Outline objects, starting with the outline dictionary"""
+    outlines = catalog.raw_get("/Outlines") if "/Outlines" in catalog else None
+    if not isinstance(outlines, IndirectObject) or sections.get(outlines.idnum) != _OUTLINES:
+        return [i for i, section in sections.items() if section == _OUTLINES]
+    rest = [i for i, s in sections.items() if s == _OUTLINES and i != outlines.idnum]
+    return [outlines.idnum] + rest
+
+
+def _serialize(
+    graph: _ObjectGraph,
+    numbers: Dict[int, int],
+    handler: Optional[StandardSecurityHandler],
+    max_workers: int,
+) -> Dict[int, bytes]:
+    """New object number -> complete ``N 0 obj ... endobj`` chunk"""
+
+    def on_reference(reference: IndirectObject, stream: BinaryIO) -> None:
+        number = numbers.get(reference.idnum)
+        stream.write(b"null" if number is None else b"%d 0 R" % number)
+
+    chunks: Dict[int, bytes] = {}
+    if handler is None:
+        for idnum, number in numbers.items():
+            obj = graph.get(idnum)
+            body = b"null" if obj is None else serialize_object(obj, on_reference)
+            chunks[number] = _chunk(number, body)
+        return chunks
+
+    plain = []
+    for idnum, number in numbers.items():
+        obj = graph.get(idnum)
+        plain.append((number, [b"null"] if obj is None else collect_parts(obj, on_reference)))
+    for number, body in encrypt_objects(plain, handler, max_workers):
+        chunks[number] = _chunk(number, body)
+    return chunks
+
+
+def _chunk(number: int, body: bytes) -> bytes:
+    return b"%d 0 obj\n%s\nendobj\n" % (number, body)
+
+
+def _parameters(
+    length: int,
+    hint: Tuple[int, int],
+    first_page: int,
+    end_of_first_page: int,
+    page_count: int,
+    main_xref_entry: int,
+) -> bytes:
+    """Linearization parameter dictionary, with offsets at a fixed width"""
+    return b"<< /Linearized 1 /L %*d /H [ %*d %*d ] /O %d /E %*d /N %d /T %*d >>" % (
+        _NUMBER_WIDTH,
+        length,
+        _NUMBER_WIDTH,
+        hint[0],
+        _NUMBER_WIDTH,
+        hint[1],
+        first_page,
+        _NUMBER_WIDTH,
+        end_of_first_page,
+        page_count,
+        _NUMBER_WIDTH,
+        main_xref_entry,
+    )
+
+
+def _trailer_entries(
+    root_number: int,
+    info: Optional[IndirectObject],
+    numbers: Dict[int, int],
+    encrypt_number: int,
+    file_id: bytes,
+) -> Dict[bytes, bytes]:
+    entries = {b"/Root": b"%d 0 R" % root_number}
+    if info is not None and info.idnum in numbers:
+        entries[b"/Info"] = b"%d 0 R" % numbers[info.idnum]
+    if encrypt_number:
+        entries[b"/Encrypt"] = b"%d 0 R" % encrypt_number
+    hex_id = b"<" + file_id.hex().encode("ascii") + b">"
+    entries[b"/ID"] = b"[ %s %s ]" % (hex_id, hex_id)
+    return entries
+
+
+def _first_trailer(entries: Dict[bytes, bytes], size: int, main_xref_offset: int) -> bytes:
+    """Trailer of the first-page cross-reference section, pointing to the main one"""
+    lines = b"".join(key + b" " + value + b"\n" for key, value in entries.items())
+    return b"trailer\n<<\n/Size %d\n%s/Prev %*d\n>>\nstartxref\n0\n%%%%EOF\n" % (
+        size,
+        lines,
+        _NUMBER_WIDTH,
+        main_xref_offset,
+    )
+
+
+class _BitWriter:
+    """Big-endian bit packing for hint tables"""
+
+    def __init__(self) -> None:
+        self.data = bytearray()
+        self._value = 0
+        self._bits = 0
+
+    def write(self, value: int, bits: int) -> None:
+        self._value = (self._value << bits) | value
+        self._bits += bits
+        while self._bits >= 8:
+            self._bits -= 8
+            self.data.append((self._value >> self._bits) & 0xFF)
+        self._value &= (1 << self._bits) - 1
+
+    def write_all(self, values: Iterable[int], bits: int) -> None:
+        """Write one item for every entry; each item array starts on a byte boundary"""
+        for value in values:
+            self.write(value, bits)
+        if self._bits:
+            self.write(0, 8 - self._bits)
+
+
+def _group_length(numbers: List[int], lengths: Dict[int, int]) -> int:
+    return sum(lengths[number] for number in numbers)
+
+
+def _page_offset_table(
+    pages: List[List[int]],
+    shared: List[List[int]],
+    shared_total: int,
+    offsets: Dict[int, int],
+    lengths: Dict[int, int],
+) -> bytes:
+    """Page offset hint table (F.4.1)
+
+    Content stream offsets and lengths are not tracked separately: every page
+    reports offset 0 and its whole length, as Acrobat and qpdf do.
+    """
+    counts = [len(numbers) for numbers in pages]
+    page_lengths = [_group_length(numbers, lengths) for numbers in pages]
+    min_count, min_length = min(counts), min(page_lengths)
+    count_bits = (max(counts) - min_count).bit_length()
+    length_bits = (max(page_lengths) - min_length).bit_length()
+    shared_count_bits = max(len(ids) for ids in shared).bit_length()
+    identifier_bits = shared_total.bit_length()
+
+    table = _BitWriter()
+    table.write(min_count, 32)
+    table.write(offsets[pages[0][0]], 32)
+    table.write(count_bits, 16)
+    table.write(min_length, 32)
+    table.write(length_bits, 16)
+    table.write(0, 32)  # 内容流最小偏移量
+    table.write(0, 16)
+    table.write(min_length, 32)  # 内容流最小长度
+    table.write(length_bits, 16)
+    table.write(shared_count_bits, 16)
+    table.write(identifier_bits, 16)
+    table.write(0, 16)  # 共用对象引用位置分子的位数
+    table.write(4, 16)  # 分母
+
+    table.write_all((count - min_count for count in counts), count_bits)
+    table.write_all((length - min_length for length in page_lengths), length_bits)
+    table.write_all((len(ids) for ids in shared), shared_count_bits)
+    table.write_all((i for ids in shared for i in ids), identifier_bits)
+    # 共用对象引用位置的分子和内容流偏移量均为 0 位，不占空间
+    table.write_all((length - min_length for length in page_lengths), length_bits)
+    return bytes(table.data)
+
+
+def _shared_object_table(
+    shared: List[int],
+    first_page_count: int,
+    first_shared_number: int,
+    offsets: Dict[int, int],
+    lengths: Dict[int, int],
+) -> bytes:
+    """Shared object hint table (F.4.2), one object per group
+
+    The first entries are the objects of the first page section, the rest
+    the objects shared by other pages.
+    """
+    group_lengths = [lengths[number] for number in shared]
+    min_length = min(group_lengths)
+    length_bits = (max(group_lengths) - min_length).bit_length()
+
+    table = _BitWriter()
+    table.write(first_shared_number, 32)
+    table.write(offsets[first_shared_number] if first_shared_number else 0, 32)
+    table.write(first_page_count, 32)
+    table.write(len(shared), 32)
+    table.write(0, 16)  # 每组对象数的位数（每组一个对象）
+    table.write(min_length, 32)
+    table.write(length_bits, 16)
+
+    table.write_all((length - min_length for length in group_lengths), length_bits)
+    table.write_all((0 for _ in shared), 1)  # 无 MD5 签名
+    return bytes(table.data)
+
+
+def _outline_table(outlines: List[int], offsets: Dict[int, int], lengths: Dict[int, int]) -> bytes:
+    """Outline hint table (generic hint table, F.4.3)"""
+    table = _BitWriter()
+    table.write(outlines[0], 32)
+    table.write(offsets[outlines[0]], 32)
+    table.write(len(outlines), 32)
+    table.write(_group_length(outlines, lengths), 32)
+    return bytes(table.data)
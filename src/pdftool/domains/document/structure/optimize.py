@@ -0,0 +1,259 @@
+"""
+Structural optimization of a whole document
+
+Rewrites a document keeping only what its catalog and document information
+dictionary can reach:
+
+- unreachable objects (left behind by page removal, incremental updates,
+  merges...) are dropped
+- objects with identical content (streams, fonts, font descriptors, graphics
+  states, arrays) are merged into one, repeatedly, so fonts whose embedded
+  font files were duplicates become duplicates themselves
+- objects are renumbered densely in reading order, non-stream objects are
+  packed into compressed object streams and the file gets a cross-reference
+  stream
+"""
+
+import hashlib
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from typing import BinaryIO, Deque, Dict, List, Optional, Tuple
+
+from PyPDF2 import PdfReader
+from PyPDF2.generic import IndirectObject, PdfObject
+
+from ....common.exceptions import PDFValidationError
+from .analysis import object_table
+from .serialization import (
+    ARRAY,
+    DICTIONARY,
+    STREAM,
+    header_version,
+    new_file_id,
+    object_kind,
+    pdf_header,
+    serialize_object,
+    write_indirect_object,
+    write_xref_stream,
+)
+
+# 每个对象流中的对象数（与 qpdf 默认值相同）
+OBJECTS_PER_STREAM = 100
+
+# 重复对象合并的最大轮数；每轮合并后引用它们的对象可能成为新的重复对象
+MAX_DEDUPLICATION_PASSES = 4
+
+# 内容相同即可合并的字典类型；页面、注释、书签等对象即使内容相同也各有身份
+DEDUPLICATED_TYPES = ("/Font", "/FontDescriptor", "/ExtGState", "/Encoding")
+
+
+@dataclass
+class OptimizationResult:
+    """Object counts of an optimized rewrite"""
+
+    source_objects: int  # 源文件对象表中的对象数
+    written_objects: int  # 写出的对象数（不含对象流和交叉引用流）
+    duplicates: int  # 合并的重复对象数
+    object_streams: int  # 写出的对象流数
+
+    @property
+    def removed_objects(self) -> int:
+        return max(0, self.source_objects - self.written_objects)
+
+
+def write_optimized(
+    reader: PdfReader,
+    output: BinaryIO,
+    object_streams: bool = True,
+    deduplicate: bool = True,
+) -> OptimizationResult:
+    """Write a garbage-collected, deduplicated copy of a document
+
+    Args:
+        reader: Source document
+        output: Empty binary stream
+        object_streams: Pack non-stream objects into object streams
+        deduplicate: Merge objects with identical content
+
+    Raises:
+        PDFValidationError: if the document is encrypted or has no catalog
+    """
+    if reader.is_encrypted:
+        raise PDFValidationError("加密文档需要先解密")
+    if "/Root" not in reader.trailer:
+        raise PDFValidationError("文档缺少目录对象 (/Root)")
+
+    canonical = _duplicates(reader) if deduplicate else {}
+
+    def resolve(idnum: int) -> int:
+        while idnum in canonical:
+            idnum = canonical[idnum]
+        return idnum
+
+    # 按引用顺序重新编号：只有从 trailer 可达的对象会得到编号
+    numbers: Dict[int, int] = {}
+    pending: Deque[Tuple[int, IndirectObject]] = deque()
+
+    def on_reference(reference: IndirectObject, stream: BinaryIO) -> None:
+        idnum = resolve(reference.idnum)
+        if idnum not in numbers:
+            numbers[idnum] = len(numbers) + 1
+            pending.append((idnum, reference))
+        stream.write(b"%d 0 R" % numbers[idnum])
+
+    trailer: Dict[bytes, bytes] = {}
+    for key in ("/Root", "/Info"):
+        if key in reader.trailer:
+            value = reader.trailer.raw_get(key)
+            trailer[key.encode("ascii")] = serialize_object(value, on_reference)
+
+    streams: Dict[int, bytes] = {}
+    objects: Dict[int, bytes] = {}
+    while pending:
+        idnum, reference = pending.popleft()
+        obj = _get_object(reader, idnum, reference)
+        body = b"null" if obj is None else serialize_object(obj, on_reference)
+        if object_kind(obj) == STREAM or not object_streams:
+            streams[numbers[idnum]] = body
+        else:
+            objects[numbers[idnum]] = body
+
+    output.write(pdf_header(header_version(reader.pdf_header)))
+    offsets: Dict[int, Tuple[int, int]] = {}
+    for number in sorted(streams):
+        offsets[number] = (output.tell(), 0)
+        write_indirect_object(output, number, 0, [streams[number]])
+
+    compressed: Dict[int, Tuple[int, int]] = {}
+    packed = sorted(objects)
+    next_number = len(numbers) + 1
+    for start in range(0, len(packed), OBJECTS_PER_STREAM):
+        group = packed[start : start + OBJECTS_PER_STREAM]
+        offsets[next_number] = (output.tell(), 0)
+        write_indirect_object(output, next_number, 0, [_object_stream(group, objects)])
+        for position, number in enumerate(group):
+            compressed[number] = (next_number, position)
+        next_number += 1
+
+    file_id = b"<" + new_file_id().hex().encode("ascii") + b">"
+    trailer[b"/ID"] = b"[ %s %s ]" % (file_id, file_id)
+    write_xref_stream(output, offsets, trailer, xref_idnum=next_number, compressed=compressed)
+
+    return OptimizationResult(
+        source_objects=len(object_table(reader)),
+        written_objects=len(numbers),
+        duplicates=len(canonical),
+        object_streams=next_number - len(numbers) - 1,
+    )
+
+
+def _duplicates(reader: PdfReader) -> Dict[int, int]:
+    """Object number -> number of an identical object to use instead
+
+    Objects are compared by the SHA-256 of their serialization, with
+    references already mapped to their replacements; passes repeat until no
+    new duplicates appear. The first pass also discovers the reachable
+    objects.
+    """
+    canonical: Dict[int, int] = {}
+
+    def resolve(idnum: int) -> int:
+        while idnum in canonical:
+            idnum = canonical[idnum]
+        return idnum
+
+    # 可合并的对象: 对象号 -> (对象, 是否包含引用)
+    candidates: Dict[int, Tuple[PdfObject, bool]] = {}
+    digests: Dict[int, bytes] = {}
+    visited = set()
+    pending: Deque[Tuple[int, IndirectObject]] = deque()
+    references = 0
+
+    def on_reference(reference: IndirectObject, stream: BinaryIO) -> None:
+        nonlocal references
+        references += 1
+        stream.write(b"%d R" % resolve(reference.idnum))
+        if reference.idnum not in visited:
+            visited.add(reference.idnum)
+            pending.append((reference.idnum, reference))
+
+    for key in ("/Root", "/Info"):
+        if key in reader.trailer:
+            serialize_object(reader.trailer.raw_get(key), on_reference)
+
+    while pending:
+        idnum, reference = pending.popleft()
+        obj = _get_object(reader, idnum, reference)
+        if obj is None:
+            continue
+        references = 0
+        body = serialize_object(obj, on_reference)
+        if _deduplicable(obj):
+            candidates[idnum] = (obj, references > 0)
+            digests[idnum] = hashlib.sha256(body).digest()
+
+    for _ in range(MAX_DEDUPLICATION_PASSES):
+        seen: Dict[bytes, int] = {}
+        found = False
+        for idnum, digest in digests.items():
+            if digest in seen:
+                canonical[idnum] = seen[digest]
+                found = True
+            else:
+                seen[digest] = idnum
+        if not found:
+            break
+
+        # 合并后，引用了被合并对象的对象需要重新计算摘要；不含引用的对象不会变化
+        digests = {
+            idnum: (
+                hashlib.sha256(serialize_object(obj, on_reference)).digest()
+                if has_references
+                else digests[idnum]
+            )
+            for idnum, (obj, has_references) in candidates.items()
+            if idnum not in canonical
+        }
+    return canonical
+
+
+def _deduplicable(obj: PdfObject) -> bool:
+    kind = object_kind(obj)
+    if kind in (STREAM, ARRAY):
+        return True
+    return kind == DICTIONARY and obj.get("/Type") in DEDUPLICATED_TYPES
+
+
+def _get_object(reader: PdfReader, idnum: int, reference: IndirectObject) -> Optional[PdfObject]:
+    """The object a reference points to; dangling references resolve to None"""
+    # 未定义的对象按规范视为 null；交给 PyPDF2 会对每个引用搜索整个文件
+    if idnum not in reader.xref_objStm and not any(
+        idnum in entries for entries in reader.xref.values()
+    ):
+        return None
+    if reference.idnum != idnum:
+        reference = IndirectObject(idnum, _generation(reader, idnum), reader)
+    return reference.get_object()
+
+
+def _generation(reader: PdfReader, idnum: int) -> int:
+    for generation, entries in reader.xref.items():
+        if idnum in entries:
+            return generation
+    return 0
+
+
+def _object_stream(numbers: List[int], objects: Dict[int, bytes]) -> bytes:
+    """Serialized compressed object stream holding the given objects"""
+    header = bytearray()
+    data = bytearray()
+    for number in numbers:
+        header += b"%d %d " % (number, len(data))
+        data += objects[number] + b"\n"
+    header += b"\n"
+    content = zlib.compress(bytes(header + data))
+    return (
+        b"<<\n/Type /ObjStm\n/N %d\n/First %d\n/Filter /FlateDecode\n/Length %d\n>>\n"
+        b"stream\n%s\nendstream" % (len(numbers), len(header), len(content), content)
+    )
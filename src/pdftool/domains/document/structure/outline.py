@@ -0,0 +1,241 @@
+"""
+Document outline (bookmarks)
+
+``read_outline`` walks the ``/Outlines`` tree once and resolves every
+destination (explicit arrays, ``/GoTo`` actions and named destinations) to a
+page index through a single page-object -> index map, rather than searching
+the page list per bookmark. ``outline_objects`` serializes an outline for a
+subset output, keeping only the bookmarks whose pages the output contains.
+"""
+
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+from PyPDF2 import PageObject, PdfReader
+from PyPDF2.generic import (
+    ArrayObject,
+    DictionaryObject,
+    IndirectObject,
+    PdfObject,
+    TextStringObject,
+)
+
+from ....common.exceptions import PDFValidationError
+from .serialization import serialize_object
+
+
+@dataclass
+class OutlineItem:
+    """One bookmark with its destination resolved to a source page"""
+
+    title: str
+    page_index: Optional[int] = None
+    page: Optional[IndirectObject] = None
+    # 目标数组中页面之后的部分，如 /XYZ left top zoom
+    view: Tuple[PdfObject, ...] = ()
+    is_open: bool = True
+    children: List["OutlineItem"] = field(default_factory=list)
+
+
+def page_index_map(pages: Sequence[PageObject]) -> Dict[int, int]:
+    """Map page object numbers to 0-based page indices"""
+    return {
+        page.indirect_reference.idnum: index
+        for index, page in enumerate(pages)
+        if page.indirect_reference is not None
+    }
+
+
+def read_outline(reader: PdfReader, pages: Sequence[PageObject]) -> List[OutlineItem]:
+    """Top-level bookmarks of the document with their nested bookmarks
+
+    Raises:
+        PDFValidationError: if the outline tree contains a cycle
+    """
+    catalog = reader.trailer["/Root"].get_object()
+    outlines = catalog.get("/Outlines")
+    if outlines is None:
+        return []
+    outlines = outlines.get_object()
+    if not isinstance(outlines, DictionaryObject) or "/First" not in outlines:
+        return []
+
+    resolver = _DestinationResolver(reader, pages)
+    return _read_level(outlines["/First"], resolver, set())
+
+
+def filter_outline(items: Sequence[OutlineItem], included: Set[int]) -> List[OutlineItem]:
+    """Restrict an outline to the pages (object numbers) present in an output
+
+    Bookmarks pointing elsewhere are dropped and their children moved up a
+    level; bookmarks without a destination are kept while they have children.
+    """
+    kept: List[OutlineItem] = []
+    for item in items:
+        children = filter_outline(item.children, included)
+        if item.page is not None and item.page.idnum in included:
+            kept.append(replace(item, children=children))
+        elif item.page is None and children:
+            kept.append(replace(item, children=children))
+        else:
+            kept.extend(children)
+    return kept
+
+
+def outline_objects(
+    items: Sequence[OutlineItem], page_numbers: Mapping[int, int], root_number: int
+) -> List[Tuple[int, bytes]]:
+    """Serialized outline dictionary and bookmarks for an output
+
+    ``page_numbers`` maps the source object numbers of the output's pages to
+    their object numbers in the output. Objects are numbered from
+    ``root_number`` (the ``/Outlines`` dictionary). Returns an empty list when
+    no bookmark points into the output.
+    """
+    kept = filter_outline(items, set(page_numbers))
+    if not kept:
+        return []
+
+    objects: Dict[int, bytes] = {}
+    next_number = root_number + 1
+
+    def write_level(level: List[OutlineItem], parent: int) -> Tuple[int, int, int]:
+        nonlocal next_number
+        numbers = list(range(next_number, next_number + len(level)))
+        next_number += len(level)
+        visible = 0
+
+        for position, (item, number) in enumerate(zip(level, numbers)):
+            entries = [b"/Title " + serialize_object(TextStringObject(item.title))]
+            entries.append(b"/Parent %d 0 R" % parent)
+            if position > 0:
+                entries.append(b"/Prev %d 0 R" % numbers[position - 1])
+            if position < len(numbers) - 1:
+                entries.append(b"/Next %d 0 R" % numbers[position + 1])
+            if item.page is not None:
+                view = b"".join(b" " + serialize_object(value) for value in item.view)
+                entries.append(b"/Dest [ %d 0 R%s ]" % (page_numbers[item.page.idnum], view))
+
+            visible += 1
+            if item.children:
+                first, last, count = write_level(item.children, number)
+                entries.append(b"/First %d 0 R\n/Last %d 0 R" % (first, last))
+                entries.append(b"/Count %d" % (count if item.is_open else -count))
+                if item.is_open:
+                    visible += count
+
+            objects[number] = b"<<\n" + b"\n".join(entries) + b"\n>>"
+        return numbers[0], numbers[-1], visible
+
+    first, last, count = write_level(kept, root_number)
+    objects[root_number] = b"<<\n/Type /Outlines\n/First %d 0 R\n/Last %d 0 R\n/Count %d\n>>" % (
+        first,
+        last,
+        count,
+    )
+    return sorted(objects.items())
+
+
+def _read_level(
+    first: PdfObject, resolver: "_DestinationResolver", visited: Set[int]
+) -> List[OutlineItem]:
+    """Read a chain of sibling bookmarks starting at ``first``"""
+    items: List[OutlineItem] = []
+    node_ref: Optional[PdfObject] = first
+    while node_ref is not None:
+        if isinstance(node_ref, IndirectObject):
+            if node_ref.idnum in visited:
+                raise PDFValidationError("书签树中存在循环引用")
+            visited.add(node_ref.idnum)
+        node = node_ref.get_object()
+        if not isinstance(node, DictionaryObject):
+            break
+
+        title = node.get("/Title", "")
+        title = title.get_object() if title is not None else ""
+        page_index, page, view = resolver.resolve(node)
+        count = node.get("/Count", 0)
+        item = OutlineItem(
+            title=str(title),
+            page_index=page_index,
+            page=page,
+            view=view,
+            is_open=not isinstance(count, int) or count >= 0,
+        )
+        if "/First" in node:
+            item.children = _read_level(node["/First"], resolver, visited)
+        items.append(item)
+        node_ref = node.get("/Next")
+    return items
+
+
+class _DestinationResolver:
+    """Resolve bookmark destinations to pages with a precomputed page map"""
+
+    def __init__(self, reader: PdfReader, pages: Sequence[PageObject]):
+        self.reader = reader
+        self.pages = pages
+        self.page_indices = page_index_map(pages)
+        self._named: Optional[Dict[str, PdfObject]] = None
+
+    def resolve(
+        self, node: DictionaryObject
+    ) -> Tuple[Optional[int], Optional[IndirectObject], Tuple[PdfObject, ...]]:
+        """(page index, page reference, view parameters) of a bookmark"""
+        destination = node.get("/Dest")
+        if destination is None and "/A" in node:
+            action = node["/A"].get_object()
+            if isinstance(action, DictionaryObject) and action.get("/S") == "/GoTo":
+                destination = action.get("/D")
+        if destination is None:
+            return None, None, ()
+
+        destination = destination.get_object()
+        if not isinstance(destination, ArrayObject):
+            destination = self.named_destinations().get(str(destination))
+            destination = destination.get_object() if destination is not None else None
+        if isinstance(destination, DictionaryObject):
+            destination = destination.get("/D")
+            destination = destination.get_object() if destination is not None else None
+        if not isinstance(destination, ArrayObject) or not destination:
+            return None, None, ()
+
+        target = destination[0]
+        if isinstance(target, IndirectObject):
+            index = self.page_indices.get(target.idnum)
+        elif isinstance(target, int) and 0 <= target < len(self.pages):
+            # 部分生成器写入页码而非页面引用
+            index = int(target)
+        else:
+            index = None
+        if index is None:
+            return None, None, ()
+
+        view = tuple(value.get_object() for value in destination[1:])
+        return index, self.pages[index].indirect_reference, view
+
+    def named_destinations(self) -> Dict[str, PdfObject]:
+        """Named destinations from ``/Dests`` and the ``/Names`` tree, read once"""
+        if self._named is None:
+            self._named = {}
+            catalog = self.reader.trailer["/Root"].get_object()
+            dests = catalog.get("/Dests")
+            if dests is not None:
+                for name, value in dests.get_object().items():
+                    self._named[str(name)] = value
+            names = catalog.get("/Names")
+            if names is not None and "/Dests" in names.get_object():
+                self._read_name_tree(names.get_object()["/Dests"], set())
+        return self._named
+
+    def _read_name_tree(self, node_ref: PdfObject, visited: Set[int]) -> None:
+        if isinstance(node_ref, IndirectObject):
+            if node_ref.idnum in visited:
+                return
+            visited.add(node_ref.idnum)
+        node = node_ref.get_object()
+        for kid in node.get("/Kids", []):
+            self._read_name_tree(kid, visited)
+        names = node.get("/Names", [])
+        for position in range(0, len(names) - 1, 2):
+            self._named[str(names[position].get_object())] = names[position + 1]  # type: ignore
@@ -0,0 +1,224 @@
+"""
+Page tree traversal without flattening
+
+``PdfReader.pages`` flattens the whole page tree before the first page can be
+accessed. The helpers here use the ``/Count`` of each ``/Pages`` node to skip
+subtrees that contain none of the requested pages, so only the nodes on the
+paths to those pages are resolved.
+"""
+
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from PyPDF2 import PageObject, PdfReader
+from PyPDF2.generic import DictionaryObject, IndirectObject, NameObject, NumberObject
+
+from ....common.exceptions import PDFValidationError
+from ....common.utils.limits import PageTreeLimits
+
+# 可从父节点继承的页面属性
+INHERITABLE_ATTRIBUTES = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+
+
+def get_pages_root(reader: PdfReader) -> DictionaryObject:
+    """Return the root ``/Pages`` node of the document"""
+    try:
+        root = reader.trailer["/Root"].get_object()
+        return root["/Pages"].get_object()
+    except Exception as e:
+        raise PDFValidationError(f"页面树根节点无效: {str(e)}")
+
+
+def get_page_count(reader: PdfReader) -> int:
+    """Return the page count from the page tree root without loading any page"""
+    count = get_pages_root(reader).get("/Count")
+    if not isinstance(count, int) or count < 0:
+        raise PDFValidationError("页面树根节点缺少有效的 /Count")
+    return int(count)
+
+
+def get_checked_page_count(reader: PdfReader) -> int:
+    """Return the page count from the page tree root, checked against its children
+
+    Only the root's kids are inspected: when their number equals ``/Count``
+    they are taken to be pages and not resolved, otherwise their ``/Count``
+    values must add up to the root's.
+
+    Raises:
+        PDFValidationError: if ``/Count`` is missing or inconsistent
+    """
+    root = get_pages_root(reader)
+    count = get_page_count(reader)
+    kids = root.get("/Kids")
+    if not isinstance(kids, list) or len(kids) > count:
+        raise PDFValidationError("页面树根节点的 /Kids 与 /Count 不一致")
+    if len(kids) != count and sum(_node_page_count(kid.get_object()) for kid in kids) != count:
+        raise PDFValidationError("页面树 /Count 与子节点不一致")
+    return count
+
+
+def get_pages(reader: PdfReader, indices: Iterable[int]) -> Dict[int, PageObject]:
+    """Resolve the pages at the given 0-based indices
+
+    Inheritable attributes (``/Resources``, ``/MediaBox``...) are copied onto the
+    returned page objects, as ``PdfReader.pages`` does.
+
+    The nodes on the way to the pages are checked against the page tree
+    limits (depth, cycles, number of kids).
+
+    Raises:
+        PDFValidationError: if an index is out of range, the page tree is
+            inconsistent (missing or wrong ``/Count``) or exceeds a limit
+    """
+    wanted = sorted(set(indices))
+    if not wanted:
+        return {}
+
+    total = get_page_count(reader)
+    if wanted[0] < 0 or wanted[-1] >= total:
+        raise PDFValidationError(f"页面索引超出范围 (0-{total - 1})")
+
+    indexed_page = getattr(reader, "indexed_page", None)
+    if indexed_page is not None and reader.index.has_pages:  # type: ignore[attr-defined]
+        # IndexedPdfReader：按侧车索引直接定位页面对象
+        return {index: indexed_page(index) for index in wanted}
+
+    pages: Dict[int, PageObject] = {}
+    limits = PageTreeLimits()
+    root_ref = reader.trailer["/Root"].get_object().raw_get("/Pages")
+
+    # 栈元素: (节点引用, 深度, 节点起始页索引, 继承属性)
+    stack: List[Tuple[IndirectObject, int, int, Dict[str, object]]] = [(root_ref, 1, 0, {})]
+    while stack:
+        node_ref, depth, offset, inherited = stack.pop()
+        limits.visit(node_ref, depth)
+        node = node_ref.get_object()
+
+        if _is_node(node):
+            attributes = dict(inherited)
+            for key in INHERITABLE_ATTRIBUTES:
+                if key in node:
+                    attributes[key] = node[key]
+
+            kids = node.get("/Kids", [])
+            limits.node(kids)
+            if _node_page_count(node) == len(kids):
+                # 扁平节点（子节点均为页面）：直接按下标定位，无需解析其余子节点
+                children = _direct_children(kids, wanted, offset, attributes)
+                if children is not None:
+                    stack.extend(
+                        (ref, depth + 1, index, attrs) for ref, index, attrs in reversed(children)
+                    )
+                    continue
+
+            children = []
+            child_offset = offset
+            for kid_ref in kids:
+                kid = kid_ref.get_object()
+                count = _node_page_count(kid)
+                if _contains_any(wanted, child_offset, child_offset + count):
+                    children.append((kid_ref, child_offset, attributes))
+                child_offset += count
+
+            if child_offset - offset != _node_page_count(node):
+                raise PDFValidationError("页面树 /Count 与子节点不一致")
+
+            # 逆序入栈以按页面顺序处理
+            stack.extend((ref, depth + 1, index, attrs) for ref, index, attrs in reversed(children))
+        else:
+            pages[offset] = _make_page(reader, node_ref, node, inherited)
+
+    if len(pages) != len(wanted):
+        raise PDFValidationError("页面树结构不完整")
+    return pages
+
+
+def standalone_page(page: PageObject) -> PageObject:
+    """Copy of a page with its effective inheritable attributes set on the page itself
+
+    A page moved under another page tree (e.g. appended to a document) would
+    otherwise inherit that tree's ``/Rotate``, ``/CropBox`` or ``/Resources``.
+    Attributes missing from the whole chain get their default values.
+    """
+    attributes: Dict[str, object] = {}
+    node: object = page
+    visited: Set[int] = set()
+    while isinstance(node, DictionaryObject):
+        for key in INHERITABLE_ATTRIBUTES:
+            if key not in attributes and key in node:
+                attributes[key] = node.raw_get(key)
+        parent = node.raw_get("/Parent") if "/Parent" in node else None
+        if not isinstance(parent, IndirectObject) or parent.idnum in visited:
+            break
+        visited.add(parent.idnum)
+        node = parent.get_object()
+
+    attributes.setdefault("/Rotate", NumberObject(0))
+    attributes.setdefault("/Resources", DictionaryObject())
+    if "/CropBox" not in attributes and "/MediaBox" in attributes:
+        attributes["/CropBox"] = attributes["/MediaBox"]
+
+    copy = PageObject(page.pdf, page.indirect_reference)
+    copy.update(page)
+    for key, value in attributes.items():
+        copy[NameObject(key)] = value  # type: ignore[assignment]
+    return copy
+
+
+def _node_page_count(node: DictionaryObject) -> int:
+    """Number of pages below a page tree node (1 for a leaf page)"""
+    if _is_node(node):
+        count = node.get("/Count")
+        if not isinstance(count, int) or count < 0:
+            raise PDFValidationError("页面树节点缺少有效的 /Count")
+        return int(count)
+    return 1
+
+
+def _direct_children(
+    kids: List[IndirectObject], wanted: List[int], offset: int, attributes: Dict[str, object]
+) -> Optional[List[Tuple[IndirectObject, int, Dict[str, object]]]]:
+    """Pick the wanted kids of a node whose ``/Count`` equals its number of kids
+
+    Kid ``i`` is page ``offset + i`` only if every kid before it is a page:
+    an empty intermediate node (``/Count 0``) next to one holding two pages
+    keeps ``/Count`` equal to the number of kids. The kids up to the last
+    wanted one are therefore checked to be pages; None is returned otherwise,
+    in which case the caller scans the kids by their ``/Count``.
+    """
+    start = bisect_left(wanted, offset)
+    end = bisect_left(wanted, offset + len(kids))
+    picked = wanted[start:end]
+    if not picked:
+        return []
+    for kid_ref in kids[: picked[-1] - offset + 1]:
+        kid = kid_ref.get_object()
+        if not isinstance(kid, DictionaryObject) or _is_node(kid):
+            return None
+    return [(kids[index - offset], index, attributes) for index in picked]
+
+
+def _is_node(node: DictionaryObject) -> bool:
+    """Whether a page tree node is an intermediate ``/Pages`` node"""
+    return node.get("/Type") == "/Pages" or "/Kids" in node
+
+
+def _contains_any(sorted_indices: List[int], start: int, end: int) -> bool:
+    """Whether any of the sorted indices falls in [start, end)"""
+    position = bisect_left(sorted_indices, start)
+    return position < len(sorted_indices) and sorted_indices[position] < end
+
+
+def _make_page(
+    reader: PdfReader,
+    page_ref: Optional[IndirectObject],
+    page: DictionaryObject,
+    inherited: Dict[str, object],
+) -> PageObject:
+    """Wrap a page dictionary as a PageObject with inherited attributes applied"""
+    page_obj = PageObject(reader, page_ref)
+    page_obj.update(page)
+    for key, value in inherited.items():
+        if key not in page_obj:
+            page_obj[NameObject(key)] = value  # type: ignore[assignment]
+    return page_obj
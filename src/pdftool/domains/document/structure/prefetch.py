@@ -0,0 +1,193 @@
+"""
+Stream prefetch
+
+Operations that read page content (watermark merging, image display sizes,
+text detection) used to inflate one Flate stream after another on the
+calling thread. ``prefetch`` decodes the streams of the next items in a
+thread pool while the caller works on the current one; zlib releases the GIL
+while inflating, so decoding overlaps across cores. Decoded data is handed
+over through PyPDF2's own cache (``EncodedStreamObject.decoded_self``), so
+``get_data`` and ``ContentStream`` find it without any change on the
+consumer's side.
+
+Only decoding runs in the pool. Reading objects from the file stays on the
+calling thread (``PdfReader`` is not thread-safe), and streams whose
+``/Filter`` or ``/DecodeParms`` contain indirect objects at any depth are
+left to the consumer. Decoding goes through the decode guard of ``common.utils.limits``,
+so ``max_decoded_stream_size`` applies as before.
+"""
+
+import logging
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from PyPDF2 import PageObject
+from PyPDF2.filters import decode_stream_data
+from PyPDF2.generic import (
+    ArrayObject,
+    DecodedStreamObject,
+    DictionaryObject,
+    EncodedStreamObject,
+    IndirectObject,
+    PdfObject,
+    StreamObject,
+)
+
+from ....common.exceptions import PDFToolError
+from ....config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 每个线程预先解压的流数量
+STREAMS_PER_WORKER = 2
+
+# 小于该字节数（压缩后）的流直接由调用方解压：解压耗时低于提交到线程池的开销
+MIN_PREFETCH_SIZE = 16 * 1024
+
+# 等待解压的条目数上限（大多数条目不含需要解压的流时，限制预读的对象数）
+MAX_PENDING_ITEMS = 256
+
+_FLATE_FILTERS = ("/FlateDecode", "/Fl")
+
+# get_data 缓存解码结果时不复制的键
+_ENCODING_KEYS = ("/Length", "/Filter", "/DecodeParms")
+
+
+def prefetch(
+    items: Iterable[T],
+    streams: Callable[[T], Iterable[PdfObject]],
+    max_workers: Optional[int] = None,
+) -> Iterator[T]:
+    """Yield ``items`` in order, each once the Flate streams ``streams(item)`` are decoded
+
+    ``items`` is consumed and ``streams`` called on the calling thread, ahead
+    of the item being yielded, while up to ``max_workers`` * STREAMS_PER_WORKER
+    streams are decoded in the pool. A stream that fails to decode is left
+    undecoded, so the consumer reports the error as before; a stream over the
+    size limit raises at once.
+
+    Args:
+        items: Items to pass through, e.g. pages
+        streams: The streams (or references to them) the consumer will decode
+        max_workers: Decoding threads, ``settings.max_workers`` by default;
+            with one, items are passed through unchanged
+    """
+    max_workers = max_workers or settings.max_workers
+    if max_workers <= 1:
+        yield from items
+        return
+
+    window = max_workers * STREAMS_PER_WORKER
+    pending: Deque[Tuple[T, List[Tuple[EncodedStreamObject, Future]]]] = deque()
+    decoding = 0
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdftool-decode")
+    try:
+        for item in items:
+            jobs = [
+                (stream, executor.submit(decode_stream_data, stream))
+                for stream in _decodable(streams(item))
+            ]
+            pending.append((item, jobs))
+            decoding += len(jobs)
+            while pending and (decoding > window or len(pending) > MAX_PENDING_ITEMS):
+                item, jobs = pending.popleft()
+                decoding -= len(jobs)
+                _hand_over(jobs)
+                yield item
+        while pending:
+            item, jobs = pending.popleft()
+            _hand_over(jobs)
+            yield item
+    finally:
+        # 调用方提前结束迭代（或出错）时，取消尚未开始的解压
+        for _, jobs in pending:
+            for _, future in jobs:
+                future.cancel()
+        executor.shutdown(wait=True)
+
+
+def prefetch_pages(
+    pages: Iterable[PageObject], max_workers: Optional[int] = None, forms: bool = False
+) -> Iterator[PageObject]:
+    """``prefetch`` for pages: their content streams, and optionally their Form XObjects"""
+    return prefetch(pages, lambda page: page_streams(page, forms), max_workers)
+
+
+def page_streams(page: DictionaryObject, forms: bool = False) -> List[PdfObject]:
+    """The content streams of a page, and with ``forms`` the Form XObjects in its resources
+
+    Form XObjects nested in other Form XObjects are not included.
+    """
+    streams: List[PdfObject] = []
+    contents = page.get("/Contents")
+    if contents is not None:
+        contents = contents.get_object()
+        streams.extend(contents if isinstance(contents, ArrayObject) else [contents])
+
+    if forms:
+        resources = page.get("/Resources")
+        resources = resources.get_object() if resources is not None else None
+        xobjects = resources.get("/XObject") if isinstance(resources, DictionaryObject) else None
+        xobjects = xobjects.get_object() if xobjects is not None else None
+        if isinstance(xobjects, DictionaryObject):
+            for xobject in xobjects.values():
+                xobject = xobject.get_object()
+                if isinstance(xobject, StreamObject) and xobject.get("/Subtype") == "/Form":
+                    streams.append(xobject)
+    return streams
+
+
+def _decodable(streams: Iterable[PdfObject]) -> Iterator[EncodedStreamObject]:
+    """Large Flate streams not decoded yet, whose filter parameters need no file access"""
+    seen = set()
+    for stream in streams:
+        stream = stream.get_object()
+        if not isinstance(stream, EncodedStreamObject) or stream.decoded_self is not None:
+            continue
+        if len(stream._data) < MIN_PREFETCH_SIZE:
+            continue
+        if id(stream) in seen:
+            continue
+        seen.add(id(stream))
+
+        filters = stream.raw_get("/Filter") if "/Filter" in stream else None
+        parms = stream.raw_get("/DecodeParms") if "/DecodeParms" in stream else None
+        # 解码器按需解析引用（如 /DecodeParms 中的 /Columns 10 0 R），这会在线程中读文件
+        if _has_reference(filters) or _has_reference(parms):
+            continue
+        names = filters if isinstance(filters, ArrayObject) else [filters]
+        if any(name in _FLATE_FILTERS for name in names):
+            yield stream
+
+
+def _has_reference(obj: Optional[PdfObject]) -> bool:
+    """Whether ``obj`` is, or contains at any depth, an indirect reference"""
+    if isinstance(obj, IndirectObject):
+        return True
+    if isinstance(obj, DictionaryObject):
+        return any(_has_reference(value) for value in obj.values())
+    if isinstance(obj, ArrayObject):
+        return any(_has_reference(value) for value in obj)
+    return False
+
+
+def _hand_over(jobs: List[Tuple[EncodedStreamObject, Future]]) -> None:
+    """Store decoded data the way ``EncodedStreamObject.get_data`` caches it"""
+    for stream, future in jobs:
+        try:
+            data = future.result()
+        except PDFToolError:
+            raise
+        except Exception as e:
+            # 留给调用方解码，按原有方式处理错误
+            logger.debug(f"预先解压流失败: {e}")
+            continue
+        decoded = DecodedStreamObject()
+        decoded._data = data
+        for key, value in list(stream.items()):
+            if key not in _ENCODING_KEYS:
+                decoded[key] = value
+        stream.decoded_self = decoded
@@ -0,0 +1,442 @@
+"""
+Cross-reference reconstruction by scanning
+
+Damaged files (truncated downloads, broken or missing xref tables, wrong
+``startxref`` offsets, junk before the header) are repaired by scanning the
+whole file once for ``N G obj`` markers with a compiled byte regex, in the
+way qpdf and PDF viewers recover such files:
+
+- the last definition of an object number wins, as with incremental updates
+- objects stored in compressed object streams are found by decoding the
+  object streams met during the scan
+- the trailer is rebuilt from the last trailer (or cross-reference stream)
+  dictionary whose ``/Root`` is usable, otherwise from the last ``/Catalog``
+  found
+
+The original bytes are copied unchanged and a new cross-reference stream is
+appended, which makes the file readable again; the caller may then rewrite
+it into a clean file.
+"""
+
+import mmap
+import re
+import shutil
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, List, Optional, Set, Tuple
+
+from PyPDF2 import PdfReader
+from PyPDF2.generic import DictionaryObject, IndirectObject, StreamObject
+
+from ....common.exceptions import PDFValidationError
+from .serialization import write_xref_stream
+
+# 对象号上限（PDF 规范附录 C 的实现限制）
+MAX_OBJECT_NUMBER = 8_388_607
+
+# 文件头允许出现的范围：部分生成器会在 %PDF- 之前写入垃圾数据
+HEADER_SEARCH_LIMIT = 1024
+
+# trailer 字典的读取窗口
+TRAILER_WINDOW = 4096
+
+# 对象头之前最多回看的字节数（"8388607 65535 " 再加空白）
+OBJECT_HEADER_WINDOW = 32
+
+# 扫描只查找 obj 关键字（包括 endobj）：以字面量开头的模式由正则引擎快速跳过其余字节，
+# 对象头、对象类型和 trailer 只在每个匹配附近检查
+_OBJECT_KEYWORD = re.compile(rb"obj(?!\w)")
+_OBJECT_HEADER = re.compile(rb"(?<![\w.+-])(\d{1,10})[\s\x00]+(\d{1,5})[\s\x00]+\Z")
+_OBJECT_TYPE = re.compile(rb"/Type[\s\x00]*/(Catalog|ObjStm|XRef)(?!\w)")
+_TRAILER = re.compile(rb"(?<!\w)trailer[\s\x00]*(?=<<)")
+
+_TRAILER_REFERENCES = {
+    key: re.compile(rb"%s[\s\x00]*(\d+)[\s\x00]+(\d+)[\s\x00]+R" % re.escape(key))
+    for key in (b"/Root", b"/Info", b"/Encrypt")
+}
+_TRAILER_ID = re.compile(rb"/ID[\s\x00]*(\[[^\]]*\])")
+_TRAILER_SIZE = re.compile(rb"/Size[\s\x00]+(\d{1,10})(?!\d)")
+
+
+@dataclass
+class ScanResult:
+    """Objects and trailer candidates found by scanning a file"""
+
+    # 对象号 -> (偏移量, 生成号)，偏移量相对于文件头
+    objects: Dict[int, Tuple[int, int]] = field(default_factory=dict)
+    # 对象流的对象号（按文件中的位置排序）
+    object_streams: List[int] = field(default_factory=list)
+    # /Type /Catalog 对象的对象号（按文件中的位置排序）
+    catalogs: List[int] = field(default_factory=list)
+    # trailer 字典条目（按文件中的位置排序），值为原始字节
+    trailers: List[Dict[bytes, bytes]] = field(default_factory=list)
+    # 文件中出现过的最大对象号：包括被丢弃的截断对象、超出上限的对象头和 trailer 的 /Size
+    highest_object_number: int = 0
+    header_offset: int = 0  # %PDF- 文件头的位置，-1 表示缺失
+    has_eof_marker: bool = True
+    has_valid_startxref: bool = True  # startxref 指向交叉引用表或交叉引用流
+
+
+@dataclass
+class RepairResult:
+    """Outcome of a cross-reference reconstruction"""
+
+    objects: int  # 直接存储的对象数
+    compressed_objects: int  # 对象流中的对象数
+    encrypted: bool
+    issues: List[str] = field(default_factory=list)
+
+
+def scan_objects(data: mmap.mmap) -> ScanResult:
+    """Find object definitions and trailer candidates in a single pass
+
+    Classic trailers are only looked for between objects (after an ``endobj``
+    and before the next object header), where cross-reference tables live.
+    """
+    result = ScanResult()
+    header = data.find(b"%PDF-", 0, HEADER_SEARCH_LIMIT)
+    result.header_offset = header
+    result.has_eof_marker = data.rfind(b"%%EOF", max(0, len(data) - HEADER_SEARCH_LIMIT)) >= 0
+    shift = max(header, 0)
+
+    # 每个对象号的定义位置；后出现的定义覆盖先出现的
+    current: Optional[int] = None
+    closed = True
+    gap_start = shift
+    xref_streams = set()
+    for match in _OBJECT_KEYWORD.finditer(data):
+        start = match.start()
+        if data[start - 3 : start] == b"end":
+            closed = True
+            gap_start = match.end()
+            continue
+
+        found = _OBJECT_HEADER.search(data, max(shift, start - OBJECT_HEADER_WINDOW), start)
+        if found is None:
+            continue
+        _find_trailers(data, gap_start, found.start(), result)
+        gap_start = found.start()
+        idnum = int(found.group(1))
+        current = None
+        closed = False
+        result.highest_object_number = max(result.highest_object_number, idnum)
+        if not 0 < idnum <= MAX_OBJECT_NUMBER:
+            continue
+        current = idnum
+        result.objects[idnum] = (found.start() - shift, int(found.group(2)))
+
+        # 对象类型只在字典开头（流数据之前）查找
+        dictionary_end = data.find(b"stream", match.end(), match.end() + TRAILER_WINDOW)
+        if dictionary_end < 0:
+            dictionary_end = match.end() + TRAILER_WINDOW
+        kind = _OBJECT_TYPE.search(data, match.end(), dictionary_end)
+        if kind is None:
+            continue
+        if kind.group(1) == b"Catalog":
+            result.catalogs.append(idnum)
+        elif kind.group(1) == b"ObjStm":
+            result.object_streams.append(idnum)
+        else:
+            # 交叉引用流的字典同时是 trailer 字典
+            result.trailers.append(_trailer_entries(data, match.end()))
+            xref_streams.add(found.start())
+    _find_trailers(data, gap_start, len(data), result)
+
+    if not closed and current is not None:
+        # 文件在最后一个对象中间被截断：不完整的流对象无法读取
+        del result.objects[current]
+        for numbers in (result.catalogs, result.object_streams):
+            if numbers and numbers[-1] == current:
+                numbers.pop()
+
+    for entries in result.trailers:
+        if b"/Size" in entries:
+            size = int(entries.pop(b"/Size"))
+            result.highest_object_number = max(result.highest_object_number, size - 1)
+    result.has_valid_startxref = _startxref_valid(data, xref_streams)
+    return result
+
+
+def _find_trailers(data: mmap.mmap, start: int, end: int, result: ScanResult) -> None:
+    for match in _TRAILER.finditer(data, start, end):
+        result.trailers.append(_trailer_entries(data, match.end()))
+
+
+def _startxref_valid(data: mmap.mmap, xref_streams: Set[int]) -> bool:
+    """Whether the last startxref points to an xref table or stream"""
+    position = data.rfind(b"startxref", max(0, len(data) - HEADER_SEARCH_LIMIT))
+    if position < 0:
+        return False
+    value = data[position + 9 : position + 40].split()
+    if not value or not value[0].isdigit():
+        return False
+    offset = int(value[0])
+    return data[offset : offset + 4] == b"xref" or offset in xref_streams
+
+
+def rebuild_xref(source: BinaryIO, output: BinaryIO) -> Tuple[ScanResult, int]:
+    """Copy a damaged file and append a cross-reference stream for it
+
+    Args:
+        source: The damaged file, opened for reading
+        output: Empty binary stream
+
+    Returns:
+        The scan result, and the offset of the appended cross-reference stream
+
+    Raises:
+        PDFValidationError: if no object definitions are found
+    """
+    try:
+        data = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        raise PDFValidationError("文件为空")
+
+    try:
+        scan = scan_objects(data)
+        if not scan.objects:
+            raise PDFValidationError("未找到任何PDF对象，文件无法修复")
+
+        if scan.header_offset < 0:
+            output.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+        shift = output.tell()
+        source.seek(max(scan.header_offset, 0))
+        shutil.copyfileobj(source, output, 1 << 20)
+    finally:
+        data.close()
+
+    if shift:
+        scan.objects = {
+            idnum: (offset + shift, generation)
+            for idnum, (offset, generation) in scan.objects.items()
+        }
+    # 对象数据后可能被截断或缺少换行，新的交叉引用流另起一行
+    output.write(b"\n")
+    xref_offset = output.tell()
+    provisional = _latest_trailer(scan)
+    if b"/Root" not in provisional and scan.catalogs:
+        provisional[b"/Root"] = _reference(scan, scan.catalogs[-1])
+    write_xref_stream(output, scan.objects, provisional, xref_idnum=_xref_number(scan))
+    return scan, xref_offset
+
+
+def complete_xref(
+    output: BinaryIO, scan: ScanResult, xref_offset: int
+) -> Tuple[PdfReader, RepairResult]:
+    """Replace the appended cross-reference stream by one that also lists the
+    compressed objects and points to a usable catalog
+
+    Args:
+        output: Readable and writable stream holding the output of ``rebuild_xref``
+        scan: The scan result returned by ``rebuild_xref``
+        xref_offset: Offset returned by ``rebuild_xref``
+
+    Returns:
+        A reader over the repaired file, and what was recovered
+
+    Raises:
+        PDFValidationError: if no usable catalog is found
+    """
+    issues = []
+    if not scan.has_valid_startxref:
+        issues.append("cross_reference_table_corrupted")
+    if scan.header_offset != 0:
+        issues.append("missing_header" if scan.header_offset < 0 else "junk_before_header")
+    if not scan.has_eof_marker:
+        issues.append("missing_eof_marker")
+
+    reader, readable = _open(output)
+    encrypted = reader.is_encrypted
+    # 无法解密时对象流不可读，只能恢复直接存储的对象，目录对象也无法验证
+    compressed = _compressed_objects(reader, scan) if readable else {}
+
+    trailer = _latest_trailer(scan)
+    if compressed:
+        reader, _ = _write_xref(output, xref_offset, scan, trailer, compressed)
+
+    if readable:
+        root = _find_catalog(reader, scan, trailer.get(b"/Root"), compressed)
+    else:
+        root = trailer.get(b"/Root") or (
+            _reference(scan, scan.catalogs[-1]) if scan.catalogs else None
+        )
+    if root is None:
+        raise PDFValidationError("未找到有效的文档目录 (/Catalog)，文件无法修复")
+
+    if trailer.get(b"/Root") != root:
+        issues.append("catalog_recovered")
+        trailer[b"/Root"] = root
+        reader, _ = _write_xref(output, xref_offset, scan, trailer, compressed)
+    if readable and b"/Info" in trailer and not _is_dictionary(reader, trailer[b"/Info"]):
+        del trailer[b"/Info"]
+        reader, _ = _write_xref(output, xref_offset, scan, trailer, compressed)
+
+    return reader, RepairResult(
+        objects=len(scan.objects),
+        compressed_objects=len(compressed),
+        encrypted=encrypted,
+        issues=issues,
+    )
+
+
+def _write_xref(
+    output: BinaryIO,
+    xref_offset: int,
+    scan: ScanResult,
+    trailer: Dict[bytes, bytes],
+    compressed: Dict[int, Tuple[int, int]],
+) -> Tuple[PdfReader, bool]:
+    """Replace the appended cross-reference stream and reopen the file"""
+    output.seek(xref_offset)
+    output.truncate()
+    write_xref_stream(
+        output, scan.objects, trailer, xref_idnum=_xref_number(scan), compressed=compressed
+    )
+    return _open(output)
+
+
+def _open(output: BinaryIO) -> Tuple[PdfReader, bool]:
+    """Open the rebuilt file, and tell whether its objects can be read
+
+    Encrypted files are only readable when the user password is empty.
+    """
+    output.flush()
+    output.seek(0)
+    try:
+        reader = PdfReader(output, strict=False)
+    except Exception as e:
+        raise PDFValidationError(f"重建交叉引用后仍无法读取文件: {str(e)}")
+    if not reader.is_encrypted:
+        return reader, True
+    try:
+        return reader, bool(reader.decrypt(""))
+    except Exception:
+        # 需要密码，或缺少 AES 解密依赖
+        return reader, False
+
+
+def _trailer_entries(data: mmap.mmap, start: int) -> Dict[bytes, bytes]:
+    """Raw /Root, /Info, /Encrypt and /ID entries of the dictionary at ``start``"""
+    window = data[start : start + TRAILER_WINDOW]
+    for terminator in (b"stream", b"startxref"):
+        end = window.find(terminator)
+        if end >= 0:
+            window = window[:end]
+
+    entries: Dict[bytes, bytes] = {}
+    for key, pattern in _TRAILER_REFERENCES.items():
+        match = pattern.search(window)
+        if match:
+            entries[key] = b"%s %s R" % (match.group(1), match.group(2))
+    match = _TRAILER_ID.search(window)
+    if match:
+        entries[b"/ID"] = match.group(1)
+    match = _TRAILER_SIZE.search(window)
+    if match:
+        entries[b"/Size"] = match.group(1)
+    return entries
+
+
+def _latest_trailer(scan: ScanResult) -> Dict[bytes, bytes]:
+    """Entries of the last trailer with a /Root, plus the last /Encrypt and /ID"""
+    trailer: Dict[bytes, bytes] = {}
+    for entries in scan.trailers:
+        if b"/Root" in entries:
+            trailer = {key: value for key, value in entries.items() if key != b"/Encrypt"}
+    for entries in scan.trailers:
+        if b"/Encrypt" in entries:
+            trailer[b"/Encrypt"] = entries[b"/Encrypt"]
+            if b"/ID" in entries:
+                trailer[b"/ID"] = entries[b"/ID"]
+    return trailer
+
+
+def _xref_number(scan: ScanResult) -> int:
+    """Object number of the appended cross-reference stream
+
+    Above every object number the file uses or declares, so the stream never
+    takes the number of a dropped object still referenced elsewhere.
+    Numbers beyond the limit cannot be referenced and are clamped to it.
+    """
+    highest = max(scan.highest_object_number, *scan.objects)
+    return min(highest, MAX_OBJECT_NUMBER) + 1
+
+
+def _reference(scan: ScanResult, idnum: int) -> bytes:
+    return b"%d %d R" % (idnum, scan.objects[idnum][1])
+
+
+def _compressed_objects(reader: PdfReader, scan: ScanResult) -> Dict[int, Tuple[int, int]]:
+    """Objects stored in the object streams found by the scan
+
+    An object defined both directly and in an object stream keeps the
+    definition that comes later in the file.
+    """
+    compressed: Dict[int, Tuple[int, int]] = {}
+    for stream_idnum in scan.object_streams:
+        try:
+            stream = reader.get_object(stream_idnum)
+            if not isinstance(stream, StreamObject) or stream.get("/Type") != "/ObjStm":
+                continue
+            first = int(stream["/First"])
+            numbers = [int(value) for value in stream.get_data()[:first].split()]
+        except Exception:
+            # 损坏的对象流：其中的对象无法恢复
+            continue
+
+        stream_offset = scan.objects[stream_idnum][0]
+        for index, idnum in enumerate(numbers[0:-1:2][: int(stream.get("/N", 0))]):
+            if not 0 < idnum <= MAX_OBJECT_NUMBER or idnum == stream_idnum:
+                continue
+            direct = scan.objects.get(idnum)
+            if direct is not None and direct[0] > stream_offset:
+                continue
+            compressed[idnum] = (stream_idnum, index)
+
+    for idnum in compressed:
+        scan.objects.pop(idnum, None)
+    return compressed
+
+
+def _find_catalog(
+    reader: PdfReader,
+    scan: ScanResult,
+    trailer_root: Optional[bytes],
+    compressed: Dict[int, Tuple[int, int]],
+) -> Optional[bytes]:
+    """Reference to a usable catalog: the trailer's, or the last one found"""
+    if trailer_root is not None and _is_catalog(reader, trailer_root):
+        return trailer_root
+    for idnum in reversed(scan.catalogs):
+        if idnum in scan.objects and _is_catalog(reader, _reference(scan, idnum)):
+            return _reference(scan, idnum)
+    # 目录对象也可能位于对象流中
+    for idnum in sorted(compressed, reverse=True):
+        reference = b"%d 0 R" % idnum
+        obj = _resolve(reader, reference)
+        if isinstance(obj, DictionaryObject) and obj.get("/Type") == "/Catalog":
+            if _is_catalog(reader, reference):
+                return reference
+    return None
+
+
+def _resolve(reader: PdfReader, reference: bytes) -> Optional[object]:
+    idnum, generation, _ = reference.split()
+    try:
+        return IndirectObject(int(idnum), int(generation), reader).get_object()
+    except Exception:
+        return None
+
+
+def _is_dictionary(reader: PdfReader, reference: bytes) -> bool:
+    return isinstance(_resolve(reader, reference), DictionaryObject)
+
+
+def _is_catalog(reader: PdfReader, reference: bytes) -> bool:
+    """Whether the reference points to a catalog with a readable page tree"""
+    catalog = _resolve(reader, reference)
+    if not isinstance(catalog, DictionaryObject) or "/Pages" not in catalog:
+        return False
+    try:
+        return isinstance(catalog["/Pages"].get_object(), DictionaryObject)
+    except Exception:
+        return False
@@ -0,0 +1,129 @@
+"""
+Page resource pruning
+
+Many documents point every page at one shared ``/Resources`` dictionary that
+lists all fonts and images of the file, so a single-page output would carry
+the resources of the whole document. ``prune_page_resources`` scans the page
+content (and the content of Form XObjects and Type 3 glyphs that inherit the
+page resources) for the names it uses and keeps only those entries.
+
+The scan collects every name token in the content, which can only keep an
+unused entry (e.g. a name inside a text string), never drop a used one.
+"""
+
+import logging
+import re
+from typing import Iterable, Optional, Set
+
+from PyPDF2 import PageObject
+from PyPDF2.generic import ArrayObject, DictionaryObject, StreamObject
+
+from ....common.exceptions import PDFToolError
+
+logger = logging.getLogger(__name__)
+
+# 资源字典中按名称引用的类别
+NAMED_RESOURCE_CATEGORIES = (
+    "/Font",
+    "/XObject",
+    "/ExtGState",
+    "/ColorSpace",
+    "/Pattern",
+    "/Shading",
+    "/Properties",
+)
+
+# 内容流中的名称记号（PDF 分隔符与空白之外的字符）
+_NAME_PATTERN = re.compile(rb"/([^\s/\[\]()<>{}%]*)")
+_NAME_ESCAPE = re.compile(rb"#([0-9A-Fa-f]{2})")
+
+
+def content_names(content: bytes) -> Set[str]:
+    """All name tokens appearing in a content stream, with ``#xx`` escapes decoded"""
+    names = set()
+    for match in _NAME_PATTERN.finditer(content):
+        raw = _NAME_ESCAPE.sub(lambda m: bytes([int(m.group(1), 16)]), match.group(1))
+        names.add("/" + raw.decode("latin-1"))
+    return names
+
+
+def prune_page_resources(page: PageObject) -> Optional[DictionaryObject]:
+    """Resources of ``page`` restricted to the names its content uses
+
+    Returns None when the page has no resources or cannot be analysed, in which
+    case the original resources should be kept.
+    """
+    resources = page.get("/Resources")
+    if resources is None:
+        return None
+    resources = resources.get_object()
+    if not isinstance(resources, DictionaryObject):
+        return None
+
+    try:
+        used = content_names(_content_bytes(page.get("/Contents")))
+        used |= _inherited_names(resources, used, set())
+    except PDFToolError:
+        raise
+    except Exception as e:
+        logger.debug(f"页面内容无法解析，保留全部资源: {str(e)}")
+        return None
+
+    pruned = DictionaryObject()
+    for key, value in resources.items():
+        if key not in NAMED_RESOURCE_CATEGORIES:
+            pruned[key] = value
+            continue
+
+        category = value.get_object()
+        if not isinstance(category, DictionaryObject):
+            pruned[key] = value
+            continue
+
+        kept = DictionaryObject({name: ref for name, ref in category.items() if name in used})
+        if kept:
+            pruned[key] = kept
+    return pruned
+
+
+def _inherited_names(resources: DictionaryObject, used: Set[str], seen: Set[int]) -> Set[str]:
+    """Names used by Form XObjects and Type 3 fonts that rely on the page resources"""
+    names: Set[str] = set()
+    candidates = []
+    for category in ("/XObject", "/Font"):
+        entries = resources.get(category)
+        entries = entries.get_object() if entries is not None else None
+        if isinstance(entries, DictionaryObject):
+            candidates.extend(ref for name, ref in entries.items() if name in used)
+
+    for ref in candidates:
+        obj = ref.get_object()
+        if id(obj) in seen or not isinstance(obj, DictionaryObject):
+            continue
+        seen.add(id(obj))
+
+        if "/Resources" in obj:
+            # 自带资源字典的对象不使用页面资源
+            continue
+        if obj.get("/Subtype") == "/Form" and isinstance(obj, StreamObject):
+            found = content_names(obj.get_data())
+        elif obj.get("/Subtype") == "/Type3":
+            procs = obj.get("/CharProcs", DictionaryObject()).get_object()
+            found = set()
+            for proc in procs.values():
+                found |= content_names(proc.get_object().get_data())
+        else:
+            continue
+
+        names |= found
+        names |= _inherited_names(resources, found, seen)
+    return names
+
+
+def _content_bytes(contents: object) -> bytes:
+    """Decoded page content, concatenating content stream arrays"""
+    if contents is None:
+        return b""
+    contents = contents.get_object()  # type: ignore[attr-defined]
+    streams: Iterable = contents if isinstance(contents, ArrayObject) else [contents]
+    return b"\n".join(stream.get_object().get_data() for stream in streams)
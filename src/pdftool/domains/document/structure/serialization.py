@@ -0,0 +1,256 @@
+"""
+Low-level PDF object serialization
+
+Serializes PyPDF2 objects to PDF syntax while letting the caller decide how
+each indirect reference is written, and assembles complete files (or
+incremental update sections) from already-serialized object bodies with a
+cross-reference stream or table.
+"""
+
+import hashlib
+import os
+import zlib
+from io import BytesIO
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple
+
+from PyPDF2.generic import (
+    ArrayObject,
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+    PdfObject,
+    StreamObject,
+)
+
+# 引用写出回调：接收间接引用，写出其在输出文件中的表示
+ReferenceWriter = Callable[[IndirectObject, BinaryIO], None]
+
+# 二进制注释行，提示传输工具按二进制处理文件
+BINARY_MARKER = b"%\xe2\xe3\xcf\xd3\n"
+
+
+def write_reference(reference: IndirectObject, stream: BinaryIO) -> None:
+    """Write a reference unchanged (``N G R``)"""
+    stream.write(b"%d %d R" % (reference.idnum, reference.generation))
+
+
+# PyPDF2 的对象类基于 typing.Protocol，isinstance 检查很慢；按具体类型缓存分类结果
+REFERENCE, STREAM, DICTIONARY, ARRAY, NAME, OTHER = range(6)
+_object_kinds: Dict[type, int] = {}
+
+# 名称对象的编码结果（PyPDF2 逐字符转义，字典键几乎都是重复的名称）
+MAX_ENCODED_NAMES = 65536
+_encoded_names: Dict[str, bytes] = {}
+
+
+def object_kind(obj: object) -> int:
+    """``REFERENCE``, ``STREAM``, ``DICTIONARY``, ``ARRAY``, ``NAME`` or ``OTHER``"""
+    cls = type(obj)
+    kind = _object_kinds.get(cls)
+    if kind is None:
+        if issubclass(cls, IndirectObject):
+            kind = REFERENCE
+        elif issubclass(cls, StreamObject):
+            kind = STREAM
+        elif issubclass(cls, DictionaryObject):
+            kind = DICTIONARY
+        elif issubclass(cls, ArrayObject):
+            kind = ARRAY
+        elif issubclass(cls, NameObject):
+            kind = NAME
+        else:
+            kind = OTHER
+        _object_kinds[cls] = kind
+    return kind
+
+
+def write_object(obj: PdfObject, stream: BinaryIO, on_reference: ReferenceWriter) -> None:
+    """Write an object body, delegating every indirect reference to ``on_reference``"""
+    kind = object_kind(obj)
+    if kind == REFERENCE:
+        on_reference(obj, stream)
+    elif kind == STREAM:
+        data = obj._data
+        stream.write(b"<<")
+        for key, value in obj.items():
+            if key == "/Length":
+                continue
+            stream.write(b"\n")
+            stream.write(_encoded_name(key))
+            stream.write(b" ")
+            write_object(value, stream, on_reference)
+        stream.write(b"\n/Length %d\n>>\nstream\n" % len(data))
+        stream.write(data)
+        stream.write(b"\nendstream")
+    elif kind == DICTIONARY:
+        stream.write(b"<<")
+        for key, value in obj.items():
+            stream.write(b"\n")
+            stream.write(_encoded_name(key))
+            stream.write(b" ")
+            write_object(value, stream, on_reference)
+        stream.write(b"\n>>")
+    elif kind == ARRAY:
+        stream.write(b"[")
+        for value in obj:
+            stream.write(b" ")
+            write_object(value, stream, on_reference)
+        stream.write(b" ]")
+    elif kind == NAME:
+        stream.write(_encoded_name(obj))
+    else:
+        obj.write_to_stream(stream, None)
+
+
+def _encoded_name(name: NameObject) -> bytes:
+    encoded = _encoded_names.get(name)
+    if encoded is None:
+        buffer = BytesIO()
+        name.write_to_stream(buffer, None)
+        encoded = buffer.getvalue()
+        if len(_encoded_names) >= MAX_ENCODED_NAMES:
+            _encoded_names.clear()
+        _encoded_names[name] = encoded
+    return encoded
+
+
+def serialize_object(obj: PdfObject, on_reference: ReferenceWriter = write_reference) -> bytes:
+    """Serialize an object body to bytes"""
+    stream = BytesIO()
+    write_object(obj, stream, on_reference)
+    return stream.getvalue()
+
+
+def pdf_header(version: str = "1.5") -> bytes:
+    """File header for the given PDF version"""
+    return b"%%PDF-%s\n%s" % (version.encode("ascii"), BINARY_MARKER)
+
+
+def header_version(header: str, minimum: str = "1.5") -> str:
+    """Version from a ``%PDF-x.y`` header, raised to at least ``minimum``"""
+    version = header[5:8] if header.startswith("%PDF-") else minimum
+    try:
+        return max(version, minimum, key=lambda v: tuple(int(p) for p in v.split(".")))
+    except ValueError:
+        return minimum
+
+
+def new_file_id(*parts: bytes) -> bytes:
+    """A file identifier for the trailer ``/ID``"""
+    return hashlib.md5(b"".join(parts) + os.urandom(16)).digest()
+
+
+def write_indirect_object(
+    output: BinaryIO, idnum: int, generation: int, body: Iterable[bytes]
+) -> None:
+    """Write ``N G obj ... endobj`` around an already-serialized body"""
+    output.write(b"%d %d obj\n" % (idnum, generation))
+    for chunk in body:
+        output.write(chunk)
+    output.write(b"\nendobj\n")
+
+
+def write_xref_stream(
+    output: BinaryIO,
+    offsets: Dict[int, Tuple[int, int]],
+    trailer: Dict[bytes, bytes],
+    prev: int = -1,
+    xref_idnum: Optional[int] = None,
+    compressed: Optional[Dict[int, Tuple[int, int]]] = None,
+) -> int:
+    """Write a cross-reference stream for the given objects and return its offset
+
+    Args:
+        output: File positioned after the last object
+        offsets: Object number -> (byte offset, generation)
+        trailer: Extra trailer entries, e.g. ``{b"/Root": b"5 0 R"}``
+        prev: Offset of the previous cross-reference section (incremental updates)
+        xref_idnum: Object number of the stream itself, by default the one after
+            the highest written object; incremental updates must pass a number
+            unused by the original file
+        compressed: Object number -> (object stream number, index in the
+            stream) for objects stored in object streams
+    """
+    xref_offset = output.tell()
+    compressed = compressed or {}
+    if xref_idnum is None:
+        xref_idnum = max([*offsets, *compressed], default=0) + 1
+    rows_by_number: Dict[int, bytes] = {
+        idnum: b"\x01" + offset.to_bytes(5, "big") + generation.to_bytes(2, "big")
+        for idnum, (offset, generation) in offsets.items()
+    }
+    for idnum, (stream_idnum, position) in compressed.items():
+        rows_by_number[idnum] = (
+            b"\x02" + stream_idnum.to_bytes(5, "big") + position.to_bytes(2, "big")
+        )
+    rows_by_number[xref_idnum] = b"\x01" + xref_offset.to_bytes(5, "big") + b"\x00\x00"
+
+    rows = bytearray()
+    if prev < 0:
+        # 完整文件：从 0 号对象开始连续编号，未使用的编号写为空闲条目
+        index = [(0, xref_idnum + 1)]
+        for idnum in range(xref_idnum + 1):
+            if idnum in rows_by_number:
+                rows += rows_by_number[idnum]
+            else:
+                rows += b"\x00" * 6 + (b"\xff\xff" if idnum == 0 else b"\x00\x00")
+    else:
+        # 增量更新：只列出本次写入的对象，按连续编号分段（/Index）
+        index = _subsections(sorted(rows_by_number))
+        for idnum in sorted(rows_by_number):
+            rows += rows_by_number[idnum]
+
+    data = zlib.compress(bytes(rows))
+    output.write(b"%d 0 obj\n<<\n/Type /XRef\n/W [ 1 5 2 ]\n" % xref_idnum)
+    output.write(b"/Index [ %s ]\n" % b" ".join(b"%d %d" % pair for pair in index))
+    output.write(b"/Size %d\n" % (xref_idnum + 1))
+    for key, value in trailer.items():
+        output.write(key + b" " + value + b"\n")
+    if prev >= 0:
+        output.write(b"/Prev %d\n" % prev)
+    output.write(b"/Filter /FlateDecode\n/Length %d\n>>\nstream\n" % len(data))
+    output.write(data)
+    output.write(b"\nendstream\nendobj\nstartxref\n%d\n%%%%EOF\n" % xref_offset)
+    return xref_offset
+
+
+def write_xref_table(
+    output: BinaryIO,
+    offsets: Dict[int, Tuple[int, int]],
+    trailer: Dict[bytes, bytes],
+    size: int,
+    prev: int = -1,
+) -> int:
+    """Write a classic ``xref`` table and trailer for an incremental update
+
+    Used when the original file has a classic cross-reference table, so the
+    update stays readable by PDF 1.4 consumers. Returns the table offset.
+    """
+    xref_offset = output.tell()
+    output.write(b"xref\n")
+    numbers = sorted(offsets)
+    for start, count in _subsections(numbers):
+        output.write(b"%d %d\n" % (start, count))
+        for idnum in range(start, start + count):
+            offset, generation = offsets[idnum]
+            # 每个条目固定 20 字节
+            output.write(b"%010d %05d n\r\n" % (offset, generation))
+
+    output.write(b"trailer\n<<\n/Size %d\n" % size)
+    for key, value in trailer.items():
+        output.write(key + b" " + value + b"\n")
+    if prev >= 0:
+        output.write(b"/Prev %d\n" % prev)
+    output.write(b">>\nstartxref\n%d\n%%%%EOF\n" % xref_offset)
+    return xref_offset
+
+
+def _subsections(numbers: List[int]) -> List[Tuple[int, int]]:
+    """(first, count) runs of consecutive object numbers from a sorted list"""
+    runs: List[Tuple[int, int]] = []
+    for idnum in numbers:
+        if runs and runs[-1][0] + runs[-1][1] == idnum:
+            runs[-1] = (runs[-1][0], runs[-1][1] + 1)
+        else:
+            runs.append((idnum, 1))
+    return runs
@@ -0,0 +1,325 @@
+"""
+Page subset writer with a shared serialized-object cache
+
+Writing many outputs from one document (one file per page, chunks...) with
+separate ``PdfWriter`` instances walks and re-encodes the shared fonts, images
+and color spaces once per output. ``PageSubsetWriter`` encodes each object
+once per split and later outputs copy the cached bytes.
+
+Every output is numbered densely from 1, so object numbers differ between
+outputs: references are kept as slots in the cached encoding and filled in
+per output with the referenced object's number in that output. References
+to page tree objects the output does not contain (other pages, ``/Pages``
+nodes, the catalog) become ``null``.
+"""
+
+import threading
+from collections import deque
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from PyPDF2 import PageObject, PdfReader
+from PyPDF2.generic import DictionaryObject, IndirectObject, NameObject
+
+from ....common.exceptions import PDFProcessingError
+from .outline import OutlineItem, outline_objects
+from .resources import prune_page_resources
+from .serialization import (
+    header_version,
+    pdf_header,
+    write_indirect_object,
+    write_object,
+    write_xref_stream,
+)
+
+# 依赖输出页面集合的对象类型，序列化时以占位符代替
+STRUCTURAL_TYPES = ("/Page", "/Pages", "/Catalog")
+
+# 页面字典中不复制的键（/Parent 由输出文件的页面树替换）
+EXCLUDED_PAGE_KEYS = ("/Parent", "/StructParents")
+
+# 输出文件中交叉引用、页面树根节点等固定开销的估计值
+OUTPUT_OVERHEAD = 512
+
+# 输出格式版本：写出的字节发生变化时递增（用于缓存校验，如单页 PDF 的 ETag）
+OUTPUT_FORMAT_VERSION = 2
+
+
+@dataclass(frozen=True)
+class SerializedObject:
+    """Cached encoding of one indirect object
+
+    ``segments`` interleave with ``slots``: the body is
+    ``segments[0] + slot(0) + segments[1] + ...`` where each slot is the source
+    object number of a reference, resolved per output. ``references`` are the
+    referenced objects an output must contain (everything but the page tree).
+    """
+
+    segments: Tuple[bytes, ...]
+    slots: Tuple[int, ...]
+    references: Tuple[Tuple[int, int], ...]
+
+    @property
+    def size(self) -> int:
+        """Approximate bytes the object adds to an output
+
+        Includes the ``N G obj``/``endobj`` wrapper, resolved slots and the
+        object's cross-reference row.
+        """
+        return sum(len(segment) for segment in self.segments) + 12 * len(self.slots) + 48
+
+    def body(self, numbers: Dict[int, int]) -> List[bytes]:
+        """Body chunks with slots resolved through ``numbers`` (source -> output number)
+
+        References to objects missing from the output become ``null``.
+        """
+        if not self.slots:
+            return list(self.segments)
+        chunks = [self.segments[0]]
+        for idnum, segment in zip(self.slots, self.segments[1:]):
+            number = numbers.get(idnum)
+            chunks.append(b"%d 0 R" % number if number is not None else b"null")
+            chunks.append(segment)
+        return chunks
+
+
+class SerializedObjectCache:
+    """Serialized objects of one source document, shared by all its outputs"""
+
+    def __init__(self, reader: PdfReader, prune_resources: bool = False):
+        self.reader = reader
+        self.prune_resources = prune_resources
+        self.next_object_number = next_object_number(reader)
+        self._objects: Dict[int, SerializedObject] = {}
+        self._structural: Dict[int, bool] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def pages_root_number(self) -> int:
+        """Object number of the ``/Pages`` root written into every output"""
+        return self.next_object_number
+
+    @property
+    def catalog_number(self) -> int:
+        """Object number of the catalog written into every output"""
+        return self.next_object_number + 1
+
+    def get(self, reference: IndirectObject) -> SerializedObject:
+        """Serialized form of a (non page tree) indirect object"""
+        with self._lock:
+            cached = self._objects.get(reference.idnum)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            self.misses += 1
+            serialized = self._serialize(reference.get_object())
+            self._objects[reference.idnum] = serialized
+            return serialized
+
+    def get_page(self, page: PageObject) -> SerializedObject:
+        """Serialized form of a page dictionary, re-parented to the output page tree"""
+        reference = page.indirect_reference
+        with self._lock:
+            if reference is not None and reference.idnum in self._objects:
+                self.hits += 1
+                return self._objects[reference.idnum]
+            self.misses += 1
+            page_dict = DictionaryObject(
+                {key: value for key, value in page.items() if key not in EXCLUDED_PAGE_KEYS}
+            )
+            page_dict[NameObject("/Parent")] = IndirectObject(self.pages_root_number, 0, None)
+            if self.prune_resources:
+                resources = prune_page_resources(page)
+                if resources is not None:
+                    page_dict[NameObject("/Resources")] = resources
+            serialized = self._serialize(page_dict)
+            if reference is not None:
+                self._objects[reference.idnum] = serialized
+            return serialized
+
+    def is_structural(self, reference: IndirectObject) -> bool:
+        """Whether a reference points into the page tree (page, node or catalog)"""
+        with self._lock:
+            structural = self._structural.get(reference.idnum)
+            if structural is None:
+                if reference.idnum >= self.next_object_number:
+                    # 输出文件自身的页面树对象
+                    structural = False
+                else:
+                    target = reference.get_object()
+                    structural = (
+                        isinstance(target, DictionaryObject)
+                        and target.get("/Type") in STRUCTURAL_TYPES
+                    )
+                self._structural[reference.idnum] = structural
+            return structural
+
+    def _serialize(self, obj: object) -> SerializedObject:
+        segments: List[bytes] = []
+        slots: List[int] = []
+        references: List[Tuple[int, int]] = []
+        buffer = BytesIO()
+
+        def on_reference(reference: IndirectObject, stream: BinaryIO) -> None:
+            segments.append(buffer.getvalue())
+            buffer.seek(0)
+            buffer.truncate()
+            slots.append(reference.idnum)
+            if reference.idnum < self.next_object_number and not self.is_structural(reference):
+                references.append((reference.idnum, reference.generation))
+
+        write_object(obj, buffer, on_reference)  # type: ignore[arg-type]
+        segments.append(buffer.getvalue())
+        return SerializedObject(
+            segments=tuple(segments),
+            slots=tuple(slots),
+            references=tuple(dict.fromkeys(references)),
+        )
+
+
+class PageSubsetWriter:
+    """Write documents made of a subset of the source pages"""
+
+    def __init__(
+        self,
+        reader: PdfReader,
+        cache: Optional[SerializedObjectCache] = None,
+        prune_resources: bool = False,
+    ):
+        self.reader = reader
+        self.cache = cache or SerializedObjectCache(reader, prune_resources=prune_resources)
+        self.version = header_version(reader.pdf_header)
+
+    def collect(self, pages: Sequence[PageObject]) -> Dict[int, SerializedObject]:
+        """Serialized page dictionaries and every object reachable from them"""
+        objects: Dict[int, SerializedObject] = {}
+        pending: deque = deque()
+
+        for page in pages:
+            if page.indirect_reference is None:
+                raise PDFProcessingError("页面缺少间接引用，无法写出")
+            serialized = self.cache.get_page(page)
+            objects[page.indirect_reference.idnum] = serialized
+            pending.extend(serialized.references)
+
+        while pending:
+            idnum, generation = pending.popleft()
+            if idnum in objects:
+                continue
+            serialized = self.cache.get(IndirectObject(idnum, generation, self.reader))
+            objects[idnum] = serialized
+            pending.extend(serialized.references)
+
+        return objects
+
+    def estimate_size(self, pages: Sequence[PageObject]) -> int:
+        """Approximate size in bytes of an output containing ``pages``"""
+        objects = self.collect(pages)
+        return sum(obj.size for obj in objects.values()) + OUTPUT_OVERHEAD
+
+    def pack_by_size(self, pages: Sequence[PageObject], max_bytes: int) -> List[List[int]]:
+        """Group consecutive pages into outputs estimated to stay below ``max_bytes``
+
+        Each page's size is estimated from the serialized objects it reaches;
+        objects shared with pages already in the current group are counted once.
+        A page that exceeds the limit on its own gets a group of its own.
+
+        Returns:
+            Groups of indices into ``pages``
+        """
+        groups: List[List[int]] = []
+        current: List[int] = []
+        current_objects: Set[int] = set()
+        current_size = OUTPUT_OVERHEAD
+
+        for index, page in enumerate(pages):
+            objects = self.collect([page])
+            added = sum(obj.size for idnum, obj in objects.items() if idnum not in current_objects)
+            if current and current_size + added > max_bytes:
+                groups.append(current)
+                current, current_objects, current_size = [], set(), OUTPUT_OVERHEAD
+                added = sum(obj.size for obj in objects.values())
+
+            current.append(index)
+            current_objects.update(objects)
+            current_size += added
+
+        if current:
+            groups.append(current)
+        return groups
+
+    def write(
+        self,
+        pages: Sequence[PageObject],
+        output_file: Path,
+        outline: Optional[Sequence[OutlineItem]] = None,
+    ) -> Path:
+        """Write the given pages, in order, to ``output_file``"""
+        with open(output_file, "wb") as output:
+            self.write_to_stream(pages, output, outline)
+        return output_file
+
+    def write_to_stream(
+        self,
+        pages: Sequence[PageObject],
+        output: BinaryIO,
+        outline: Optional[Sequence[OutlineItem]] = None,
+    ) -> None:
+        """Write the given pages, in order, to an empty binary stream
+
+        ``outline`` bookmarks pointing to pages outside the output are dropped.
+        """
+        objects = self.collect(pages)
+        page_sources = [page.indirect_reference.idnum for page in pages]  # type: ignore[union-attr]
+
+        # 按输出连续编号：页面在前（按输出顺序），其余对象按源对象号
+        numbers: Dict[int, int] = {}
+        for idnum in [*page_sources, *sorted(objects)]:
+            numbers.setdefault(idnum, len(numbers) + 1)
+        pages_root = len(numbers) + 1
+        catalog = pages_root + 1
+        numbers[self.cache.pages_root_number] = pages_root
+        offsets: Dict[int, Tuple[int, int]] = {}
+
+        output.write(pdf_header(self.version))
+        for idnum in sorted(objects, key=numbers.__getitem__):
+            number = numbers[idnum]
+            offsets[number] = (output.tell(), 0)
+            write_indirect_object(output, number, 0, objects[idnum].body(numbers))
+
+        kids = b" ".join(b"%d 0 R" % numbers[idnum] for idnum in page_sources)
+
+        offsets[pages_root] = (output.tell(), 0)
+        write_indirect_object(
+            output,
+            pages_root,
+            0,
+            [b"<<\n/Type /Pages\n/Count %d\n/Kids [ %s ]\n>>" % (len(page_sources), kids)],
+        )
+        catalog_entries = b"/Type /Catalog\n/Pages %d 0 R" % pages_root
+        page_numbers = {idnum: numbers[idnum] for idnum in page_sources}
+        bookmarks = outline_objects(outline, page_numbers, catalog + 1) if outline else []
+        for idnum, body in bookmarks:
+            offsets[idnum] = (output.tell(), 0)
+            write_indirect_object(output, idnum, 0, [body])
+        if bookmarks:
+            catalog_entries += b"\n/Outlines %d 0 R\n/PageMode /UseOutlines" % (catalog + 1)
+
+        offsets[catalog] = (output.tell(), 0)
+        write_indirect_object(output, catalog, 0, [b"<<\n%s\n>>" % catalog_entries])
+
+        write_xref_stream(output, offsets, {b"/Root": b"%d 0 R" % catalog})
+
+
+def next_object_number(reader: PdfReader) -> int:
+    """First object number not used by the source document"""
+    numbers: Iterable[int] = [
+        int(reader.trailer.get("/Size", 0)) - 1,
+        *reader.xref_objStm.keys(),
+        *(idnum for entries in reader.xref.values() for idnum in entries),
+    ]
+    return max(numbers, default=0) + 1
@@ -12,7 +12,7 @@ from ...config.settings import settings
 from .middleware.cors import setup_cors
 from .middleware.error_handler import ErrorHandlerMiddleware, setup_error_handlers
 from .middleware.logging import setup_logging_middleware
-from .routers import docs, health, pdf, web
+from .routers import docs, documents, health, pdf, web
 
 # 设置日志
 setup_logging()
@@ -79,6 +79,9 @@ def setup_routers(app: FastAPI) -> None:
     # API路由
     app.include_router(pdf.router)
 
+    # 文档存储路由
+    app.include_router(documents.router)
+
     # 健康检查路由
     app.include_router(health.router)
 
@@ -2,6 +2,9 @@
 FastAPI依赖注入
 """
 
+import csv
+import io
+import json
 from pathlib import Path
 
 from fastapi import HTTPException, status
@@ -73,6 +76,35 @@ def parse_page_list(pages: str) -> list[int]:
     return page_list
 
 
+def parse_recipients(text: str) -> list[dict[str, str]]:
+    """解析接收者列表：JSON 对象数组，或首行为字段名的 CSV
+
+    Raises:
+        ValueError: 内容无法解析、条目不是字段映射或 CSV 行的列数多于表头
+    """
+    text = text.strip()
+    if text.startswith("["):
+        records = json.loads(text)
+        if not all(isinstance(record, dict) for record in records):
+            raise ValueError("JSON 接收者列表的每一项必须是对象")
+        return [
+            {str(key): "" if value is None else str(value) for key, value in record.items()}
+            for record in records
+        ]
+
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames:
+        raise ValueError("CSV 接收者列表缺少表头")
+    fieldnames = reader.fieldnames
+    recipients = []
+    for row in reader:
+        # 多出表头的值被 DictReader 放在 None 键下
+        if None in row:
+            raise ValueError(f"CSV 接收者列表第 {reader.line_num} 行的列数多于表头")
+        recipients.append({name.strip(): (row.get(name) or "").strip() for name in fieldnames})
+    return recipients
+
+
 class CommonQueryParams:
     """通用查询参数"""
 
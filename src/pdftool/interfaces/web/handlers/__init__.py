@@ -2,14 +2,30 @@
 API service handlers package
 """
 
+from .append import AppendServiceHandler
+from .bulk_watermark import BulkWatermarkServiceHandler
+from .compress import CompressServiceHandler
+from .distribution import PasswordDistributionServiceHandler
+from .documents import DocumentServiceHandler
 from .info import InfoServiceHandler
 from .merge import MergeServiceHandler
+from .metadata import MetadataServiceHandler
+from .optimize import OptimizeServiceHandler
+from .repair import RepairServiceHandler
 from .split import SplitServiceHandler
 from .watermark import WatermarkServiceHandler
 
 __all__ = [
+    "AppendServiceHandler",
+    "BulkWatermarkServiceHandler",
+    "CompressServiceHandler",
+    "DocumentServiceHandler",
     "InfoServiceHandler",
     "MergeServiceHandler",
+    "MetadataServiceHandler",
+    "OptimizeServiceHandler",
+    "PasswordDistributionServiceHandler",
+    "RepairServiceHandler",
     "SplitServiceHandler",
     "WatermarkServiceHandler",
 ]
@@ -0,0 +1,55 @@
+"""
+Append service handler
+"""
+
+from typing import List
+
+from fastapi import HTTPException, UploadFile
+
+from ....common.exceptions import PDFToolError
+from ....common.models import AppendOptions, OperationResult
+from ....common.utils.logging import get_logger
+from ....domains.document.operations import AppendOperation
+from ..interfaces import BaseServiceHandler
+from ..schemas.requests import PDFAppendRequest
+
+logger = get_logger("api.handlers.append")
+
+
+class AppendServiceHandler(BaseServiceHandler):
+    """Service handler for appending pages to an existing PDF"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.append_operation = AppendOperation()
+
+    @property
+    def service_name(self) -> str:
+        return "append"
+
+    async def handle(self, files: List[UploadFile], request: PDFAppendRequest) -> OperationResult:
+        """Handle PDF append request (the first file is the base document)"""
+        if len(files) < 2:
+            raise HTTPException(status_code=400, detail="需要一个基础文件和至少一个待追加文件")
+
+        try:
+            # Save all uploaded files using tracked method
+            temp_files = []
+            for file in files:
+                temp_path = await self.save_upload_file_tracked(file)
+                temp_files.append(temp_path)
+
+            # 不原地追加：增量更新失败时需要回退到完整合并
+            options = AppendOptions(incremental=request.incremental, in_place=False)
+
+            result = self.append_operation.execute(temp_files, options)
+
+            logger.info(f"PDF追加成功: {len(files) - 1}个文件")
+            return result
+
+        except PDFToolError as e:
+            logger.error(f"PDF追加失败: {str(e)}")
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"PDF追加异常: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"追加PDF页面时出错: {str(e)}")
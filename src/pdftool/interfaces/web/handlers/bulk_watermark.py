@@ -0,0 +1,79 @@
+"""
+Bulk watermark service handler
+"""
+
+from pathlib import Path
+from typing import List
+
+from fastapi import HTTPException, UploadFile
+
+from ....common.exceptions import PDFToolError
+from ....common.models import (
+    BulkWatermarkOptions,
+    OperationResult,
+    WatermarkOptions,
+    WatermarkPosition,
+    WatermarkType,
+)
+from ....common.utils.logging import get_logger
+from ....domains.document.operations import BulkWatermarkOperation
+from ..interfaces import BaseServiceHandler
+from ..schemas.requests import BulkWatermarkRequest
+from .watermark import page_selection_options
+
+logger = get_logger("api.handlers.bulk_watermark")
+
+
+class BulkWatermarkServiceHandler(BaseServiceHandler):
+    """Service handler for per-recipient personalized watermarks"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.bulk_watermark_operation = BulkWatermarkOperation()
+
+    @property
+    def service_name(self) -> str:
+        return "bulk_watermark"
+
+    async def handle(
+        self, files: List[UploadFile], request: BulkWatermarkRequest, *args, **kwargs
+    ) -> OperationResult:
+        """Handle bulk watermark request"""
+        if len(files) != 1:
+            raise HTTPException(status_code=400, detail="只能处理一个PDF文件")
+
+        file = files[0]
+        try:
+            # Save uploaded file using tracked method
+            temp_input = await self.save_upload_file_tracked(file)
+
+            page_selection, specific_pages = page_selection_options(request)
+            options = BulkWatermarkOptions(
+                watermark=WatermarkOptions(
+                    watermark_type=WatermarkType.TEXT,
+                    position=WatermarkPosition(request.position.value),
+                    opacity=request.opacity,
+                    text=request.watermark_text,
+                    font_size=request.font_size,
+                    font_color=request.font_color,
+                    page_selection=page_selection,
+                    specific_pages=specific_pages,
+                ),
+                recipients=request.recipients,
+                name_field=request.name_field,
+                # 副本写入本次请求的目录，下载完成后连同压缩包一起删除
+                output_dir=self.create_request_dir("bulk_watermark"),
+                filename_prefix=Path(file.filename or "document").stem,
+            )
+
+            result = self.bulk_watermark_operation.execute(temp_input, options)
+
+            logger.info(f"批量水印成功: {file.filename}, 接收者 {len(request.recipients)} 个")
+            return result
+
+        except PDFToolError as e:
+            logger.error(f"批量水印失败: {str(e)}")
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"批量水印异常: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"批量添加水印时出错: {str(e)}")
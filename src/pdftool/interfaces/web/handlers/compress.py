@@ -0,0 +1,89 @@
+"""
+Compress service handler
+"""
+
+import time
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, UploadFile
+
+from ....common.exceptions import PDFToolError
+from ....common.models import CompressionLevel, CompressOptions, OperationResult
+from ....common.utils.logging import get_logger
+from ....domains.document.operations import CompressOperation
+from ....domains.document.operations.compress import compression_ratio
+from ..interfaces import BaseServiceHandler
+from ..schemas.requests import PDFCompressRequest
+from ..schemas.responses import PDFCompressResponse
+
+logger = get_logger("api.handlers.compress")
+
+
+class CompressServiceHandler(BaseServiceHandler):
+    """Service handler for PDF compression
+
+    The handler is created per request; after ``handle`` the size and timing
+    of the compression are available as ``compress_response``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.compress_operation = CompressOperation()
+        self.compress_response: Optional[PDFCompressResponse] = None
+
+    @property
+    def service_name(self) -> str:
+        return "compress"
+
+    async def handle(self, files: List[UploadFile], request: PDFCompressRequest) -> OperationResult:
+        """Handle PDF compress request"""
+        if len(files) != 1:
+            raise HTTPException(status_code=400, detail="只能处理一个PDF文件")
+
+        file = files[0]
+
+        try:
+            # 保存输入文件，使用跟踪机制
+            temp_input = await self.save_upload_file_tracked(file)
+
+            options = CompressOptions(
+                level=CompressionLevel(request.compression_level.value),
+                image_quality=request.image_quality,
+                max_image_dpi=request.max_image_dpi,
+                remove_metadata=request.remove_metadata,
+                remove_bookmarks=request.remove_bookmarks,
+            )
+
+            start = time.perf_counter()
+            result = self.compress_operation.execute(temp_input, options)
+            elapsed = time.perf_counter() - start
+
+            original_size = temp_input.stat().st_size
+            compressed_size = result.output_files[0].stat().st_size
+            self.compress_response = PDFCompressResponse(
+                original_size=original_size,
+                compressed_size=compressed_size,
+                compression_ratio=compression_ratio(original_size, compressed_size),
+                processing_time=f"{elapsed:.1f}s",
+            )
+
+            logger.info(f"PDF压缩成功: {file.filename}, {result.details}")
+            return result
+
+        except PDFToolError as e:
+            logger.error(f"PDF压缩失败: {str(e)}")
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"PDF压缩异常: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"压缩PDF时出错: {str(e)}")
+
+    def response_headers(self) -> Dict[str, str]:
+        """Compression statistics as download response headers"""
+        if self.compress_response is None:
+            return {}
+        return {
+            "X-Original-Size": str(self.compress_response.original_size),
+            "X-Compressed-Size": str(self.compress_response.compressed_size),
+            "X-Compression-Ratio": self.compress_response.compression_ratio,
+            "X-Processing-Time": self.compress_response.processing_time,
+        }
@@ -0,0 +1,70 @@
+"""
+Password distribution service handler
+"""
+
+from pathlib import Path
+from typing import List
+
+from fastapi import HTTPException, UploadFile
+
+from ....common.exceptions import PDFToolError
+from ....common.models import (
+    OperationResult,
+    PasswordDistributionOptions,
+    RecipientProtection,
+)
+from ....common.utils.logging import get_logger
+from ....domains.document.operations import PasswordDistributionOperation
+from ..interfaces import BaseServiceHandler
+from ..schemas.requests import PasswordDistributionRequest
+from .password import protection_options
+
+logger = get_logger("api.handlers.distribution")
+
+
+class PasswordDistributionServiceHandler(BaseServiceHandler):
+    """Service handler for per-recipient encrypted distribution"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.distribution_operation = PasswordDistributionOperation()
+
+    @property
+    def service_name(self) -> str:
+        return "distribution"
+
+    async def handle(
+        self, files: List[UploadFile], request: PasswordDistributionRequest, *args, **kwargs
+    ) -> OperationResult:
+        """Handle per-recipient encrypted distribution request"""
+        if len(files) != 1:
+            raise HTTPException(status_code=400, detail="只能处理一个PDF文件")
+
+        file = files[0]
+        try:
+            # Save uploaded file using tracked method
+            temp_input = await self.save_upload_file_tracked(file)
+
+            options = PasswordDistributionOptions(
+                recipients=[
+                    RecipientProtection(
+                        name=recipient.name, protection=protection_options(recipient)
+                    )
+                    for recipient in request.recipients
+                ],
+                # 副本写入本次请求的目录，下载完成后连同压缩包一起删除
+                output_dir=self.create_request_dir("distribution"),
+                filename_prefix=Path(file.filename or "document").stem,
+            )
+
+            result = self.distribution_operation.execute(temp_input, options)
+
+            logger.info(f"分发加密成功: {file.filename}, 接收者 {len(request.recipients)} 个")
+            return result
+
+        except PDFToolError as e:
+            logger.error(f"分发加密失败: {str(e)}")
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"分发加密异常: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"分发加密时出错: {str(e)}")
@@ -0,0 +1,130 @@
+"""
+Document store service handler
+"""
+
+import json
+from typing import List, Optional
+
+from fastapi import HTTPException, Response, UploadFile
+
+from ....common.exceptions import PDFFileNotFoundError, PDFToolError
+from ....common.models import OperationResult
+from ....common.utils.logging import get_logger
+from ....domains.document.store import DocumentStore, page_etag
+from ..interfaces import BaseServiceHandler
+from ..schemas.responses import DocumentResponse, PageBoxResponse
+
+logger = get_logger("api.handlers.documents")
+
+# 已存储文档的内容不会改变，页面可由客户端长期缓存
+PAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class DocumentServiceHandler(BaseServiceHandler):
+    """Service handler for stored documents"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.store = DocumentStore()
+
+    @property
+    def service_name(self) -> str:
+        return "documents"
+
+    async def handle(
+        self, files: List[UploadFile], request: Optional[object] = None, *args, **kwargs
+    ) -> OperationResult:
+        """Store an uploaded document and index it"""
+        if len(files) != 1:
+            raise HTTPException(status_code=400, detail="只能处理一个PDF文件")
+
+        file = files[0]
+        try:
+            temp_file = await self.save_upload_file_tracked(file)
+            document_id = self.store.add(temp_file)
+            logger.info(f"存储文档成功: {file.filename} -> {document_id}")
+
+            return OperationResult(
+                success=True,
+                message="文档存储成功",
+                output_files=[],
+                details=json.dumps(self.describe(document_id).model_dump()),
+            )
+
+        except HTTPException:
+            raise
+        except PDFToolError as e:
+            logger.error(f"存储文档失败: {str(e)}")
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"存储文档异常: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"存储文档时出错: {str(e)}")
+        finally:
+            # 文档已复制到存储目录，上传的临时文件不再需要
+            self._cleanup_files(self._temp_files_registry)
+
+    def describe(self, document_id: str) -> DocumentResponse:
+        """Page count and page boxes of a stored document, from its index"""
+        try:
+            index = self.store.index(document_id)
+        except PDFFileNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        except PDFToolError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        if not index.has_pages:
+            return DocumentResponse(id=document_id, file_size=index.file_size, encrypted=True)
+        return DocumentResponse(
+            id=document_id,
+            file_size=index.file_size,
+            encrypted=False,
+            pages=index.page_count,
+            page_boxes=[
+                PageBoxResponse(
+                    media_box=list(index.media_box(page)), crop_box=list(index.crop_box(page))
+                )
+                for page in range(index.page_count)
+            ],
+        )
+
+    def page(
+        self, document_id: str, page_number: int, if_none_match: Optional[str] = None
+    ) -> Response:
+        """One page of a stored document as a PDF, or 304 when the client has it"""
+        try:
+            page_count = self.store.page_count(document_id)
+            if not 1 <= page_number <= page_count:
+                raise HTTPException(
+                    status_code=404, detail=f"页面 {page_number} 超出范围 (1-{page_count})"
+                )
+
+            etag = page_etag(document_id, page_number)
+            headers = {"ETag": etag, "Cache-Control": PAGE_CACHE_CONTROL}
+            if if_none_match and _etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers=headers)
+
+            content = self.store.page_pdf(document_id, page_number)
+            headers["Content-Disposition"] = f'inline; filename="page_{page_number}.pdf"'
+            return Response(content=content, media_type="application/pdf", headers=headers)
+
+        except HTTPException:
+            raise
+        except PDFFileNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        except PDFToolError as e:
+            logger.error(f"提取页面失败: {str(e)}")
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"提取页面异常: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"提取页面时出错: {str(e)}")
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an ``If-None-Match`` header value lists ``etag`` (or is ``*``)"""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in ("*", etag):
+            return True
+    return False
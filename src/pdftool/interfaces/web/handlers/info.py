@@ -2,16 +2,18 @@
 Info service handler
 """
 
-from typing import List
+from dataclasses import asdict
+from typing import List, Optional
 
 from fastapi import HTTPException, UploadFile
 
 from ....common.exceptions import PDFToolError
-from ....common.models import OperationResult
+from ....common.models import InfoOptions, OperationResult
 from ....common.utils.logging import get_logger
 from ....domains.document.operations import InfoOperation
 from ..interfaces import BaseServiceHandler
-from ..schemas.responses import PDFInfoResponse
+from ..schemas.requests import PDFInfoRequest
+from ..schemas.responses import DocumentAnalysisResponse, PDFInfoResponse
 
 logger = get_logger("api.handlers.info")
 
@@ -28,7 +30,7 @@ class InfoServiceHandler(BaseServiceHandler):
         return "info"
 
     async def handle(
-        self, files: List[UploadFile], request=None, *args, **kwargs
+        self, files: List[UploadFile], request: Optional[PDFInfoRequest] = None, *args, **kwargs
     ) -> OperationResult:
         """Handle PDF info request"""
         if len(files) != 1:
@@ -40,11 +42,8 @@ class InfoServiceHandler(BaseServiceHandler):
             temp_file = await self.save_upload_file_tracked(file)
 
             # Get PDF info
-            pdf_info = self.info_operation.execute(temp_file)
-
-            # Get file size
-            content = await file.read()
-            file_size = len(content)
+            options = InfoOptions(analyze=request.analyze if request else False)
+            pdf_info = self.info_operation.execute(temp_file, options)
 
             logger.info(f"获取PDF信息成功: {file.filename}")
 
@@ -54,7 +53,14 @@ class InfoServiceHandler(BaseServiceHandler):
                 title=pdf_info.title,
                 author=pdf_info.author,
                 creation_date=str(pdf_info.creation_date) if pdf_info.creation_date else None,
-                file_size=file_size,
+                file_size=pdf_info.file_size,
+                analysis=(
+                    DocumentAnalysisResponse(
+                        **asdict(pdf_info.analysis), content_type=pdf_info.analysis.content_type
+                    )
+                    if pdf_info.analysis
+                    else None
+                ),
             )
 
             # 返回 OperationResult，将响应数据放在 details 中
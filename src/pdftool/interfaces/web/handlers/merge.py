@@ -44,6 +44,9 @@ class MergeServiceHandler(BaseServiceHandler):
             if request:
                 options.preserve_bookmarks = request.preserve_bookmarks
                 options.preserve_metadata = request.preserve_metadata
+                options.tree_merge = request.tree_merge
+                options.optimize = request.optimize
+                options.linearize = request.linearize
 
             # Execute merge operation
             result = self.merge_operation.execute(temp_files, options)
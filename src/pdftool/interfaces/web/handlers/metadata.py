@@ -0,0 +1,62 @@
+"""
+Metadata edit service handler
+"""
+
+from typing import List
+
+from fastapi import HTTPException, UploadFile
+
+from ....common.exceptions import PDFToolError
+from ....common.models import MetadataOptions, OperationResult
+from ....common.utils.logging import get_logger
+from ....domains.document.operations import MetadataOperation
+from ..interfaces import BaseServiceHandler
+from ..schemas.requests import MetadataRequest
+
+logger = get_logger("api.handlers.metadata")
+
+
+class MetadataServiceHandler(BaseServiceHandler):
+    """Service handler for PDF metadata edit operations"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metadata_operation = MetadataOperation()
+
+    @property
+    def service_name(self) -> str:
+        return "metadata"
+
+    async def handle(
+        self, files: List[UploadFile], request: MetadataRequest, *args, **kwargs
+    ) -> OperationResult:
+        """Handle PDF metadata edit request"""
+        if len(files) != 1:
+            raise HTTPException(status_code=400, detail="只能处理一个PDF文件")
+
+        file = files[0]
+        try:
+            # Save uploaded file using tracked method
+            temp_input = await self.save_upload_file_tracked(file)
+
+            options = MetadataOptions(
+                title=request.title,
+                author=request.author,
+                subject=request.subject,
+                keywords=request.keywords,
+                creator=request.creator,
+                producer=request.producer,
+                incremental=request.incremental,
+            )
+
+            result = self.metadata_operation.execute(temp_input, options)
+
+            logger.info(f"元数据更新成功: {file.filename}")
+            return result
+
+        except PDFToolError as e:
+            logger.error(f"元数据更新失败: {str(e)}")
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"元数据更新异常: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"更新元数据时出错: {str(e)}")
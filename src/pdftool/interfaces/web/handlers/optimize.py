@@ -0,0 +1,69 @@
+"""
+Optimize service handler
+"""
+
+from typing import Dict, List
+
+from fastapi import HTTPException, UploadFile
+
+from ....common.exceptions import PDFToolError
+from ....common.models import OperationResult, OptimizeOptions
+from ....common.utils.logging import get_logger
+from ....domains.document.operations import OptimizeOperation
+from ..interfaces import BaseServiceHandler
+from ..schemas.requests import PDFOptimizeRequest
+
+logger = get_logger("api.handlers.optimize")
+
+
+class OptimizeServiceHandler(BaseServiceHandler):
+    """Service handler for structural PDF optimization
+
+    The handler is created per request; after ``handle`` the sizes before and
+    after optimization are available through ``response_headers``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.optimize_operation = OptimizeOperation()
+        self.sizes: Dict[str, int] = {}
+
+    @property
+    def service_name(self) -> str:
+        return "optimize"
+
+    async def handle(self, files: List[UploadFile], request: PDFOptimizeRequest) -> OperationResult:
+        """Handle PDF optimize request"""
+        if len(files) != 1:
+            raise HTTPException(status_code=400, detail="只能处理一个PDF文件")
+
+        file = files[0]
+
+        try:
+            # 保存输入文件，使用跟踪机制
+            temp_input = await self.save_upload_file_tracked(file)
+
+            options = OptimizeOptions(
+                object_streams=request.object_streams,
+                deduplicate=request.deduplicate,
+            )
+            result = self.optimize_operation.execute(temp_input, options)
+
+            self.sizes = {
+                "X-Original-Size": temp_input.stat().st_size,
+                "X-Optimized-Size": result.output_files[0].stat().st_size,
+            }
+
+            logger.info(f"PDF结构优化成功: {file.filename}, {result.details}")
+            return result
+
+        except PDFToolError as e:
+            logger.error(f"PDF结构优化失败: {str(e)}")
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"PDF结构优化异常: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"优化PDF时出错: {str(e)}")
+
+    def response_headers(self) -> Dict[str, str]:
+        """File sizes before and after optimization as download response headers"""
+        return {name: str(size) for name, size in self.sizes.items()}
@@ -7,7 +7,11 @@ from typing import List
 from fastapi import HTTPException, UploadFile
 
 from ....common.exceptions import PDFToolError
-from ....common.models import OperationResult, PasswordProtectionOptions
+from ....common.models import (
+    EncryptionAlgorithm,
+    OperationResult,
+    PasswordProtectionOptions,
+)
 from ....common.utils.logging import get_logger
 from ....domains.document.operations import PasswordProtectionOperation
 from ..interfaces import BaseServiceHandler
@@ -40,18 +44,7 @@ class PasswordProtectionServiceHandler(BaseServiceHandler):
             temp_input = await self.save_upload_file_tracked(file)
 
             # Create password protection options
-            options = PasswordProtectionOptions(
-                user_password=request.user_password,
-                owner_password=request.owner_password,
-                allow_printing=request.allow_printing,
-                allow_copying=request.allow_copying,
-                allow_modification=request.allow_modification,
-                allow_annotation=request.allow_annotation,
-                allow_filling_forms=request.allow_filling_forms,
-                allow_screen_readers=request.allow_screen_readers,
-                allow_assembly=request.allow_assembly,
-                allow_degraded_printing=request.allow_degraded_printing,
-            )
+            options = protection_options(request)
 
             # Execute password protection operation
             result = self.password_operation.execute(temp_input, options)
@@ -65,3 +58,21 @@ class PasswordProtectionServiceHandler(BaseServiceHandler):
         except Exception as e:
             logger.error(f"密码保护异常: {str(e)}")
             raise HTTPException(status_code=500, detail=f"密码保护时出错: {str(e)}")
+
+
+def protection_options(request: PasswordProtectionRequest) -> PasswordProtectionOptions:
+    """Convert a password protection request to operation options"""
+    return PasswordProtectionOptions(
+        user_password=request.user_password,
+        owner_password=request.owner_password,
+        allow_printing=request.allow_printing,
+        allow_copying=request.allow_copying,
+        allow_modification=request.allow_modification,
+        allow_annotation=request.allow_annotation,
+        allow_filling_forms=request.allow_filling_forms,
+        allow_screen_readers=request.allow_screen_readers,
+        allow_assembly=request.allow_assembly,
+        allow_degraded_printing=request.allow_degraded_printing,
+        algorithm=EncryptionAlgorithm(request.encryption_algorithm.value),
+        linearize=request.linearize,
+    )
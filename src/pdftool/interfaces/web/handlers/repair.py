@@ -0,0 +1,73 @@
+"""
+Repair service handler
+"""
+
+from typing import Dict, List
+
+import PyPDF2
+from fastapi import HTTPException, UploadFile
+
+from ....common.exceptions import PDFToolError
+from ....common.models import OperationResult, RepairOptions
+from ....common.utils.logging import get_logger
+from ....domains.document.operations import RepairOperation
+from ....domains.document.structure import get_page_count
+from ..interfaces import BaseServiceHandler
+from ..schemas.requests import PDFRepairRequest
+
+logger = get_logger("api.handlers.repair")
+
+
+class RepairServiceHandler(BaseServiceHandler):
+    """Service handler for PDF repair
+
+    The handler is created per request; after ``handle`` the number of
+    recovered pages is available through ``response_headers``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.repair_operation = RepairOperation()
+        self.pages_recovered = 0
+
+    @property
+    def service_name(self) -> str:
+        return "repair"
+
+    async def handle(self, files: List[UploadFile], request: PDFRepairRequest) -> OperationResult:
+        """Handle PDF repair request"""
+        if len(files) != 1:
+            raise HTTPException(status_code=400, detail="只能处理一个PDF文件")
+
+        file = files[0]
+
+        try:
+            # 保存输入文件，使用跟踪机制
+            temp_input = await self.save_upload_file_tracked(file)
+
+            options = RepairOptions(rewrite=request.rewrite)
+            result = self.repair_operation.execute(temp_input, options)
+
+            # 修复后的文件可以正常解析，页数从页面树根节点读取
+            with open(result.output_files[0], "rb") as f:
+                reader = PyPDF2.PdfReader(f)
+                if not reader.is_encrypted:
+                    try:
+                        self.pages_recovered = get_page_count(reader)
+                    except PDFToolError:
+                        # 页面树仍然损坏，文件照常返回
+                        pass
+
+            logger.info(f"PDF修复成功: {file.filename}, {result.details}")
+            return result
+
+        except PDFToolError as e:
+            logger.error(f"PDF修复失败: {str(e)}")
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"PDF修复异常: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"修复PDF时出错: {str(e)}")
+
+    def response_headers(self) -> Dict[str, str]:
+        """Number of recovered pages as a download response header"""
+        return {"X-Pages-Recovered": str(self.pages_recovered)}
@@ -47,6 +47,12 @@ class SplitServiceHandler(BaseServiceHandler):
                 mode = PageSelectionMode.SPECIFIC_PAGES
             elif request.mode == PageSelectionModeEnum.SINGLE:
                 mode = PageSelectionMode.SINGLE_FILE
+            elif request.mode == PageSelectionModeEnum.CHUNK:
+                mode = PageSelectionMode.CHUNK
+            elif request.mode == PageSelectionModeEnum.MAX_BYTES:
+                mode = PageSelectionMode.MAX_BYTES
+            elif request.mode == PageSelectionModeEnum.OUTLINE:
+                mode = PageSelectionMode.OUTLINE
             else:
                 raise HTTPException(status_code=400, detail=f"不支持的模式: {request.mode}")
 
@@ -54,7 +60,11 @@ class SplitServiceHandler(BaseServiceHandler):
             options = PageSelectionOptions(
                 mode=mode,
                 pages=request.pages,
+                chunk_size=request.chunk_size,
+                max_bytes=request.max_bytes,
                 filename_prefix=request.filename_prefix or Path(file.filename or "document").stem,
+                optimize=request.optimize,
+                linearize=request.linearize,
             )
 
             # Execute split operation
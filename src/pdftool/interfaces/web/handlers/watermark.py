@@ -2,7 +2,7 @@
 Watermark service handler
 """
 
-from typing import List, Optional
+from typing import List, Optional, Tuple, Union
 
 from fastapi import HTTPException, UploadFile
 
@@ -17,7 +17,7 @@ from ....common.models import (
 from ....common.utils.logging import get_logger
 from ....domains.document.operations import WatermarkOperation
 from ..interfaces import BaseServiceHandler
-from ..schemas.requests import WatermarkRequest
+from ..schemas.requests import BulkWatermarkRequest, WatermarkRequest
 
 logger = get_logger("api.handlers.watermark")
 
@@ -56,15 +56,7 @@ class WatermarkServiceHandler(BaseServiceHandler):
                     watermark_file, validate_pdf=False
                 )
 
-            # Parse page list
-            specific_pages = None
-            if request.page_selection in ["pages", "range"] and request.specific_pages:
-                try:
-                    from ..dependencies import parse_page_list
-
-                    specific_pages = parse_page_list(request.specific_pages)
-                except ValueError as e:
-                    raise HTTPException(status_code=400, detail=f"页面格式错误: {str(e)}")
+            page_selection, specific_pages = page_selection_options(request)
 
             # Convert enum values
             watermark_type = (
@@ -74,12 +66,6 @@ class WatermarkServiceHandler(BaseServiceHandler):
             )
             position = WatermarkPosition(request.position.value)
 
-            # Page selection mode conversion
-            if request.page_selection == "all":
-                page_selection = PageSelectionMode.ALL_PAGES
-            else:
-                page_selection = PageSelectionMode.SPECIFIC_PAGES
-
             # Create watermark options
             options = WatermarkOptions(
                 watermark_type=watermark_type,
@@ -92,6 +78,9 @@ class WatermarkServiceHandler(BaseServiceHandler):
                 image_scale=request.image_scale,
                 page_selection=page_selection,
                 specific_pages=specific_pages,
+                incremental=request.incremental,
+                optimize=request.optimize,
+                linearize=request.linearize,
             )
 
             # Execute watermark operation
@@ -110,3 +99,21 @@ class WatermarkServiceHandler(BaseServiceHandler):
         except Exception as e:
             logger.error(f"PDF水印添加异常: {str(e)}")
             raise HTTPException(status_code=500, detail=f"添加水印时出错: {str(e)}")
+
+
+def page_selection_options(
+    request: Union[WatermarkRequest, BulkWatermarkRequest],
+) -> Tuple[PageSelectionMode, Optional[List[int]]]:
+    """Page selection mode and 1-based page list of a watermark request"""
+    specific_pages = None
+    if request.page_selection in ["pages", "range"] and request.specific_pages:
+        try:
+            from ..dependencies import parse_page_list
+
+            specific_pages = parse_page_list(request.specific_pages)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"页面格式错误: {str(e)}")
+
+    if request.page_selection == "all":
+        return PageSelectionMode.ALL_PAGES, specific_pages
+    return PageSelectionMode.SPECIFIC_PAGES, specific_pages
@@ -2,10 +2,11 @@
 API service interfaces
 """
 
+import shutil
 import tempfile
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, List
+from typing import Any, Dict, List, Optional
 
 from fastapi import HTTPException, UploadFile
 
@@ -90,37 +91,56 @@ class BaseServiceHandler(IServiceHandler):
         self._temp_files_registry.append(temp_path)
         return temp_path
 
+    def create_request_dir(self, prefix: str) -> Path:
+        """创建本次请求专用的临时目录，并跟踪以便统一清理（整个目录删除）"""
+        temp_dir = Path(tempfile.mkdtemp(prefix=f"{prefix}_"))
+        if not hasattr(self, "_temp_files_registry"):
+            self._temp_files_registry = []
+        self._temp_files_registry.append(temp_dir)
+        return temp_dir
+
     def _cleanup_files(self, files: list):
-        """Simple cleanup function for temporary files"""
+        """Simple cleanup function for temporary files and directories"""
         import os
 
         for file_path in files:
             try:
-                if os.path.exists(file_path):
+                if os.path.isdir(file_path):
+                    shutil.rmtree(file_path)
+                    logger.info(f"已清理临时目录: {file_path}")
+                elif os.path.exists(file_path):
                     os.unlink(file_path)
                     logger.info(f"已清理临时文件: {file_path}")
             except Exception as e:
                 logger.warning(f"清理文件失败 {file_path}: {str(e)}")
 
-    def create_archive(self, file_paths, output_zip="output.zip"):
+    def create_archive(self, file_paths, output_zip, compress=True):
         """
         将多个文件打包成一个 zip 压缩包
 
         Args:
             file_paths (list[str]): 要打包的文件路径列表
-            output_zip (str): 输出的 zip 文件路径
+            output_zip (Path): 输出的 zip 文件路径，应位于本次请求的临时目录中
+            compress (bool): 是否压缩；已加密等无法再压缩的文件直接存储
         """
         import os
         import zipfile
 
-        with zipfile.ZipFile(output_zip, "w", zipfile.ZIP_DEFLATED) as zipf:
+        compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+        with zipfile.ZipFile(output_zip, "w", compression) as zipf:
             for file in file_paths:
                 arcname = os.path.basename(file)  # 只保留文件名，不带路径
                 zipf.write(file, arcname)
 
         return output_zip
 
-    def create_download_response(self, result: OperationResult, filename: str):
+    def create_download_response(
+        self,
+        result: OperationResult,
+        filename: str,
+        compress_archive: bool = True,
+        headers: Optional[Dict[str, str]] = None,
+    ):
         """Create file download response with comprehensive cleanup"""
         from fastapi.responses import FileResponse
         from starlette.background import BackgroundTask
@@ -139,7 +159,14 @@ class BaseServiceHandler(IServiceHandler):
 
         # Choose download type based on number of files
         if len(result.output_files) > 1:
-            zip_file = self.create_archive(result.output_files)
+            # 压缩包放在输出文件所在的请求目录中；输出不在请求目录中时另建一个
+            archive_dir = Path(output_file).parent
+            if archive_dir not in all_cleanup_files:
+                archive_dir = self.create_request_dir("archive")
+                all_cleanup_files.append(archive_dir)
+            zip_file = self.create_archive(
+                result.output_files, archive_dir / "archive.zip", compress=compress_archive
+            )
             # 添加输出文件和ZIP文件到清理列表
             all_cleanup_files.extend(result.output_files)
             all_cleanup_files.append(zip_file)
@@ -148,6 +175,7 @@ class BaseServiceHandler(IServiceHandler):
                 path=str(zip_file),
                 filename=f"{filename}.zip",
                 media_type="application/zip",
+                headers=headers,
                 background=BackgroundTask(self._cleanup_files, all_cleanup_files),
             )
 
@@ -158,5 +186,6 @@ class BaseServiceHandler(IServiceHandler):
             path=str(output_file),
             filename=f"{filename}.pdf",
             media_type="application/pdf",
+            headers=headers,
             background=BackgroundTask(self._cleanup_files, all_cleanup_files),
         )
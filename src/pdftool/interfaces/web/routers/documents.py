@@ -0,0 +1,71 @@
+"""
+文档存储API路由
+
+上传的文档按内容哈希存储并建立索引，之后按文档ID访问，无需重新上传和解析
+"""
+
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, Header, HTTPException, UploadFile
+from fastapi.responses import Response
+
+from ..dependencies import get_service_registry, validate_file_extension
+from ..schemas.responses import DocumentResponse
+from ..service_registry import ServiceRegistry
+
+router = APIRouter(prefix="/api/v1/documents", tags=["文档存储"])
+
+
+@router.post(
+    "",
+    response_model=DocumentResponse,
+    summary="存储PDF文件",
+    description="存储PDF文件并建立索引，返回文档ID（内容的 SHA-256）",
+)
+async def store_document(
+    file: UploadFile = File(..., description="要存储的PDF文件"),
+    service_registry: ServiceRegistry = Depends(get_service_registry),
+):
+    """存储PDF文件"""
+    validate_file_extension(file.filename)
+
+    documents_handler = service_registry.get_handler("documents")
+    result = await documents_handler.handle([file])
+
+    if result.success and result.details:
+        return DocumentResponse(**json.loads(result.details))
+
+    raise HTTPException(status_code=500, detail=result.message)
+
+
+@router.get(
+    "/{document_id}",
+    response_model=DocumentResponse,
+    summary="获取已存储文档的信息",
+    description="从文档索引读取页面数和页面框，不解析文档",
+)
+async def get_document(
+    document_id: str,
+    service_registry: ServiceRegistry = Depends(get_service_registry),
+):
+    """获取已存储文档的信息"""
+    documents_handler = service_registry.get_handler("documents")
+    return documents_handler.describe(document_id)
+
+
+@router.get(
+    "/{document_id}/pages/{page_number}.pdf",
+    response_class=Response,
+    summary="获取已存储文档的单页PDF",
+    description="提取一页为独立的PDF文件（页码从 1 开始），支持 ETag / If-None-Match",
+)
+async def get_document_page(
+    document_id: str,
+    page_number: int,
+    if_none_match: Optional[str] = Header(None),
+    service_registry: ServiceRegistry = Depends(get_service_registry),
+):
+    """获取已存储文档的单页PDF"""
+    documents_handler = service_registry.get_handler("documents")
+    return documents_handler.page(document_id, page_number, if_none_match)
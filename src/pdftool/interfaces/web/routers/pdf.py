@@ -3,6 +3,7 @@ PDF操作API路由 - 新架构版本 (v2)
 使用可扩展的服务注册模式
 """
 
+import json
 from pathlib import Path
 from typing import List, Optional
 
@@ -12,13 +13,24 @@ from fastapi.responses import FileResponse
 from ..dependencies import (
     get_service_registry,
     parse_page_list,
+    parse_recipients,
     validate_file_extension,
 )
 from ..schemas.requests import (
+    BulkWatermarkRequest,
+    CompressionLevelEnum,
+    EncryptionAlgorithmEnum,
+    MetadataRequest,
     PageSelectionModeEnum,
+    PasswordDistributionRequest,
     PasswordProtectionRequest,
+    PDFAppendRequest,
+    PDFCompressRequest,
+    PDFInfoRequest,
     PDFMergeRequest,
+    PDFOptimizeRequest,
     PDFPageSelectionRequest,
+    PDFRepairRequest,
     WatermarkPositionEnum,
     WatermarkRequest,
     WatermarkTypeEnum,
@@ -39,6 +51,9 @@ async def merge_pdfs_v2(
     files: List[UploadFile] = File(..., description="要合并的PDF文件列表"),
     preserve_bookmarks: bool = Form(True, description="是否保留书签"),
     preserve_metadata: bool = Form(True, description="是否保留元数据"),
+    tree_merge: bool = Form(False, description="是否使用分层并行合并（适用于大量文件）"),
+    optimize: bool = Form(False, description="是否对输出进行结构优化"),
+    linearize: bool = Form(False, description="是否线性化输出（快速 Web 查看）"),
     service_registry: ServiceRegistry = Depends(get_service_registry),
 ):
     """合并多个PDF文件 - 使用新架构"""
@@ -48,7 +63,11 @@ async def merge_pdfs_v2(
 
     # 创建请求对象
     request = PDFMergeRequest(
-        preserve_bookmarks=preserve_bookmarks, preserve_metadata=preserve_metadata
+        preserve_bookmarks=preserve_bookmarks,
+        preserve_metadata=preserve_metadata,
+        tree_merge=tree_merge,
+        optimize=optimize,
+        linearize=linearize,
     )
 
     # 获取合并服务处理器
@@ -61,6 +80,37 @@ async def merge_pdfs_v2(
     return merge_handler.create_download_response(result, "merged")
 
 
+@router.post(
+    "/append",
+    summary="追加页面到PDF",
+    description="将一个或多个PDF的页面追加到基础PDF末尾，默认以增量更新方式只写出新页面",
+    response_class=FileResponse,
+)
+async def append_pdfs(
+    file: UploadFile = File(..., description="基础PDF文件"),
+    files: List[UploadFile] = File(..., description="要追加的PDF文件列表"),
+    incremental: bool = Form(True, description="是否以增量更新方式追加"),
+    service_registry: ServiceRegistry = Depends(get_service_registry),
+):
+    """追加页面到现有PDF文件"""
+    # 验证文件
+    for upload in [file, *files]:
+        validate_file_extension(upload.filename)
+
+    # 创建请求对象
+    request = PDFAppendRequest(incremental=incremental)
+
+    # 获取追加服务处理器
+    append_handler = service_registry.get_handler("append")
+
+    # 执行追加
+    result = await append_handler.handle([file, *files], request)
+
+    # 返回下载响应
+    filename = f"appended_{Path(file.filename or 'document').stem}"
+    return append_handler.create_download_response(result, filename)
+
+
 @router.post(
     "/info",
     response_model=PDFInfoResponse,
@@ -69,6 +119,7 @@ async def merge_pdfs_v2(
 )
 async def get_pdf_info_v2(
     file: UploadFile = File(..., description="要分析的PDF文件"),
+    analyze: bool = Form(False, description="是否分析文档结构（页面尺寸、字体、图片等）"),
     service_registry: ServiceRegistry = Depends(get_service_registry),
 ):
     """获取PDF文件详细信息 - 使用新架构"""
@@ -79,12 +130,10 @@ async def get_pdf_info_v2(
     info_handler = service_registry.get_handler("info")
 
     # 获取PDF信息
-    result = await info_handler.handle([file], request=None)
+    result = await info_handler.handle([file], request=PDFInfoRequest(analyze=analyze))
 
     # 从 OperationResult 中解析 PDFInfoResponse
     if result.success and result.details:
-        import json
-
         info_data = json.loads(result.details)
         return PDFInfoResponse(**info_data)
 
@@ -101,7 +150,11 @@ async def select_pages_v2(
     file: UploadFile = File(..., description="要处理的PDF文件"),
     mode: PageSelectionModeEnum = Form(..., description="页面选择模式"),
     pages: Optional[str] = Form(None, description="指定页面列表，格式：'1,3,5' 或 '1-5'"),
+    chunk_size: Optional[int] = Form(None, description="每个文件的页数（chunk模式）"),
+    max_bytes: Optional[int] = Form(None, description="每个文件的大小上限，字节（max_bytes模式）"),
     filename_prefix: Optional[str] = Form(None, description="输出文件名前缀"),
+    optimize: bool = Form(False, description="是否对输出进行结构优化"),
+    linearize: bool = Form(False, description="是否线性化输出（快速 Web 查看）"),
     service_registry: ServiceRegistry = Depends(get_service_registry),
 ):
     """统一的PDF页面选择和处理 - 使用新架构"""
@@ -118,7 +171,18 @@ async def select_pages_v2(
             )
 
     # 创建请求对象
-    request = PDFPageSelectionRequest(mode=mode, pages=page_list, filename_prefix=filename_prefix)
+    try:
+        request = PDFPageSelectionRequest(
+            mode=mode,
+            pages=page_list,
+            chunk_size=chunk_size,
+            max_bytes=max_bytes,
+            filename_prefix=filename_prefix,
+            optimize=optimize,
+            linearize=linearize,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"参数验证失败: {str(e)}")
 
     # 获取分割服务处理器
     split_handler = service_registry.get_handler("split")
@@ -134,6 +198,12 @@ async def select_pages_v2(
             filename = f"page_{page_list[0]}"
         else:
             filename = "selected_pages"
+    elif mode == PageSelectionModeEnum.CHUNK:
+        filename = f"chunks_of_{chunk_size}"
+    elif mode == PageSelectionModeEnum.MAX_BYTES:
+        filename = f"chunks_under_{max_bytes}_bytes"
+    elif mode == PageSelectionModeEnum.OUTLINE:
+        filename = "chapters"
     else:
         filename = "pdf_pages"
 
@@ -158,6 +228,9 @@ async def add_watermark_v2(
     opacity: float = Form(..., description="透明度(0.1-1.0)"),
     page_selection: PageSelectionModeEnum = Form(..., description="页面选择模式"),
     specific_pages: Optional[str] = Form(None, description="指定页面"),
+    incremental: bool = Form(False, description="是否以增量更新方式写出"),
+    optimize: bool = Form(False, description="是否对输出进行结构优化"),
+    linearize: bool = Form(False, description="是否线性化输出（快速 Web 查看）"),
     service_registry: ServiceRegistry = Depends(get_service_registry),
 ):
     """添加水印到PDF文件 - 使用新架构"""
@@ -186,6 +259,9 @@ async def add_watermark_v2(
             image_scale=image_scale,
             page_selection=page_selection,
             specific_pages=specific_pages,
+            incremental=incremental,
+            optimize=optimize,
+            linearize=linearize,
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"参数验证失败: {str(e)}")
@@ -201,6 +277,186 @@ async def add_watermark_v2(
     return watermark_handler.create_download_response(result, filename)
 
 
+@router.post(
+    "/watermark/bulk",
+    response_class=FileResponse,
+    summary="按接收者批量添加个性化水印",
+    description=(
+        "源文件只上传、解析一次，按文本模板为每个接收者生成带个性化水印的副本，打包为ZIP返回"
+    ),
+)
+async def add_bulk_watermark(
+    file: UploadFile = File(..., description="要添加水印的PDF文件"),
+    watermark_text: str = Form(..., description="水印文本模板，如 {name} - {email}"),
+    recipients: Optional[str] = Form(
+        None, description="接收者列表：JSON对象数组，或首行为字段名的CSV"
+    ),
+    recipients_file: Optional[UploadFile] = File(None, description="接收者列表文件(CSV/JSON)"),
+    name_field: str = Form("name", description="用于输出文件名的接收者字段"),
+    font_size: Optional[int] = Form(36, description="字体大小"),
+    font_color: Optional[str] = Form("#000000", description="字体颜色"),
+    position: WatermarkPositionEnum = Form(..., description="水印位置"),
+    opacity: float = Form(..., description="透明度(0.1-1.0)"),
+    page_selection: PageSelectionModeEnum = Form(
+        PageSelectionModeEnum.ALL, description="页面选择模式"
+    ),
+    specific_pages: Optional[str] = Form(None, description="指定页面"),
+    service_registry: ServiceRegistry = Depends(get_service_registry),
+):
+    """为每个接收者生成个性化水印副本"""
+    # 验证文件
+    validate_file_extension(file.filename)
+
+    # 接收者列表可以直接提交，也可以上传文件
+    if recipients_file is not None:
+        recipients = (await recipients_file.read()).decode("utf-8-sig", errors="replace")
+    if not recipients:
+        raise HTTPException(status_code=400, detail="需要提供接收者列表")
+
+    # 创建请求对象
+    try:
+        request = BulkWatermarkRequest(
+            watermark_text=watermark_text,
+            position=position,
+            opacity=opacity / 100.0,  # 前端传百分比，转换为小数
+            font_size=font_size,
+            font_color=font_color,
+            page_selection=page_selection,
+            specific_pages=specific_pages,
+            recipients=parse_recipients(recipients),
+            name_field=name_field,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"参数验证失败: {str(e)}")
+
+    # 获取批量水印服务处理器
+    bulk_watermark_handler = service_registry.get_handler("bulk_watermark")
+
+    # 执行批量水印
+    result = await bulk_watermark_handler.handle([file], request)
+
+    # 返回下载响应
+    filename = f"watermarked_{Path(file.filename or 'document').stem}"
+    return bulk_watermark_handler.create_download_response(result, filename)
+
+
+@router.post(
+    "/compress",
+    response_class=FileResponse,
+    summary="压缩PDF文件",
+    description=(
+        "对分辨率过高的图片降采样并重新编码，用 Flate 压缩未压缩的流；"
+        "原始大小、压缩后大小、压缩率和耗时通过 X-Original-Size、X-Compressed-Size、"
+        "X-Compression-Ratio、X-Processing-Time 响应头返回"
+    ),
+)
+async def compress_pdf(
+    file: UploadFile = File(..., description="要压缩的PDF文件"),
+    compression_level: CompressionLevelEnum = Form(
+        CompressionLevelEnum.MEDIUM, description="压缩级别: low/medium/high/custom"
+    ),
+    image_quality: Optional[int] = Form(None, description="图片质量 (10-100)"),
+    max_image_dpi: Optional[int] = Form(None, description="图片最大分辨率 (DPI)"),
+    remove_metadata: bool = Form(False, description="是否移除元数据"),
+    remove_bookmarks: bool = Form(False, description="是否移除书签"),
+    service_registry: ServiceRegistry = Depends(get_service_registry),
+):
+    """压缩PDF文件"""
+    # 验证文件
+    validate_file_extension(file.filename)
+
+    # 创建请求对象
+    try:
+        request = PDFCompressRequest(
+            compression_level=compression_level,
+            image_quality=image_quality,
+            max_image_dpi=max_image_dpi,
+            remove_metadata=remove_metadata,
+            remove_bookmarks=remove_bookmarks,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"参数验证失败: {str(e)}")
+
+    # 获取压缩服务处理器
+    compress_handler = service_registry.get_handler("compress")
+
+    # 执行压缩
+    result = await compress_handler.handle([file], request)
+
+    # 返回下载响应，压缩统计放在响应头中
+    filename = f"compressed_{Path(file.filename or 'document').stem}"
+    return compress_handler.create_download_response(
+        result, filename, headers=compress_handler.response_headers()
+    )
+
+
+@router.post(
+    "/optimize",
+    response_class=FileResponse,
+    summary="优化PDF结构",
+    description=(
+        "无损地重写PDF：移除不可达对象、合并重复对象、使用压缩对象流和交叉引用流；"
+        "优化前后的大小通过 X-Original-Size、X-Optimized-Size 响应头返回"
+    ),
+)
+async def optimize_pdf(
+    file: UploadFile = File(..., description="要优化的PDF文件"),
+    object_streams: bool = Form(True, description="是否将非流对象打包进压缩对象流"),
+    deduplicate: bool = Form(True, description="是否合并内容相同的对象"),
+    service_registry: ServiceRegistry = Depends(get_service_registry),
+):
+    """优化PDF结构"""
+    # 验证文件
+    validate_file_extension(file.filename)
+
+    request = PDFOptimizeRequest(object_streams=object_streams, deduplicate=deduplicate)
+
+    # 获取优化服务处理器
+    optimize_handler = service_registry.get_handler("optimize")
+
+    # 执行优化
+    result = await optimize_handler.handle([file], request)
+
+    # 返回下载响应
+    filename = f"optimized_{Path(file.filename or 'document').stem}"
+    return optimize_handler.create_download_response(
+        result, filename, headers=optimize_handler.response_headers()
+    )
+
+
+@router.post(
+    "/repair",
+    response_class=FileResponse,
+    summary="修复PDF",
+    description=(
+        "扫描整个文件重建损坏或缺失的交叉引用表和 trailer，并重写为干净的文件；"
+        "恢复的页数通过 X-Pages-Recovered 响应头返回，发现的问题见日志"
+    ),
+)
+async def repair_pdf(
+    file: UploadFile = File(..., description="要修复的PDF文件"),
+    rewrite: bool = Form(True, description="是否重写为干净的文件"),
+    service_registry: ServiceRegistry = Depends(get_service_registry),
+):
+    """修复PDF"""
+    # 验证文件
+    validate_file_extension(file.filename)
+
+    request = PDFRepairRequest(rewrite=rewrite)
+
+    # 获取修复服务处理器
+    repair_handler = service_registry.get_handler("repair")
+
+    # 执行修复
+    result = await repair_handler.handle([file], request)
+
+    # 返回下载响应
+    filename = f"repaired_{Path(file.filename or 'document').stem}"
+    return repair_handler.create_download_response(
+        result, filename, headers=repair_handler.response_headers()
+    )
+
+
 @router.post(
     "/password",
     response_class=FileResponse,
@@ -219,6 +475,10 @@ async def protect_pdf_with_password(
     allow_screen_readers: bool = Form(True, description="允许屏幕阅读器访问"),
     allow_assembly: bool = Form(True, description="允许组装文档"),
     allow_degraded_printing: bool = Form(True, description="允许低质量打印"),
+    encryption_algorithm: EncryptionAlgorithmEnum = Form(
+        EncryptionAlgorithmEnum.AES_256, description="加密算法: rc4_128/aes_128/aes_256"
+    ),
+    linearize: bool = Form(False, description="是否线性化输出（快速 Web 查看）"),
     service_registry: ServiceRegistry = Depends(get_service_registry),
 ):
     """为PDF文件添加密码保护"""
@@ -238,6 +498,8 @@ async def protect_pdf_with_password(
             allow_screen_readers=allow_screen_readers,
             allow_assembly=allow_assembly,
             allow_degraded_printing=allow_degraded_printing,
+            encryption_algorithm=encryption_algorithm,
+            linearize=linearize,
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"参数验证失败: {str(e)}")
@@ -253,6 +515,90 @@ async def protect_pdf_with_password(
     return password_handler.create_download_response(result, filename)
 
 
+@router.post(
+    "/distribute",
+    response_class=FileResponse,
+    summary="按接收者分发加密副本",
+    description="源文件只上传、解析一次，为每个接收者生成使用各自密码和权限加密的副本，打包为ZIP返回",
+)
+async def distribute_protected_pdf(
+    file: UploadFile = File(..., description="要分发的PDF文件"),
+    recipients: str = Form(
+        ...,
+        description=(
+            "接收者列表(JSON数组)，每项包含 name、user_password，"
+            "可选 owner_password、encryption_algorithm 及 allow_* 权限"
+        ),
+    ),
+    service_registry: ServiceRegistry = Depends(get_service_registry),
+):
+    """为每个接收者生成加密副本"""
+    # 验证文件
+    validate_file_extension(file.filename)
+
+    # 创建请求对象
+    try:
+        request = PasswordDistributionRequest(recipients=json.loads(recipients))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"参数验证失败: {str(e)}")
+
+    # 获取分发服务处理器
+    distribution_handler = service_registry.get_handler("distribution")
+
+    # 执行分发加密
+    result = await distribution_handler.handle([file], request)
+
+    # 返回下载响应，加密后的文件无法再压缩，ZIP 中直接存储
+    filename = f"distributed_{Path(file.filename or 'document').stem}"
+    return distribution_handler.create_download_response(result, filename, compress_archive=False)
+
+
+@router.post(
+    "/metadata",
+    response_class=FileResponse,
+    summary="编辑PDF元数据",
+    description="修改标题、作者、关键词等文档信息，默认以增量更新方式追加到原文件末尾",
+)
+async def edit_pdf_metadata(
+    file: UploadFile = File(..., description="要修改的PDF文件"),
+    title: Optional[str] = Form(None, description="标题（空字符串表示删除）"),
+    author: Optional[str] = Form(None, description="作者"),
+    subject: Optional[str] = Form(None, description="主题"),
+    keywords: Optional[str] = Form(None, description="关键词"),
+    creator: Optional[str] = Form(None, description="创建工具"),
+    producer: Optional[str] = Form(None, description="生成工具"),
+    incremental: bool = Form(True, description="是否以增量更新方式写出"),
+    service_registry: ServiceRegistry = Depends(get_service_registry),
+):
+    """编辑PDF文档信息"""
+    # 验证文件
+    validate_file_extension(file.filename)
+
+    # 创建请求对象
+    try:
+        request = MetadataRequest(
+            title=title,
+            author=author,
+            subject=subject,
+            keywords=keywords,
+            creator=creator,
+            producer=producer,
+            incremental=incremental,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"参数验证失败: {str(e)}")
+
+    # 获取元数据服务处理器
+    metadata_handler = service_registry.get_handler("metadata")
+
+    # 执行元数据更新
+    result = await metadata_handler.handle([file], request)
+
+    # 返回下载响应
+    filename = f"metadata_{Path(file.filename or 'document').stem}"
+    return metadata_handler.create_download_response(result, filename)
+
+
 @router.get(
     "/services",
     response_model=SuccessResponse,
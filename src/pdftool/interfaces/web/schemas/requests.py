@@ -5,7 +5,7 @@ API请求模型定义
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, root_validator, validator
 
 
 class PageSelectionModeEnum(str, Enum):
@@ -15,6 +15,9 @@ class PageSelectionModeEnum(str, Enum):
     PAGES = "pages"  # 指定页面列表（每页单独文件）
     SINGLE = "single"  # 将选中页面合并为单个文件
     RANGE = "range"  # 指定页面范围
+    CHUNK = "chunk"  # 按固定页数拆分（每 N 页一个文件）
+    MAX_BYTES = "max_bytes"  # 按文件大小上限拆分
+    OUTLINE = "outline"  # 按顶层书签（章节）拆分
 
 
 class WatermarkTypeEnum(str, Enum):
@@ -38,11 +41,78 @@ class WatermarkPositionEnum(int, Enum):
     BOTTOM_RIGHT = 9
 
 
+class EncryptionAlgorithmEnum(str, Enum):
+    """加密算法枚举"""
+
+    RC4_128 = "rc4_128"  # RC4 128位（兼容旧阅读器）
+    AES_128 = "aes_128"  # AES 128位
+    AES_256 = "aes_256"  # AES 256位（推荐）
+
+
+class CompressionLevelEnum(str, Enum):
+    """压缩级别枚举"""
+
+    LOW = "low"  # 轻度压缩 - 保持高质量
+    MEDIUM = "medium"  # 中等压缩 - 平衡质量和大小
+    HIGH = "high"  # 高度压缩 - 最小文件大小
+    CUSTOM = "custom"  # 自定义参数
+
+
 class PDFMergeRequest(BaseModel):
     """PDF合并请求模型"""
 
     preserve_bookmarks: bool = Field(True, description="是否保留书签")
     preserve_metadata: bool = Field(True, description="是否保留元数据")
+    tree_merge: bool = Field(False, description="是否使用分层并行合并（适用于大量文件）")
+    optimize: bool = Field(
+        False, description="是否对输出进行结构优化（对象流、去重、移除无用对象）"
+    )
+    linearize: bool = Field(False, description="是否线性化输出（快速 Web 查看）")
+
+
+class PDFAppendRequest(BaseModel):
+    """PDF追加页面请求模型"""
+
+    incremental: bool = Field(True, description="是否以增量更新方式追加（只写出新页面）")
+
+
+class PDFInfoRequest(BaseModel):
+    """PDF信息请求模型"""
+
+    analyze: bool = Field(
+        False, description="是否分析文档结构（页面尺寸、字体、图片、加密、线性化等）"
+    )
+
+
+class PDFCompressRequest(BaseModel):
+    """PDF压缩请求模型"""
+
+    compression_level: CompressionLevelEnum = Field(
+        CompressionLevelEnum.MEDIUM, description="压缩级别"
+    )
+    image_quality: Optional[int] = Field(
+        None, ge=10, le=100, description="图片质量 (10-100)，默认使用压缩级别的预设值"
+    )
+    max_image_dpi: Optional[int] = Field(
+        None, ge=36, le=1200, description="图片最大分辨率 (DPI)，默认使用压缩级别的预设值"
+    )
+    remove_metadata: bool = Field(False, description="是否移除元数据")
+    remove_bookmarks: bool = Field(False, description="是否移除书签")
+
+
+class PDFOptimizeRequest(BaseModel):
+    """PDF结构优化请求模型"""
+
+    object_streams: bool = Field(True, description="是否将非流对象打包进压缩对象流")
+    deduplicate: bool = Field(True, description="是否合并内容相同的对象")
+
+
+class PDFRepairRequest(BaseModel):
+    """PDF修复请求模型"""
+
+    rewrite: bool = Field(
+        True, description="是否重写为干净的文件（否则只在原文件后追加重建的交叉引用）"
+    )
 
 
 class PDFPageSelectionRequest(BaseModel):
@@ -51,8 +121,16 @@ class PDFPageSelectionRequest(BaseModel):
     mode: PageSelectionModeEnum = Field(..., description="页面选择模式")
     # 页面选择参数
     pages: Optional[List[int]] = Field(None, description="指定页面列表（pages/single模式使用）")
+    chunk_size: Optional[int] = Field(None, ge=1, description="每个文件的页数（chunk模式使用）")
+    max_bytes: Optional[int] = Field(
+        None, ge=1024, description="每个文件的大小上限，字节（max_bytes模式使用）"
+    )
     # 输出选项
     filename_prefix: Optional[str] = Field(None, description="输出文件名前缀")
+    optimize: bool = Field(
+        False, description="是否对输出进行结构优化（对象流、去重、移除无用对象）"
+    )
+    linearize: bool = Field(False, description="是否线性化输出（快速 Web 查看）")
 
     @validator("pages")
     def validate_pages(cls, v: Optional[List[int]], values: Dict[str, Any]) -> Optional[List[int]]:
@@ -67,6 +145,18 @@ class PDFPageSelectionRequest(BaseModel):
             return sorted(v)
         return v
 
+    @validator("chunk_size", always=True)
+    def validate_chunk_size(cls, v: Optional[int], values: Dict[str, Any]) -> Optional[int]:
+        if values.get("mode") == PageSelectionModeEnum.CHUNK and not v:
+            raise ValueError("chunk模式需要指定每个文件的页数")
+        return v
+
+    @validator("max_bytes", always=True)
+    def validate_max_bytes(cls, v: Optional[int], values: Dict[str, Any]) -> Optional[int]:
+        if values.get("mode") == PageSelectionModeEnum.MAX_BYTES and not v:
+            raise ValueError("max_bytes模式需要指定每个文件的大小上限")
+        return v
+
 
 # 保持向后兼容的别名
 class PDFExtractRequest(BaseModel):
@@ -107,6 +197,14 @@ class WatermarkRequest(BaseModel):
     )
     specific_pages: Optional[str] = Field(None, description="指定页面(如: 1,3,5-8)")
 
+    incremental: bool = Field(
+        False, description="是否以增量更新方式写出（原始版本仍保留在文件中，可被还原）"
+    )
+    optimize: bool = Field(
+        False, description="是否对输出进行结构优化（对象流、去重、移除无用对象）"
+    )
+    linearize: bool = Field(False, description="是否线性化输出（快速 Web 查看）")
+
     @validator("watermark_text")
     def validate_text_watermark(cls, v: Optional[str], values: Dict[str, Any]) -> Optional[str]:
         if values.get("watermark_type") == WatermarkTypeEnum.TEXT and not v:
@@ -120,6 +218,41 @@ class WatermarkRequest(BaseModel):
         return v
 
 
+class BulkWatermarkRequest(BaseModel):
+    """按接收者批量生成个性化文本水印请求模型"""
+
+    watermark_text: str = Field(
+        ..., min_length=1, max_length=500, description="水印文本模板，如 {name} - {email}"
+    )
+    position: WatermarkPositionEnum = Field(..., description="水印位置")
+    opacity: float = Field(..., ge=0.1, le=1.0, description="透明度(0.1-1.0)")
+    font_size: Optional[int] = Field(36, ge=12, le=100, description="字体大小")
+    font_color: Optional[str] = Field("#000000", description="字体颜色(十六进制)")
+
+    # 页面选择
+    page_selection: PageSelectionModeEnum = Field(
+        PageSelectionModeEnum.ALL, description="页面选择模式"
+    )
+    specific_pages: Optional[str] = Field(None, description="指定页面(如: 1,3,5-8)")
+
+    recipients: List[Dict[str, str]] = Field(..., description="接收者列表，每项为字段名到值的映射")
+    name_field: str = Field("name", min_length=1, description="用于输出文件名的接收者字段")
+
+    @validator("font_color")
+    def validate_font_color(cls, v: Optional[str]) -> Optional[str]:
+        if v and (not v.startswith("#") or len(v) != 7):
+            raise ValueError("字体颜色必须是7位十六进制格式 (#RRGGBB)")
+        return v
+
+    @validator("recipients")
+    def validate_recipients(cls, v: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        if not v:
+            raise ValueError("至少需要一个接收者")
+        if len(v) > 1000:
+            raise ValueError("接收者数量不能超过1000")
+        return v
+
+
 class PasswordProtectionRequest(BaseModel):
     """密码保护请求模型"""
 
@@ -138,6 +271,11 @@ class PasswordProtectionRequest(BaseModel):
     allow_assembly: bool = Field(True, description="允许组装文档")
     allow_degraded_printing: bool = Field(True, description="允许低质量打印")
 
+    encryption_algorithm: EncryptionAlgorithmEnum = Field(
+        EncryptionAlgorithmEnum.AES_256, description="加密算法"
+    )
+    linearize: bool = Field(False, description="是否线性化输出（快速 Web 查看）")
+
     @validator("user_password")
     def validate_user_password(cls, v: str) -> str:
         if not v or len(v.strip()) < 4:
@@ -151,6 +289,47 @@ class PasswordProtectionRequest(BaseModel):
         return v.strip() if v else None
 
 
+class RecipientProtectionRequest(PasswordProtectionRequest):
+    """分发接收者请求模型：接收者名称及其密码与权限"""
+
+    name: str = Field(..., min_length=1, max_length=100, description="接收者名称（用于输出文件名）")
+
+
+class PasswordDistributionRequest(BaseModel):
+    """按接收者分发加密副本请求模型"""
+
+    recipients: List[RecipientProtectionRequest] = Field(..., description="接收者列表")
+
+    @validator("recipients")
+    def validate_recipients(
+        cls, v: List[RecipientProtectionRequest]
+    ) -> List[RecipientProtectionRequest]:
+        if not v:
+            raise ValueError("至少需要一个接收者")
+        if len(v) > 1000:
+            raise ValueError("接收者数量不能超过1000")
+        return v
+
+
+class MetadataRequest(BaseModel):
+    """元数据编辑请求模型（未提供的字段保持不变，空字符串表示删除）"""
+
+    title: Optional[str] = Field(None, max_length=1000, description="标题")
+    author: Optional[str] = Field(None, max_length=1000, description="作者")
+    subject: Optional[str] = Field(None, max_length=1000, description="主题")
+    keywords: Optional[str] = Field(None, max_length=1000, description="关键词")
+    creator: Optional[str] = Field(None, max_length=1000, description="创建工具")
+    producer: Optional[str] = Field(None, max_length=1000, description="生成工具")
+    incremental: bool = Field(True, description="是否以增量更新方式写出（保留原始文件内容）")
+
+    @root_validator(skip_on_failure=True)
+    def validate_any_field(cls, values: Dict[str, Any]) -> Dict[str, Any]:
+        fields = ("title", "author", "subject", "keywords", "creator", "producer")
+        if all(values.get(field) is None for field in fields):
+            raise ValueError("至少需要修改一项元数据")
+        return values
+
+
 class UploadConfig(BaseModel):
     """上传配置模型"""
 
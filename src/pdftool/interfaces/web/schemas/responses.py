@@ -2,7 +2,7 @@
 API响应模型定义
 """
 
-from typing import Any, Optional
+from typing import Any, List, Optional
 
 from pydantic import BaseModel
 
@@ -32,6 +32,32 @@ class SuccessResponse(BaseModel):
     data: Optional[Any] = None
 
 
+class PageSizeResponse(BaseModel):
+    """一组尺寸和旋转角度相同的页面"""
+
+    width: float
+    height: float
+    rotation: int
+    count: int
+
+
+class DocumentAnalysisResponse(BaseModel):
+    """文档结构分析响应模型（加密文档无法读取的字段为 None）"""
+
+    version: str
+    object_count: int
+    encrypted: bool
+    encryption: Optional[str] = None
+    linearized: bool
+    page_sizes: Optional[List[PageSizeResponse]] = None
+    fonts: Optional[List[str]] = None
+    image_count: Optional[int] = None
+    image_bytes: Optional[int] = None
+    text_pages: Optional[int] = None
+    scanned_pages: Optional[int] = None
+    content_type: Optional[str] = None  # text / scanned / mixed / other
+
+
 class PDFInfoResponse(BaseModel):
     """PDF信息响应模型"""
 
@@ -40,6 +66,16 @@ class PDFInfoResponse(BaseModel):
     author: Optional[str] = None
     creation_date: Optional[str] = None
     file_size: int
+    analysis: Optional[DocumentAnalysisResponse] = None
+
+
+class PDFCompressResponse(BaseModel):
+    """PDF压缩结果（随下载文件以响应头返回）"""
+
+    original_size: int
+    compressed_size: int
+    compression_ratio: str
+    processing_time: str
 
 
 class HealthResponse(BaseModel):
@@ -59,3 +95,20 @@ class FileUploadResponse(BaseModel):
     size: int
     content_type: str
     upload_time: str
+
+
+class PageBoxResponse(BaseModel):
+    """页面框（x0, y0, x1, y1）"""
+
+    media_box: List[float]
+    crop_box: List[float]
+
+
+class DocumentResponse(BaseModel):
+    """已存储文档（页面数和页面框来自文档索引；加密文档为 None）"""
+
+    id: str
+    file_size: int
+    encrypted: bool
+    pages: Optional[int] = None
+    page_boxes: Optional[List[PageBoxResponse]] = None
@@ -105,6 +105,14 @@ class ServiceRegistry(IServiceRegistry):
             ("info", "InfoServiceHandler"),
             ("watermark", "WatermarkServiceHandler"),
             ("password", "PasswordProtectionServiceHandler"),
+            ("metadata", "MetadataServiceHandler"),
+            ("append", "AppendServiceHandler"),
+            ("distribution", "PasswordDistributionServiceHandler"),
+            ("bulk_watermark", "BulkWatermarkServiceHandler"),
+            ("compress", "CompressServiceHandler"),
+            ("optimize", "OptimizeServiceHandler"),
+            ("repair", "RepairServiceHandler"),
+            ("documents", "DocumentServiceHandler"),
         ]
 
         for service_name, handler_class_name in services:
@@ -0,0 +1,32 @@
+"""
+Shared fixtures: sample documents written with reportlab
+"""
+
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from .helpers import write_document
+
+
+@pytest.fixture
+def make_document(tmp_path: Path) -> Callable[..., Path]:
+    """Factory writing a sample document into the test's temporary directory"""
+
+    def make(name: str = "document.pdf", pages: int = 6, **kwargs) -> Path:
+        return write_document(tmp_path / name, pages, **kwargs)
+
+    return make
+
+
+@pytest.fixture
+def document(make_document) -> Path:
+    """Six pages, a bookmark on every other page"""
+    return make_document(pages=6, outline_every=2)
+
+
+@pytest.fixture
+def large_document(make_document) -> Path:
+    """300 small pages, a bookmark every 30 pages"""
+    return make_document("large.pdf", pages=300, outline_every=30)
@@ -0,0 +1,119 @@
+"""
+Test helpers: sample documents and independent checks of written files
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import PyPDF2
+import pytest
+from reportlab.pdfgen import canvas
+
+
+def write_document(
+    path: Path, pages: int, outline_every: int = 0, size=(300, 300), rotate: int = 0
+) -> Path:
+    """Pages with the text "Page n" (from 1); a bookmark every ``outline_every`` pages"""
+    c = canvas.Canvas(str(path), pagesize=size)
+    c.setTitle("sample")
+    for number in range(1, pages + 1):
+        if rotate:
+            c.setPageRotation(rotate)
+        c.drawString(50, 150, f"Page {number}")
+        if outline_every and (number - 1) % outline_every == 0:
+            key = f"page{number}"
+            c.bookmarkPage(key)
+            c.addOutlineEntry(f"Chapter {number}", key, level=0)
+        c.showPage()
+    c.save()
+    return path
+
+
+# 页面树描述：None 表示一页，列表表示 /Pages 节点及其子节点
+PageTree = Union[None, List["PageTree"]]
+
+
+def write_page_tree(
+    path: Path, tree: List[PageTree], rotate: Optional[Dict[int, int]] = None
+) -> Path:
+    """A document whose page tree has the shape of ``tree``, written object by object
+
+    Page ``n`` (from 0) is ``100 + n`` points wide. ``rotate`` maps the
+    position of a ``/Pages`` node (order of appearance, root is 0) to a
+    ``/Rotate`` it sets for its pages.
+    """
+    objects: List[bytes] = [b"<< /Type /Catalog /Pages 2 0 R >>"]
+    pages = 0
+    nodes = 0
+
+    def add(tree: List[PageTree], parent: int) -> int:
+        nonlocal pages, nodes
+        objects.append(b"")
+        number = len(objects)
+        position = nodes
+        nodes += 1
+        kids, count = [], 0
+        for kid in tree:
+            if kid is None:
+                objects.append(
+                    b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d 100] >>"
+                    % (number, 100 + pages)
+                )
+                kids.append(len(objects))
+                pages += 1
+                count += 1
+            else:
+                before = pages
+                kids.append(add(kid, number))
+                count += pages - before
+        entries = b" ".join(b"%d 0 R" % kid for kid in kids)
+        extra = b" /Parent %d 0 R" % parent if parent else b""
+        if rotate and position in rotate:
+            extra += b" /Rotate %d" % rotate[position]
+        objects[number - 1] = b"<< /Type /Pages /Kids [%s] /Count %d%s >>" % (
+            entries,
+            count,
+            extra,
+        )
+        return number
+
+    add(tree, 0)
+    data = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    path.write_bytes(bytes(data))
+    return path
+
+
+def page_texts(path: Path) -> List[str]:
+    """Text of every page, read with PyPDF2"""
+    return [page.extract_text().strip() for page in PyPDF2.PdfReader(str(path)).pages]
+
+
+def qpdf_check(path: Path) -> int:
+    """Open a written file with qpdf (through pikepdf) and check its structure
+
+    Fails when qpdf reports problems or the trailer ``/Size`` does not match
+    the objects in the file; skips the test when pikepdf is not installed.
+
+    Returns:
+        Number of pages qpdf sees
+    """
+    pikepdf = pytest.importorskip("pikepdf")
+    with pikepdf.open(path) as pdf:
+        # 文件中的对象号从交叉引用读取：qpdf 打开时会把继承的页面属性下推为新的内存对象
+        reader = PyPDF2.PdfReader(str(path))
+        numbers = [*reader.xref_objStm, *(n for table in reader.xref.values() for n in table)]
+        assert int(pdf.trailer.Size) == max(numbers) + 1
+        problems = pdf.check_pdf_syntax()
+        assert not problems, problems
+        return len(pdf.pages)
@@ -0,0 +1,83 @@
+"""
+Append: appended pages keep their own geometry under the base page tree
+"""
+
+from pathlib import Path
+
+import pytest
+from PyPDF2 import PdfReader
+
+from pdftool.common.models import AppendOptions
+from pdftool.common.utils import reader_cache
+from pdftool.domains.document.operations import AppendOperation
+
+from .helpers import page_texts, qpdf_check
+
+pikepdf = pytest.importorskip("pikepdf")
+
+
+def move_to_root(path, **root_entries):
+    """Move the pages' /MediaBox and /Resources to the page tree root, drop /Rotate 0"""
+    with pikepdf.open(path, allow_overwriting_input=True) as pdf:
+        root = pdf.Root.Pages
+        for kid in root.Kids:
+            del kid["/Rotate"]
+            for key in ("/MediaBox", "/Resources"):
+                root[key] = kid[key]
+                del kid[key]
+        for key, value in root_entries.items():
+            root[f"/{key}"] = value
+        pdf.save(path)
+    return path
+
+
+@pytest.mark.parametrize("incremental", [True, False])
+def test_appended_pages_do_not_inherit_base_attributes(make_document, incremental):
+    base = move_to_root(
+        make_document("base.pdf", pages=2),
+        Rotate=90,
+        CropBox=pikepdf.Array([0, 0, 50, 50]),
+    )
+    appended = move_to_root(make_document("appended.pdf", pages=3, size=(200, 400)))
+    output = base.with_name("output.pdf")
+
+    AppendOperation().execute(
+        [base, appended], AppendOptions(output_file=output, incremental=incremental)
+    )
+
+    assert qpdf_check(output) == 5
+    pages = PdfReader(str(output)).pages
+    assert [page.rotation for page in pages] == [90, 90, 0, 0, 0]
+    for page in pages[2:]:
+        assert list(page.mediabox) == [0, 0, 200, 400]
+        assert list(page.cropbox) == [0, 0, 200, 400]
+    assert page_texts(output) == ["Page 1", "Page 2", "Page 1", "Page 2", "Page 3"]
+
+
+@pytest.mark.parametrize("incremental", [True, False])
+def test_each_file_is_parsed_once(make_document, monkeypatch, incremental):
+    base = make_document("base.pdf", pages=2)
+    appended = [make_document(f"appended_{n}.pdf", pages=n) for n in (1, 3)]
+    output = base.with_name("output.pdf")
+    parsed = []
+    init = PdfReader.__init__
+
+    def counting_init(self, stream, *args, **kwargs):
+        name = getattr(stream, "name", stream)
+        if isinstance(name, (str, Path)):
+            parsed.append(Path(name).name)
+        init(self, stream, *args, **kwargs)
+
+    monkeypatch.setattr(PdfReader, "__init__", counting_init)
+    reader_cache.clear()
+
+    result = AppendOperation().execute(
+        [base, *appended], AppendOptions(output_file=output, incremental=incremental)
+    )
+
+    assert sorted(parsed) == ["appended_1.pdf", "appended_3.pdf", "base.pdf"]
+    # 校验输入时不再解析文件放入缓存
+    assert len(reader_cache) == 0
+    assert result.message.endswith("4 个页面")
+    monkeypatch.undo()
+    assert qpdf_check(output) == 6
@@ -0,0 +1,76 @@
+"""
+Bulk watermark: recipient templates and recipient lists
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from pdftool.common.exceptions import PDFValidationError
+from pdftool.domains.document.operations.bulk_watermark import render_template
+from pdftool.interfaces.web.dependencies import parse_recipients
+from pdftool.interfaces.web.main import app
+
+RECIPIENT = {"name": "Alice", "email": "alice@example.com"}
+
+
+@pytest.mark.parametrize(
+    "template, expected",
+    [
+        ("Licensed to {name} <{email}>", "Licensed to Alice <alice@example.com>"),
+        ("{{name}} = {name}", "{name} = Alice"),
+        ("no fields", "no fields"),
+    ],
+)
+def test_render_template(template, expected):
+    assert render_template(template, RECIPIENT, 1) == expected
+
+
+def test_field_values_are_not_expanded():
+    recipient = {"name": "{email}", "email": "alice@example.com"}
+
+    assert render_template("{name}", recipient, 1) == "{email}"
+
+
+@pytest.mark.parametrize(
+    "template",
+    ["{name:>500}", "{name!r}", "{name.upper}", "{name[0]}", "{0}x{", "{}", "unbalanced }"],
+)
+def test_format_syntax_is_rejected(template):
+    with pytest.raises(PDFValidationError, match="格式无效|缺少"):
+        render_template(template, RECIPIENT, 1)
+
+
+def test_missing_field():
+    with pytest.raises(PDFValidationError, match="第 2 个接收者缺少水印模板字段: phone"):
+        render_template("{phone}", RECIPIENT, 2)
+
+
+def test_parse_csv_recipients():
+    text = " name , email\nAlice, alice@example.com\nBob\n"
+
+    assert parse_recipients(text) == [
+        {"name": "Alice", "email": "alice@example.com"},
+        {"name": "Bob", "email": ""},
+    ]
+
+
+def test_csv_row_with_extra_columns_is_rejected():
+    with pytest.raises(ValueError, match="第 3 行"):
+        parse_recipients("name,email\nAlice,a@example.com\nBob,b@example.com,extra\n")
+
+
+def test_csv_extra_columns_are_a_bad_request(document):
+    with TestClient(app) as client, open(document, "rb") as f:
+        response = client.post(
+            "/api/v1/pdf/watermark/bulk",
+            files={"file": ("document.pdf", f, "application/pdf")},
+            data={
+                "watermark_text": "{name}",
+                "recipients": "name\nAlice,extra\n",
+                "position": "5",
+                "opacity": "50",
+            },
+        )
+
+    assert response.status_code == 400
+    assert "列数多于表头" in response.json()["detail"]
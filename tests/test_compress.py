@@ -0,0 +1,119 @@
+"""
+Compress: re-encoded images must decode to the original pixels
+"""
+
+import zlib
+from base64 import a85encode
+
+import pytest
+from PyPDF2 import PageObject, PdfWriter
+from PyPDF2.generic import (
+    ArrayObject,
+    DictionaryObject,
+    NameObject,
+    NullObject,
+    NumberObject,
+    StreamObject,
+)
+
+from pdftool.common.models import CompressionLevel, CompressOptions
+from pdftool.domains.document.operations import CompressOperation
+
+from .helpers import qpdf_check
+
+pikepdf = pytest.importorskip("pikepdf")
+
+WIDTH = HEIGHT = 200
+
+
+def gradient_rows() -> bytes:
+    """Gray image, left-to-right gradient, with a PNG "None" filter byte per row"""
+    row = bytes(x * 255 // (WIDTH - 1) for x in range(WIDTH))
+    return b"".join(b"\x00" + row for _ in range(HEIGHT))
+
+
+def write_image_document(path, data, filters, decode_parms=None):
+    """One page drawing a 200x200 gray image on a 20x20 pt square (720 DPI)
+
+    ``data`` is stored as is, encoded with ``filters``.
+    """
+    writer = PdfWriter()
+    page = PageObject.create_blank_page(width=100, height=100)
+    image = StreamObject()
+    image._data = data
+    image.update(
+        {
+            NameObject("/Type"): NameObject("/XObject"),
+            NameObject("/Subtype"): NameObject("/Image"),
+            NameObject("/Width"): NumberObject(WIDTH),
+            NameObject("/Height"): NumberObject(HEIGHT),
+            NameObject("/ColorSpace"): NameObject("/DeviceGray"),
+            NameObject("/BitsPerComponent"): NumberObject(8),
+            NameObject("/Filter"): filters,
+        }
+    )
+    if decode_parms is not None:
+        image[NameObject("/DecodeParms")] = decode_parms
+    content = StreamObject()
+    content._data = b"q 20 0 0 20 10 10 cm /Im0 Do Q"
+    page[NameObject("/Resources")] = DictionaryObject(
+        {NameObject("/XObject"): DictionaryObject({NameObject("/Im0"): writer._add_object(image)})}
+    )
+    page[NameObject("/Contents")] = writer._add_object(content)
+    writer.add_page(page)
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path
+
+
+def compressed_image(source, tmp_path):
+    output = tmp_path / "compressed.pdf"
+    options = CompressOptions(level=CompressionLevel.HIGH, max_workers=1, output_file=output)
+    CompressOperation().execute(source, options)
+    qpdf_check(output)
+    with pikepdf.open(output) as pdf:
+        image = pdf.pages[0].Resources.XObject.Im0
+        return pikepdf.PdfImage(image).as_pil_image()
+
+
+def test_predictor_behind_ascii_filter(tmp_path):
+    """/DecodeParms of /FlateDecode apply even when an ASCII filter comes first"""
+    predictor = DictionaryObject(
+        {
+            NameObject("/Predictor"): NumberObject(15),
+            NameObject("/Columns"): NumberObject(WIDTH),
+            NameObject("/Colors"): NumberObject(1),
+        }
+    )
+    data = a85encode(zlib.compress(gradient_rows()), adobe=True)[2:]
+    source = write_image_document(
+        tmp_path / "ascii.pdf",
+        data,
+        ArrayObject([NameObject("/ASCII85Decode"), NameObject("/FlateDecode")]),
+        ArrayObject([NullObject(), predictor]),
+    )
+
+    image = compressed_image(source, tmp_path)
+
+    assert image.width < WIDTH
+    # 每一行都是同样的从左到右渐变
+    for y in (0, image.height // 2, image.height - 1):
+        assert image.getpixel((0, y)) < 20
+        assert image.getpixel((image.width - 1, y)) > 235
+
+
+def test_image_with_wrong_data_length_is_kept(tmp_path):
+    """Pixel data that does not match /Width x /Height is not reinterpreted"""
+    # 每行多一个字节，但没有声明预测器
+    source = write_image_document(
+        tmp_path / "mismatch.pdf", zlib.compress(gradient_rows()), NameObject("/FlateDecode")
+    )
+
+    output = tmp_path / "compressed.pdf"
+    options = CompressOptions(level=CompressionLevel.HIGH, max_workers=1, output_file=output)
+    CompressOperation().execute(source, options)
+
+    with pikepdf.open(output) as pdf:
+        image = pdf.pages[0].Resources.XObject.Im0
+        assert int(image.Width) == WIDTH
+        assert image.Filter == pikepdf.Name.FlateDecode
@@ -0,0 +1,72 @@
+"""
+Multi-file downloads: archives live in the request's temporary directory
+"""
+
+import json
+import tempfile
+import zipfile
+from io import BytesIO
+
+import pytest
+from fastapi.testclient import TestClient
+
+from pdftool.interfaces.web.main import app
+
+
+@pytest.fixture
+def temp_root(tmp_path, monkeypatch):
+    """Temporary files of the request go to an empty directory; run from another one"""
+    root = tmp_path / "temp"
+    root.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(root))
+    cwd = tmp_path / "cwd"
+    cwd.mkdir()
+    monkeypatch.chdir(cwd)
+    return root
+
+
+def assert_cleaned_up(temp_root, prefix):
+    """Request directories (copies and archive) and uploads are gone after the download"""
+    assert list(temp_root.iterdir()) == []
+    # 工作目录（操作的默认临时目录 temp/ 所在处）中没有残留
+    cwd = temp_root.parent / "cwd"
+    assert [path for path in cwd.rglob("*") if not path.is_dir()] == []
+    assert not any(path.name.startswith(prefix) for path in cwd.rglob("*"))
+
+
+def test_distribution_archive_is_cleaned_up(document, temp_root):
+    recipients = [
+        {"name": name, "user_password": f"{name}-secret", "encryption_algorithm": "rc4_128"}
+        for name in ("alice", "bob")
+    ]
+
+    with TestClient(app) as client, open(document, "rb") as f:
+        response = client.post(
+            "/api/v1/pdf/distribute",
+            files={"file": ("document.pdf", f, "application/pdf")},
+            data={"recipients": json.dumps(recipients)},
+        )
+
+    assert response.status_code == 200, response.text
+    with zipfile.ZipFile(BytesIO(response.content)) as archive:
+        assert sorted(archive.namelist()) == ["document_alice.pdf", "document_bob.pdf"]
+    assert_cleaned_up(temp_root, "distribution_")
+
+
+def test_bulk_watermark_archive_is_cleaned_up(document, temp_root):
+    with TestClient(app) as client, open(document, "rb") as f:
+        response = client.post(
+            "/api/v1/pdf/watermark/bulk",
+            files={"file": ("document.pdf", f, "application/pdf")},
+            data={
+                "watermark_text": "Licensed to {name}",
+                "recipients": "name,email\nalice,a@example.com\nbob,b@example.com\n",
+                "position": "5",
+                "opacity": "50",
+            },
+        )
+
+    assert response.status_code == 200, response.text
+    with zipfile.ZipFile(BytesIO(response.content)) as archive:
+        assert sorted(archive.namelist()) == ["document_alice.pdf", "document_bob.pdf"]
+    assert_cleaned_up(temp_root, "bulk_watermark_")
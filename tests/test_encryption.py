@@ -0,0 +1,47 @@
+"""
+Object encryption: batches are encrypted ahead of the writer, within a bounded window
+"""
+
+from PyPDF2.generic import TextStringObject
+
+from pdftool.common.models import EncryptionAlgorithm
+from pdftool.domains.document.structure import encryption
+from pdftool.domains.document.structure.encryption import (
+    StandardSecurityHandler,
+    collect_parts,
+    encrypt_objects,
+)
+
+OBJECTS = [(idnum, collect_parts(TextStringObject(f"Object {idnum}"))) for idnum in range(1, 2001)]
+
+
+def handler():
+    return StandardSecurityHandler(
+        EncryptionAlgorithm.RC4_128, "secret", "owner", permissions=0, file_id=b"\0" * 16
+    )
+
+
+def test_parallel_output_matches_serial():
+    serial = list(encrypt_objects(OBJECTS, handler(), max_workers=1))
+
+    assert list(encrypt_objects(OBJECTS, handler(), max_workers=2)) == serial
+    assert [idnum for idnum, _ in serial] == [idnum for idnum, _ in OBJECTS]
+
+
+def test_encryption_stays_within_window(monkeypatch):
+    encrypted = []
+    encrypt_parts = encryption._encrypt_parts
+
+    def counting(parts, handler, idnum):
+        encrypted.append(idnum)
+        return encrypt_parts(parts, handler, idnum)
+
+    monkeypatch.setattr(encryption, "_encrypt_parts", counting)
+    bodies = encrypt_objects(OBJECTS, handler(), max_workers=2)
+
+    assert next(bodies)[0] == 1
+    bodies.close()
+
+    # 第一个对象写出前，最多加密了窗口内的批次和当前批次
+    window = 2 * encryption.BATCHES_PER_WORKER + 1
+    assert len(encrypted) <= window * encryption._BATCH_SIZE < len(OBJECTS)
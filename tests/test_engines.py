@@ -0,0 +1,135 @@
+"""
+PDF engines: every registered engine passes the same checks
+
+Outputs are verified with PyPDF2 and with qpdf (through pikepdf).
+"""
+
+import pytest
+from PyPDF2 import PdfReader
+from reportlab.pdfgen import canvas
+
+from pdftool.common.exceptions import PDFValidationError
+from pdftool.common.interfaces import available_engines, get_engine
+from pdftool.common.models import EncryptionAlgorithm
+from pdftool.config.settings import settings
+from pdftool.domains.document import engines  # noqa: F401  注册引擎
+
+from .helpers import page_texts, qpdf_check
+
+# 加密算法 -> 安全处理程序修订版本
+REVISIONS = {
+    EncryptionAlgorithm.RC4_128: 3,
+    EncryptionAlgorithm.AES_128: 4,
+    EncryptionAlgorithm.AES_256: 6,
+}
+PERMISSIONS = -3904 | 4  # 仅允许打印
+
+
+@pytest.fixture(params=available_engines())
+def engine(request):
+    return get_engine(request.param)
+
+
+@pytest.fixture
+def stamp(tmp_path):
+    path = tmp_path / "stamp.pdf"
+    c = canvas.Canvas(str(path), pagesize=(300, 300))
+    c.drawString(50, 250, "STAMP")
+    c.showPage()
+    c.save()
+    return path
+
+
+def outline(path):
+    reader = PdfReader(str(path))
+    return [(item.title, reader.get_destination_page_number(item)) for item in reader.outline]
+
+
+def test_page_count(engine, document):
+    with engine.open(document) as opened:
+        assert opened.page_count == 6
+        assert not opened.is_encrypted
+
+
+def test_copy_pages(engine, document, tmp_path):
+    output = tmp_path / "copy.pdf"
+    with engine.open(document) as first, engine.open(document) as second:
+        with engine.new() as merged:
+            merged.copy_pages(first, import_outline=True)
+            merged.copy_pages(second, [1, 4, 5], import_outline=True)
+            assert merged.page_count == 9
+            merged.write(output)
+
+    assert qpdf_check(output) == 9
+    assert page_texts(output) == [f"Page {n}" for n in (1, 2, 3, 4, 5, 6, 2, 5, 6)]
+    # 书签指向复制后的页面；第二份只保留指向所选页面的书签
+    assert outline(output) == [
+        ("Chapter 1", 0),
+        ("Chapter 3", 2),
+        ("Chapter 5", 4),
+        ("Chapter 5", 7),
+    ]
+
+
+def test_stamp(engine, document, stamp, tmp_path):
+    output = tmp_path / "stamped.pdf"
+    with engine.open(document) as opened, engine.open(stamp) as overlay:
+        opened.stamp(overlay, [0, 2])
+        opened.write(output)
+
+    assert qpdf_check(output) == 6
+    stamped = ["STAMP" in text for text in page_texts(output)]
+    assert stamped == [True, False, True, False, False, False]
+    assert PdfReader(str(output)).metadata["/Title"] == "sample"
+
+
+@pytest.mark.parametrize("algorithm", list(REVISIONS))
+def test_encrypt(engine, document, tmp_path, algorithm):
+    pikepdf = pytest.importorskip("pikepdf")
+    output = tmp_path / f"{algorithm.value}.pdf"
+    with engine.open(document) as opened:
+        opened.encrypt(algorithm, "user", "owner", PERMISSIONS)
+        opened.write(output)
+
+    with pytest.raises(pikepdf.PasswordError):
+        pikepdf.open(output)
+    with pikepdf.open(output, password="user") as pdf:
+        assert pdf.encryption.R == REVISIONS[algorithm]
+        assert pdf.allow.print_lowres
+        assert not pdf.allow.extract
+        assert not pdf.check_pdf_syntax()
+        assert len(pdf.pages) == 6
+        assert b"Page 1" in pdf.pages[0].Contents.read_bytes()
+
+
+def test_linearize(engine, document, tmp_path):
+    pikepdf = pytest.importorskip("pikepdf")
+    output = tmp_path / "linearized.pdf"
+    with engine.open(document) as opened:
+        opened.write(output, linearize=True)
+
+    with pikepdf.open(output) as pdf:
+        assert pdf.is_linearized
+        assert pdf.check_linearization(stream=None)
+        assert len(pdf.pages) == 6
+
+
+def test_page_limit(engine, document, monkeypatch):
+    monkeypatch.setattr(settings, "max_page_count", 5)
+
+    with pytest.raises(PDFValidationError):
+        engine.open(document).close()
+    # 不检查上限时可以打开
+    engine.open(document, check_limits=False).close()
+
+
+def test_encrypted_input_is_rejected(engine, document, tmp_path):
+    encrypted = tmp_path / "encrypted.pdf"
+    with engine.open(document) as opened:
+        opened.encrypt(EncryptionAlgorithm.RC4_128, "user", "owner", PERMISSIONS)
+        opened.write(encrypted)
+
+    # 打开或写出时拒绝，取决于引擎
+    with pytest.raises(PDFValidationError):
+        with engine.open(encrypted) as opened:
+            opened.write(tmp_path / "output.pdf")
@@ -0,0 +1,85 @@
+"""
+Document info: the page count fast path and the structure analysis
+"""
+
+import pytest
+from PIL import Image
+from PyPDF2 import PdfReader
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from pdftool.common.models import InfoOptions, PageSizeSummary
+from pdftool.common.utils import LimitedPdfReader, reader_cache
+from pdftool.config.settings import settings
+from pdftool.domains.document.operations import InfoOperation
+from pdftool.domains.document.structure.analysis import analyze_document
+
+from .helpers import write_page_tree
+
+P = None  # 一页
+
+
+@pytest.fixture
+def mixed_document(tmp_path):
+    """Two text pages (300 x 300), then two rotated pages (MediaBox 200 x 400) drawing one image"""
+    path = tmp_path / "mixed.pdf"
+    image = ImageReader(Image.new("RGB", (20, 10), "red"))
+    c = canvas.Canvas(str(path), pagesize=(300, 300))
+    for number in (1, 2):
+        c.setFont("Courier", 12)
+        c.drawString(50, 150, f"Page {number}")
+        c.showPage()
+    for _ in range(2):
+        c.setPageSize((400, 200))
+        c.setPageRotation(90)
+        c.drawImage(image, 0, 0, width=400, height=200)
+        c.showPage()
+    c.save()
+    return path
+
+
+def test_page_count_reads_only_page_tree_root(large_document, monkeypatch):
+    def flatten(*args, **kwargs):
+        raise AssertionError("page tree walked")
+
+    reader_cache.clear()
+    monkeypatch.setattr(PdfReader, "_flatten", flatten)
+    monkeypatch.setattr(LimitedPdfReader, "_flatten", flatten)
+
+    assert InfoOperation().execute(large_document).pages == 300
+
+
+def test_inconsistent_page_count_falls_back_to_traversal(tmp_path):
+    path = write_page_tree(tmp_path / "pages.pdf", [[P, P, P], [P, P, P]])
+    path.write_bytes(path.read_bytes().replace(b"/Count 6", b"/Count 5"))
+
+    assert InfoOperation().execute(path).pages == 6
+
+
+def test_analysis_fields(mixed_document):
+    info = InfoOperation().execute(mixed_document, InfoOptions(analyze=True))
+
+    analysis = info.analysis
+    assert info.pages == 4
+    assert (analysis.version, analysis.encrypted, analysis.linearized) == ("1.3", False, False)
+    assert analysis.encryption is None
+    assert analysis.page_sizes == [
+        PageSizeSummary(width=300, height=300, rotation=0, count=2),
+        PageSizeSummary(width=200, height=400, rotation=90, count=2),
+    ]
+    # reportlab 在页面资源中声明默认字体 Helvetica
+    assert analysis.fonts == ["Courier", "Helvetica"]
+    # 两页绘制同一个图片对象
+    assert analysis.image_count == 1 and analysis.image_bytes > 0
+    assert (analysis.text_pages, analysis.scanned_pages) == (2, 2)
+    assert analysis.content_type == "mixed"
+
+
+def test_analysis_ignores_pages_below_depth_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "max_nesting_depth", 2)
+    path = write_page_tree(tmp_path / "deep.pdf", [P, [[[[P]]]]])
+
+    analysis = analyze_document(PdfReader(str(path)))
+
+    # 第二页的父节点链超过深度上限，不计入页面统计
+    assert analysis.page_sizes == [PageSizeSummary(width=100, height=100, rotation=0, count=1)]
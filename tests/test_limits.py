@@ -0,0 +1,98 @@
+"""
+Resource limits: decompression bombs and page trees, checked where they are read
+"""
+
+import zlib
+
+import pytest
+from PyPDF2 import PageObject, PdfWriter
+from PyPDF2.generic import NameObject, StreamObject
+
+from pdftool.common.exceptions import PDFValidationError
+from pdftool.common.utils import inflate, open_reader
+from pdftool.config.settings import settings
+from pdftool.domains.document.structure import get_pages
+
+from .helpers import write_page_tree
+
+P = None  # 一页
+
+
+@pytest.fixture
+def bomb(tmp_path):
+    """One page whose 10 KB content stream inflates to 10 MB"""
+    writer = PdfWriter()
+    page = PageObject.create_blank_page(width=100, height=100)
+    content = StreamObject()
+    content._data = zlib.compress(b" " * (10 * 1024 * 1024), 9)
+    content[NameObject("/Filter")] = NameObject("/FlateDecode")
+    page[NameObject("/Contents")] = writer._add_object(content)
+    writer.add_page(page)
+    path = tmp_path / "bomb.pdf"
+    with open(path, "wb") as f:
+        writer.write(f)
+    assert path.stat().st_size < 100 * 1024
+    return path
+
+
+def test_inflate_stops_at_limit():
+    data = zlib.compress(b"\0" * 1_000_000)
+
+    assert inflate(data, limit=1_000_000) == b"\0" * 1_000_000
+    with pytest.raises(PDFValidationError, match="解压炸弹"):
+        inflate(data, limit=999_999)
+
+
+def test_content_stream_bomb_is_rejected(bomb, monkeypatch):
+    monkeypatch.setattr(settings, "max_decoded_stream_size", 1024 * 1024)
+    reader = open_reader(str(bomb))
+
+    with pytest.raises(PDFValidationError):
+        reader.pages[0].get_contents().get_data()
+
+
+def test_open_does_not_walk_page_tree(large_document):
+    reader = open_reader(str(large_document))
+
+    # 只读取目录和页面树根节点
+    assert len(reader.resolved_objects) <= 3
+
+
+def test_declared_page_count_is_checked_at_open(document, monkeypatch):
+    monkeypatch.setattr(settings, "max_page_count", 5)
+
+    with pytest.raises(PDFValidationError, match="超过 5 页"):
+        open_reader(str(document))
+
+
+def test_deep_page_tree_is_rejected_when_walked(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "max_nesting_depth", 4)
+    path = write_page_tree(tmp_path / "deep.pdf", [P, [[[[P]]]]])
+
+    reader = open_reader(str(path))
+    # 只经过浅层节点的页面仍可读取
+    assert list(get_pages(reader, [0])) == [0]
+    with pytest.raises(PDFValidationError, match="深度"):
+        get_pages(reader, [1])
+    with pytest.raises(PDFValidationError, match="深度"):
+        len(open_reader(str(path)).pages)
+
+
+def test_page_tree_cycle_is_rejected(tmp_path):
+    path = write_page_tree(tmp_path / "cycle.pdf", [[P], P])
+    # 第一个中间节点（3 号对象）的子节点中加入根节点
+    path.write_bytes(path.read_bytes().replace(b"/Kids [4 0 R]", b"/Kids [4 0 R 2 0 R]"))
+
+    with pytest.raises(PDFValidationError, match="循环"):
+        len(open_reader(str(path)).pages)
+
+
+def test_undeclared_pages_are_counted_when_walked(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "max_page_count", 5)
+    path = write_page_tree(tmp_path / "pages.pdf", [[P, P, P], [P, P, P]])
+    # 根节点声明的页数低于上限，实际页数超过
+    path.write_bytes(path.read_bytes().replace(b"/Count 6", b"/Count 2"))
+
+    reader = open_reader(str(path))
+    with pytest.raises(PDFValidationError, match="页数超过"):
+        len(reader.pages)
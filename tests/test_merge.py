@@ -0,0 +1,28 @@
+"""
+Merge: tree merge in worker processes keeps page and bookmark order
+"""
+
+from PyPDF2 import PdfReader
+
+from pdftool.common.models import MergeOptions
+from pdftool.domains.document.operations import MergeOperation
+
+from .helpers import page_texts, qpdf_check
+
+
+def test_tree_merge_in_worker_processes(make_document, tmp_path):
+    inputs = [make_document(f"part_{index}.pdf", pages=2, outline_every=2) for index in range(7)]
+    output = tmp_path / "merged.pdf"
+    options = MergeOptions(
+        output_file=output, tree_merge=True, group_size=2, max_workers=2, preserve_bookmarks=True
+    )
+
+    result = MergeOperation().execute(inputs, options)
+
+    assert "分层并行合并" in result.details
+    assert qpdf_check(output) == 14
+    assert page_texts(output) == ["Page 1", "Page 2"] * 7
+    reader = PdfReader(str(output))
+    assert [reader.get_destination_page_number(item) for item in reader.outline] == list(
+        range(0, 14, 2)
+    )
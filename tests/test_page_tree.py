@@ -0,0 +1,64 @@
+"""
+Page tree traversal: selected pages are found without flattening the tree
+"""
+
+import pytest
+from PyPDF2 import PdfReader
+
+from pdftool.common.exceptions import PDFValidationError
+from pdftool.domains.document.structure import get_pages
+
+from .helpers import write_page_tree
+
+P = None  # 一页
+
+TREES = {
+    "flat": [P, P, P, P, P],
+    "nested": [[P, P], [P, P], [P]],
+    "unbalanced": [P, [P, [P, [P]]], P],
+    # /Count 等于子节点数，但第一个子节点是空的中间节点
+    "empty node first": [[], P, [P, P]],
+    "empty node between": [[P, P], [], P],
+    "empty nodes only": [[], [[]], P],
+}
+
+
+def widths(pages):
+    return {index: int(page.mediabox.width) for index, page in pages.items()}
+
+
+@pytest.mark.parametrize("shape", TREES)
+def test_get_pages_matches_flattening(shape, tmp_path):
+    path = write_page_tree(tmp_path / "tree.pdf", TREES[shape])
+    expected = [int(page.mediabox.width) for page in PdfReader(str(path)).pages]
+    assert expected == [100 + n for n in range(len(expected))]
+
+    for index in range(len(expected)):
+        assert widths(get_pages(PdfReader(str(path)), [index])) == {index: 100 + index}
+    everything = get_pages(PdfReader(str(path)), range(len(expected)))
+    assert widths(everything) == dict(enumerate(expected))
+
+
+def test_get_pages_applies_inherited_attributes(tmp_path):
+    # 节点按出现顺序编号：0 为根，1 为第一个子节点
+    path = write_page_tree(tmp_path / "tree.pdf", [[P, P], P], rotate={0: 90, 1: 180})
+
+    pages = get_pages(PdfReader(str(path)), [0, 2])
+
+    assert {index: page["/Rotate"] for index, page in pages.items()} == {0: 180, 2: 90}
+
+
+def test_get_pages_out_of_range(tmp_path):
+    path = write_page_tree(tmp_path / "tree.pdf", [[], P, [P, P]])
+
+    with pytest.raises(PDFValidationError):
+        get_pages(PdfReader(str(path)), [3])
+
+
+def test_get_pages_rejects_wrong_count(tmp_path):
+    path = write_page_tree(tmp_path / "tree.pdf", [[P, P], P])
+    data = path.read_bytes().replace(b"/Count 2", b"/Count 1")
+    path.write_bytes(data)
+
+    with pytest.raises(PDFValidationError):
+        get_pages(PdfReader(str(path)), [2])
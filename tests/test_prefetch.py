@@ -0,0 +1,68 @@
+"""
+Stream prefetch: only streams decodable without file access go to the pool
+"""
+
+import zlib
+
+import pytest
+from PyPDF2 import PageObject, PdfReader, PdfWriter
+from PyPDF2.generic import (
+    ArrayObject,
+    DictionaryObject,
+    NameObject,
+    NumberObject,
+    StreamObject,
+)
+
+from pdftool.domains.document.structure import prefetch_pages
+
+COLUMNS = 100
+
+
+def predicted_rows(rows: int) -> bytes:
+    """Rows of ``COLUMNS`` bytes, each with a PNG "None" predictor byte, compressed"""
+    data = b"".join(b"\x00" + bytes(range(COLUMNS)) for _ in range(rows))
+    return zlib.compress(data, 0)
+
+
+def predictor(writer, indirect_columns):
+    columns = NumberObject(COLUMNS)
+    return DictionaryObject(
+        {
+            NameObject("/Predictor"): NumberObject(12),
+            NameObject("/Columns"): writer._add_object(columns) if indirect_columns else columns,
+        }
+    )
+
+
+@pytest.fixture
+def source(tmp_path):
+    """Three pages with predicted content: /Columns direct, referenced from a
+    direct /DecodeParms dictionary, and from a dictionary inside an array"""
+    writer = PdfWriter()
+    for indirect_columns, in_array in ((False, False), (True, False), (True, True)):
+        parms = predictor(writer, indirect_columns)
+        filters = NameObject("/FlateDecode")
+        if in_array:
+            parms, filters = ArrayObject([parms]), ArrayObject([filters])
+        content = StreamObject()
+        content._data = predicted_rows(400)
+        content[NameObject("/Filter")] = filters
+        content[NameObject("/DecodeParms")] = parms
+        page = PageObject.create_blank_page(width=100, height=100)
+        page[NameObject("/Contents")] = writer._add_object(content)
+        writer.add_page(page)
+    path = tmp_path / "predicted.pdf"
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path
+
+
+def test_references_in_decode_parms_are_left_to_the_consumer(source):
+    reader = PdfReader(str(source))
+
+    pages = list(prefetch_pages(reader.pages, max_workers=2))
+
+    # 解析引用需要读文件，这些流留给调用方在自己的线程中解码
+    decoded = [page["/Contents"].get_object().decoded_self is not None for page in pages]
+    assert decoded == [True, False, False]
@@ -0,0 +1,49 @@
+"""
+Parsed document cache: the content hash is computed once per borrow
+"""
+
+import hashlib
+
+import pytest
+
+from pdftool.common.models import InfoOptions
+from pdftool.common.utils import ReaderCache, file_sha256, reader_cache
+from pdftool.domains.document.operations import InfoOperation
+
+
+@pytest.fixture
+def hashed(monkeypatch):
+    """Counts SHA-256 computations"""
+    calls = []
+    sha256 = hashlib.sha256
+
+    def counting(*args):
+        calls.append(args)
+        return sha256(*args)
+
+    monkeypatch.setattr(hashlib, "sha256", counting)
+    return calls
+
+
+@pytest.mark.parametrize("max_bytes", [1024 * 1024, 1])
+def test_borrow_yields_content_hash(document, max_bytes):
+    cache = ReaderCache(max_bytes)
+
+    for _ in range(2):
+        with cache.borrow_with_key(document) as (reader, key):
+            assert len(reader.pages) == 6
+            assert key == file_sha256(document)
+    # 大于缓存的文件不缓存
+    assert len(cache) == (1 if max_bytes > 1 else 0)
+
+
+def test_info_analysis_hashes_once(document, hashed):
+    reader_cache.clear()
+    InfoOperation._analysis_cache.clear()
+
+    info = InfoOperation().execute(document, InfoOptions(analyze=True))
+
+    assert info.analysis is not None
+    assert len(hashed) == 1
+    # 相同内容再次分析时使用缓存的结果
+    assert InfoOperation().execute(document, InfoOptions(analyze=True)).analysis is info.analysis
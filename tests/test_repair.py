@@ -0,0 +1,50 @@
+"""
+Repair: rebuilt cross-references must open in an independent reader (qpdf)
+"""
+
+import re
+
+import pytest
+from PyPDF2 import PdfReader
+
+from pdftool.common.models import RepairOptions
+from pdftool.domains.document.operations import RepairOperation
+
+from .helpers import qpdf_check
+
+
+@pytest.fixture
+def truncated(document, tmp_path):
+    """The sample document cut in the middle of its last object"""
+    data = document.read_bytes()
+    last = list(re.finditer(rb"(\d+) 0 obj", data))[-1]
+    path = tmp_path / "truncated.pdf"
+    path.write_bytes(data[: last.end() + 40])
+    return path, int(last.group(1))
+
+
+def test_truncated_object_number_is_not_reused(truncated, tmp_path):
+    pikepdf = pytest.importorskip("pikepdf")
+    source, dropped = truncated
+    output = tmp_path / "repaired.pdf"
+
+    RepairOperation().execute(source, RepairOptions(rewrite=False, output_file=output))
+
+    with pikepdf.open(output) as pdf:
+        assert pdf.trailer.Size > dropped + 1
+        # 被丢弃的对象号不能指向新追加的交叉引用流
+        obj = pdf.get_object((dropped, 0))
+        assert not isinstance(obj, pikepdf.Dictionary) or obj.get("/Type") != "/XRef"
+
+
+@pytest.mark.parametrize("rewrite", [False, True])
+def test_repaired_file_opens_in_qpdf(truncated, tmp_path, rewrite):
+    source, _ = truncated
+    output = tmp_path / "repaired.pdf"
+
+    RepairOperation().execute(source, RepairOptions(rewrite=rewrite, output_file=output))
+
+    assert qpdf_check(output) == 6
+    # 最后一页的内容流被截断，其余页面完整
+    pages = PdfReader(str(output)).pages[:5]
+    assert [page.extract_text().strip() for page in pages] == [f"Page {n}" for n in range(1, 6)]
@@ -0,0 +1,147 @@
+"""
+Resource pruning: split pages keep only the resources their content uses
+"""
+
+import pytest
+from PyPDF2 import PageObject, PdfReader, PdfWriter
+from PyPDF2.generic import (
+    ArrayObject,
+    DictionaryObject,
+    NameObject,
+    NumberObject,
+    StreamObject,
+)
+
+from pdftool.common.models import PageSelectionMode, PageSelectionOptions
+from pdftool.domains.document.operations import SplitOperation
+from pdftool.domains.document.structure.resources import (
+    content_names,
+    prune_page_resources,
+)
+
+from .helpers import qpdf_check
+
+
+def name(value):
+    return NameObject(value)
+
+
+def stream(data, **entries):
+    obj = StreamObject()
+    obj._data = data
+    obj.update({name(key): value for key, value in entries.items()})
+    return obj
+
+
+@pytest.fixture
+def shared_resources(tmp_path):
+    """Two pages sharing one resource dictionary
+
+    Page 1 draws the Form XObject /Fm0, which uses /F2 and /GS1 from the page
+    resources; page 2 only uses /F1. /Im0 and /GS2 are used by neither.
+    """
+    writer = PdfWriter()
+
+    def font(base):
+        return writer._add_object(
+            DictionaryObject(
+                {
+                    name("/Type"): name("/Font"),
+                    name("/Subtype"): name("/Type1"),
+                    name("/BaseFont"): name(base),
+                }
+            )
+        )
+
+    def gstate(opacity):
+        return writer._add_object(DictionaryObject({name("/CA"): NumberObject(opacity)}))
+
+    form = stream(
+        b"/GS1 gs BT /F2 12 Tf (form) Tj ET",
+        **{"/Type": name("/XObject"), "/Subtype": name("/Form")},
+    )
+    form[name("/BBox")] = ArrayObject(NumberObject(v) for v in (0, 0, 100, 100))
+    image = stream(
+        b"\x00",
+        **{
+            "/Type": name("/XObject"),
+            "/Subtype": name("/Image"),
+            "/Width": NumberObject(1),
+            "/Height": NumberObject(1),
+            "/ColorSpace": name("/DeviceGray"),
+            "/BitsPerComponent": NumberObject(8),
+        },
+    )
+    resources = writer._add_object(
+        DictionaryObject(
+            {
+                name("/Font"): DictionaryObject(
+                    {name("/F1"): font("/Helvetica"), name("/F2"): font("/Courier")}
+                ),
+                name("/XObject"): DictionaryObject(
+                    {
+                        name("/Fm0"): writer._add_object(form),
+                        name("/Im0"): writer._add_object(image),
+                    }
+                ),
+                name("/ExtGState"): DictionaryObject(
+                    {name("/GS1"): gstate(1), name("/GS2"): gstate(0)}
+                ),
+                name("/ProcSet"): name("/PDF"),
+            }
+        )
+    )
+    for content in (b"q /Fm0 Do Q", b"BT /F1 12 Tf (page) Tj ET"):
+        page = PageObject.create_blank_page(width=100, height=100)
+        page[name("/Resources")] = resources
+        page[name("/Contents")] = writer._add_object(stream(content))
+        writer.add_page(page)
+
+    path = tmp_path / "shared.pdf"
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path
+
+
+def resource_names(resources):
+    return {
+        key: sorted(value.get_object().keys()) if isinstance(value.get_object(), dict) else value
+        for key, value in resources.items()
+    }
+
+
+def test_content_names():
+    content = b"BT /F#231 12 Tf (a /NotAName) Tj ET /Im0 Do"
+
+    assert content_names(content) == {"/F#1", "/NotAName", "/Im0"}
+
+
+def test_prune_page_resources(shared_resources):
+    first, second = PdfReader(str(shared_resources)).pages
+
+    # Form XObject 使用的页面资源也被保留
+    assert resource_names(prune_page_resources(first)) == {
+        "/Font": ["/F2"],
+        "/XObject": ["/Fm0"],
+        "/ExtGState": ["/GS1"],
+        "/ProcSet": "/PDF",
+    }
+    assert resource_names(prune_page_resources(second)) == {
+        "/Font": ["/F1"],
+        "/ProcSet": "/PDF",
+    }
+
+
+def test_split_writes_pruned_resources(shared_resources, tmp_path):
+    options = PageSelectionOptions(
+        mode=PageSelectionMode.SPECIFIC_PAGES, pages=[2], output_dir=tmp_path
+    )
+
+    (output,) = SplitOperation().execute(shared_resources, options).output_files
+
+    assert qpdf_check(output) == 1
+    resources = PdfReader(str(output)).pages[0]["/Resources"]
+    assert resource_names(resources) == {"/Font": ["/F1"], "/ProcSet": "/PDF"}
+    # 未使用的图片和字体不写入输出
+    data = output.read_bytes()
+    assert b"/Courier" not in data and b"/Image" not in data
@@ -0,0 +1,207 @@
+"""
+Round trips through the structure writers: outputs must open in an independent reader (qpdf)
+"""
+
+import pytest
+
+from pdftool.common.models import (
+    BulkWatermarkOptions,
+    EncryptionAlgorithm,
+    MergeOptions,
+    MetadataOptions,
+    OptimizeOptions,
+    PasswordDistributionOptions,
+    PasswordProtectionOptions,
+    RecipientProtection,
+    WatermarkOptions,
+    WatermarkPosition,
+    WatermarkType,
+)
+from pdftool.domains.document.operations import (
+    BulkWatermarkOperation,
+    MergeOperation,
+    MetadataOperation,
+    OptimizeOperation,
+    PasswordDistributionOperation,
+    PasswordProtectionOperation,
+    WatermarkOperation,
+)
+
+from .helpers import page_texts, qpdf_check
+
+pikepdf = pytest.importorskip("pikepdf")
+
+PAGES = [f"Page {n}" for n in range(1, 7)]
+
+
+def text_watermark(text="CONFIDENTIAL", **kwargs):
+    return WatermarkOptions(
+        watermark_type=WatermarkType.TEXT,
+        position=WatermarkPosition.CENTER,
+        opacity=0.5,
+        text=text,
+        font_size=24,
+        font_color="#ff0000",
+        **kwargs,
+    )
+
+
+def page_streams(page):
+    """Content streams of a page and of the Form XObjects it draws, decoded"""
+    contents = page.obj.Contents
+    for content in contents if isinstance(contents, pikepdf.Array) else [contents]:
+        yield content.read_bytes()
+    resources = page.obj.get("/Resources", {})
+    for xobject in resources.get("/XObject", {}).values():
+        if xobject.get("/Subtype") == "/Form":
+            yield xobject.read_bytes()
+
+
+def watermarked(path, text=b"CONFIDENTIAL"):
+    """For every page, whether its content shows ``text``"""
+    with pikepdf.open(path) as pdf:
+        return [any(text in data for data in page_streams(page)) for page in pdf.pages]
+
+
+def check_encrypted(path, password, revision):
+    """Opens in qpdf only with the password; decrypted pages carry the original text"""
+    with pytest.raises(pikepdf.PasswordError):
+        pikepdf.open(path)
+    with pikepdf.open(path, password=password) as pdf:
+        assert pdf.encryption.R == revision
+        assert not pdf.check_pdf_syntax()
+        contents = [page.Contents.read_bytes() for page in pdf.pages]
+    assert [f"Page {n}".encode() in data for n, data in enumerate(contents, 1)] == [True] * 6
+
+
+@pytest.mark.parametrize(
+    "algorithm, revision",
+    [(EncryptionAlgorithm.RC4_128, 3), (EncryptionAlgorithm.AES_256, 6)],
+)
+@pytest.mark.parametrize("linearize", [False, True])
+def test_password_protection(document, tmp_path, algorithm, revision, linearize):
+    output = tmp_path / "protected.pdf"
+    options = PasswordProtectionOptions(
+        user_password="secret",
+        owner_password="owner",
+        allow_copying=False,
+        algorithm=algorithm,
+        max_workers=2,
+        linearize=linearize,
+        output_file=output,
+    )
+
+    PasswordProtectionOperation().execute(document, options)
+
+    check_encrypted(output, "secret", revision)
+    with pikepdf.open(output, password="owner") as pdf:
+        assert pdf.owner_password_matched
+        assert pdf.is_linearized == linearize
+        assert not pdf.allow.extract
+
+
+def test_distribution_copies(document, tmp_path):
+    recipients = [
+        RecipientProtection(
+            name,
+            PasswordProtectionOptions(user_password=f"{name}-secret", algorithm=algorithm),
+        )
+        for name, algorithm in (
+            ("alice", EncryptionAlgorithm.RC4_128),
+            ("bob", EncryptionAlgorithm.AES_256),
+        )
+    ]
+    options = PasswordDistributionOptions(recipients, output_dir=tmp_path, max_workers=2)
+
+    result = PasswordDistributionOperation().execute(document, options)
+
+    alice, bob = sorted(result.output_files)
+    check_encrypted(alice, "alice-secret", 3)
+    check_encrypted(bob, "bob-secret", 6)
+    # 每个副本只能用自己的密码打开
+    with pytest.raises(pikepdf.PasswordError):
+        pikepdf.open(alice, password="bob-secret")
+    with pikepdf.open(alice, password="alice-secret") as first:
+        with pikepdf.open(bob, password="bob-secret") as second:
+            assert first.trailer.ID[0] != second.trailer.ID[0]
+
+
+@pytest.mark.parametrize(
+    "object_streams, deduplicate", [(True, True), (False, True), (True, False)]
+)
+def test_optimize(large_document, tmp_path, object_streams, deduplicate):
+    output = tmp_path / "optimized.pdf"
+    options = OptimizeOptions(
+        object_streams=object_streams, deduplicate=deduplicate, output_file=output
+    )
+
+    OptimizeOperation().execute(large_document, options)
+
+    assert qpdf_check(output) == 300
+    texts = page_texts(output)
+    assert texts[0] == "Page 1" and texts[-1] == "Page 300"
+    with pikepdf.open(output) as pdf:
+        has_object_streams = any(
+            obj.get("/Type") == "/ObjStm" for obj in pdf.objects if isinstance(obj, pikepdf.Stream)
+        )
+        assert has_object_streams == object_streams
+        assert [item.title for item in pdf.open_outline().root][:2] == ["Chapter 1", "Chapter 31"]
+
+
+def test_metadata_incremental(document, tmp_path):
+    output = tmp_path / "metadata.pdf"
+    options = MetadataOptions(title="Edited", author="", incremental=True, output_file=output)
+
+    MetadataOperation().execute(document, options)
+
+    # 原始字节保留在文件开头
+    assert output.read_bytes().startswith(document.read_bytes())
+    assert qpdf_check(output) == 6
+    with pikepdf.open(output) as pdf:
+        assert str(pdf.docinfo.Title) == "Edited"
+        assert "/Author" not in pdf.docinfo
+    assert page_texts(output) == PAGES
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_watermark(document, tmp_path, incremental):
+    output = tmp_path / "watermarked.pdf"
+    options = text_watermark(incremental=incremental, output_file=output)
+
+    WatermarkOperation().execute(document, options)
+
+    if incremental:
+        assert output.read_bytes().startswith(document.read_bytes())
+    assert qpdf_check(output) == 6
+    assert watermarked(output) == [True] * 6
+    assert [text.splitlines()[0] for text in page_texts(output)] == PAGES
+
+
+def test_bulk_watermark(document, tmp_path):
+    options = BulkWatermarkOptions(
+        watermark=text_watermark("CONFIDENTIAL {name}"),
+        recipients=[{"name": "alice"}, {"name": "bob"}],
+        output_dir=tmp_path / "bulk",
+        max_workers=2,
+    )
+
+    result = BulkWatermarkOperation().execute(document, options)
+
+    for path, name in zip(sorted(result.output_files), ("alice", "bob")):
+        assert qpdf_check(path) == 6
+        assert watermarked(path, f"CONFIDENTIAL {name}".encode()) == [True] * 6
+
+
+@pytest.mark.parametrize("optimize, linearize", [(True, False), (False, True)])
+def test_merge_rewrites(make_document, tmp_path, optimize, linearize):
+    inputs = [make_document(f"part_{n}.pdf", pages=3) for n in range(3)]
+    output = tmp_path / "merged.pdf"
+    options = MergeOptions(output_file=output, optimize=optimize, linearize=linearize)
+
+    MergeOperation().execute(inputs, options)
+
+    assert qpdf_check(output) == 9
+    with pikepdf.open(output) as pdf:
+        assert pdf.is_linearized == linearize
+        if linearize:
+            assert pdf.check_linearization(stream=None)
@@ -0,0 +1,56 @@
+"""
+Document store: single pages served from stored documents
+"""
+
+import pytest
+
+from pdftool.common.exceptions import PDFValidationError
+from pdftool.domains.document.store import DocumentStore, page_etag
+from pdftool.domains.document.structure.writer import OUTPUT_FORMAT_VERSION
+from pdftool.interfaces.web.handlers.documents import DocumentServiceHandler
+
+from .helpers import page_texts, qpdf_check
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DocumentStore(tmp_path / "store")
+
+
+def test_page_pdf_opens_in_qpdf(store, large_document, tmp_path):
+    document_id = store.add(large_document)
+
+    for number in (1, 150, 300):
+        output = tmp_path / f"page_{number}.pdf"
+        output.write_bytes(store.page_pdf(document_id, number))
+        assert qpdf_check(output) == 1
+        assert page_texts(output) == [f"Page {number}"]
+
+
+def test_page_out_of_range(store, document):
+    document_id = store.add(document)
+
+    with pytest.raises(PDFValidationError):
+        store.page_pdf(document_id, 7)
+
+
+def test_page_etag_carries_writer_version(store, document):
+    document_id = store.add(document)
+
+    assert page_etag(document_id, 3) == f'"{document_id}-3-w{OUTPUT_FORMAT_VERSION}"'
+
+
+def test_page_not_modified(store, document):
+    handler = DocumentServiceHandler()
+    handler.store = store
+    document_id = store.add(document)
+    etag = page_etag(document_id, 2)
+
+    response = handler.page(document_id, 2)
+    assert response.status_code == 200
+    assert response.headers["ETag"] == etag
+
+    assert handler.page(document_id, 2, if_none_match=f"W/{etag}").status_code == 304
+    # 旧版本写出器的 ETag 不再匹配
+    stale = f'"{document_id}-2"'
+    assert handler.page(document_id, 2, if_none_match=stale).status_code == 200
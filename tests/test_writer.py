@@ -0,0 +1,81 @@
+"""
+Page subset writer: outputs must open in an independent reader (qpdf)
+"""
+
+import pytest
+from PyPDF2 import PdfReader
+
+from pdftool.common.models import PageSelectionMode, PageSelectionOptions
+from pdftool.domains.document.operations import SplitOperation
+from pdftool.domains.document.structure import PageSubsetWriter, read_outline
+
+from .helpers import page_texts, qpdf_check
+
+
+def split(source, tmp_path, mode, **kwargs):
+    output_dir = tmp_path / f"out_{mode.value}"
+    output_dir.mkdir()
+    options = PageSelectionOptions(mode=mode, output_dir=output_dir, **kwargs)
+    result = SplitOperation().execute(source, options)
+    assert result.success
+    return sorted(result.output_files, key=lambda path: path.stat().st_mtime_ns)
+
+
+@pytest.mark.parametrize(
+    "mode, kwargs",
+    [
+        (PageSelectionMode.SPECIFIC_PAGES, {"pages": [1, 150, 300]}),
+        (PageSelectionMode.SINGLE_FILE, {"pages": [299, 2, 7]}),
+        (PageSelectionMode.CHUNK, {"chunk_size": 50}),
+        (PageSelectionMode.OUTLINE, {}),
+    ],
+)
+def test_split_outputs_open_in_qpdf(large_document, tmp_path, mode, kwargs):
+    outputs = split(large_document, tmp_path, mode, **kwargs)
+
+    pages = 0
+    for output in outputs:
+        count = qpdf_check(output)
+        assert count == len(PdfReader(str(output)).pages)
+        pages += count
+    expected = len(kwargs["pages"]) if "pages" in kwargs else 300
+    assert pages == expected
+
+
+def test_single_page_output_is_small(large_document, tmp_path):
+    """A one-page output is numbered from 1, not with the source numbering"""
+    (output,) = split(large_document, tmp_path, PageSelectionMode.SPECIFIC_PAGES, pages=[300])
+
+    pikepdf = pytest.importorskip("pikepdf")
+    qpdf_check(output)
+    with pikepdf.open(output) as pdf:
+        assert int(pdf.trailer.Size) < 20
+    assert page_texts(output) == ["Page 300"]
+
+
+def test_outline_destinations_follow_renumbering(large_document, tmp_path):
+    reader = PdfReader(str(large_document))
+    pages = reader.pages[30:90]
+    outline = read_outline(reader, pages)
+    output = tmp_path / "chapters.pdf"
+
+    PageSubsetWriter(reader).write(pages, output, outline)
+
+    qpdf_check(output)
+    written = PdfReader(str(output))
+    assert page_texts(output)[0] == "Page 31"
+    titles = [(item.title, written.get_destination_page_number(item)) for item in written.outline]
+    assert titles == [("Chapter 31", 0), ("Chapter 61", 30)]
+
+
+def test_outputs_share_cached_objects(large_document, tmp_path):
+    reader = PdfReader(str(large_document))
+    writer = PageSubsetWriter(reader)
+
+    for number in (1, 2, 3):
+        writer.write([reader.pages[number - 1]], tmp_path / f"page_{number}.pdf")
+
+    assert writer.cache.hits > 0
+    for number in (1, 2, 3):
+        qpdf_check(tmp_path / f"page_{number}.pdf")
+        assert page_texts(tmp_path / f"page_{number}.pdf") == [f"Page {number}"]